@@ -31,6 +31,66 @@ DB_PATH = os.path.join(DATA_DIR, 'teaching_assistant.db')
 # SQL 脚本路径
 SQL_SCRIPT_PATH = os.path.join(BASE_DIR, 'start.sql')
 
+# 数据库迁移脚本目录（start.sql 为版本 1，后续版本按 NNNN_name.sql 命名）
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+
+# 数据库连接池配置
+DB_POOL_CONFIG = {
+    'enabled': True,
+    'max_size': 5,  # 最大连接数
+    'timeout': 10,  # 等待空闲连接的最长时间（秒）
+    'health_check_interval': 30,  # 空闲超过该时间的连接在借出前做健康检查（秒）
+    'cached_statements': 512,  # 每个连接缓存的预编译语句数量（sqlite3 默认 128）
+    'fetch_batch_size': 500  # iter_query 每次 fetchmany 读取的行数
+}
+
+# 数据库存储配置（连接建立时应用的 PRAGMA）
+DB_STORAGE_PROFILES = {
+    # SQLite 默认行为：回滚日志，读写共用连接
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,  # 负数表示 KB
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,  # 毫秒
+        'read_write_split': False
+    },
+    # WAL 模式：读连接只读打开，写操作走单一写连接，读不会被写阻塞
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'read_write_split': True
+    }
+}
+DB_STORAGE_PROFILE = 'wal'
+
+# 后台数据库执行器配置（界面的服务调用在工作线程中执行）
+DB_EXECUTOR_CONFIG = {
+    'max_workers': 4,  # 工作线程数，不超过读连接池大小
+    'poll_interval': 30  # 界面轮询结果的间隔（毫秒）
+}
+
+# 数据库错误处理配置
+DB_ERROR_CONFIG = {
+    'strict': False,  # 严格模式：execute_* 出错时抛出 DatabaseError 子类，而不是返回 [] / None
+    'busy_retries': 3,  # 数据库被锁定时的重试次数（严格与非严格模式都生效）
+    'busy_backoff': 0.05,  # 首次重试前等待的秒数，之后按指数增长
+    'busy_backoff_max': 1.0  # 单次等待上限（秒）
+}
+
+# SQL 性能分析配置（默认关闭，开启后记录每条语句的耗时和调用方）
+DB_PROFILER_CONFIG = {
+    'enabled': False,
+    'slow_query_threshold_ms': 100,  # 超过该耗时写入慢查询日志
+    'slow_query_log': os.path.join(LOG_DIR, 'slow_query.log'),
+    'explain': True  # 慢查询日志中附带 EXPLAIN QUERY PLAN
+}
+
 # 日志配置
 LOG_FILE = os.path.join(LOG_DIR, 'app.log')
 LOG_LEVEL = logging.INFO
@@ -51,6 +111,56 @@ SESSION_TIMEOUT = timedelta(hours=2)
 AI_SIMILARITY_THRESHOLD = 0.6  # 相似度阈值
 AI_MIN_SCORE_RATIO = 0.3  # 最低得分比例
 AI_MAX_GRADING_TIME = 30  # 最大评分时间（秒）
+AI_TOKEN_CACHE_SIZE = 4096  # 分词缓存条目数（LRU）
+
+# 主观题评分后端：tfidf（jieba 分词 + TF-IDF 余弦相似度）/ hashed_embedding（字符 n-gram 哈希向量，离线）
+AI_GRADING_BACKEND = 'tfidf'
+
+# 向量评分后端配置
+AI_EMBEDDING_CONFIG = {
+    'n_features': 2 ** 12,  # 哈希向量维度
+    'ngram_range': (1, 3),  # 字符 n-gram 范围
+    'cache_path': os.path.join(TEMP_DIR, 'embedding_cache.npz'),  # 标准答案向量的持久化缓存
+    'cache_size': 2000,  # 内存中缓存的标准答案向量数
+    'cache_flush_every': 100  # 每新增多少个向量写回一次缓存文件，其余在程序退出时写回
+}
+
+# 相似答案（抄袭）检测配置：MinHash + LSH
+PLAGIARISM_CONFIG = {
+    'num_perm': 128,  # MinHash 签名长度
+    'bands': 16,  # LSH 分段数，每段 num_perm / bands 行；阈值约为 (1/bands)^(bands/num_perm) ≈ 0.71
+    'shingle_size': 2,  # 以连续 2 个词为一个 shingle（主观题答案较短，3 个词时改一个词就会丢掉较多 shingle）
+    'threshold': 0.7,  # 估计 Jaccard 相似度不低于该值才算相似
+    'min_tokens': 5,  # 少于该词数的答案（如"不知道"）不参与检测
+    'seed': 42
+}
+
+# 主观题评分结果记忆表（grading_memo）
+GRADING_MEMO_CONFIG = {
+    'enabled': True
+}
+
+# 评分器预热配置（程序启动时在后台线程加载 jieba 词典）
+AI_WARMUP_CONFIG = {
+    'enabled': True,
+    'jieba_cache_dir': TEMP_DIR,  # jieba 预构建词典缓存（jieba.cache）所在目录
+    'wait_timeout': 30  # 评分等待预热完成的最长时间（秒），超时后直接分词
+}
+
+# 作业重新评分配置（标准答案修改后整份作业重新评分）
+AI_REGRADE_CONFIG = {
+    'workers': None,  # 评分进程数，None 表示 CPU 核数；0 表示在当前进程中评分
+    'shard_size': 200,  # 每个分片的提交数，每个分片在一个事务中写回
+    'pending_per_worker': 2  # 每个进程最多排队的分片数，限制内存占用
+}
+
+# 异步评分队列配置
+GRADING_QUEUE_CONFIG = {
+    'workers': 2,  # 评分工作线程数
+    'max_attempts': 3,  # 每个任务最多尝试次数，用尽后标记为 failed
+    'retry_backoff': 5,  # 重试退避基数（秒），第 n 次失败后等待 retry_backoff * 2^(n-1)
+    'poll_interval': 1.0  # 队列为空时的轮询间隔（秒）
+}
 
 # 文件上传配置
 ALLOWED_EXTENSIONS = {
@@ -18,8 +18,10 @@ try:
 except ImportError:
     HAS_TTKBOOTSTRAP = False
 
-from config import WINDOW_TITLE, WINDOW_SIZE, THEME_NAME, APP_NAME, APP_VERSION
+from config import WINDOW_TITLE, WINDOW_SIZE, THEME_NAME, APP_NAME, APP_VERSION, AI_WARMUP_CONFIG
 from modules.db_manager import DBManager
+from modules.db_executor import shutdown_db_executor
+from modules.ai_grader import grader_warmup, flush_grading_backends
 from modules.auth import AuthManager
 from modules.logger import setup_logger
 
@@ -92,6 +94,15 @@ class App(ttk.Window if HAS_TTKBOOTSTRAP else tk.Tk):
             self.gradebook_service = GradebookService(self.db)
             self.analytics_service = AnalyticsService(self.db)
             
+            # 异步评分队列：提交后立即返回，评分在后台工作线程中完成
+            from modules.grading_queue import GradingQueue
+            self.grading_queue = GradingQueue(self.db, self.submission_service, self.notification_service)
+            self.grading_queue.start()
+            
+            # 后台预热评分器，第一份提交不再承担 jieba 词典加载的耗时
+            if AI_WARMUP_CONFIG['enabled']:
+                grader_warmup.start()
+            
             logger.info("All services initialized successfully")
             
         except Exception as e:
@@ -204,6 +215,7 @@ class App(ttk.Window if HAS_TTKBOOTSTRAP else tk.Tk):
             self.notification_service,
             self.gradebook_service,
             self.analytics_service,
+            self.grading_queue,
             self.logout
         )
         self.current_frame.pack(fill=BOTH, expand=True)
@@ -281,7 +293,12 @@ def main():
         def on_closing():
             if app.confirm_dialog("确认退出", "确定要退出系统吗？"):
                 logger.info("Application closed by user")
+                # 停止评分队列（未完成的任务下次启动时恢复），写回标准答案向量缓存，取消尚未执行的后台查询，并关闭连接池
+                app.grading_queue.stop()
+                flush_grading_backends()
+                shutdown_db_executor()
                 app.destroy()
+                app.db.close()
         
         app.protocol("WM_DELETE_WINDOW", on_closing)
         
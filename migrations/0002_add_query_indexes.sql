@@ -0,0 +1,37 @@
+-- 热点查询的复合索引
+-- 索引列顺序：等值过滤列在前，排序/聚合列在后，尽量让查询只读索引
+
+-- get_submission_detail: WHERE submission_id = ? ORDER BY question_id
+CREATE INDEX IF NOT EXISTS idx_submission_detail_submission ON submission_detail(submission_id, question_id);
+
+-- get_question_statistics: JOIN ON question_id，聚合 score / is_correct（覆盖索引）
+CREATE INDEX IF NOT EXISTS idx_submission_detail_question ON submission_detail(question_id, score, is_correct);
+
+-- 讨论列表中 reply_count / last_reply_time 的相关子查询（覆盖索引）
+CREATE INDEX IF NOT EXISTS idx_discussion_parent ON discussion(parent_id, created_at);
+
+-- get_user_notifications / get_notification_count: user_id + is_read，按 created_at 倒序
+CREATE INDEX IF NOT EXISTS idx_notification_user_read ON notification(user_id, is_read, created_at);
+DROP INDEX IF EXISTS idx_notification_user;
+
+-- 课程成绩：按 course_id 过滤，按 assignment_id / student_id 分组
+CREATE INDEX IF NOT EXISTS idx_gradebook_course ON gradebook(course_id, assignment_id, student_id);
+
+-- 作业题目列表和总分
+CREATE INDEX IF NOT EXISTS idx_question_assignment ON question(assignment_id);
+
+-- update_learning_progress 的查重：student_id + course_id + content_id
+CREATE INDEX IF NOT EXISTS idx_learning_progress_lookup ON learning_progress(student_id, course_id, content_id);
+DROP INDEX IF EXISTS idx_learning_progress_student;
+
+-- 课程统计和 enrolled_count 子查询：按 course_id 统计学生
+CREATE INDEX IF NOT EXISTS idx_learning_progress_course ON learning_progress(course_id, student_id);
+
+-- 以下由索引顾问（scripts/index_advisor.py）发现
+-- 章节内容列表：WHERE chapter_id = ? ORDER BY order_index
+CREATE INDEX IF NOT EXISTS idx_course_content_chapter ON course_content(chapter_id, order_index);
+-- 作业讨论列表
+CREATE INDEX IF NOT EXISTS idx_discussion_assignment ON discussion(assignment_id);
+
+-- 更新查询规划器的统计信息
+ANALYZE;
@@ -0,0 +1,3 @@
+-- 标准答案的分词结果（JSON 数组），由 AssignmentService.add_question / update_question 写入
+-- 主观题评分时直接使用，不再对标准答案重复分词；旧题目为 NULL，评分时现场分词
+ALTER TABLE question ADD COLUMN answer_tokens TEXT;
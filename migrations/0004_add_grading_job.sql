@@ -0,0 +1,17 @@
+-- 评分任务队列：提交先记录为 pending，由 GradingQueue 的工作线程异步评分
+-- status: queued 等待评分 / running 评分中 / done 完成 / failed 重试次数用尽
+CREATE TABLE IF NOT EXISTS grading_job (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_id INTEGER NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at DATETIME DEFAULT CURRENT_TIMESTAMP, -- 重试退避：此时间之后才可领取
+    started_at DATETIME,
+    finished_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (submission_id) REFERENCES submission(id) ON DELETE CASCADE
+);
+
+-- 领取任务：WHERE status = 'queued' AND available_at <= now ORDER BY available_at
+CREATE INDEX IF NOT EXISTS idx_grading_job_status ON grading_job(status, available_at);
@@ -0,0 +1,17 @@
+-- 主观题评分结果记忆表：同一道题、同一版标准答案下，标准化后相同的答案直接复用评分结果
+-- answer_version: 标准答案或分值修改时由 AssignmentService.update_question 递增，旧版本的结果不再命中
+ALTER TABLE question ADD COLUMN answer_version INTEGER NOT NULL DEFAULT 1;
+
+-- grader: 评分方式（评分后端名，未安装 sklearn 时为 overlap），不同评分方式的结果互不复用
+-- answer_hash: 去掉空白和标点差异后的答案哈希
+CREATE TABLE IF NOT EXISTS grading_memo (
+    question_id INTEGER NOT NULL,
+    answer_version INTEGER NOT NULL,
+    grader TEXT NOT NULL,
+    answer_hash TEXT NOT NULL,
+    score REAL NOT NULL,
+    feedback TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (question_id, answer_version, grader, answer_hash),
+    FOREIGN KEY (question_id) REFERENCES question(id) ON DELETE CASCADE
+) WITHOUT ROWID;
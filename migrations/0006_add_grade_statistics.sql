@@ -0,0 +1,247 @@
+-- 成绩统计汇总表：由 gradebook 上的触发器增量维护，成绩统计只读汇总行，不再扫描成绩表
+-- 触发器中不用 INSERT OR IGNORE：外层语句为 UPSERT 时会沿用外层的冲突处理方式
+-- 只统计 score 不为空的成绩；作业的 min/max 在当前最值被删除或修改时从该作业的成绩重新查询，
+-- 课程的 min/max 再从作业汇总行得到，不扫描整门课程的成绩
+-- 数据不一致时用 GradebookService.rebuild_grade_statistics() 重建
+CREATE TABLE IF NOT EXISTS course_grade_stats (
+    course_id INTEGER PRIMARY KEY,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    score_sumsq REAL NOT NULL DEFAULT 0,
+    min_score REAL,
+    max_score REAL
+);
+
+CREATE TABLE IF NOT EXISTS assignment_grade_stats (
+    assignment_id INTEGER PRIMARY KEY,
+    course_id INTEGER,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    score_sumsq REAL NOT NULL DEFAULT 0,
+    min_score REAL,
+    max_score REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_assignment_grade_stats_course ON assignment_grade_stats(course_id);
+
+-- 学生在课程中的成绩汇总，用于参与人数和排名
+CREATE TABLE IF NOT EXISTS student_grade_stats (
+    course_id INTEGER NOT NULL,
+    student_id INTEGER NOT NULL,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (course_id, student_id)
+) WITHOUT ROWID;
+
+-- 课程中每个等级的成绩数：等级由课程的等级标准决定（可以自定义，如 "优/良/中/差"），
+-- 按等级字母分行保存，不用固定的 A–F 列；计数为 0 的行保留，读取时过滤
+CREATE TABLE IF NOT EXISTS course_grade_counts (
+    course_id INTEGER NOT NULL,
+    grade TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (course_id, grade)
+) WITHOUT ROWID;
+
+-- 新成绩计入汇总
+CREATE TRIGGER IF NOT EXISTS gradebook_stats_insert AFTER INSERT ON gradebook
+WHEN NEW.score IS NOT NULL
+BEGIN
+    INSERT INTO course_grade_stats (course_id)
+    SELECT NEW.course_id WHERE NOT EXISTS (SELECT 1 FROM course_grade_stats WHERE course_id = NEW.course_id);
+    UPDATE course_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score,
+        score_sumsq = score_sumsq + NEW.score * NEW.score,
+        min_score = CASE WHEN min_score IS NULL OR NEW.score < min_score THEN NEW.score ELSE min_score END,
+        max_score = CASE WHEN max_score IS NULL OR NEW.score > max_score THEN NEW.score ELSE max_score END
+    WHERE course_id = NEW.course_id;
+
+    INSERT INTO assignment_grade_stats (assignment_id, course_id)
+    SELECT NEW.assignment_id, NEW.course_id WHERE NEW.assignment_id IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM assignment_grade_stats WHERE assignment_id = NEW.assignment_id);
+    UPDATE assignment_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score,
+        score_sumsq = score_sumsq + NEW.score * NEW.score,
+        min_score = CASE WHEN min_score IS NULL OR NEW.score < min_score THEN NEW.score ELSE min_score END,
+        max_score = CASE WHEN max_score IS NULL OR NEW.score > max_score THEN NEW.score ELSE max_score END
+    WHERE assignment_id = NEW.assignment_id;
+
+    INSERT INTO student_grade_stats (course_id, student_id)
+    SELECT NEW.course_id, NEW.student_id WHERE NOT EXISTS (
+        SELECT 1 FROM student_grade_stats WHERE course_id = NEW.course_id AND student_id = NEW.student_id);
+    UPDATE student_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score
+    WHERE course_id = NEW.course_id AND student_id = NEW.student_id;
+END;
+
+-- 删除的成绩移出汇总
+CREATE TRIGGER IF NOT EXISTS gradebook_stats_delete AFTER DELETE ON gradebook
+WHEN OLD.score IS NOT NULL
+BEGIN
+    -- 先更新作业汇总，课程的 min/max 由作业汇总行和未关联作业的成绩得到
+    UPDATE assignment_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END,
+        score_sumsq = CASE WHEN score_count = 1 THEN 0 ELSE score_sumsq - OLD.score * OLD.score END,
+        min_score = CASE WHEN OLD.score <= min_score
+            THEN (SELECT MIN(score) FROM gradebook WHERE course_id = OLD.course_id AND assignment_id = OLD.assignment_id)
+            ELSE min_score END,
+        max_score = CASE WHEN OLD.score >= max_score
+            THEN (SELECT MAX(score) FROM gradebook WHERE course_id = OLD.course_id AND assignment_id = OLD.assignment_id)
+            ELSE max_score END
+    WHERE assignment_id = OLD.assignment_id;
+
+    UPDATE course_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END,
+        score_sumsq = CASE WHEN score_count = 1 THEN 0 ELSE score_sumsq - OLD.score * OLD.score END,
+        min_score = CASE WHEN OLD.score <= min_score
+            THEN (SELECT MIN(extreme) FROM (
+                SELECT min_score AS extreme FROM assignment_grade_stats WHERE course_id = OLD.course_id
+                UNION ALL
+                SELECT score FROM gradebook WHERE course_id = OLD.course_id AND assignment_id IS NULL)) ELSE min_score END,
+        max_score = CASE WHEN OLD.score >= max_score
+            THEN (SELECT MAX(extreme) FROM (
+                SELECT max_score AS extreme FROM assignment_grade_stats WHERE course_id = OLD.course_id
+                UNION ALL
+                SELECT score FROM gradebook WHERE course_id = OLD.course_id AND assignment_id IS NULL)) ELSE max_score END
+    WHERE course_id = OLD.course_id;
+
+    UPDATE student_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END
+    WHERE course_id = OLD.course_id AND student_id = OLD.student_id;
+END;
+
+-- 修改分数或所属课程、作业、学生：先移出旧值再计入新值（与删除 + 插入两个触发器的语句相同）
+CREATE TRIGGER IF NOT EXISTS gradebook_stats_update_old AFTER UPDATE OF score, course_id, assignment_id, student_id ON gradebook
+WHEN OLD.score IS NOT NULL AND (OLD.score IS NOT NEW.score OR OLD.course_id IS NOT NEW.course_id
+     OR OLD.assignment_id IS NOT NEW.assignment_id OR OLD.student_id IS NOT NEW.student_id)
+BEGIN
+    -- 先更新作业汇总，课程的 min/max 由作业汇总行和未关联作业的成绩得到
+    UPDATE assignment_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END,
+        score_sumsq = CASE WHEN score_count = 1 THEN 0 ELSE score_sumsq - OLD.score * OLD.score END,
+        min_score = CASE WHEN OLD.score <= min_score
+            THEN (SELECT MIN(score) FROM gradebook WHERE course_id = OLD.course_id AND assignment_id = OLD.assignment_id)
+            ELSE min_score END,
+        max_score = CASE WHEN OLD.score >= max_score
+            THEN (SELECT MAX(score) FROM gradebook WHERE course_id = OLD.course_id AND assignment_id = OLD.assignment_id)
+            ELSE max_score END
+    WHERE assignment_id = OLD.assignment_id;
+
+    UPDATE course_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END,
+        score_sumsq = CASE WHEN score_count = 1 THEN 0 ELSE score_sumsq - OLD.score * OLD.score END,
+        min_score = CASE WHEN OLD.score <= min_score
+            THEN (SELECT MIN(extreme) FROM (
+                SELECT min_score AS extreme FROM assignment_grade_stats WHERE course_id = OLD.course_id
+                UNION ALL
+                SELECT score FROM gradebook WHERE course_id = OLD.course_id AND assignment_id IS NULL)) ELSE min_score END,
+        max_score = CASE WHEN OLD.score >= max_score
+            THEN (SELECT MAX(extreme) FROM (
+                SELECT max_score AS extreme FROM assignment_grade_stats WHERE course_id = OLD.course_id
+                UNION ALL
+                SELECT score FROM gradebook WHERE course_id = OLD.course_id AND assignment_id IS NULL)) ELSE max_score END
+    WHERE course_id = OLD.course_id;
+
+    UPDATE student_grade_stats SET
+        score_count = score_count - 1,
+        score_sum = CASE WHEN score_count = 1 THEN 0 ELSE score_sum - OLD.score END
+    WHERE course_id = OLD.course_id AND student_id = OLD.student_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS gradebook_stats_update_new AFTER UPDATE OF score, course_id, assignment_id, student_id ON gradebook
+WHEN NEW.score IS NOT NULL AND (OLD.score IS NOT NEW.score OR OLD.course_id IS NOT NEW.course_id
+     OR OLD.assignment_id IS NOT NEW.assignment_id OR OLD.student_id IS NOT NEW.student_id)
+BEGIN
+    INSERT INTO course_grade_stats (course_id)
+    SELECT NEW.course_id WHERE NOT EXISTS (SELECT 1 FROM course_grade_stats WHERE course_id = NEW.course_id);
+    UPDATE course_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score,
+        score_sumsq = score_sumsq + NEW.score * NEW.score,
+        min_score = CASE WHEN min_score IS NULL OR NEW.score < min_score THEN NEW.score ELSE min_score END,
+        max_score = CASE WHEN max_score IS NULL OR NEW.score > max_score THEN NEW.score ELSE max_score END
+    WHERE course_id = NEW.course_id;
+
+    INSERT INTO assignment_grade_stats (assignment_id, course_id)
+    SELECT NEW.assignment_id, NEW.course_id WHERE NEW.assignment_id IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM assignment_grade_stats WHERE assignment_id = NEW.assignment_id);
+    UPDATE assignment_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score,
+        score_sumsq = score_sumsq + NEW.score * NEW.score,
+        min_score = CASE WHEN min_score IS NULL OR NEW.score < min_score THEN NEW.score ELSE min_score END,
+        max_score = CASE WHEN max_score IS NULL OR NEW.score > max_score THEN NEW.score ELSE max_score END
+    WHERE assignment_id = NEW.assignment_id;
+
+    INSERT INTO student_grade_stats (course_id, student_id)
+    SELECT NEW.course_id, NEW.student_id WHERE NOT EXISTS (
+        SELECT 1 FROM student_grade_stats WHERE course_id = NEW.course_id AND student_id = NEW.student_id);
+    UPDATE student_grade_stats SET
+        score_count = score_count + 1,
+        score_sum = score_sum + NEW.score
+    WHERE course_id = NEW.course_id AND student_id = NEW.student_id;
+END;
+
+-- 新成绩计入所在等级
+CREATE TRIGGER IF NOT EXISTS gradebook_grade_counts_insert AFTER INSERT ON gradebook
+WHEN NEW.score IS NOT NULL AND NEW.grade IS NOT NULL
+BEGIN
+    INSERT INTO course_grade_counts (course_id, grade)
+    SELECT NEW.course_id, NEW.grade WHERE NOT EXISTS (
+        SELECT 1 FROM course_grade_counts WHERE course_id = NEW.course_id AND grade = NEW.grade);
+    UPDATE course_grade_counts SET count = count + 1
+    WHERE course_id = NEW.course_id AND grade = NEW.grade;
+END;
+
+-- 删除的成绩移出所在等级
+CREATE TRIGGER IF NOT EXISTS gradebook_grade_counts_delete AFTER DELETE ON gradebook
+WHEN OLD.score IS NOT NULL AND OLD.grade IS NOT NULL
+BEGIN
+    UPDATE course_grade_counts SET count = count - 1
+    WHERE course_id = OLD.course_id AND grade = OLD.grade;
+END;
+
+-- 修改等级、所属课程或分数是否为空：先移出旧等级再计入新等级
+CREATE TRIGGER IF NOT EXISTS gradebook_grade_counts_update_old AFTER UPDATE OF score, grade, course_id ON gradebook
+WHEN OLD.score IS NOT NULL AND OLD.grade IS NOT NULL
+     AND (NEW.score IS NULL OR OLD.grade IS NOT NEW.grade OR OLD.course_id IS NOT NEW.course_id)
+BEGIN
+    UPDATE course_grade_counts SET count = count - 1
+    WHERE course_id = OLD.course_id AND grade = OLD.grade;
+END;
+
+CREATE TRIGGER IF NOT EXISTS gradebook_grade_counts_update_new AFTER UPDATE OF score, grade, course_id ON gradebook
+WHEN NEW.score IS NOT NULL AND NEW.grade IS NOT NULL
+     AND (OLD.score IS NULL OR OLD.grade IS NOT NEW.grade OR OLD.course_id IS NOT NEW.course_id)
+BEGIN
+    INSERT INTO course_grade_counts (course_id, grade)
+    SELECT NEW.course_id, NEW.grade WHERE NOT EXISTS (
+        SELECT 1 FROM course_grade_counts WHERE course_id = NEW.course_id AND grade = NEW.grade);
+    UPDATE course_grade_counts SET count = count + 1
+    WHERE course_id = NEW.course_id AND grade = NEW.grade;
+END;
+
+-- 已有成绩的初始汇总（与 GradebookService.rebuild_grade_statistics 相同）
+INSERT INTO course_grade_stats
+SELECT course_id, COUNT(score), COALESCE(SUM(score), 0), COALESCE(SUM(score * score), 0), MIN(score), MAX(score)
+FROM gradebook WHERE score IS NOT NULL GROUP BY course_id;
+
+INSERT INTO assignment_grade_stats
+SELECT assignment_id, MIN(course_id), COUNT(score), COALESCE(SUM(score), 0), COALESCE(SUM(score * score), 0),
+       MIN(score), MAX(score)
+FROM gradebook WHERE score IS NOT NULL AND assignment_id IS NOT NULL GROUP BY assignment_id;
+
+INSERT INTO student_grade_stats
+SELECT course_id, student_id, COUNT(score), COALESCE(SUM(score), 0)
+FROM gradebook WHERE score IS NOT NULL GROUP BY course_id, student_id;
+
+INSERT INTO course_grade_counts
+SELECT course_id, grade, COUNT(*)
+FROM gradebook WHERE score IS NOT NULL AND grade IS NOT NULL GROUP BY course_id, grade;
@@ -0,0 +1,3 @@
+-- 课程自定义的成绩等级标准，格式与 system_setting 中的 grade_scale 相同（"A:90-100,B:80-89,..."）
+-- 为 NULL 时使用系统默认标准，由 GradebookService.set_course_grade_scale 写入
+ALTER TABLE course ADD COLUMN grade_scale TEXT;
@@ -1,36 +1,211 @@
+import os
+import re
 import jieba
+import math
+import time
+import hashlib
 import logging
-from config import AI_SIMILARITY_THRESHOLD, AI_MIN_SCORE_RATIO
+import threading
+from collections import OrderedDict
+from config import (AI_SIMILARITY_THRESHOLD, AI_MIN_SCORE_RATIO, AI_TOKEN_CACHE_SIZE, AI_WARMUP_CONFIG,
+                    AI_GRADING_BACKEND, AI_EMBEDDING_CONFIG)
 
 logger = logging.getLogger(__name__)
 
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer, HashingVectorizer
     from sklearn.metrics.pairwise import cosine_similarity
     HAS_SKLEARN = True
 except ImportError:
     HAS_SKLEARN = False
     logger.warning("sklearn not installed, using fallback grading method")
 
+# grade_subjective 的语料只有 [学生答案, 标准答案] 两篇，TfidfVectorizer(smooth_idf=True) 的 idf
+# 只有两种取值：两篇都出现的词为 ln(3/3)+1 = 1，只出现在一篇中的词为 ln(3/2)+1
+_PAIR_IDF = math.log(1.5) + 1
+
+_FAILED_FEEDBACK = "AI评分失败，给予基础分"
+_FALLBACK_FAILED_FEEDBACK = "评分失败，给予基础分"
+
+# 多选题答案中的分隔符，例如 "A,C"、"A、C"、"A C"
+_CHOICE_SEPARATORS = re.compile(r"[\s,，、;；]+")
+
+# 题型：界面和测试数据使用 subjective / boolean，start.sql 的约束使用 short_answer / essay / true_false
+OBJECTIVE_TYPES = ('single_choice', 'multi_choice', 'boolean', 'true_false', 'fill_in')
+SUBJECTIVE_TYPES = ('subjective', 'short_answer', 'essay')
+
+class GraderWarmup:
+    """
+    评分器预热
+    - jieba 第一次分词时才加载词典（超过 1 秒），预热在后台线程中提前完成加载
+    - 词典从 jieba_cache_dir 下的 jieba.cache 加载，不存在时由 jieba 构建并写入
+    - 评分在分词前调用 wait()，预热进行中时等待其完成而不是同时加载
+    """
+    def __init__(self, config=None):
+        self.config = config or AI_WARMUP_CONFIG
+        self.elapsed = None  # 预热耗时（秒）
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    def start(self):
+        """启动后台预热（重复调用无效）"""
+        with self._lock:
+            if self._thread is not None or self.ready:
+                return
+            self._thread = threading.Thread(target=self._run, name='grader-warmup', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            cache_dir = self.config.get('jieba_cache_dir')
+            if cache_dir:
+                jieba.dt.tmp_dir = cache_dir
+            jieba.initialize()
+            # 走一遍完整的主观题评分，同时完成 sklearn 的延迟导入
+            AIGrader.grade_subjective("预热评分", "预热评分", 1)
+        except Exception as e:
+            logger.error(f"Grader warm-up failed: {e}", exc_info=True)
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self._ready.set()
+            logger.info(f"Grader warm-up finished in {self.elapsed:.2f}s")
+
+    def wait(self, timeout=None):
+        """
+        等待预热完成；未启动预热时立即返回
+        返回: 预热是否已完成
+        """
+        if self.ready or self._thread is None or self._thread is threading.current_thread():
+            return self.ready
+        if timeout is None:
+            timeout = self.config.get('wait_timeout')
+        if not self._ready.wait(timeout):
+            logger.warning("Grader warm-up still running, grading without waiting")
+        return self.ready
+
+# 全局评分器预热
+grader_warmup = GraderWarmup()
+
+class TokenCache:
+    """
+    jieba 分词结果的 LRU 缓存
+    - 以文本内容的哈希为键，标准答案和重复的学生答案（复制粘贴、"不知道"）只分词一次
+    - 评分可能在多个工作线程中进行，读写加锁
+    """
+    def __init__(self, maxsize=AI_TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def cut(self, text):
+        """返回分词结果（tuple）"""
+        key = self._key(text)
+        with self._lock:
+            tokens = self._data.get(key)
+            if tokens is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+
+        if not grader_warmup.ready:
+            grader_warmup.wait()
+        tokens = tuple(jieba.cut(text))
+        self.put(text, tokens, key)
+        return tokens
+
+    def put(self, text, tokens, key=None):
+        """写入已知的分词结果（例如题目保存时预先计算的标准答案分词）"""
+        key = key or self._key(text)
+        with self._lock:
+            self._data[key] = tuple(tokens)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        """返回 {'size', 'maxsize', 'hits', 'misses', 'hit_rate'}"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def clear(self):
+        """清空缓存和计数"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+# 全局分词缓存
+token_cache = TokenCache()
+
 class AIGrader:
     @staticmethod
-    def grade_objective(student_answer, standard_answer):
+    def grade_objective(student_answer, standard_answer, question_type=None):
         """
         评分客观题 (忽略大小写和首尾空格)
+        question_type 为 multi_choice 时不考虑选项顺序
         """
         if not student_answer or not standard_answer:
             return False
         
         # 标准化答案
-        student = student_answer.strip().upper().replace(" ", "")
-        standard = standard_answer.strip().upper().replace(" ", "")
+        student = AIGrader.normalize_objective(student_answer, question_type)
+        standard = AIGrader.normalize_objective(standard_answer, question_type)
         
         return student == standard
 
     @staticmethod
-    def grade_subjective(student_answer, standard_answer, max_score):
+    def normalize_objective(answer, question_type=None):
+        """
+        客观题答案的标准形式：去掉空格并转为大写；多选题为选项的 frozenset
+        空答案返回 None
+        """
+        if not answer:
+            return None
+        if question_type == 'multi_choice':
+            return frozenset(_CHOICE_SEPARATORS.sub("", answer.upper())) or None
+        return answer.strip().upper().replace(" ", "") or None
+
+    @staticmethod
+    def tokenize(text):
+        """分词（经过 token_cache）"""
+        return token_cache.cut(text)
+
+    @staticmethod
+    def _use_standard_tokens(standard_answer, standard_tokens):
+        """题目保存时预先计算的标准答案分词直接放入缓存"""
+        if standard_tokens:
+            token_cache.put(standard_answer, standard_tokens)
+
+    @staticmethod
+    def grade_subjective(student_answer, standard_answer, max_score, standard_tokens=None):
         """
         评分主观题
+        standard_tokens: 标准答案的分词结果（Question.answer_tokens），为空时现场分词
         返回: (score, feedback)
         """
         if not student_answer or not student_answer.strip():
@@ -41,16 +216,21 @@ class AIGrader:
             
         student_answer = student_answer.strip()
         standard_answer = standard_answer.strip()
+        AIGrader._use_standard_tokens(standard_answer, standard_tokens)
         
         # 1. 如果没有安装 sklearn，使用简单的关键词覆盖率
         if not HAS_SKLEARN:
             return AIGrader._grade_feature_overlap(student_answer, standard_answer, max_score)
             
-        # 2. 如果有 sklearn，使用 TF-IDF 余弦相似度
+        # 2. 配置了其他评分后端时交给批量评分
+        if AI_GRADING_BACKEND != TfidfBackend.name:
+            return AIGrader.grade_subjective_batch([student_answer], standard_answer, max_score)[0]
+        
+        # 3. 如果有 sklearn，使用 TF-IDF 余弦相似度
         try:
             # 分词
-            s_cut = " ".join(jieba.cut(student_answer))
-            t_cut = " ".join(jieba.cut(standard_answer))
+            s_cut = " ".join(AIGrader.tokenize(student_answer))
+            t_cut = " ".join(AIGrader.tokenize(standard_answer))
             
             corpus = [s_cut, t_cut]
             vectorizer = TfidfVectorizer()
@@ -69,21 +249,134 @@ class AIGrader:
                 feedback = f"AI评分: 相似度 {similarity:.2%}"
             
             # 根据相似度给出建议
-            if similarity >= 0.8:
-                feedback += " - 优秀"
-            elif similarity >= 0.6:
-                feedback += " - 良好"
-            elif similarity >= 0.4:
-                feedback += " - 及格"
-            else:
-                feedback += " - 需改进"
+            feedback += f" - {AIGrader._similarity_level(similarity)}"
             
             logger.info(f"Subjective grading: similarity={similarity:.2f}, score={score:.1f}/{max_score}")
             return round(score, 1), feedback
             
         except Exception as e:
             logger.error(f"AI Grading Error: {e}")
-            return max_score * 0.3, "AI评分失败，给予基础分"
+            return max_score * 0.3, _FAILED_FEEDBACK
+
+    @staticmethod
+    def subjective_grader_name():
+        """当前主观题评分方式：评分后端名，未安装 sklearn 时为 overlap（关键词覆盖率）"""
+        return AI_GRADING_BACKEND if HAS_SKLEARN else 'overlap'
+
+    @staticmethod
+    def is_failed_feedback(feedback):
+        """评分过程出错时给出的基础分结果"""
+        return feedback in (_FAILED_FEEDBACK, _FALLBACK_FAILED_FEEDBACK)
+
+    @staticmethod
+    def _similarity_level(similarity):
+        if similarity >= 0.8:
+            return "优秀"
+        elif similarity >= 0.6:
+            return "良好"
+        elif similarity >= 0.4:
+            return "及格"
+        return "需改进"
+
+    @staticmethod
+    def grade_subjective_batch(student_answers, standard_answer, max_score, standard_tokens=None, backend=None):
+        """
+        批量评分同一道主观题的多份答案
+        - 相似度由 AI_GRADING_BACKEND 选择的评分后端一次算出，分数和等级用 NumPy 向量化计算
+        - 默认的 tfidf 后端结果与逐份调用 grade_subjective 一致
+        student_answers: list of str
+        standard_tokens: 同 grade_subjective
+        backend: 评分后端名称或 GradingBackend 实例，默认 AI_GRADING_BACKEND
+        返回: list of (score, feedback)，顺序与 student_answers 相同
+        """
+        results = [None] * len(student_answers)
+        answered = []
+        for i, answer in enumerate(student_answers):
+            if not answer or not answer.strip():
+                results[i] = (0.0, "未作答")
+            else:
+                answered.append(i)
+
+        if not answered:
+            return results
+
+        if not standard_answer or not standard_answer.strip():
+            for i in answered:
+                results[i] = (max_score * 0.5, "标准答案为空，给予基础分")
+            return results
+
+        standard_answer = standard_answer.strip()
+        AIGrader._use_standard_tokens(standard_answer, standard_tokens)
+
+        if not HAS_SKLEARN:
+            for i in answered:
+                results[i] = AIGrader._grade_feature_overlap(student_answers[i].strip(), standard_answer, max_score)
+            return results
+
+        try:
+            if not isinstance(backend, GradingBackend):
+                backend = get_grading_backend(backend)
+            similarity, failed = backend.similarities(
+                [student_answers[i].strip() for i in answered], standard_answer
+            )
+        except Exception as e:
+            logger.error(f"AI Grading Error: {e}")
+            for i in answered:
+                results[i] = (max_score * 0.3, _FAILED_FEEDBACK)
+            return results
+
+        ratio = AI_MIN_SCORE_RATIO
+        scores = np.round(np.where(similarity < ratio, max_score * ratio, similarity * max_score), 1)
+        levels = np.select(
+            [similarity >= 0.8, similarity >= 0.6, similarity >= 0.4],
+            ["优秀", "良好", "及格"],
+            "需改进"
+        )
+        low = similarity < ratio
+
+        for row, i in enumerate(answered):
+            if failed[row]:
+                results[i] = (max_score * 0.3, _FAILED_FEEDBACK)
+                continue
+            sim = similarity[row]
+            if low[row]:
+                feedback = f"AI评分: 相似度较低 ({sim:.2%}), 给予基础分 - {levels[row]}"
+            else:
+                feedback = f"AI评分: 相似度 {sim:.2%} - {levels[row]}"
+            results[i] = (float(scores[row]), feedback)
+
+        logger.info(f"Batch subjective grading: {len(answered)} answers, mean similarity={similarity.mean():.2f}")
+        return results
+
+    @staticmethod
+    def _pair_similarities(student_counts, standard_counts):
+        """
+        由词频矩阵计算每份答案与标准答案的 TF-IDF 余弦相似度，
+        idf 按 grade_subjective 的两文档语料计算（见 _PAIR_IDF）
+        student_counts: n x V 稀疏词频矩阵；standard_counts: 1 x V
+        返回: (相似度数组, 两边都没有词项的布尔数组)
+        """
+        t = standard_counts.toarray().ravel()
+        t_sq = t * t
+        t_total = t_sq.sum()
+
+        s_sq = student_counts.multiply(student_counts).tocsr()
+        s_total = np.asarray(s_sq.sum(axis=1)).ravel()
+        s_shared = s_sq @ (t > 0).astype(np.float64)
+        present = student_counts.copy()
+        present.data[:] = 1.0
+        t_shared = present @ t_sq
+
+        # 共有词的 idf 为 1，点积只来自共有词；非共有词在各自的范数中按 _PAIR_IDF 加权
+        dot = student_counts @ t
+        k2 = _PAIR_IDF ** 2
+        s_norm = np.sqrt(s_shared + k2 * (s_total - s_shared))
+        t_norm = np.sqrt(t_shared + k2 * (t_total - t_shared))
+        denom = s_norm * t_norm
+
+        similarity = np.divide(dot, denom, out=np.zeros_like(dot), where=denom > 0)
+        failed = (s_total == 0) & (t_total == 0)
+        return similarity, failed
 
     @staticmethod
     def _grade_feature_overlap(student_answer, standard_answer, max_score):
@@ -91,8 +384,8 @@ class AIGrader:
         基于 Jaccard 相似度的简单评分 (Fallback)
         """
         try:
-            s_words = set(jieba.cut(student_answer))
-            t_words = set(jieba.cut(standard_answer))
+            s_words = set(AIGrader.tokenize(student_answer))
+            t_words = set(AIGrader.tokenize(standard_answer))
             
             # 移除停用词（简单版本）
             stop_words = {'的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '一个'}
@@ -120,7 +413,7 @@ class AIGrader:
             
         except Exception as e:
             logger.error(f"Fallback grading error: {e}")
-            return max_score * 0.3, "评分失败，给予基础分"
+            return max_score * 0.3, _FALLBACK_FAILED_FEEDBACK
 
     @staticmethod
     def batch_grade(questions, answers):
@@ -134,13 +427,13 @@ class AIGrader:
         for question in questions:
             student_answer = answers.get(question.id, "")
             
-            if question.type in ['single_choice', 'multi_choice', 'boolean', 'fill_in']:
-                is_correct = AIGrader.grade_objective(student_answer, question.answer)
+            if question.type in OBJECTIVE_TYPES:
+                is_correct = AIGrader.grade_objective(student_answer, question.answer, question.type)
                 score = question.score if is_correct else 0
                 feedback = "正确" if is_correct else "错误"
-            elif question.type == 'subjective':
+            elif question.type in SUBJECTIVE_TYPES:
                 score, feedback = AIGrader.grade_subjective(
-                    student_answer, question.answer, question.score
+                    student_answer, question.answer, question.score, question.answer_tokens
                 )
                 is_correct = None
             else:
@@ -149,3 +442,206 @@ class AIGrader:
             results.append((score, is_correct, feedback))
         
         return results
+
+    @staticmethod
+    def batch_grade_many(questions, answer_sets):
+        """
+        批量评分多份提交，结果与逐份调用 batch_grade 相同
+        主观题按题目整列交给 grade_subjective_batch，每道题只拟合一次
+        answer_sets: list of {question_id: student_answer}
+        返回: list of list of (score, is_correct, feedback)
+        """
+        results = [[None] * len(questions) for _ in answer_sets]
+        for col, question in enumerate(questions):
+            if question.type in SUBJECTIVE_TYPES:
+                graded = AIGrader.grade_subjective_batch(
+                    [answers.get(question.id, "") for answers in answer_sets],
+                    question.answer, question.score, question.answer_tokens
+                )
+                for row, (score, feedback) in enumerate(graded):
+                    results[row][col] = (score, None, feedback)
+            else:
+                for row, answers in enumerate(answer_sets):
+                    results[row][col] = AIGrader.batch_grade([question], answers)[0]
+        return results
+
+class GradingBackend:
+    """
+    主观题评分后端
+    子类实现 similarities()，返回每份答案与标准答案的相似度（0~1），由 AIGrader 统一换算分数和评语
+    """
+    name = None
+
+    def similarities(self, student_answers, standard_answer):
+        """
+        student_answers: list of str（已去掉首尾空白且非空）
+        返回: (相似度数组, 无法评分的布尔数组)
+        """
+        raise NotImplementedError
+
+class TfidfBackend(GradingBackend):
+    """jieba 分词 + TF-IDF 余弦相似度，idf 按 [学生答案, 标准答案] 两文档语料计算"""
+    name = 'tfidf'
+
+    def similarities(self, student_answers, standard_answer):
+        docs = [" ".join(AIGrader.tokenize(standard_answer))]
+        docs.extend(" ".join(AIGrader.tokenize(answer)) for answer in student_answers)
+        try:
+            counts = CountVectorizer().fit_transform(docs).tocsr().astype(np.float64)
+        except ValueError:
+            # 所有答案和标准答案都没有可用词项
+            return np.zeros(len(student_answers)), np.ones(len(student_answers), dtype=bool)
+        return AIGrader._pair_similarities(counts[1:], counts[0])
+
+class EmbeddingCache:
+    """
+    标准答案向量缓存
+    - 以文本哈希为键，内存中 LRU，并持久化到 .npz 文件，重启后不必重新计算
+    - 写回文件要序列化整个缓存，不在每次新增时进行：每新增 flush_every 个向量写回一次，
+      其余由 flush_grading_backends() 在程序退出时写回
+    - 同一道题的标准答案在所有提交之间共用一个向量
+    """
+    def __init__(self, path=None, max_size=None, flush_every=None):
+        self.path = path
+        self.max_size = max_size or AI_EMBEDDING_CONFIG['cache_size']
+        self.flush_every = flush_every or AI_EMBEDDING_CONFIG['cache_flush_every']
+        self._data = OrderedDict()
+        self._dirty = 0  # 上次写回之后新增的向量数
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _load(self):
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                for key, vector in zip(data['keys'], data['vectors']):
+                    self._data[str(key)] = vector
+        except Exception as e:
+            logger.warning(f"Failed to load embedding cache {self.path}: {e}")
+
+    def get(self, text):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            key = self.key(text)
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+            return vector
+
+    def put(self, text, vector):
+        with self._lock:
+            self._data[self.key(text)] = vector
+            self._dirty += 1
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+            due = self.path is not None and self._dirty >= self.flush_every
+        if due:
+            self.flush()
+
+    def flush(self):
+        """有新向量时写回缓存文件（先写临时文件再替换）"""
+        with self._lock:
+            if not self._dirty or not self.path or not self._data:
+                return
+            keys = np.array(list(self._data.keys()))
+            vectors = np.stack(list(self._data.values()))
+            tmp_path = f"{self.path}.tmp.npz"
+            try:
+                np.savez(tmp_path, keys=keys, vectors=vectors)
+                os.replace(tmp_path, self.path)
+                self._dirty = 0
+            except OSError as e:
+                logger.warning(f"Failed to save embedding cache {self.path}: {e}")
+
+class EmbeddingBackend(GradingBackend):
+    """
+    向量评分后端：相似度为答案向量与标准答案向量的余弦相似度
+    子类实现 embed()，返回 L2 归一化的 n x d 矩阵（可以是稀疏矩阵）
+    persist_cache: 标准答案向量是否持久化到 AI_EMBEDDING_CONFIG['cache_path']；
+    embed() 开销大的后端（例如本地模型）持久化，重新计算很便宜的后端只在内存中缓存
+    """
+    persist_cache = True
+
+    def __init__(self, cache=None):
+        if cache is None:
+            cache = EmbeddingCache(AI_EMBEDDING_CONFIG['cache_path'] if self.persist_cache else None)
+        self.cache = cache
+
+    def embed(self, texts):
+        raise NotImplementedError
+
+    def embed_standard(self, standard_answer):
+        """标准答案向量（经缓存）"""
+        vector = self.cache.get(standard_answer)
+        if vector is None:
+            embedded = self.embed([standard_answer])
+            vector = np.asarray(embedded.todense() if hasattr(embedded, 'todense') else embedded,
+                                dtype=np.float32).ravel()
+            self.cache.put(standard_answer, vector)
+        return vector
+
+    def similarities(self, student_answers, standard_answer):
+        standard = self.embed_standard(standard_answer)
+        # 学生答案整批向量化，一次矩阵乘法得到全部相似度
+        similarity = np.asarray(self.embed(student_answers) @ standard, dtype=np.float64).ravel()
+        return np.clip(similarity, 0.0, 1.0), np.zeros(len(student_answers), dtype=bool)
+
+class HashedEmbeddingBackend(EmbeddingBackend):
+    """
+    字符 n-gram 哈希向量（离线，无需下载模型）
+    不依赖分词，换一种说法但用字相近的答案也能得到相似度，同时没有拟合开销
+    """
+    name = 'hashed_embedding'
+    # 一个标准答案的哈希向量只需几微秒，写回文件的开销远大于重新计算
+    persist_cache = False
+
+    def __init__(self, cache=None, n_features=None, ngram_range=None):
+        super().__init__(cache)
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb',
+            ngram_range=tuple(ngram_range or AI_EMBEDDING_CONFIG['ngram_range']),
+            n_features=n_features or AI_EMBEDDING_CONFIG['n_features'],
+            alternate_sign=False,
+            norm='l2'
+        )
+
+    def embed(self, texts):
+        return self.vectorizer.transform(texts)
+
+GRADING_BACKENDS = {
+    TfidfBackend.name: TfidfBackend,
+    HashedEmbeddingBackend.name: HashedEmbeddingBackend
+}
+
+_backend_instances = {}
+_backend_lock = threading.Lock()
+
+def flush_grading_backends():
+    """把已创建的评分后端中尚未写回的标准答案向量写回缓存文件（程序退出时调用）"""
+    with _backend_lock:
+        backends = list(_backend_instances.values())
+    for backend in backends:
+        if isinstance(backend, EmbeddingBackend):
+            backend.cache.flush()
+
+def register_grading_backend(name, backend_class):
+    """注册自定义评分后端（例如本地小模型），之后可在 AI_GRADING_BACKEND 中选择"""
+    GRADING_BACKENDS[name] = backend_class
+
+def get_grading_backend(name=None):
+    """获取评分后端实例，默认使用 AI_GRADING_BACKEND"""
+    name = name or AI_GRADING_BACKEND
+    with _backend_lock:
+        backend = _backend_instances.get(name)
+        if backend is None:
+            if name not in GRADING_BACKENDS:
+                raise ValueError(f"未知的评分后端: {name}")
+            backend = _backend_instances[name] = GRADING_BACKENDS[name]()
+        return backend
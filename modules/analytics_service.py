@@ -3,9 +3,86 @@
 """
 import logging
 from collections import defaultdict
+from modules.query_registry import query_registry
+from modules.plagiarism_index import plagiarism_indexes
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('analytics', {
+    'get_assignment_statistics': """
+        SELECT 
+            COUNT(*) as total,
+            AVG(total_score) as avg_score,
+            MAX(total_score) as max_score,
+            MIN(total_score) as min_score
+        FROM submission
+        WHERE assignment_id = ?
+    """,
+    'get_assignment_statistics_pass': """
+        SELECT COUNT(*) as pass_count
+        FROM submission
+        WHERE assignment_id = ? AND total_score >= ?
+    """,
+    '_get_assignment_total_score': "SELECT SUM(score) as total FROM question WHERE assignment_id = ?",
+    'get_question_statistics': """
+        SELECT 
+            q.id as question_id,
+            q.content,
+            q.score as max_score,
+            q.type,
+            AVG(sd.score) as avg_score,
+            COUNT(CASE WHEN sd.is_correct = 1 THEN 1 END) as correct_count,
+            COUNT(*) as total_count
+        FROM question q
+        LEFT JOIN submission_detail sd ON q.id = sd.question_id
+        WHERE q.assignment_id = ?
+        GROUP BY q.id
+        ORDER BY q.id
+    """,
+    'get_student_performance': """
+        SELECT 
+            COUNT(DISTINCT a.id) as total_assignments,
+            COUNT(s.id) as completed,
+            AVG(s.total_score) as avg_score
+        FROM assignment a
+        LEFT JOIN submission s ON a.id = s.assignment_id AND s.student_id = ?
+    """,
+    'get_student_performance_recent': """
+        SELECT 
+            a.title,
+            s.total_score,
+            s.submit_time
+        FROM submission s
+        JOIN assignment a ON s.assignment_id = a.id
+        WHERE s.student_id = ?
+        ORDER BY s.submit_time DESC
+        LIMIT 5
+    """,
+    'get_class_ranking': """
+        SELECT 
+            u.nickname as student_name,
+            s.total_score as score,
+            s.submit_time
+        FROM submission s
+        JOIN user u ON s.student_id = u.id
+        WHERE s.assignment_id = ?
+        ORDER BY s.total_score DESC, s.submit_time ASC
+        LIMIT ?
+    """,
+    'get_score_distribution': """
+        SELECT total_score
+        FROM submission
+        WHERE assignment_id = ?
+    """,
+    'get_answer_owner': """
+        SELECT s.id as submission_id, s.student_id, u.nickname as student_name, sd.student_answer
+        FROM submission s
+        JOIN user u ON s.student_id = u.id
+        JOIN submission_detail sd ON sd.submission_id = s.id
+        WHERE s.id = ? AND sd.question_id = ?
+    """
+})
+
 class AnalyticsService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -21,16 +98,7 @@ class AnalyticsService:
             'pass_rate': float
         }
         """
-        query = """
-            SELECT 
-                COUNT(*) as total,
-                AVG(total_score) as avg_score,
-                MAX(total_score) as max_score,
-                MIN(total_score) as min_score
-            FROM submission
-            WHERE assignment_id = ?
-        """
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('analytics.get_assignment_statistics', (assignment_id,))
         
         if not rows or rows[0]['total'] == 0:
             return {
@@ -47,12 +115,7 @@ class AnalyticsService:
         total_possible = self._get_assignment_total_score(assignment_id)
         pass_threshold = total_possible * 0.6
         
-        pass_query = """
-            SELECT COUNT(*) as pass_count
-            FROM submission
-            WHERE assignment_id = ? AND total_score >= ?
-        """
-        pass_rows = self.db.execute_query(pass_query, (assignment_id, pass_threshold))
+        pass_rows = self.db.execute_named('analytics.get_assignment_statistics_pass', (assignment_id, pass_threshold))
         pass_count = pass_rows[0]['pass_count'] if pass_rows else 0
         
         pass_rate = (pass_count / row['total']) * 100 if row['total'] > 0 else 0
@@ -68,8 +131,7 @@ class AnalyticsService:
 
     def _get_assignment_total_score(self, assignment_id):
         """获取作业总分"""
-        query = "SELECT SUM(score) as total FROM question WHERE assignment_id = ?"
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('analytics._get_assignment_total_score', (assignment_id,))
         return rows[0]['total'] if rows and rows[0]['total'] else 0
 
     def get_question_statistics(self, assignment_id):
@@ -83,22 +145,7 @@ class AnalyticsService:
             'correct_rate': float
         }
         """
-        query = """
-            SELECT 
-                q.id as question_id,
-                q.content,
-                q.score as max_score,
-                q.type,
-                AVG(sd.score) as avg_score,
-                COUNT(CASE WHEN sd.is_correct = 1 THEN 1 END) as correct_count,
-                COUNT(*) as total_count
-            FROM question q
-            LEFT JOIN submission_detail sd ON q.id = sd.question_id
-            WHERE q.assignment_id = ?
-            GROUP BY q.id
-            ORDER BY q.id
-        """
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('analytics.get_question_statistics', (assignment_id,))
         
         results = []
         for row in rows:
@@ -131,30 +178,11 @@ class AnalyticsService:
         }
         """
         # 总体统计
-        query = """
-            SELECT 
-                COUNT(DISTINCT a.id) as total_assignments,
-                COUNT(s.id) as completed,
-                AVG(s.total_score) as avg_score
-            FROM assignment a
-            LEFT JOIN submission s ON a.id = s.assignment_id AND s.student_id = ?
-        """
-        rows = self.db.execute_query(query, (student_id,))
+        rows = self.db.execute_named('analytics.get_student_performance', (student_id,))
         row = rows[0] if rows else {}
         
         # 最近提交
-        recent_query = """
-            SELECT 
-                a.title,
-                s.total_score,
-                s.submit_time
-            FROM submission s
-            JOIN assignment a ON s.assignment_id = a.id
-            WHERE s.student_id = ?
-            ORDER BY s.submit_time DESC
-            LIMIT 5
-        """
-        recent = self.db.execute_query(recent_query, (student_id,))
+        recent = self.db.execute_named('analytics.get_student_performance_recent', (student_id,))
         
         return {
             'total_assignments': row.get('total_assignments', 0),
@@ -168,18 +196,7 @@ class AnalyticsService:
         获取作业排名
         返回: list of {rank, student_name, score}
         """
-        query = """
-            SELECT 
-                u.nickname as student_name,
-                s.total_score as score,
-                s.submit_time
-            FROM submission s
-            JOIN user u ON s.student_id = u.id
-            WHERE s.assignment_id = ?
-            ORDER BY s.total_score DESC, s.submit_time ASC
-            LIMIT ?
-        """
-        rows = self.db.execute_query(query, (assignment_id, limit))
+        rows = self.db.execute_named('analytics.get_class_ranking', (assignment_id, limit))
         
         rankings = []
         for idx, row in enumerate(rows, 1):
@@ -197,12 +214,8 @@ class AnalyticsService:
         获取分数分布
         返回: dict {score_range: count}
         """
-        query = """
-            SELECT total_score
-            FROM submission
-            WHERE assignment_id = ?
-        """
-        rows = self.db.execute_query(query, (assignment_id,))
+        # 逐行统计，不把整张提交表读入内存
+        rows = self.db.iter_named('analytics.get_score_distribution', (assignment_id,))
         
         # 分数段统计
         distribution = {
@@ -231,3 +244,26 @@ class AnalyticsService:
                 distribution['90-100'] += 1
         
         return distribution
+
+    def get_duplicate_answers(self, question_id, threshold=None, min_cluster_size=2):
+        """
+        获取一道题中疑似抄袭的相似答案簇（MinHash LSH，不做两两比较）
+        返回: list of {'similarity', 'members': [{'submission_id', 'student_id', 'student_name', 'student_answer'}]}
+        """
+        index = plagiarism_indexes.get(self.db, question_id)
+        clusters = []
+        for cluster in index.clusters(threshold, min_cluster_size):
+            members = []
+            for submission_id in cluster['keys']:
+                rows = self.db.execute_named('analytics.get_answer_owner', (submission_id, question_id))
+                if rows:
+                    members.append(dict(rows[0]))
+            clusters.append({'similarity': cluster['similarity'], 'members': members})
+        return clusters
+
+    def find_similar_answers(self, question_id, answer, threshold=None):
+        """
+        查找与给定答案相似的已提交答案
+        返回: list of (submission_id, 估计相似度)
+        """
+        return plagiarism_indexes.get(self.db, question_id).query(answer, threshold)
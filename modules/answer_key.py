@@ -0,0 +1,109 @@
+"""
+作业答案索引
+- 每份作业的题目和客观题标准答案（预先标准化，多选题为 frozenset）缓存在内存中
+- 客观题评分变成一次字典查找，整份提交在一次遍历中完成
+- AssignmentService 修改题目时使缓存失效；TTL 兜底绕过服务层的修改
+"""
+import time
+import threading
+from collections import OrderedDict
+from config import CACHE_CONFIG
+from modules.ai_grader import AIGrader, OBJECTIVE_TYPES
+
+class AnswerKey:
+    """一份作业的答案索引"""
+    __slots__ = ('assignment_id', 'questions', 'objective', 'max_score', 'loaded_at')
+
+    def __init__(self, assignment_id, questions):
+        self.assignment_id = assignment_id
+        self.questions = questions
+        # question_id -> (标准化后的标准答案, 分值, 题型)
+        self.objective = {
+            q.id: (AIGrader.normalize_objective(q.answer, q.type), q.score, q.type)
+            for q in questions if q.type in OBJECTIVE_TYPES
+        }
+        self.max_score = sum(q.score or 0 for q in questions)
+        self.loaded_at = time.monotonic()
+
+    def grade_objective(self, answers):
+        """
+        一次遍历评分整份提交的客观题，结果与 AIGrader.grade_objective 一致
+        answers: {question_id: student_answer}
+        返回: {question_id: (score, is_correct, feedback)}
+        """
+        normalize = AIGrader.normalize_objective
+        results = {}
+        for question_id, (key, score, question_type) in self.objective.items():
+            is_correct = key is not None and normalize(answers.get(question_id), question_type) == key
+            results[question_id] = (score, True, "正确") if is_correct else (0, False, "错误")
+        return results
+
+class AnswerKeyCache:
+    """按 (数据库路径, 作业ID) 缓存 AnswerKey，LRU + TTL"""
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = max_size or CACHE_CONFIG['max_size']
+        self.ttl = ttl if ttl is not None else CACHE_CONFIG['ttl']
+        self.enabled = CACHE_CONFIG['enabled']
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._question_index = {}  # (数据库路径, 题目ID) -> 作业ID
+        self._lock = threading.Lock()
+
+    def get(self, db, assignment_id, loader):
+        """
+        获取作业的答案索引
+        loader: callable() -> list of Question，缓存未命中时调用
+        """
+        key = (db.db_path, assignment_id)
+        with self._lock:
+            answer_key = self._data.get(key)
+            if answer_key is not None and time.monotonic() - answer_key.loaded_at < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return answer_key
+            self.misses += 1
+
+        answer_key = AnswerKey(assignment_id, loader())
+        if not self.enabled:
+            return answer_key
+
+        with self._lock:
+            self._data[key] = answer_key
+            self._data.move_to_end(key)
+            for question in answer_key.questions:
+                self._question_index[(db.db_path, question.id)] = assignment_id
+            while len(self._data) > self.max_size:
+                (db_path, _), evicted = self._data.popitem(last=False)
+                for question in evicted.questions:
+                    self._question_index.pop((db_path, question.id), None)
+        return answer_key
+
+    def invalidate(self, db, assignment_id):
+        """作业的题目有变化时调用"""
+        with self._lock:
+            answer_key = self._data.pop((db.db_path, assignment_id), None)
+            if answer_key is not None:
+                for question in answer_key.questions:
+                    self._question_index.pop((db.db_path, question.id), None)
+
+    def invalidate_question(self, db, question_id):
+        """按题目ID使所在作业的缓存失效（只知道题目ID时使用）"""
+        with self._lock:
+            assignment_id = self._question_index.get((db.db_path, question_id))
+        if assignment_id is not None:
+            self.invalidate(db, assignment_id)
+
+    def stats(self):
+        """返回 {'size', 'hits', 'misses'}"""
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._question_index.clear()
+
+# 全局答案索引缓存
+answer_key_cache = AnswerKeyCache()
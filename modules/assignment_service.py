@@ -1,14 +1,52 @@
 """
 作业服务层 - 处理作业相关业务逻辑
 """
+import json
 import logging
 from datetime import datetime
+from modules.ai_grader import AIGrader
+from modules.answer_key import answer_key_cache
+from modules.grading_memo import grading_memo
 from modules.models import Assignment, Question
 from modules.validators import Validator
 from modules.exceptions import ValidationError, ResourceNotFoundError
+from modules.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('assignment', {
+    'create_assignment': """
+        INSERT INTO assignment (title, description, teacher_id, deadline)
+        VALUES (?, ?, ?, ?)
+    """,
+    'get_assignment_by_id': "SELECT * FROM assignment WHERE id = ?",
+    'get_assignments_by_teacher': """
+        SELECT * FROM assignment 
+        WHERE teacher_id = ? 
+        ORDER BY create_time DESC
+    """,
+    'get_all_assignments': "SELECT * FROM assignment ORDER BY create_time DESC",
+    'update_assignment': """
+        UPDATE assignment 
+        SET title = ?, description = ?, deadline = ?
+        WHERE id = ?
+    """,
+    'delete_assignment': "DELETE FROM assignment WHERE id = ?",
+    'get_questions_by_assignment': "SELECT * FROM question WHERE assignment_id = ? ORDER BY id",
+    'update_question': """
+        UPDATE question 
+        SET content = ?, answer = ?, score = ?, analysis = ?, answer_tokens = ?,
+            answer_version = CASE WHEN answer IS ? AND score IS ? THEN answer_version ELSE answer_version + 1 END
+        WHERE id = ?
+    """,
+    'get_answer_version': "SELECT answer_version FROM question WHERE id = ?",
+    'delete_question': "DELETE FROM question WHERE id = ?",
+    'add_question': """
+        INSERT INTO question (assignment_id, type, content, answer, score, analysis, answer_tokens)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+})
+
 class AssignmentService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -25,11 +63,7 @@ class AssignmentService:
             if not valid:
                 raise ValidationError(msg)
         
-        query = """
-            INSERT INTO assignment (title, description, teacher_id, deadline)
-            VALUES (?, ?, ?, ?)
-        """
-        assignment_id = self.db.execute_update(query, (title, description, teacher_id, deadline))
+        assignment_id = self.db.execute_named('assignment.create_assignment', (title, description, teacher_id, deadline))
         
         if assignment_id:
             logger.info(f"Assignment created: {assignment_id} by teacher {teacher_id}")
@@ -38,26 +72,19 @@ class AssignmentService:
 
     def get_assignment_by_id(self, assignment_id):
         """根据ID获取作业"""
-        query = "SELECT * FROM assignment WHERE id = ?"
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('assignment.get_assignment_by_id', (assignment_id,))
         if rows:
             return Assignment.from_row(rows[0])
         raise ResourceNotFoundError(f"作业不存在: {assignment_id}")
 
     def get_assignments_by_teacher(self, teacher_id):
         """获取教师的所有作业"""
-        query = """
-            SELECT * FROM assignment 
-            WHERE teacher_id = ? 
-            ORDER BY create_time DESC
-        """
-        rows = self.db.execute_query(query, (teacher_id,))
+        rows = self.db.execute_named('assignment.get_assignments_by_teacher', (teacher_id,))
         return [Assignment.from_row(row) for row in rows]
 
     def get_all_assignments(self):
         """获取所有作业（学生视角）"""
-        query = "SELECT * FROM assignment ORDER BY create_time DESC"
-        rows = self.db.execute_query(query)
+        rows = self.db.execute_named('assignment.get_all_assignments')
         return [Assignment.from_row(row) for row in rows]
 
     def update_assignment(self, assignment_id, title, description, deadline):
@@ -66,12 +93,7 @@ class AssignmentService:
         if not valid:
             raise ValidationError(msg)
         
-        query = """
-            UPDATE assignment 
-            SET title = ?, description = ?, deadline = ?
-            WHERE id = ?
-        """
-        result = self.db.execute_update(query, (title, description, deadline, assignment_id))
+        result = self.db.execute_named('assignment.update_assignment', (title, description, deadline, assignment_id))
         if result is not None:
             logger.info(f"Assignment updated: {assignment_id}")
             return True
@@ -79,8 +101,8 @@ class AssignmentService:
 
     def delete_assignment(self, assignment_id):
         """删除作业（级联删除题目）"""
-        query = "DELETE FROM assignment WHERE id = ?"
-        result = self.db.execute_update(query, (assignment_id,))
+        result = self.db.execute_named('assignment.delete_assignment', (assignment_id,))
+        answer_key_cache.invalidate(self.db, assignment_id)
         if result is not None:
             logger.info(f"Assignment deleted: {assignment_id}")
             return True
@@ -96,38 +118,50 @@ class AssignmentService:
         if not valid:
             raise ValidationError(msg)
         
-        query = """
-            INSERT INTO question (assignment_id, type, content, answer, score, analysis)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
-        question_id = self.db.execute_update(
-            query, 
-            (assignment_id, question_type, content, answer, score, analysis)
+        question_id = self.db.execute_named(
+            'assignment.add_question', 
+            (assignment_id, question_type, content, answer, score, analysis, self._answer_tokens(answer))
         )
         
         if question_id:
+            answer_key_cache.invalidate(self.db, assignment_id)
             logger.info(f"Question added: {question_id} to assignment {assignment_id}")
             return question_id
         raise ValidationError("添加题目失败")
 
     def get_questions_by_assignment(self, assignment_id):
         """获取作业的所有题目"""
-        query = "SELECT * FROM question WHERE assignment_id = ? ORDER BY id"
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('assignment.get_questions_by_assignment', (assignment_id,))
         return [Question.from_row(row) for row in rows]
 
     def update_question(self, question_id, content, answer, score, analysis):
         """更新题目"""
-        query = """
-            UPDATE question 
-            SET content = ?, answer = ?, score = ?, analysis = ?
-            WHERE id = ?
-        """
-        result = self.db.execute_update(query, (content, answer, score, analysis, question_id))
+        previous = self._get_answer_version(question_id)
+        result = self.db.execute_named(
+            'assignment.update_question',
+            (content, answer, score, analysis, self._answer_tokens(answer), answer, score, question_id)
+        )
+        answer_key_cache.invalidate_question(self.db, question_id)
+        # 标准答案或分值变化时 answer_version 递增，旧的评分记录不再命中，删除即可；
+        # 只修改题干或解析时版本不变，评分记录仍然有效
+        if self._get_answer_version(question_id) != previous:
+            grading_memo.invalidate(self.db, question_id)
         return result is not None
 
+    def _get_answer_version(self, question_id):
+        rows = self.db.execute_named('assignment.get_answer_version', (question_id,))
+        return rows[0]['answer_version'] if rows else None
+
+    @staticmethod
+    def _answer_tokens(answer):
+        """预先计算标准答案的分词结果（JSON），评分时不再重复分词"""
+        if not answer or not answer.strip():
+            return None
+        return json.dumps(AIGrader.tokenize(answer.strip()), ensure_ascii=False)
+
     def delete_question(self, question_id):
         """删除题目"""
-        query = "DELETE FROM question WHERE id = ?"
-        result = self.db.execute_update(query, (question_id,))
+        result = self.db.execute_named('assignment.delete_question', (question_id,))
+        answer_key_cache.invalidate_question(self.db, question_id)
+        grading_memo.invalidate(self.db, question_id)
         return result is not None
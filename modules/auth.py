@@ -2,6 +2,13 @@ import hashlib
 import re
 from modules.db_manager import DBManager
 from modules.models import User
+from modules.query_registry import query_registry
+
+query_registry.register('auth', {
+    'login': "SELECT * FROM user WHERE username = ? AND password = ?",
+    'username_exists': "SELECT id FROM user WHERE username = ?",
+    'create_user': "INSERT INTO user (username, password, role, nickname) VALUES (?, ?, ?, ?)"
+})
 
 class AuthManager:
     def __init__(self, db_manager: DBManager):
@@ -35,8 +42,7 @@ class AuthManager:
             return False, "用户名和密码不能为空"
         
         hashed_password = self.hash_password(password)
-        query = "SELECT * FROM user WHERE username = ? AND password = ?"
-        rows = self.db.execute_query(query, (username, hashed_password))
+        rows = self.db.execute_named('auth.login', (username, hashed_password))
         
         if rows:
             self.current_user = User.from_row(rows[0])
@@ -61,16 +67,14 @@ class AuthManager:
             return False, "昵称不能为空"
         
         # 检查用户名是否已存在
-        check_query = "SELECT id FROM user WHERE username = ?"
-        if self.db.execute_query(check_query, (username,)):
+        if self.db.execute_named('auth.username_exists', (username,)):
             return False, "用户名已存在"
 
         # 密码加密
         hashed_password = self.hash_password(password)
         
-        insert_query = "INSERT INTO user (username, password, role, nickname) VALUES (?, ?, ?, ?)"
         try:
-            self.db.execute_update(insert_query, (username, hashed_password, role, nickname.strip()))
+            self.db.execute_named('auth.create_user', (username, hashed_password, role, nickname.strip()))
             return True, "注册成功"
         except Exception as e:
             return False, f"注册失败: {str(e)}"
@@ -5,9 +5,106 @@ import logging
 from typing import List, Dict, Any, Optional
 from modules.models import Class, User
 from modules.exceptions import ValidationError, ResourceNotFoundError, PermissionError
+from modules.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('class', {
+    'code_exists': "SELECT id FROM class WHERE code = ?",
+    'create_class': """
+        INSERT INTO class (name, code, description, teacher_id, max_students)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    'get_class_by_id': """
+        SELECT c.*, u.nickname as teacher_name
+        FROM class c
+        LEFT JOIN user u ON c.teacher_id = u.id
+        WHERE c.id = ?
+    """,
+    'get_classes_by_teacher': """
+        SELECT c.*, 
+               (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
+        FROM class c
+        WHERE c.teacher_id = ? AND c.status != 'archived'
+        ORDER BY c.created_at DESC
+    """,
+    'delete_class': "UPDATE class SET status = 'archived' WHERE id = ?",
+    'add_student_to_class_check': """
+        SELECT id FROM class_member 
+        WHERE class_id = ? AND student_id = ? AND status = 'active'
+    """,
+    'add_student_to_class_count': """
+        SELECT COUNT(*) as count FROM class_member 
+        WHERE class_id = ? AND status = 'active'
+    """,
+    'add_student_to_class': """
+        INSERT INTO class_member (class_id, student_id, status)
+        VALUES (?, ?, 'active')
+    """,
+    'remove_student_from_class': """
+        UPDATE class_member 
+        SET status = 'removed' 
+        WHERE class_id = ? AND student_id = ? AND status = 'active'
+    """,
+    'get_class_students': """
+        SELECT u.id, u.username, u.nickname, u.email, u.avatar,
+               cm.join_date, cm.status as member_status
+        FROM class_member cm
+        JOIN user u ON cm.student_id = u.id
+        WHERE cm.class_id = ? AND cm.status = 'active'
+        ORDER BY cm.join_date DESC
+    """,
+    'get_student_classes': """
+        SELECT c.*, u.nickname as teacher_name,
+               (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
+        FROM class_member cm
+        JOIN class c ON cm.class_id = c.id
+        JOIN user u ON c.teacher_id = u.id
+        WHERE cm.student_id = ? AND cm.status = 'active' AND c.status = 'active'
+        ORDER BY cm.join_date DESC
+    """,
+    'get_class_statistics_student': """
+        SELECT 
+            COUNT(*) as total_students,
+            COUNT(CASE WHEN u.status = 'active' THEN 1 END) as active_students
+        FROM class_member cm
+        JOIN user u ON cm.student_id = u.id
+        WHERE cm.class_id = ? AND cm.status = 'active'
+    """,
+    'get_class_statistics_assignment': """
+        SELECT 
+            COUNT(*) as total_assignments,
+            COUNT(CASE WHEN a.status = 'published' THEN 1 END) as published_assignments,
+            COUNT(CASE WHEN a.status = 'graded' THEN 1 END) as graded_assignments
+        FROM assignment a
+        WHERE a.class_id = ?
+    """,
+    'get_class_statistics_grade': """
+        SELECT AVG(g.score) as average_score
+        FROM gradebook g
+        JOIN assignment a ON g.assignment_id = a.id
+        WHERE a.class_id = ? AND g.score IS NOT NULL
+    """,
+    'update_class': """
+        UPDATE class
+        SET name = COALESCE(:name, name),
+            description = COALESCE(:description, description),
+            max_students = COALESCE(:max_students, max_students),
+            status = COALESCE(:status, status)
+        WHERE id = :id
+    """,
+    'search_classes': """
+        SELECT c.*, u.nickname as teacher_name,
+               (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
+        FROM class c
+        LEFT JOIN user u ON c.teacher_id = u.id
+        WHERE c.status = :status
+          AND (:keyword IS NULL OR c.name LIKE :keyword OR c.code LIKE :keyword OR c.description LIKE :keyword)
+          AND (:teacher_id IS NULL OR c.teacher_id = :teacher_id)
+        ORDER BY c.created_at DESC
+    """
+})
+
 class ClassService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -28,16 +125,11 @@ class ClassService:
             code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
         
         # 检查代码是否唯一
-        check_query = "SELECT id FROM class WHERE code = ?"
-        if self.db.execute_query(check_query, (code,)):
+        if self.db.execute_named('class.code_exists', (code,)):
             raise ValidationError("班级代码已存在，请使用其他代码")
         
-        query = """
-            INSERT INTO class (name, code, description, teacher_id, max_students)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        class_id = self.db.execute_update(
-            query, (name.strip(), code, description.strip(), teacher_id, max_students)
+        class_id = self.db.execute_named(
+            'class.create_class', (name.strip(), code, description.strip(), teacher_id, max_students)
         )
         
         if class_id:
@@ -47,64 +139,41 @@ class ClassService:
 
     def get_class_by_id(self, class_id: int) -> Optional[Class]:
         """根据ID获取班级"""
-        query = """
-            SELECT c.*, u.nickname as teacher_name
-            FROM class c
-            LEFT JOIN user u ON c.teacher_id = u.id
-            WHERE c.id = ?
-        """
-        rows = self.db.execute_query(query, (class_id,))
+        rows = self.db.execute_named('class.get_class_by_id', (class_id,))
         if rows:
             return Class.from_row(rows[0])
         return None
 
     def get_classes_by_teacher(self, teacher_id: int) -> List[Class]:
         """获取教师的所有班级"""
-        query = """
-            SELECT c.*, 
-                   (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
-            FROM class c
-            WHERE c.teacher_id = ? AND c.status != 'archived'
-            ORDER BY c.created_at DESC
-        """
-        rows = self.db.execute_query(query, (teacher_id,))
+        rows = self.db.execute_named('class.get_classes_by_teacher', (teacher_id,))
         return [Class.from_row(row) for row in rows]
 
     def update_class(self, class_id: int, name: str = None, description: str = None,
                     max_students: int = None, status: str = None) -> bool:
-        """更新班级信息"""
-        updates = []
-        params = []
-        
+        """更新班级信息（参数为 None 的字段保持不变）"""
         if name:
             if len(name.strip()) < 2:
                 raise ValidationError("班级名称至少需要2个字符")
-            updates.append("name = ?")
-            params.append(name.strip())
-        
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description.strip())
         
         if max_students:
             if max_students < 1 or max_students > 200:
                 raise ValidationError("班级人数限制应在1-200之间")
-            updates.append("max_students = ?")
-            params.append(max_students)
         
         if status:
             if status not in ['active', 'archived', 'closed']:
                 raise ValidationError("无效的班级状态")
-            updates.append("status = ?")
-            params.append(status)
         
-        if not updates:
+        if not (name or description is not None or max_students or status):
             return True
         
-        query = f"UPDATE class SET {', '.join(updates)} WHERE id = ?"
-        params.append(class_id)
-        
-        result = self.db.execute_update(query, tuple(params))
+        result = self.db.execute_named('class.update_class', {
+            'id': class_id,
+            'name': name.strip() if name else None,
+            'description': description.strip() if description is not None else None,
+            'max_students': max_students or None,
+            'status': status or None
+        })
         if result is not None:
             logger.info(f"Class updated: {class_id}")
             return True
@@ -112,8 +181,7 @@ class ClassService:
 
     def delete_class(self, class_id: int) -> bool:
         """删除班级（软删除）"""
-        query = "UPDATE class SET status = 'archived' WHERE id = ?"
-        result = self.db.execute_update(query, (class_id,))
+        result = self.db.execute_named('class.delete_class', (class_id,))
         if result is not None:
             logger.info(f"Class archived: {class_id}")
             return True
@@ -130,30 +198,18 @@ class ClassService:
             raise ValidationError("班级未激活")
         
         # 检查学生是否已经是班级成员
-        check_query = """
-            SELECT id FROM class_member 
-            WHERE class_id = ? AND student_id = ? AND status = 'active'
-        """
-        if self.db.execute_query(check_query, (class_id, student_id)):
+        if self.db.execute_named('class.add_student_to_class_check', (class_id, student_id)):
             raise ValidationError("学生已经在班级中")
         
         # 检查班级人数限制
-        count_query = """
-            SELECT COUNT(*) as count FROM class_member 
-            WHERE class_id = ? AND status = 'active'
-        """
-        count_rows = self.db.execute_query(count_query, (class_id,))
+        count_rows = self.db.execute_named('class.add_student_to_class_count', (class_id,))
         current_count = count_rows[0]['count'] if count_rows else 0
         
         if current_count >= class_info.max_students:
             raise ValidationError("班级人数已满")
         
         # 添加学生
-        query = """
-            INSERT INTO class_member (class_id, student_id, status)
-            VALUES (?, ?, 'active')
-        """
-        result = self.db.execute_update(query, (class_id, student_id))
+        result = self.db.execute_named('class.add_student_to_class', (class_id, student_id))
         if result is not None:
             logger.info(f"Student {student_id} added to class {class_id}")
             return True
@@ -161,12 +217,7 @@ class ClassService:
 
     def remove_student_from_class(self, class_id: int, student_id: int) -> bool:
         """从班级移除学生"""
-        query = """
-            UPDATE class_member 
-            SET status = 'removed' 
-            WHERE class_id = ? AND student_id = ? AND status = 'active'
-        """
-        result = self.db.execute_update(query, (class_id, student_id))
+        result = self.db.execute_named('class.remove_student_from_class', (class_id, student_id))
         if result is not None:
             logger.info(f"Student {student_id} removed from class {class_id}")
             return True
@@ -174,90 +225,34 @@ class ClassService:
 
     def get_class_students(self, class_id: int) -> List[Dict[str, Any]]:
         """获取班级学生列表"""
-        query = """
-            SELECT u.id, u.username, u.nickname, u.email, u.avatar,
-                   cm.join_date, cm.status as member_status
-            FROM class_member cm
-            JOIN user u ON cm.student_id = u.id
-            WHERE cm.class_id = ? AND cm.status = 'active'
-            ORDER BY cm.join_date DESC
-        """
-        rows = self.db.execute_query(query, (class_id,))
+        rows = self.db.execute_named('class.get_class_students', (class_id,))
         return [dict(row) for row in rows]
 
     def get_student_classes(self, student_id: int) -> List[Dict[str, Any]]:
         """获取学生加入的班级"""
-        query = """
-            SELECT c.*, u.nickname as teacher_name,
-                   (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
-            FROM class_member cm
-            JOIN class c ON cm.class_id = c.id
-            JOIN user u ON c.teacher_id = u.id
-            WHERE cm.student_id = ? AND cm.status = 'active' AND c.status = 'active'
-            ORDER BY cm.join_date DESC
-        """
-        rows = self.db.execute_query(query, (student_id,))
+        rows = self.db.execute_named('class.get_student_classes', (student_id,))
         return [dict(row) for row in rows]
 
     def search_classes(self, keyword: str = None, teacher_id: int = None, 
                       status: str = 'active') -> List[Class]:
         """搜索班级"""
-        conditions = ["c.status = ?"]
-        params = [status]
-        
-        if keyword:
-            conditions.append("(c.name LIKE ? OR c.code LIKE ? OR c.description LIKE ?)")
-            params.extend([f"%{keyword}%", f"%{keyword}%", f"%{keyword}%"])
-        
-        if teacher_id:
-            conditions.append("c.teacher_id = ?")
-            params.append(teacher_id)
-        
-        where_clause = " AND ".join(conditions)
-        query = f"""
-            SELECT c.*, u.nickname as teacher_name,
-                   (SELECT COUNT(*) FROM class_member WHERE class_id = c.id AND status = 'active') as student_count
-            FROM class c
-            LEFT JOIN user u ON c.teacher_id = u.id
-            WHERE {where_clause}
-            ORDER BY c.created_at DESC
-        """
-        
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('class.search_classes', {
+            'status': status,
+            'keyword': f"%{keyword}%" if keyword else None,
+            'teacher_id': teacher_id or None
+        })
         return [Class.from_row(row) for row in rows]
 
     def get_class_statistics(self, class_id: int) -> Dict[str, Any]:
         """获取班级统计信息"""
         # 学生统计
-        student_query = """
-            SELECT 
-                COUNT(*) as total_students,
-                COUNT(CASE WHEN u.status = 'active' THEN 1 END) as active_students
-            FROM class_member cm
-            JOIN user u ON cm.student_id = u.id
-            WHERE cm.class_id = ? AND cm.status = 'active'
-        """
-        student_stats = self.db.execute_query(student_query, (class_id,))
+        student_stats = self.db.execute_named('class.get_class_statistics_student', (class_id,))
         
         # 作业统计
-        assignment_query = """
-            SELECT 
-                COUNT(*) as total_assignments,
-                COUNT(CASE WHEN a.status = 'published' THEN 1 END) as published_assignments,
-                COUNT(CASE WHEN a.status = 'graded' THEN 1 END) as graded_assignments
-            FROM assignment a
-            WHERE a.class_id = ?
-        """
-        assignment_stats = self.db.execute_query(assignment_query, (class_id,))
+        assignment_stats = self.db.execute_named('class.get_class_statistics_assignment', (class_id,))
         
         # 平均成绩
-        grade_query = """
-            SELECT AVG(g.score) as average_score
-            FROM gradebook g
-            JOIN assignment a ON g.assignment_id = a.id
-            WHERE a.class_id = ? AND g.score IS NOT NULL
-        """
-        grade_stats = self.db.execute_query(grade_query, (class_id,))
+        grade_stats = self.db.execute_named('class.get_class_statistics_grade', (class_id,))
         
         return {
             'student_stats': dict(student_stats[0]) if student_stats else {},
@@ -272,6 +267,5 @@ class ClassService:
         
         while True:
             code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            check_query = "SELECT id FROM class WHERE code = ?"
-            if not self.db.execute_query(check_query, (code,)):
+            if not self.db.execute_named('class.code_exists', (code,)):
                 return code
\ No newline at end of file
@@ -6,9 +6,177 @@ import json
 from typing import List, Dict, Any, Optional
 from modules.models import Course, Chapter, Resource, LearningProgress
 from modules.exceptions import ValidationError, ResourceNotFoundError
+from modules.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('course', {
+    'create_course_check': "SELECT id FROM class WHERE id = ? AND teacher_id = ?",
+    'get_course_by_id': """
+        SELECT c.*, u.nickname as teacher_name,
+               cl.name as class_name
+        FROM course c
+        LEFT JOIN user u ON c.teacher_id = u.id
+        LEFT JOIN class cl ON c.class_id = cl.id
+        WHERE c.id = ?
+    """,
+    'get_available_courses': """
+        SELECT c.*, u.nickname as teacher_name,
+               (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count,
+               lp.progress as student_progress,
+               lp.status as learning_status
+        FROM course c
+        JOIN user u ON c.teacher_id = u.id
+        LEFT JOIN learning_progress lp ON c.id = lp.course_id AND lp.student_id = ?
+        WHERE c.status = 'published'
+        ORDER BY c.created_at DESC
+    """,
+    'publish_course': "UPDATE course SET status = 'published' WHERE id = ?",
+    'archive_course': "UPDATE course SET status = 'archived' WHERE id = ?",
+    'add_chapter_max_order': "SELECT MAX(order_index) as max_order FROM chapter WHERE course_id = ?",
+    'get_chapters': """
+        SELECT c.*,
+               (SELECT COUNT(*) FROM course_content WHERE chapter_id = c.id) as content_count
+        FROM chapter c
+        WHERE c.course_id = ?
+        ORDER BY c.order_index
+    """,
+    'delete_chapter': "DELETE FROM chapter WHERE id = ?",
+    'add_course_content_max_order': "SELECT MAX(order_index) as max_order FROM course_content WHERE chapter_id = ?",
+    'get_course_contents': """
+        SELECT cc.*
+        FROM course_content cc
+        WHERE cc.chapter_id = ?
+        ORDER BY cc.order_index
+    """,
+    'update_learning_progress_check': """
+        SELECT id FROM learning_progress 
+        WHERE student_id = ? AND course_id = ? AND content_id = ?
+    """,
+    'get_student_progress_overall': """
+        SELECT 
+            AVG(progress) as overall_progress,
+            SUM(time_spent) as total_time_spent,
+            COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_count,
+            COUNT(*) as total_count
+        FROM learning_progress
+        WHERE student_id = ? AND course_id = ?
+    """,
+    'get_student_progress_chapter': """
+        SELECT 
+            ch.id, ch.title, ch.order_index,
+            lp.progress, lp.status, lp.last_accessed, lp.time_spent
+        FROM chapter ch
+        LEFT JOIN learning_progress lp ON ch.id = lp.chapter_id AND lp.student_id = ?
+        WHERE ch.course_id = ?
+        ORDER BY ch.order_index
+    """,
+    'get_student_progress_recent': """
+        SELECT cc.title, cc.content_type, lp.last_accessed
+        FROM learning_progress lp
+        JOIN course_content cc ON lp.content_id = cc.id
+        WHERE lp.student_id = ? AND lp.course_id = ?
+        ORDER BY lp.last_accessed DESC
+        LIMIT 5
+    """,
+    'get_course_resources': """
+        SELECT r.*, u.nickname as uploader_name
+        FROM resource r
+        LEFT JOIN user u ON r.uploader_id = u.id
+        WHERE r.course_id = ?
+        ORDER BY r.created_at DESC
+    """,
+    'get_course_statistics_student': """
+        SELECT 
+            COUNT(DISTINCT student_id) as enrolled_students,
+            AVG(progress) as average_progress,
+            COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_students
+        FROM learning_progress
+        WHERE course_id = ?
+    """,
+    'get_course_statistics_content': """
+        SELECT 
+            COUNT(*) as total_content,
+            COUNT(CASE WHEN content_type = 'video' THEN 1 END) as video_count,
+            COUNT(CASE WHEN content_type = 'quiz' THEN 1 END) as quiz_count,
+            COUNT(CASE WHEN content_type = 'assignment' THEN 1 END) as assignment_count
+        FROM course_content cc
+        JOIN chapter ch ON cc.chapter_id = ch.id
+        WHERE ch.course_id = ?
+    """,
+    'get_course_statistics_assignment': """
+        SELECT 
+            COUNT(*) as total_assignments,
+            AVG(total_score) as average_score,
+            COUNT(CASE WHEN grading_status = 'graded' THEN 1 END) as graded_assignments
+        FROM submission s
+        JOIN assignment a ON s.assignment_id = a.id
+        WHERE a.course_id = ?
+    """,
+    'create_course': """
+        INSERT INTO course (title, description, teacher_id, class_id, cover_image)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    'add_chapter': """
+        INSERT INTO chapter (course_id, title, description, order_index)
+        VALUES (?, ?, ?, ?)
+    """,
+    'add_course_content': """
+        INSERT INTO course_content (chapter_id, title, content_type, content, file_path, duration, order_index)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    'update_learning_progress_update': """
+        UPDATE learning_progress 
+        SET progress = ?, time_spent = time_spent + ?, last_accessed = CURRENT_TIMESTAMP,
+            status = CASE WHEN ? >= 100 THEN 'completed' ELSE 'in_progress' END
+        WHERE id = ?
+    """,
+    'update_learning_progress_insert': """
+        INSERT INTO learning_progress 
+        (student_id, course_id, chapter_id, content_id, progress, time_spent, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    'add_resource': """
+        INSERT INTO resource 
+        (title, description, file_path, file_type, file_size, uploader_id, course_id, assignment_id, tags)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'get_courses_by_teacher': """
+        SELECT c.*, 
+               (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count
+        FROM course c
+        WHERE c.teacher_id = :teacher_id
+          AND (:status IS NULL OR c.status = :status)
+        ORDER BY c.created_at DESC
+    """,
+    'update_course': """
+        UPDATE course
+        SET title = COALESCE(:title, title),
+            description = COALESCE(:description, description),
+            cover_image = COALESCE(:cover_image, cover_image),
+            status = COALESCE(:status, status)
+        WHERE id = :id
+    """,
+    'update_chapter': """
+        UPDATE chapter
+        SET title = COALESCE(:title, title),
+            description = COALESCE(:description, description),
+            order_index = COALESCE(:order_index, order_index)
+        WHERE id = :id
+    """,
+    'search_courses': """
+        SELECT c.*, u.nickname as teacher_name,
+               (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count,
+               (SELECT COUNT(*) FROM learning_progress WHERE course_id = c.id) as enrolled_count
+        FROM course c
+        LEFT JOIN user u ON c.teacher_id = u.id
+        WHERE c.status = :status
+          AND (:keyword IS NULL OR c.title LIKE :keyword OR c.description LIKE :keyword)
+          AND (:teacher_id IS NULL OR c.teacher_id = :teacher_id)
+        ORDER BY c.created_at DESC
+    """
+})
+
 class CourseService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -21,16 +189,11 @@ class CourseService:
         
         if class_id:
             # 验证班级是否存在且教师有权限
-            check_query = "SELECT id FROM class WHERE id = ? AND teacher_id = ?"
-            if not self.db.execute_query(check_query, (class_id, teacher_id)):
+            if not self.db.execute_named('course.create_course_check', (class_id, teacher_id)):
                 raise ValidationError("班级不存在或您没有权限")
         
-        query = """
-            INSERT INTO course (title, description, teacher_id, class_id, cover_image)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        course_id = self.db.execute_update(
-            query, (title.strip(), description.strip(), teacher_id, class_id, cover_image)
+        course_id = self.db.execute_named(
+            'course.create_course', (title.strip(), description.strip(), teacher_id, class_id, cover_image)
         )
         
         if course_id:
@@ -40,88 +203,45 @@ class CourseService:
 
     def get_course_by_id(self, course_id: int) -> Optional[Course]:
         """根据ID获取课程"""
-        query = """
-            SELECT c.*, u.nickname as teacher_name,
-                   cl.name as class_name
-            FROM course c
-            LEFT JOIN user u ON c.teacher_id = u.id
-            LEFT JOIN class cl ON c.class_id = cl.id
-            WHERE c.id = ?
-        """
-        rows = self.db.execute_query(query, (course_id,))
+        rows = self.db.execute_named('course.get_course_by_id', (course_id,))
         if rows:
             return Course.from_row(rows[0])
         return None
 
     def get_courses_by_teacher(self, teacher_id: int, status: str = None) -> List[Course]:
         """获取教师的所有课程"""
-        conditions = ["c.teacher_id = ?"]
-        params = [teacher_id]
-        
-        if status:
-            conditions.append("c.status = ?")
-            params.append(status)
-        
-        where_clause = " AND ".join(conditions)
-        query = f"""
-            SELECT c.*, 
-                   (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count
-            FROM course c
-            WHERE {where_clause}
-            ORDER BY c.created_at DESC
-        """
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('course.get_courses_by_teacher', {
+            'teacher_id': teacher_id,
+            'status': status or None
+        })
         return [Course.from_row(row) for row in rows]
 
     def get_available_courses(self, student_id: int) -> List[Dict[str, Any]]:
         """获取学生可访问的课程"""
-        query = """
-            SELECT c.*, u.nickname as teacher_name,
-                   (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count,
-                   lp.progress as student_progress,
-                   lp.status as learning_status
-            FROM course c
-            JOIN user u ON c.teacher_id = u.id
-            LEFT JOIN learning_progress lp ON c.id = lp.course_id AND lp.student_id = ?
-            WHERE c.status = 'published'
-            ORDER BY c.created_at DESC
-        """
-        rows = self.db.execute_query(query, (student_id,))
+        rows = self.db.execute_named('course.get_available_courses', (student_id,))
         return [dict(row) for row in rows]
 
     def update_course(self, course_id: int, title: str = None, description: str = None,
                      cover_image: str = None, status: str = None) -> bool:
-        """更新课程信息"""
-        updates = []
-        params = []
-        
+        """更新课程信息（参数为 None 的字段保持不变）"""
         if title:
             if len(title.strip()) < 2:
                 raise ValidationError("课程标题至少需要2个字符")
-            updates.append("title = ?")
-            params.append(title.strip())
-        
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description.strip())
-        
-        if cover_image is not None:
-            updates.append("cover_image = ?")
-            params.append(cover_image)
         
         if status:
             if status not in ['draft', 'published', 'archived']:
                 raise ValidationError("无效的课程状态")
-            updates.append("status = ?")
-            params.append(status)
         
-        if not updates:
+        if not (title or description is not None or cover_image is not None or status):
             return True
         
-        query = f"UPDATE course SET {', '.join(updates)} WHERE id = ?"
-        params.append(course_id)
-        
-        result = self.db.execute_update(query, tuple(params))
+        result = self.db.execute_named('course.update_course', {
+            'id': course_id,
+            'title': title.strip() if title else None,
+            'description': description.strip() if description is not None else None,
+            'cover_image': cover_image,
+            'status': status or None
+        })
         if result is not None:
             logger.info(f"Course updated: {course_id}")
             return True
@@ -129,8 +249,7 @@ class CourseService:
 
     def publish_course(self, course_id: int) -> bool:
         """发布课程"""
-        query = "UPDATE course SET status = 'published' WHERE id = ?"
-        result = self.db.execute_update(query, (course_id,))
+        result = self.db.execute_named('course.publish_course', (course_id,))
         if result is not None:
             logger.info(f"Course published: {course_id}")
             return True
@@ -138,8 +257,7 @@ class CourseService:
 
     def archive_course(self, course_id: int) -> bool:
         """归档课程"""
-        query = "UPDATE course SET status = 'archived' WHERE id = ?"
-        result = self.db.execute_update(query, (course_id,))
+        result = self.db.execute_named('course.archive_course', (course_id,))
         if result is not None:
             logger.info(f"Course archived: {course_id}")
             return True
@@ -153,16 +271,11 @@ class CourseService:
         
         # 获取最大order_index
         if order_index is None:
-            max_order_query = "SELECT MAX(order_index) as max_order FROM chapter WHERE course_id = ?"
-            max_order_rows = self.db.execute_query(max_order_query, (course_id,))
+            max_order_rows = self.db.execute_named('course.add_chapter_max_order', (course_id,))
             order_index = (max_order_rows[0]['max_order'] or 0) + 1
         
-        query = """
-            INSERT INTO chapter (course_id, title, description, order_index)
-            VALUES (?, ?, ?, ?)
-        """
-        chapter_id = self.db.execute_update(
-            query, (course_id, title.strip(), description.strip(), order_index)
+        chapter_id = self.db.execute_named(
+            'course.add_chapter', (course_id, title.strip(), description.strip(), order_index)
         )
         
         if chapter_id:
@@ -172,43 +285,25 @@ class CourseService:
 
     def get_chapters(self, course_id: int) -> List[Chapter]:
         """获取课程的所有章节"""
-        query = """
-            SELECT c.*,
-                   (SELECT COUNT(*) FROM course_content WHERE chapter_id = c.id) as content_count
-            FROM chapter c
-            WHERE c.course_id = ?
-            ORDER BY c.order_index
-        """
-        rows = self.db.execute_query(query, (course_id,))
+        rows = self.db.execute_named('course.get_chapters', (course_id,))
         return [Chapter.from_row(row) for row in rows]
 
     def update_chapter(self, chapter_id: int, title: str = None, description: str = None,
                       order_index: int = None) -> bool:
-        """更新章节信息"""
-        updates = []
-        params = []
-        
+        """更新章节信息（参数为 None 的字段保持不变）"""
         if title:
             if len(title.strip()) < 1:
                 raise ValidationError("章节标题不能为空")
-            updates.append("title = ?")
-            params.append(title.strip())
         
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description.strip())
-        
-        if order_index is not None:
-            updates.append("order_index = ?")
-            params.append(order_index)
-        
-        if not updates:
+        if not (title or description is not None or order_index is not None):
             return True
         
-        query = f"UPDATE chapter SET {', '.join(updates)} WHERE id = ?"
-        params.append(chapter_id)
-        
-        result = self.db.execute_update(query, tuple(params))
+        result = self.db.execute_named('course.update_chapter', {
+            'id': chapter_id,
+            'title': title.strip() if title else None,
+            'description': description.strip() if description is not None else None,
+            'order_index': order_index
+        })
         if result is not None:
             logger.info(f"Chapter updated: {chapter_id}")
             return True
@@ -216,8 +311,7 @@ class CourseService:
 
     def delete_chapter(self, chapter_id: int) -> bool:
         """删除章节"""
-        query = "DELETE FROM chapter WHERE id = ?"
-        result = self.db.execute_update(query, (chapter_id,))
+        result = self.db.execute_named('course.delete_chapter', (chapter_id,))
         if result is not None:
             logger.info(f"Chapter deleted: {chapter_id}")
             return True
@@ -235,16 +329,11 @@ class CourseService:
         
         # 获取最大order_index
         if order_index is None:
-            max_order_query = "SELECT MAX(order_index) as max_order FROM course_content WHERE chapter_id = ?"
-            max_order_rows = self.db.execute_query(max_order_query, (chapter_id,))
+            max_order_rows = self.db.execute_named('course.add_course_content_max_order', (chapter_id,))
             order_index = (max_order_rows[0]['max_order'] or 0) + 1
         
-        query = """
-            INSERT INTO course_content (chapter_id, title, content_type, content, file_path, duration, order_index)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        content_id = self.db.execute_update(
-            query, (chapter_id, title.strip(), content_type, content, file_path, duration, order_index)
+        content_id = self.db.execute_named(
+            'course.add_course_content', (chapter_id, title.strip(), content_type, content, file_path, duration, order_index)
         )
         
         if content_id:
@@ -254,13 +343,7 @@ class CourseService:
 
     def get_course_contents(self, chapter_id: int) -> List[Dict[str, Any]]:
         """获取章节的所有内容"""
-        query = """
-            SELECT cc.*
-            FROM course_content cc
-            WHERE cc.chapter_id = ?
-            ORDER BY cc.order_index
-        """
-        rows = self.db.execute_query(query, (chapter_id,))
+        rows = self.db.execute_named('course.get_course_contents', (chapter_id,))
         return [dict(row) for row in rows]
 
     def update_learning_progress(self, student_id: int, course_id: int, 
@@ -268,33 +351,20 @@ class CourseService:
                                 progress: float = None, time_spent: int = 0) -> bool:
         """更新学习进度"""
         # 检查是否已存在记录
-        check_query = """
-            SELECT id FROM learning_progress 
-            WHERE student_id = ? AND course_id = ? AND content_id = ?
-        """
-        existing = self.db.execute_query(check_query, (student_id, course_id, content_id))
+        existing = self.db.execute_named(
+            'course.update_learning_progress_check', (student_id, course_id, content_id)
+        )
         
         if existing:
             # 更新现有记录
-            query = """
-                UPDATE learning_progress 
-                SET progress = ?, time_spent = time_spent + ?, last_accessed = CURRENT_TIMESTAMP,
-                    status = CASE WHEN ? >= 100 THEN 'completed' ELSE 'in_progress' END
-                WHERE id = ?
-            """
-            result = self.db.execute_update(
-                query, (progress, time_spent, progress, existing[0]['id'])
+            result = self.db.execute_named(
+                'course.update_learning_progress_update', (progress, time_spent, progress, existing[0]['id'])
             )
         else:
             # 创建新记录
-            query = """
-                INSERT INTO learning_progress 
-                (student_id, course_id, chapter_id, content_id, progress, time_spent, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
             status = 'completed' if progress and progress >= 100 else 'in_progress'
-            result = self.db.execute_update(
-                query, (student_id, course_id, chapter_id, content_id, progress, time_spent, status)
+            result = self.db.execute_named(
+                'course.update_learning_progress_insert', (student_id, course_id, chapter_id, content_id, progress, time_spent, status)
             )
         
         if result is not None:
@@ -305,39 +375,13 @@ class CourseService:
     def get_student_progress(self, student_id: int, course_id: int) -> Dict[str, Any]:
         """获取学生的学习进度"""
         # 总体进度
-        overall_query = """
-            SELECT 
-                AVG(progress) as overall_progress,
-                SUM(time_spent) as total_time_spent,
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_count,
-                COUNT(*) as total_count
-            FROM learning_progress
-            WHERE student_id = ? AND course_id = ?
-        """
-        overall_stats = self.db.execute_query(overall_query, (student_id, course_id))
+        overall_stats = self.db.execute_named('course.get_student_progress_overall', (student_id, course_id))
         
         # 章节进度
-        chapter_query = """
-            SELECT 
-                ch.id, ch.title, ch.order_index,
-                lp.progress, lp.status, lp.last_accessed, lp.time_spent
-            FROM chapter ch
-            LEFT JOIN learning_progress lp ON ch.id = lp.chapter_id AND lp.student_id = ?
-            WHERE ch.course_id = ?
-            ORDER BY ch.order_index
-        """
-        chapter_progress = self.db.execute_query(chapter_query, (student_id, course_id))
+        chapter_progress = self.db.execute_named('course.get_student_progress_chapter', (student_id, course_id))
         
         # 最近学习的内容
-        recent_query = """
-            SELECT cc.title, cc.content_type, lp.last_accessed
-            FROM learning_progress lp
-            JOIN course_content cc ON lp.content_id = cc.id
-            WHERE lp.student_id = ? AND lp.course_id = ?
-            ORDER BY lp.last_accessed DESC
-            LIMIT 5
-        """
-        recent_activities = self.db.execute_query(recent_query, (student_id, course_id))
+        recent_activities = self.db.execute_named('course.get_student_progress_recent', (student_id, course_id))
         
         return {
             'overall': dict(overall_stats[0]) if overall_stats else {},
@@ -356,13 +400,8 @@ class CourseService:
         file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
         file_type = os.path.splitext(file_path)[1].lower() if file_path else None
         
-        query = """
-            INSERT INTO resource 
-            (title, description, file_path, file_type, file_size, uploader_id, course_id, assignment_id, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        resource_id = self.db.execute_update(
-            query, (title.strip(), description, file_path, file_type, file_size, 
+        resource_id = self.db.execute_named(
+            'course.add_resource', (title.strip(), description, file_path, file_type, file_size, 
                    uploader_id, course_id, assignment_id, tags)
         )
         
@@ -373,81 +412,29 @@ class CourseService:
 
     def get_course_resources(self, course_id: int) -> List[Resource]:
         """获取课程资源"""
-        query = """
-            SELECT r.*, u.nickname as uploader_name
-            FROM resource r
-            LEFT JOIN user u ON r.uploader_id = u.id
-            WHERE r.course_id = ?
-            ORDER BY r.created_at DESC
-        """
-        rows = self.db.execute_query(query, (course_id,))
+        rows = self.db.execute_named('course.get_course_resources', (course_id,))
         return [Resource.from_row(row) for row in rows]
 
     def search_courses(self, keyword: str = None, teacher_id: int = None,
                       status: str = 'published') -> List[Dict[str, Any]]:
         """搜索课程"""
-        conditions = ["c.status = ?"]
-        params = [status]
-        
-        if keyword:
-            conditions.append("(c.title LIKE ? OR c.description LIKE ?)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
-        
-        if teacher_id:
-            conditions.append("c.teacher_id = ?")
-            params.append(teacher_id)
-        
-        where_clause = " AND ".join(conditions)
-        query = f"""
-            SELECT c.*, u.nickname as teacher_name,
-                   (SELECT COUNT(*) FROM chapter WHERE course_id = c.id) as chapter_count,
-                   (SELECT COUNT(*) FROM learning_progress WHERE course_id = c.id) as enrolled_count
-            FROM course c
-            LEFT JOIN user u ON c.teacher_id = u.id
-            WHERE {where_clause}
-            ORDER BY c.created_at DESC
-        """
-        
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('course.search_courses', {
+            'status': status,
+            'keyword': f"%{keyword}%" if keyword else None,
+            'teacher_id': teacher_id or None
+        })
         return [dict(row) for row in rows]
 
     def get_course_statistics(self, course_id: int) -> Dict[str, Any]:
         """获取课程统计信息"""
         # 学生统计
-        student_query = """
-            SELECT 
-                COUNT(DISTINCT student_id) as enrolled_students,
-                AVG(progress) as average_progress,
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_students
-            FROM learning_progress
-            WHERE course_id = ?
-        """
-        student_stats = self.db.execute_query(student_query, (course_id,))
+        student_stats = self.db.execute_named('course.get_course_statistics_student', (course_id,))
         
         # 内容统计
-        content_query = """
-            SELECT 
-                COUNT(*) as total_content,
-                COUNT(CASE WHEN content_type = 'video' THEN 1 END) as video_count,
-                COUNT(CASE WHEN content_type = 'quiz' THEN 1 END) as quiz_count,
-                COUNT(CASE WHEN content_type = 'assignment' THEN 1 END) as assignment_count
-            FROM course_content cc
-            JOIN chapter ch ON cc.chapter_id = ch.id
-            WHERE ch.course_id = ?
-        """
-        content_stats = self.db.execute_query(content_query, (course_id,))
+        content_stats = self.db.execute_named('course.get_course_statistics_content', (course_id,))
         
         # 作业统计
-        assignment_query = """
-            SELECT 
-                COUNT(*) as total_assignments,
-                AVG(total_score) as average_score,
-                COUNT(CASE WHEN grading_status = 'graded' THEN 1 END) as graded_assignments
-            FROM submission s
-            JOIN assignment a ON s.assignment_id = a.id
-            WHERE a.course_id = ?
-        """
-        assignment_stats = self.db.execute_query(assignment_query, (course_id,))
+        assignment_stats = self.db.execute_named('course.get_course_statistics_assignment', (course_id,))
         
         return {
             'student_stats': dict(student_stats[0]) if student_stats else {},
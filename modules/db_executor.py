@@ -0,0 +1,84 @@
+"""
+后台数据库执行器
+- 服务调用提交到工作线程池执行，立即返回 concurrent.futures.Future
+- 本模块不依赖 Tk，界面层通过 ui/async_tasks.py 把结果送回主线程
+"""
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import DB_EXECUTOR_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class DBExecutor:
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or DB_EXECUTOR_CONFIG['max_workers'],
+            thread_name_prefix='db-worker'
+        )
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+        self._in_flight = 0
+        self._futures = set()  # 尚未完成的 Future，关闭时逐个取消
+
+    def submit(self, func, *args, **kwargs):
+        """提交调用，返回 Future"""
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._in_flight += 1
+        future = self._executor.submit(self._call, func, args, kwargs)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _call(self, func, args, kwargs):
+        # 在工作线程中更新统计，调用方拿到结果时统计已经是最新的
+        key = 'failed'
+        try:
+            result = func(*args, **kwargs)
+            key = 'completed'
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats[key] += 1
+
+    def _on_done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+            if future.cancelled():
+                self._in_flight -= 1
+                self._stats['cancelled'] += 1
+
+    def stats(self):
+        """获取执行统计"""
+        with self._lock:
+            return dict(self._stats, in_flight=self._in_flight)
+
+    def shutdown(self, wait=False):
+        """关闭执行器，尚未开始的调用直接取消（shutdown 的 cancel_futures 参数需要 Python 3.9，这里自行取消）"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=wait)
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+def get_db_executor():
+    """获取全局执行器（首次调用时创建）"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = DBExecutor()
+        return _default_executor
+
+def shutdown_db_executor():
+    """关闭全局执行器（程序退出时调用）"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is not None:
+            _default_executor.shutdown()
+            _default_executor = None
@@ -1,8 +1,19 @@
 import sqlite3
 import os
+import time
+import random
+import threading
 import logging
 from contextlib import contextmanager
-from config import DB_PATH, SQL_SCRIPT_PATH
+from urllib.request import pathname2url
+from config import (
+    DB_PATH, SQL_SCRIPT_PATH, DB_POOL_CONFIG, DB_STORAGE_PROFILES, DB_STORAGE_PROFILE,
+    DB_PROFILER_CONFIG, DB_ERROR_CONFIG
+)
+from modules.exceptions import DatabaseError, DatabaseLockedError, IntegrityConstraintError
+from modules.schema_migrator import SchemaMigrator
+from modules.query_registry import query_registry, NamedQuery
+from modules.query_profiler import QueryProfiler
 
 # 配置日志
 logging.basicConfig(
@@ -11,23 +22,272 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class Row(sqlite3.Row):
+    """支持 get() 的行对象（models 中的 from_row 依赖该方法）"""
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (IndexError, KeyError):
+            return default
+
+class ConnectionPool:
+    """
+    线程感知的 SQLite 连接池
+    - 连接在创建时设置一次 PRAGMA，之后反复复用
+    - 线程优先取回自己上次归还的连接
+    - 连接总数不超过 max_size，池满时等待归还
+    - 空闲时间过长的连接在借出前做健康检查
+    """
+
+    def __init__(self, factory, max_size=5, timeout=10, health_check_interval=30):
+        self._factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._idle = []  # [(conn, last_used)]
+        self._open_count = 0
+        self._closed = False
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0
+        }
+
+    def acquire(self):
+        """借出一个连接"""
+        deadline = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DatabaseError("连接池已关闭")
+
+                entry = self._take_idle()
+                if entry:
+                    self._stats['hits'] += 1
+                    conn, last_used = entry
+                    break
+
+                if self._open_count < self.max_size:
+                    self._stats['misses'] += 1
+                    self._open_count += 1
+                    conn, last_used = None, None
+                    break
+
+                # 池已满，等待其他线程归还
+                self._stats['waits'] += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    self._stats['timeouts'] += 1
+                    raise DatabaseError(f"获取数据库连接超时 ({self.timeout}s)")
+
+        # 建立连接和健康检查都放在锁外进行
+        if conn is None:
+            conn = self._open()
+        elif time.monotonic() - last_used > self.health_check_interval and not self._is_healthy(conn):
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            self._discard(conn, reopen=True)
+            conn = self._open()
+
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn):
+        """归还连接"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open_count -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        """关闭所有空闲连接，借出中的连接在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                conn.close()
+                self._open_count -= 1
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self):
+        """获取连接池统计信息"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['open_connections'] = self._open_count
+            stats['idle_connections'] = len(self._idle)
+            stats['in_use_connections'] = self._open_count - len(self._idle)
+            stats['max_size'] = self.max_size
+            return stats
+
+    def _take_idle(self):
+        """优先取当前线程上次使用的连接，否则取最近归还的连接"""
+        if not self._idle:
+            return None
+        preferred = getattr(self._local, 'conn', None)
+        for index, (conn, _) in enumerate(self._idle):
+            if conn is preferred:
+                return self._idle.pop(index)
+        return self._idle.pop()
+
+    def _open(self):
+        try:
+            return self._factory()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+
+    def _discard(self, conn, reopen=False):
+        """丢弃失效连接，reopen 为 True 时保留名额用于重建"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        if not reopen:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+class _Transaction:
+    """transaction() 在线程局部保存的状态"""
+    __slots__ = ('conn', 'depth', 'failed', 'on_commit')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.depth = 0
+        self.failed = False
+        self.on_commit = []  # 最外层提交后执行的回调
+
+# SQLite 主错误码：SQLITE_BUSY / SQLITE_LOCKED
+_BUSY_ERROR_CODES = (5, 6)
+
 class DBManager:
-    def __init__(self):
-        self.db_path = DB_PATH
+    def __init__(self, db_path=None, pool_size=None, storage_profile=None, strict=None):
+        self.db_path = db_path or DB_PATH
+        self.storage_profile = DB_STORAGE_PROFILES[storage_profile or DB_STORAGE_PROFILE]
+        # 严格模式下 execute_* 出错抛出异常，而不是返回 [] / None
+        self.strict = DB_ERROR_CONFIG['strict'] if strict is None else strict
+        self._error_stats = {'retries': 0, 'retried_successes': 0, 'busy_failures': 0, 'failures': 0}
+        self._error_stats_lock = threading.Lock()
+
+        # pool_size 为 0 时退化为每次调用新建连接
+        if pool_size is None:
+            pool_size = DB_POOL_CONFIG['max_size'] if DB_POOL_CONFIG['enabled'] else 0
+        if pool_size > 0:
+            if self.storage_profile['read_write_split']:
+                # 单一写连接 + 只读连接池，读不会排在写的后面
+                self.write_pool = self._create_pool(self._create_connection, 1)
+                self.read_pool = self._create_pool(
+                    lambda: self._create_connection(readonly=True), pool_size
+                )
+            else:
+                self.write_pool = self.read_pool = self._create_pool(
+                    self._create_connection, pool_size
+                )
+        else:
+            self.write_pool = self.read_pool = None
+
+        # 当前线程的事务（见 transaction()）
+        self._local = threading.local()
+
+        # SQL 性能分析，关闭时为 None
+        self.profiler = None
+        if DB_PROFILER_CONFIG['enabled']:
+            self.enable_profiler()
+
         self.init_db()
 
-    def get_connection(self):
-        """获取数据库连接"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # 允许通过列名访问
+    @staticmethod
+    def _create_pool(factory, max_size):
+        return ConnectionPool(
+            factory,
+            max_size=max_size,
+            timeout=DB_POOL_CONFIG['timeout'],
+            health_check_interval=DB_POOL_CONFIG['health_check_interval']
+        )
+
+    def _create_connection(self, readonly=False):
+        """新建数据库连接"""
+        timeout = self.storage_profile['busy_timeout'] / 1000
+        if readonly:
+            uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, timeout=timeout, check_same_thread=False,
+                cached_statements=DB_POOL_CONFIG['cached_statements']
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, timeout=timeout, check_same_thread=False,
+                cached_statements=DB_POOL_CONFIG['cached_statements']
+            )
+        conn.row_factory = Row  # 允许通过列名访问
         # 启用外键约束
         conn.execute("PRAGMA foreign_keys = ON")
+        self._apply_storage_profile(conn, readonly)
         return conn
 
+    def _apply_storage_profile(self, conn, readonly=False):
+        """应用存储配置"""
+        profile = self.storage_profile
+        # journal_mode 持久化在数据库文件中，只需写连接设置
+        if not readonly:
+            conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        for pragma in ('synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout'):
+            conn.execute(f"PRAGMA {pragma} = {profile[pragma]}")
+
+    def get_connection(self):
+        """获取独立的数据库连接（由调用方负责关闭）"""
+        return self._create_connection()
+
     @contextmanager
-    def get_connection_context(self):
-        """上下文管理器方式获取连接"""
-        conn = self.get_connection()
+    def get_connection_context(self, readonly=False):
+        """
+        上下文管理器方式获取连接，readonly 为 True 时使用只读连接
+        当前线程处于 transaction() 中时，读写都使用事务连接，由事务统一提交
+        """
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            try:
+                yield tx.conn
+            except Exception as e:
+                # 即使调用方吞掉异常（execute_update 返回 None），事务也不会提交
+                tx.failed = True
+                logger.error(f"Database operation failed in transaction: {e}")
+                raise
+            return
+
+        pool = self.read_pool if readonly else self.write_pool
+        if pool is None:
+            conn = self.get_connection()
+        else:
+            conn = pool.acquire()
         try:
             yield conn
             conn.commit()
@@ -36,61 +296,359 @@ class DBManager:
             logger.error(f"Database operation failed: {e}")
             raise
         finally:
-            conn.close()
+            if pool is None:
+                conn.close()
+            else:
+                pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        工作单元：块内所有 DBManager 调用共用一个写连接，结束时只提交一次
+        - 可以嵌套，内层使用 SAVEPOINT，内层失败只回滚内层，外层捕获异常后可以继续提交
+        - 块内任何语句失败（包括被 execute_* 吞掉的异常）都会使整个事务回滚并抛出 DatabaseError
+        用法:
+            with db.transaction():
+                db.execute_named(...)
+                db.execute_named_many(...)
+        """
+        tx = getattr(self._local, 'transaction', None)
+        if tx is not None:
+            yield from self._savepoint(tx)
+            return
+
+        pool = self.write_pool
+        conn = self.get_connection() if pool is None else pool.acquire()
+        try:
+            # 立即取得写锁，避免事务中途因锁升级失败；锁冲突时按退避策略重试
+            # （必须在登记事务之前执行，事务内的语句不重试）
+            self._with_retry(lambda: conn.execute("BEGIN IMMEDIATE"))
+        except sqlite3.Error as e:
+            if pool is None:
+                conn.close()
+            else:
+                pool.release(conn)
+            self._count('busy_failures' if self._is_busy_error(e) else 'failures')
+            logger.error(f"Failed to begin transaction, {e}")
+            raise self._translate_error(e) from e
+
+        tx = self._local.transaction = _Transaction(conn)
+        try:
+            yield conn
+            if tx.failed:
+                raise DatabaseError("事务中有语句执行失败，已回滚")
+            conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.transaction = None
+            if pool is None:
+                conn.close()
+            else:
+                pool.release(conn)
+        self._run_callbacks(tx.on_commit)
+
+    def on_commit(self, callback):
+        """
+        在当前事务提交后执行 callback()（例如更新内存索引），事务回滚时不执行
+        不在事务中时立即执行；回调出错只记录日志
+        """
+        tx = getattr(self._local, 'transaction', None)
+        if tx is None:
+            self._run_callbacks([callback])
+        else:
+            tx.on_commit.append(callback)
+
+    @staticmethod
+    def _run_callbacks(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"On-commit callback failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _savepoint(tx):
+        """嵌套事务"""
+        tx.depth += 1
+        name = f"sp_{tx.depth}"
+        failed = tx.failed
+        callbacks = len(tx.on_commit)
+        tx.conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield tx.conn
+            if tx.failed and not failed:
+                raise DatabaseError("事务中有语句执行失败，已回滚")
+        except BaseException:
+            tx.conn.execute(f"ROLLBACK TO {name}")
+            tx.conn.execute(f"RELEASE {name}")
+            # 内层的失败已经回滚，不影响外层；内层登记的提交回调一并丢弃
+            tx.failed = failed
+            del tx.on_commit[callbacks:]
+            raise
+        else:
+            tx.conn.execute(f"RELEASE {name}")
+        finally:
+            tx.depth -= 1
+
+    def in_transaction(self):
+        """当前线程是否处于 transaction() 中"""
+        return getattr(self._local, 'transaction', None) is not None
+
+    def get_pool_stats(self):
+        """获取连接池统计信息（未启用读写分离时两者为同一个连接池）"""
+        if self.write_pool is None:
+            return {}
+        return {
+            'read': self.read_pool.stats(),
+            'write': self.write_pool.stats()
+        }
+
+    def close(self):
+        """关闭连接池"""
+        for pool in {self.read_pool, self.write_pool}:
+            if pool is not None:
+                pool.close_all()
+
+    def _is_read_statement(self, query):
+        return query.lstrip().upper().startswith(NamedQuery.READ_STATEMENTS)
 
     def init_db(self):
-        """初始化数据库"""
+        """初始化数据库（只执行未应用的结构迁移）"""
         if not os.path.exists(SQL_SCRIPT_PATH):
             logger.error(f"SQL script not found at {SQL_SCRIPT_PATH}")
             return
 
         try:
             with self.get_connection_context() as conn:
-                cursor = conn.cursor()
-                
-                # 读取 SQL 脚本
-                with open(SQL_SCRIPT_PATH, 'r', encoding='utf-8') as f:
-                    sql_script = f.read()
-                
-                # 执行脚本
-                cursor.executescript(sql_script)
-                logger.info("Database initialized successfully.")
+                applied = SchemaMigrator(conn).migrate()
+            if applied:
+                logger.info(f"Database initialized successfully, schema version {applied[-1]}.")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
 
+    def enable_profiler(self, slow_threshold_ms=None, slow_log_path=None, explain=None):
+        """开启 SQL 性能分析，未指定的参数取 DB_PROFILER_CONFIG"""
+        self.profiler = QueryProfiler(
+            slow_threshold_ms=DB_PROFILER_CONFIG['slow_query_threshold_ms'] if slow_threshold_ms is None else slow_threshold_ms,
+            slow_log_path=slow_log_path or DB_PROFILER_CONFIG['slow_query_log'],
+            explain=DB_PROFILER_CONFIG['explain'] if explain is None else explain
+        )
+        return self.profiler
+
+    def disable_profiler(self):
+        """关闭 SQL 性能分析"""
+        self.profiler = None
+
+    def get_profile_report(self, top_n=20, order_by='total_time'):
+        """获取耗时最多的 top_n 条语句（未开启时返回空列表）"""
+        if self.profiler is None:
+            return []
+        return self.profiler.get_report(top_n, order_by)
+
+    @staticmethod
+    def _is_busy_error(error):
+        """是否为锁冲突（可以重试）"""
+        if not isinstance(error, sqlite3.OperationalError):
+            return False
+        code = getattr(error, 'sqlite_errorcode', None)
+        if code is not None:
+            return code & 0xFF in _BUSY_ERROR_CODES
+        message = str(error)
+        return 'locked' in message or 'busy' in message
+
+    def _count(self, key):
+        with self._error_stats_lock:
+            self._error_stats[key] += 1
+
+    def _with_retry(self, func):
+        """
+        执行 func()，遇到锁冲突时按指数退避重试
+        事务内的单条语句不重试（重试无法恢复事务中已执行的部分）
+        """
+        retries = 0
+        while True:
+            try:
+                result = func()
+            except sqlite3.OperationalError as e:
+                if (not self._is_busy_error(e) or retries >= DB_ERROR_CONFIG['busy_retries']
+                        or self.in_transaction()):
+                    raise
+                delay = min(DB_ERROR_CONFIG['busy_backoff'] * 2 ** retries, DB_ERROR_CONFIG['busy_backoff_max'])
+                retries += 1
+                self._count('retries')
+                logger.warning(f"Database busy, retry {retries} in {delay:.3f}s: {e}")
+                # 加入随机抖动，避免多个线程同时重试
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+            if retries:
+                self._count('retried_successes')
+            return result
+
+    def _translate_error(self, error):
+        """把 sqlite3 异常转换为 modules.exceptions 中的异常类型"""
+        if isinstance(error, DatabaseError):
+            return error
+        if self._is_busy_error(error):
+            return DatabaseLockedError(f"数据库被锁定: {error}")
+        if isinstance(error, sqlite3.IntegrityError):
+            return IntegrityConstraintError(f"违反数据约束: {error}")
+        return DatabaseError(f"数据库操作失败: {error}")
+
+    def _handle_failure(self, message, error, default):
+        """记录失败；严格模式下抛出对应异常，否则返回 default"""
+        self._count('busy_failures' if self._is_busy_error(error) else 'failures')
+        logger.error(f"{message}, {error}")
+        if self.strict:
+            raise self._translate_error(error) from error
+        return default
+
+    def get_error_stats(self):
+        """
+        获取错误统计
+        retries: 因锁冲突重试的次数
+        retried_successes: 重试后成功的操作数
+        busy_failures: 重试用尽仍被锁定而失败的操作数
+        failures: 其他失败的操作数
+        """
+        with self._error_stats_lock:
+            return dict(self._error_stats)
+
     def execute_query(self, query, params=()):
         """执行查询语句 (SELECT)"""
-        try:
-            with self.get_connection_context() as conn:
+        profiler = self.profiler
+
+        def run():
+            with self.get_connection_context(readonly=self._is_read_statement(query)) as conn:
+                if profiler is not None:
+                    start = time.perf_counter()
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 result = cursor.fetchall()
+                if profiler is not None:
+                    profiler.record(query, params, time.perf_counter() - start, len(result), conn)
                 return result
+
+        try:
+            return self._with_retry(run)
         except Exception as e:
-            logger.error(f"Query execution failed: {query}, {params}, {e}")
-            return []
+            return self._handle_failure(f"Query execution failed: {query}, {params}", e, [])
+
+    def iter_query(self, query, params=(), batch_size=None):
+        """
+        流式执行查询，逐行产出结果
+        - 每次 fetchmany(batch_size) 行，内存占用与结果集大小无关
+        - 连接只在迭代期间占用，迭代结束或生成器关闭时归还
+        - 中途出错抛出 DatabaseError，避免调用方把截断的结果当成完整结果
+        """
+        return self._stream(query, params, batch_size)
+
+    def _stream(self, query, params, batch_size, named=None):
+        """iter_query / iter_named 的实现，耗时只统计数据库部分，不包括调用方处理每批数据的时间"""
+        batch_size = batch_size or DB_POOL_CONFIG['fetch_batch_size']
+        profiler = self.profiler
+        elapsed = 0.0
+        count = 0
+        try:
+            with self.get_connection_context(readonly=self._is_read_statement(query)) as conn:
+                start = time.perf_counter()
+                cursor = conn.execute(query, params)
+                try:
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        elapsed += time.perf_counter() - start
+                        count += len(rows)
+                        if not rows:
+                            break
+                        yield from rows
+                        start = time.perf_counter()
+                finally:
+                    cursor.close()
+                    if named is not None:
+                        query_registry.record(named, elapsed)
+                if profiler is not None:
+                    profiler.record(query, params, elapsed, count, conn)
+        except sqlite3.Error as e:
+            self._count('busy_failures' if self._is_busy_error(e) else 'failures')
+            logger.error(f"Streaming query failed: {query}, {params}, {e}")
+            raise self._translate_error(e) from e
 
     def execute_update(self, query, params=()):
         """执行更新语句 (INSERT, UPDATE, DELETE)"""
-        try:
+        profiler = self.profiler
+
+        def run():
             with self.get_connection_context() as conn:
+                if profiler is not None:
+                    start = time.perf_counter()
                 cursor = conn.cursor()
                 cursor.execute(query, params)
+                if profiler is not None:
+                    profiler.record(query, params, time.perf_counter() - start, cursor.rowcount, conn)
                 return cursor.lastrowid
+
+        try:
+            return self._with_retry(run)
         except Exception as e:
-            logger.error(f"Update execution failed: {query}, {params}, {e}")
-            return None
+            return self._handle_failure(f"Update execution failed: {query}, {params}", e, None)
 
     def execute_many(self, query, params_list):
         """批量执行更新语句"""
-        try:
+        profiler = self.profiler
+        # 重试时需要再次遍历参数
+        if not isinstance(params_list, (list, tuple)):
+            params_list = list(params_list)
+
+        def run():
             with self.get_connection_context() as conn:
+                if profiler is not None:
+                    start = time.perf_counter()
                 cursor = conn.cursor()
                 cursor.executemany(query, params_list)
+                if profiler is not None:
+                    # 执行计划按第一组参数获取
+                    profiler.record(query, params_list[0] if params_list else (),
+                                    time.perf_counter() - start, cursor.rowcount, conn)
                 return cursor.rowcount
+
+        try:
+            return self._with_retry(run)
         except Exception as e:
-            logger.error(f"Batch execution failed: {query}, {e}")
-            return None
+            return self._handle_failure(f"Batch execution failed: {query}", e, None)
+
+    def execute_named(self, name, params=()):
+        """
+        按名称执行已注册的查询
+        读语句返回结果行，写语句返回 lastrowid
+        """
+        query = query_registry.get(name)
+        start = time.perf_counter()
+        try:
+            if query.readonly:
+                return self.execute_query(query.sql, params)
+            return self.execute_update(query.sql, params)
+        finally:
+            query_registry.record(query, time.perf_counter() - start)
+
+    def iter_named(self, name, params=(), batch_size=None):
+        """按名称流式执行已注册的查询"""
+        query = query_registry.get(name)
+        return self._stream(query.sql, params, batch_size, named=query)
+
+    def execute_named_many(self, name, params_list):
+        """按名称批量执行已注册的更新语句"""
+        query = query_registry.get(name)
+        start = time.perf_counter()
+        try:
+            return self.execute_many(query.sql, params_list)
+        finally:
+            query_registry.record(query, time.perf_counter() - start)
+
+    def get_query_stats(self, limit=None):
+        """获取命名查询的调用次数和累计耗时"""
+        return query_registry.get_stats(limit)
 
 if __name__ == "__main__":
     db = DBManager()
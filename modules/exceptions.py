@@ -6,6 +6,14 @@ class DatabaseError(Exception):
     """数据库操作异常"""
     pass
 
+class DatabaseLockedError(DatabaseError):
+    """数据库被锁定（SQLITE_BUSY / SQLITE_LOCKED），重试后仍未成功"""
+    pass
+
+class IntegrityConstraintError(DatabaseError):
+    """违反唯一、外键、非空或 CHECK 约束"""
+    pass
+
 class AuthenticationError(Exception):
     """认证异常"""
     pass
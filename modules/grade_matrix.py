@@ -0,0 +1,226 @@
+"""
+课程成绩矩阵
+- 成绩存为 学生 x 作业 的 NumPy 数组，行列按学生和作业的序号排列，缺失的成绩为 NaN
+- 总分、平均分、加权平均分、等级和排名都是按行或按列的向量化计算
+- to_dict() 等方法给出与原 get_course_grades / iter_export_rows 相同结构的字典视图
+"""
+import numpy as np
+from modules.grade_scale import default_grade_scale
+
+def letter_grades(scores, total_score=100, scale=None):
+    """
+    向量化的 GradebookService.calculate_grade
+    scores: 浮点数组，NaN 的位置返回 None
+    scale: GradeScale，默认按 config.GRADE_SCALE
+    返回: 与 scores 形状相同的 object 数组
+    """
+    return (scale or default_grade_scale).grade_array(scores, total_score)
+
+def final_scores(student_ids, scores, weights):
+    """
+    向量化的 GradebookService.calculate_final_grade：按学生分组求 Σ(分数 x 权重) / Σ权重，总权重为 0 时为 0
+    student_ids, scores, weights: 每条成绩一项的等长列；同一学生的成绩按 calculate_final_grade 的顺序排列时，
+    累加顺序相同，结果与逐个学生计算完全一致
+    返回: (按ID排序的学生ID数组, 最终分数数组, 总权重数组)
+    """
+    ids, inverse = np.unique(np.asarray(student_ids), return_inverse=True)
+    scores = np.asarray(scores, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    weighted = np.bincount(inverse, weights=scores * weights, minlength=len(ids))
+    total_weights = np.bincount(inverse, weights=weights, minlength=len(ids))
+    finals = np.divide(weighted, total_weights, out=np.zeros(len(ids)), where=total_weights > 0)
+    return ids, finals, total_weights
+
+class GradeMatrix:
+    """
+    一门课程的成绩矩阵
+    行: students 中的学生，之后是只在成绩表中出现的学生（例如用户已删除）
+    列: assignments 中已批改的作业，之后是成绩表中出现的其他作业（不参与统计）
+    """
+    def __init__(self, students, assignments, student_ids, assignment_ids, scores, weights, exists, grades, comments,
+                 scale=None):
+        self.students = students
+        self.assignments = assignments
+        self.student_ids = student_ids
+        self.assignment_ids = assignment_ids
+        self.scores = scores  # float64，缺失为 NaN
+        self.weights = weights  # float64，缺失为 NaN
+        self.exists = exists  # 成绩表中是否有该条记录（分数可以为空）
+        self.grades = grades  # object，等级
+        self.comments = comments  # object，评语
+        self.scale = scale  # 计算平均分等级的 GradeScale，为空时按 config.GRADE_SCALE
+
+    @classmethod
+    def from_rows(cls, students, assignments, rows, scale=None):
+        """
+        students: list of {'student_id', 'nickname', 'username'}
+        assignments: list of {'id', 'title', 'total_score', 'type'}（参与统计的作业）
+        rows: iterable of (student_id, assignment_id, score, weight, grade, comment)，按此列顺序
+        scale: 课程的 GradeScale
+        """
+        student_ids = [s['student_id'] for s in students]
+        assignment_ids = [a['id'] for a in assignments]
+
+        # 按列转置（在 C 中完成），之后每列整体处理，不再逐行按列名取值
+        columns = list(zip(*rows))
+        if columns:
+            student_column, assignment_column, scores, weights, grades, comments = columns
+            row_index = cls._ordinals(student_column, student_ids)
+            col_index = cls._ordinals(assignment_column, assignment_ids)
+        else:
+            row_index = col_index = ()
+
+        shape = (len(student_ids), len(assignment_ids))
+        score_matrix = np.full(shape, np.nan)
+        weight_matrix = np.full(shape, np.nan)
+        exists = np.zeros(shape, dtype=bool)
+        grade_matrix = np.full(shape, None, dtype=object)
+        comment_matrix = np.full(shape, None, dtype=object)
+        if columns:
+            index = (np.array(row_index, dtype=np.intp), np.array(col_index, dtype=np.intp))
+            # None 转换为 NaN
+            score_matrix[index] = np.array(scores, dtype=np.float64)
+            weight_matrix[index] = np.array(weights, dtype=np.float64)
+            exists[index] = True
+            grade_matrix[index] = np.array(grades, dtype=object)
+            comment_matrix[index] = np.array(comments, dtype=object)
+
+        return cls(students, assignments, student_ids, assignment_ids,
+                   score_matrix, weight_matrix, exists, grade_matrix, comment_matrix, scale)
+
+    @staticmethod
+    def _ordinals(values, ids):
+        """
+        把一列 ID 换成序号；ids 中没有的 ID 依次追加到 ids 末尾
+        返回: 序号列表
+        """
+        ordinal = {value: i for i, value in enumerate(ids)}
+        result = [ordinal.get(value) for value in values]
+        if None in result:
+            for k, value in enumerate(values):
+                if result[k] is None:
+                    i = ordinal.get(value)
+                    if i is None:
+                        i = ordinal[value] = len(ids)
+                        ids.append(value)
+                    result[k] = i
+        return result
+
+    @property
+    def counted_scores(self):
+        """参与统计的部分：students 中的学生 x 已批改的作业（视图，不复制）"""
+        return self.scores[:len(self.students), :len(self.assignments)]
+
+    def grade_counts(self):
+        """每个学生有分数的作业数"""
+        return np.count_nonzero(~np.isnan(self.counted_scores), axis=1)
+
+    def totals(self):
+        """每个学生的总分，没有成绩时为 0"""
+        return np.nansum(self.counted_scores, axis=1)
+
+    def averages(self):
+        """每个学生的平均分，没有成绩时为 NaN"""
+        counts = self.grade_counts()
+        return np.divide(self.totals(), counts, out=np.full(len(counts), np.nan), where=counts > 0)
+
+    def weighted_averages(self):
+        """每个学生的加权平均分（权重为空时按 1），没有成绩时为 NaN"""
+        scores = self.counted_scores
+        weights = self.weights[:len(self.students), :len(self.assignments)]
+        weights = np.where(np.isnan(scores), 0.0, np.where(np.isnan(weights), 1.0, weights))
+        total_weight = weights.sum(axis=1)
+        weighted = np.nansum(scores * weights, axis=1)
+        return np.divide(weighted, total_weight, out=np.full(len(total_weight), np.nan), where=total_weight > 0)
+
+    def rankings(self, values=None):
+        """
+        按平均分（或给定的每个学生的值）从高到低排名，并列时名次相同（1, 2, 2, 4）
+        没有成绩的学生为 0
+        """
+        values = self.averages() if values is None else np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        ordered = np.sort(values[valid])
+        ranks = np.zeros(len(values), dtype=np.int64)
+        ranks[valid] = len(ordered) - np.searchsorted(ordered, values[valid], side='right') + 1
+        return ranks
+
+    def assignment_means(self):
+        """每份已批改作业的平均分，没有成绩时为 NaN"""
+        scores = self.counted_scores
+        counts = np.count_nonzero(~np.isnan(scores), axis=0)
+        return np.divide(np.nansum(scores, axis=0), counts, out=np.full(len(counts), np.nan), where=counts > 0)
+
+    def grade_matrix_dict(self):
+        """{student_id: {assignment_id: {'score', 'grade', 'comment'}}}，包含成绩表中的全部记录"""
+        result = {}
+        rows, cols = np.nonzero(self.exists)
+        scores = self.scores[rows, cols].tolist()
+        grades = self.grades[rows, cols]
+        comments = self.comments[rows, cols]
+        student_ids = self.student_ids
+        assignment_ids = self.assignment_ids
+        for k, (i, j) in enumerate(zip(rows.tolist(), cols.tolist())):
+            score = scores[k]
+            result.setdefault(student_ids[i], {})[assignment_ids[j]] = {
+                'score': None if score != score else score,
+                'grade': grades[k],
+                'comment': comments[k]
+            }
+        return result
+
+    def student_stats(self):
+        """{student_id: {'total_score', 'average_score', 'average_grade', 'grade_count'}}"""
+        totals = self.totals().tolist()
+        averages = self.averages()
+        average_grades = letter_grades(averages, scale=self.scale)
+        counts = self.grade_counts().tolist()
+        return {
+            student_id: {
+                'total_score': totals[i],
+                'average_score': None if counts[i] == 0 else float(averages[i]),
+                'average_grade': average_grades[i],
+                'grade_count': counts[i]
+            }
+            for i, student_id in enumerate(self.student_ids[:len(self.students)])
+        }
+
+    def to_dict(self):
+        """与原 get_course_grades 相同结构的字典"""
+        return {
+            'students': [dict(s) for s in self.students],
+            'assignments': [dict(a) for a in self.assignments],
+            'grade_matrix': self.grade_matrix_dict(),
+            'student_stats': self.student_stats()
+        }
+
+    def export_rows(self):
+        """与 iter_export_rows 相同结构的导出数据，每个学生一项"""
+        stats = self.student_stats()
+        n_assignments = len(self.assignments)
+        assignment_ids = self.assignment_ids[:n_assignments]
+        rows = []
+        for i, student in enumerate(self.students):
+            scores = self.scores[i, :n_assignments].tolist()
+            exists = self.exists[i, :n_assignments]
+            grades = self.grades[i, :n_assignments]
+            comments = self.comments[i, :n_assignments]
+            student_stats = stats[student['student_id']]
+            rows.append({
+                'student_id': student['student_id'],
+                'name': student['nickname'],
+                'username': student['username'],
+                'grades': [
+                    {
+                        'assignment_id': assignment_ids[j],
+                        'score': None if scores[j] != scores[j] else scores[j],
+                        'grade': grades[j] if exists[j] else None,
+                        'comment': comments[j] if exists[j] else None
+                    }
+                    for j in range(n_assignments)
+                ],
+                'total_score': student_stats['total_score'],
+                'average_score': student_stats['average_score'],
+                'average_grade': student_stats['average_grade']
+            })
+        return rows
@@ -0,0 +1,82 @@
+"""
+编译后的成绩等级标准
+- 等级按下限从低到高排成一个有序数组，每个等级覆盖 [本等级下限, 上一等级下限)，区间之间没有空隙
+  （原来按闭区间逐个比较时 89.5 不属于任何等级）
+- 单个分数用 bisect 查找（grade），数组用 NumPy searchsorted 一次得到全部等级（grade_array）
+- 低于最低下限的百分比为最低等级，超过 100 的百分比为最高等级
+- 来源: config.GRADE_SCALE、system_setting 中的 grade_scale 或课程的 grade_scale 字段，
+  文本格式与 system_setting 相同，例如 "A:90-100,B:80-89,C:70-79,D:60-69,F:0-59"
+"""
+from bisect import bisect_right
+import numpy as np
+from config import GRADE_SCALE
+from modules.exceptions import ValidationError
+
+class GradeScale:
+    def __init__(self, bounds):
+        """
+        bounds: iterable of (等级, 下限百分比)，顺序不限
+        """
+        ordered = sorted(bounds, key=lambda item: item[1])
+        if not ordered:
+            raise ValidationError("成绩等级标准不能为空")
+        self.grades = [grade for grade, _ in ordered]
+        self.thresholds = [float(low) for _, low in ordered]
+        if len(set(self.grades)) != len(self.grades) or len(set(self.thresholds)) != len(self.thresholds):
+            raise ValidationError("成绩等级标准中的等级和下限不能重复")
+        self._threshold_array = np.array(self.thresholds)
+        # 末尾的 None 对应 NaN
+        self._letters = np.array(self.grades + [None], dtype=object)
+
+    @classmethod
+    def from_config(cls, scale=None):
+        """从 {等级: (下限, 上限)} 字典编译，默认为 config.GRADE_SCALE"""
+        return cls((grade, low) for grade, (low, _) in (scale or GRADE_SCALE).items())
+
+    @classmethod
+    def parse(cls, text):
+        """从 "A:90-100,B:80-89,..." 文本编译，上限只用于校验格式"""
+        bounds = []
+        try:
+            for item in text.split(','):
+                grade, interval = item.split(':')
+                low, high = interval.split('-')
+                if float(low) > float(high):
+                    raise ValueError(item)
+                bounds.append((grade.strip(), float(low)))
+        except (AttributeError, ValueError) as e:
+            raise ValidationError(f"成绩等级标准格式错误: {text}") from e
+        return cls(bounds)
+
+    def grade(self, score, total_score=100):
+        """单个分数的等级，score 为空时返回 None"""
+        if score is None:
+            return None
+        percentage = (score / total_score) * 100 if total_score > 0 else 0
+        return self.grades[max(bisect_right(self.thresholds, percentage) - 1, 0)]
+
+    def grade_array(self, scores, total_score=100):
+        """
+        数组的等级
+        scores: 浮点数组，NaN 的位置返回 None
+        返回: 与 scores 形状相同的 object 数组
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        if total_score > 0:
+            percentage = (scores / total_score) * 100
+        else:
+            percentage = np.where(np.isnan(scores), np.nan, 0.0)
+        flat = percentage.ravel()
+        index = np.searchsorted(self._threshold_array, flat, side='right') - 1
+        np.maximum(index, 0, out=index)
+        index[np.isnan(flat)] = len(self.grades)
+        return self._letters[index].reshape(percentage.shape)
+
+    def __eq__(self, other):
+        return isinstance(other, GradeScale) and (self.grades, self.thresholds) == (other.grades, other.thresholds)
+
+    def __repr__(self):
+        return f"GradeScale({list(zip(self.grades, self.thresholds))!r})"
+
+# 按 config.GRADE_SCALE 编译的默认等级标准
+default_grade_scale = GradeScale.from_config()
@@ -1,31 +1,287 @@
 """
 成绩管理服务
 """
+import math
 import logging
 import json
+from datetime import datetime
+from itertools import groupby
 from typing import List, Dict, Any, Optional
 from modules.models import User, Assignment
+from modules.grade_matrix import GradeMatrix, final_scores
+from modules.grade_scale import GradeScale
 from modules.exceptions import ValidationError, ResourceNotFoundError
-from config import GRADE_SCALE
+from modules.query_registry import query_registry
+from utils.export_utils import ExportUtils
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('gradebook', {
+    'get_course_grades_students': """
+        SELECT DISTINCT g.student_id, u.nickname, u.username
+        FROM gradebook g
+        JOIN user u ON g.student_id = u.id
+        WHERE g.course_id = ?
+        ORDER BY u.nickname, g.student_id
+    """,
+    'get_course_grades_assignments': """
+        SELECT a.id, a.title, a.total_score, a.type
+        FROM assignment a
+        WHERE a.course_id = ? AND a.status = 'graded'
+        ORDER BY a.created_at
+    """,
+    'get_course_grades_grades': """
+        SELECT g.student_id, g.assignment_id, g.score, g.weight, g.grade, g.comment
+        FROM gradebook g
+        WHERE g.course_id = ?
+    """,
+    'get_assignment_grades': """
+        SELECT g.*, 
+               u.nickname as student_name, u.username,
+               s.submit_time, s.late_submission
+        FROM gradebook g
+        JOIN user u ON g.student_id = u.id
+        LEFT JOIN submission s ON g.assignment_id = s.assignment_id AND g.student_id = s.student_id
+        WHERE g.assignment_id = ?
+        ORDER BY u.nickname
+    """,
+    'import_grades_from_submissions_assignment': "SELECT id, course_id, total_score FROM assignment WHERE id = ?",
+    'import_grades_from_submissions_submissions': """
+        SELECT s.student_id, s.total_score
+        FROM submission s
+        WHERE s.id IN (
+            SELECT MAX(id) FROM submission
+            WHERE assignment_id = ? AND grading_status = 'graded'
+            GROUP BY student_id
+        )
+    """,
+    'calculate_final_grade_grades': """
+        SELECT g.score, g.weight, a.title, a.type
+        FROM gradebook g
+        JOIN assignment a ON g.assignment_id = a.id
+        WHERE g.student_id = ? AND g.course_id = ? AND g.score IS NOT NULL
+        ORDER BY g.assignment_id, g.id
+    """,
+    'calculate_course_final_grades_grades': """
+        SELECT g.student_id, g.score, g.weight, a.title, a.type
+        FROM gradebook g
+        JOIN assignment a ON g.assignment_id = a.id
+        WHERE g.course_id = ? AND g.score IS NOT NULL
+        ORDER BY g.student_id, g.assignment_id, g.id
+    """,
+    'get_grade_statistics_overall': """
+        SELECT
+            (SELECT COUNT(*) FROM student_grade_stats
+             WHERE course_id = :course_id AND score_count > 0) as total_students,
+            c.score_count, c.score_sum, c.score_sumsq, c.min_score, c.max_score
+        FROM (SELECT :course_id as course_id) x
+        LEFT JOIN course_grade_stats c ON c.course_id = x.course_id
+    """,
+    'get_grade_statistics_assignment': """
+        SELECT
+            a.id, a.title, a.type,
+            s.score_count, s.score_sum, s.score_sumsq, s.min_score, s.max_score
+        FROM assignment a
+        LEFT JOIN assignment_grade_stats s ON s.assignment_id = a.id
+        WHERE a.course_id = ?
+        ORDER BY a.created_at, a.id
+    """,
+    'get_grade_statistics_grade_counts': """
+        SELECT grade, count FROM course_grade_counts
+        WHERE course_id = ? AND count > 0
+    """,
+    'get_grade_statistics_ranking': """
+        SELECT
+            st.student_id, u.nickname, u.username,
+            st.score_sum / st.score_count as average_score,
+            st.score_count as assignment_count
+        FROM student_grade_stats st
+        JOIN user u ON st.student_id = u.id
+        WHERE st.course_id = ? AND st.score_count > 0
+        ORDER BY average_score DESC
+    """,
+    'rebuild_stats_clear_course': "DELETE FROM course_grade_stats WHERE :course_id IS NULL OR course_id = :course_id",
+    'rebuild_stats_clear_assignment': "DELETE FROM assignment_grade_stats WHERE :course_id IS NULL OR course_id = :course_id",
+    'rebuild_stats_clear_student': "DELETE FROM student_grade_stats WHERE :course_id IS NULL OR course_id = :course_id",
+    'rebuild_stats_clear_grade_count': "DELETE FROM course_grade_counts WHERE :course_id IS NULL OR course_id = :course_id",
+    'rebuild_stats_course': """
+        INSERT INTO course_grade_stats
+        SELECT course_id, COUNT(score), COALESCE(SUM(score), 0), COALESCE(SUM(score * score), 0),
+               MIN(score), MAX(score)
+        FROM gradebook
+        WHERE score IS NOT NULL AND (:course_id IS NULL OR course_id = :course_id)
+        GROUP BY course_id
+    """,
+    'rebuild_stats_assignment': """
+        INSERT INTO assignment_grade_stats
+        SELECT assignment_id, MIN(course_id), COUNT(score), COALESCE(SUM(score), 0), COALESCE(SUM(score * score), 0),
+               MIN(score), MAX(score)
+        FROM gradebook
+        WHERE score IS NOT NULL AND assignment_id IS NOT NULL AND (:course_id IS NULL OR course_id = :course_id)
+        GROUP BY assignment_id
+    """,
+    'rebuild_stats_student': """
+        INSERT INTO student_grade_stats
+        SELECT course_id, student_id, COUNT(score), COALESCE(SUM(score), 0)
+        FROM gradebook
+        WHERE score IS NOT NULL AND (:course_id IS NULL OR course_id = :course_id)
+        GROUP BY course_id, student_id
+    """,
+    'rebuild_stats_grade_count': """
+        INSERT INTO course_grade_counts
+        SELECT course_id, grade, COUNT(*)
+        FROM gradebook
+        WHERE score IS NOT NULL AND grade IS NOT NULL AND (:course_id IS NULL OR course_id = :course_id)
+        GROUP BY course_id, grade
+    """,
+    'export_grades_course': "SELECT title FROM course WHERE id = ?",
+    'generate_report_card_student': "SELECT nickname, username FROM user WHERE id = ?",
+    'generate_report_card_course': "SELECT title, description FROM course WHERE id = ?",
+    'generate_report_card_progress': """
+        SELECT 
+            AVG(progress) as overall_progress,
+            SUM(time_spent) as total_time_spent
+        FROM learning_progress
+        WHERE student_id = ? AND course_id = ?
+    """,
+    'generate_report_card_comment': """
+        SELECT comment FROM gradebook 
+        WHERE student_id = ? AND course_id = ? AND assignment_id IS NULL
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+    """,
+    'generate_report_cards_progress': """
+        SELECT student_id,
+               AVG(progress) as overall_progress,
+               SUM(time_spent) as total_time_spent
+        FROM learning_progress
+        WHERE course_id = ?
+        GROUP BY student_id
+    """,
+    'generate_report_cards_comments': """
+        SELECT student_id, comment FROM gradebook
+        WHERE course_id = ? AND assignment_id IS NULL
+        ORDER BY student_id, updated_at DESC, id DESC
+    """,
+    'generate_report_cards_grades': """
+        SELECT g.*, 
+               a.title as assignment_title, a.total_score as assignment_total,
+               c.title as course_title,
+               u.nickname as student_name
+        FROM gradebook g
+        LEFT JOIN assignment a ON g.assignment_id = a.id
+        LEFT JOIN course c ON g.course_id = c.id
+        LEFT JOIN user u ON g.student_id = u.id
+        WHERE g.course_id = ?
+        ORDER BY g.student_id, g.updated_at DESC, g.id DESC
+    """,
+    'bulk_update_grades_course': "SELECT course_id FROM assignment WHERE id = ?",
+    'get_default_grade_scale': "SELECT value FROM system_setting WHERE key = 'grade_scale'",
+    'get_course_grade_scale': "SELECT grade_scale FROM course WHERE id = ?",
+    'set_course_grade_scale': "UPDATE course SET grade_scale = ? WHERE id = ?",
+    'insert_entry': """
+        INSERT INTO gradebook 
+        (student_id, course_id, assignment_id, score, grade, weight, comment)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    'upsert_entry': """
+        INSERT INTO gradebook
+        (student_id, course_id, assignment_id, score, grade, weight, comment)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(student_id, assignment_id) DO UPDATE SET
+            score = COALESCE(excluded.score, score),
+            grade = COALESCE(excluded.grade, grade),
+            weight = COALESCE(excluded.weight, weight),
+            comment = COALESCE(excluded.comment, comment),
+            updated_at = CURRENT_TIMESTAMP
+    """,
+    'find_entry': """
+        SELECT id FROM gradebook 
+        WHERE student_id = :student_id AND course_id = :course_id
+          AND assignment_id IS :assignment_id
+    """,
+    'update_entry': """
+        UPDATE gradebook SET
+            score = COALESCE(:score, score),
+            grade = COALESCE(:grade, grade),
+            weight = COALESCE(:weight, weight),
+            comment = COALESCE(:comment, comment),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = :id
+    """,
+    'get_student_grades': """
+        SELECT g.*, 
+               a.title as assignment_title, a.total_score as assignment_total,
+               c.title as course_title,
+               u.nickname as student_name
+        FROM gradebook g
+        LEFT JOIN assignment a ON g.assignment_id = a.id
+        LEFT JOIN course c ON g.course_id = c.id
+        LEFT JOIN user u ON g.student_id = u.id
+        WHERE g.student_id = :student_id
+          AND (:course_id IS NULL OR g.course_id = :course_id)
+        ORDER BY g.updated_at DESC, g.id DESC
+    """,
+    'export_grades_rows': """
+        SELECT g.student_id, u.nickname, u.username, g.assignment_id, g.score, g.grade, g.comment
+        FROM gradebook g
+        JOIN user u ON g.student_id = u.id
+        WHERE g.course_id = ?
+        ORDER BY u.nickname, g.student_id
+    """
+})
+
 class GradebookService:
     def __init__(self, db_manager):
         self.db = db_manager
+        self._grade_scales = {}  # course_id（None 为系统默认）-> GradeScale
+
+    def get_grade_scale(self, course_id: int = None) -> GradeScale:
+        """
+        获取课程的等级标准（编译一次后缓存）
+        课程未设置时使用 system_setting 中的 grade_scale，再没有时使用 config.GRADE_SCALE
+        """
+        scale = self._grade_scales.get(course_id)
+        if scale is None:
+            if course_id is None:
+                rows = self.db.execute_named('gradebook.get_default_grade_scale')
+                text = rows[0]['value'] if rows else None
+                scale = self._parse_grade_scale(text) or GradeScale.from_config()
+            else:
+                rows = self.db.execute_named('gradebook.get_course_grade_scale', (course_id,))
+                text = rows[0]['grade_scale'] if rows else None
+                scale = self._parse_grade_scale(text) or self.get_grade_scale()
+            self._grade_scales[course_id] = scale
+        return scale
 
-    def calculate_grade(self, score: float, total_score: float = 100) -> str:
-        """根据分数计算等级"""
-        if score is None:
+    @staticmethod
+    def _parse_grade_scale(text) -> Optional[GradeScale]:
+        """解析保存的等级标准，格式错误时记录日志并返回 None（使用上一级标准）"""
+        if not text:
+            return None
+        try:
+            return GradeScale.parse(text)
+        except ValidationError as e:
+            logger.warning(f"Invalid grade scale setting ignored: {e}")
             return None
-        
-        percentage = (score / total_score) * 100 if total_score > 0 else 0
-        
-        for grade, (min_score, max_score) in GRADE_SCALE.items():
-            if min_score <= percentage <= max_score:
-                return grade
-        
-        return 'F'
+
+    def set_course_grade_scale(self, course_id: int, scale_text: Optional[str]) -> None:
+        """
+        设置课程的等级标准，格式同 system_setting 中的 grade_scale；为空时恢复系统默认
+        已保存的成绩等级不会重新计算
+        """
+        if scale_text:
+            GradeScale.parse(scale_text)
+        self.db.execute_named('gradebook.set_course_grade_scale', (scale_text or None, course_id))
+        self._grade_scales.pop(course_id, None)
+
+    def clear_grade_scale_cache(self) -> None:
+        """清空等级标准缓存（系统默认标准在别处修改后调用）"""
+        self._grade_scales.clear()
+
+    def calculate_grade(self, score: float, total_score: float = 100, course_id: int = None) -> str:
+        """根据分数计算等级（使用课程的等级标准）"""
+        return self.get_grade_scale(course_id).grade(score, total_score)
 
     def update_gradebook(self, student_id: int, course_id: int, 
                         assignment_id: int = None, score: float = None,
@@ -37,61 +293,27 @@ class GradebookService:
         if weight <= 0 or weight > 10:
             raise ValidationError("权重必须在0-10之间")
         
-        # 检查是否已存在记录
-        check_query = """
-            SELECT id FROM gradebook 
-            WHERE student_id = ? AND course_id = ? AND assignment_id = ?
-        """
-        params = [student_id, course_id]
-        if assignment_id:
-            params.append(assignment_id)
-            check_query += " AND assignment_id = ?"
-        else:
-            check_query += " AND assignment_id IS NULL"
-        
-        existing = self.db.execute_query(check_query, tuple(params))
+        # 检查是否已存在记录（assignment_id 为空时用 IS 匹配 NULL）
+        existing = self.db.execute_named('gradebook.find_entry', {
+            'student_id': student_id, 'course_id': course_id, 'assignment_id': assignment_id
+        })
         
         if existing:
-            # 更新现有记录
-            updates = []
-            update_params = []
-            
-            if score is not None:
-                updates.append("score = ?")
-                update_params.append(score)
-                
-                # 计算等级
-                grade = self.calculate_grade(score)
-                updates.append("grade = ?")
-                update_params.append(grade)
-            
-            if weight is not None:
-                updates.append("weight = ?")
-                update_params.append(weight)
-            
-            if comment is not None:
-                updates.append("comment = ?")
-                update_params.append(comment)
-            
-            if not updates:
+            # 更新现有记录，未提供的字段保持原值
+            if score is None and weight is None and comment is None:
                 return True
             
-            updates.append("updated_at = CURRENT_TIMESTAMP")
-            query = f"UPDATE gradebook SET {', '.join(updates)} WHERE id = ?"
-            update_params.append(existing[0]['id'])
-            
-            result = self.db.execute_update(query, tuple(update_params))
+            grade = self.calculate_grade(score, course_id=course_id) if score is not None else None
+            result = self.db.execute_named('gradebook.update_entry', {
+                'score': score, 'grade': grade, 'weight': weight,
+                'comment': comment, 'id': existing[0]['id']
+            })
         else:
             # 创建新记录
-            grade = self.calculate_grade(score) if score is not None else None
+            grade = self.calculate_grade(score, course_id=course_id) if score is not None else None
             
-            query = """
-                INSERT INTO gradebook 
-                (student_id, course_id, assignment_id, score, grade, weight, comment)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            result = self.db.execute_update(
-                query, (student_id, course_id, assignment_id, score, grade, weight, comment)
+            result = self.db.execute_named(
+                'gradebook.insert_entry', (student_id, course_id, assignment_id, score, grade, weight, comment)
             )
         
         if result is not None:
@@ -101,173 +323,69 @@ class GradebookService:
 
     def get_student_grades(self, student_id: int, course_id: int = None) -> List[Dict[str, Any]]:
         """获取学生成绩"""
-        conditions = ["g.student_id = ?"]
-        params = [student_id]
-        
-        if course_id:
-            conditions.append("g.course_id = ?")
-            params.append(course_id)
-        
-        where_clause = " AND ".join(conditions)
-        query = f"""
-            SELECT g.*, 
-                   a.title as assignment_title, a.total_score as assignment_total,
-                   c.title as course_title,
-                   u.nickname as student_name
-            FROM gradebook g
-            LEFT JOIN assignment a ON g.assignment_id = a.id
-            LEFT JOIN course c ON g.course_id = c.id
-            LEFT JOIN user u ON g.student_id = u.id
-            WHERE {where_clause}
-            ORDER BY g.updated_at DESC
-        """
-        
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('gradebook.get_student_grades', {
+            'student_id': student_id, 'course_id': course_id or None
+        })
         return [dict(row) for row in rows]
 
     def get_course_grades(self, course_id: int) -> Dict[str, Any]:
-        """获取课程所有学生成绩"""
-        # 获取学生列表
-        students_query = """
-            SELECT DISTINCT g.student_id, u.nickname, u.username
-            FROM gradebook g
-            JOIN user u ON g.student_id = u.id
-            WHERE g.course_id = ?
-            ORDER BY u.nickname
-        """
-        students = self.db.execute_query(students_query, (course_id,))
-        
-        # 获取作业列表
-        assignments_query = """
-            SELECT a.id, a.title, a.total_score, a.type
-            FROM assignment a
-            WHERE a.course_id = ? AND a.status = 'graded'
-            ORDER BY a.created_at
+        """获取课程所有学生成绩（成绩矩阵的字典视图）"""
+        return self.get_grade_matrix(course_id).to_dict()
+
+    def get_grade_matrix(self, course_id: int) -> GradeMatrix:
         """
-        assignments = self.db.execute_query(assignments_query, (course_id,))
-        
-        # 获取成绩数据
-        grades_query = """
-            SELECT g.student_id, g.assignment_id, g.score, g.grade, g.comment
-            FROM gradebook g
-            WHERE g.course_id = ?
+        获取课程的成绩矩阵（学生 x 已批改作业的 NumPy 数组）
+        总分、平均分、加权平均分、排名等统计直接在矩阵上向量化计算
         """
-        grades = self.db.execute_query(grades_query, (course_id,))
+        # 获取学生列表
+        students = self.db.execute_named('gradebook.get_course_grades_students', (course_id,))
         
-        # 构建成绩矩阵
-        grade_matrix = {}
-        for grade in grades:
-            student_id = grade['student_id']
-            assignment_id = grade['assignment_id']
-            if student_id not in grade_matrix:
-                grade_matrix[student_id] = {}
-            grade_matrix[student_id][assignment_id] = {
-                'score': grade['score'],
-                'grade': grade['grade'],
-                'comment': grade['comment']
-            }
+        # 获取作业列表
+        assignments = self.db.execute_named('gradebook.get_course_grades_assignments', (course_id,))
         
-        # 计算每个学生的总分和平均分
-        student_stats = {}
-        for student in students:
-            student_id = student['student_id']
-            student_grades = grade_matrix.get(student_id, {})
-            
-            total_score = 0
-            total_weight = 0
-            grade_count = 0
-            
-            for assignment in assignments:
-                assignment_id = assignment['id']
-                if assignment_id in student_grades:
-                    grade_data = student_grades[assignment_id]
-                    if grade_data['score'] is not None:
-                        total_score += grade_data['score']
-                        total_weight += 1
-                        grade_count += 1
-            
-            average_score = total_score / total_weight if total_weight > 0 else None
-            average_grade = self.calculate_grade(average_score) if average_score is not None else None
-            
-            student_stats[student_id] = {
-                'total_score': total_score,
-                'average_score': average_score,
-                'average_grade': average_grade,
-                'grade_count': grade_count
-            }
+        # 获取成绩数据（流式读取，直接填入矩阵）
+        grades = self.db.iter_named('gradebook.get_course_grades_grades', (course_id,))
         
-        return {
-            'students': [dict(s) for s in students],
-            'assignments': [dict(a) for a in assignments],
-            'grade_matrix': grade_matrix,
-            'student_stats': student_stats
-        }
+        return GradeMatrix.from_rows(students, assignments, grades, self.get_grade_scale(course_id))
 
     def get_assignment_grades(self, assignment_id: int) -> List[Dict[str, Any]]:
         """获取作业成绩"""
-        query = """
-            SELECT g.*, 
-                   u.nickname as student_name, u.username,
-                   s.submit_time, s.late_submission
-            FROM gradebook g
-            JOIN user u ON g.student_id = u.id
-            LEFT JOIN submission s ON g.assignment_id = s.assignment_id AND g.student_id = s.student_id
-            WHERE g.assignment_id = ?
-            ORDER BY u.nickname
-        """
-        rows = self.db.execute_query(query, (assignment_id,))
+        rows = self.db.execute_named('gradebook.get_assignment_grades', (assignment_id,))
         return [dict(row) for row in rows]
 
     def import_grades_from_submissions(self, assignment_id: int) -> int:
-        """从提交记录导入成绩"""
+        """
+        从提交记录导入成绩（每个学生取最后一次已评分的提交）
+        一次查询读出全部成绩，在一个事务中用 executemany 批量插入或更新
+        """
         # 获取作业信息
-        assignment_query = "SELECT id, total_score FROM assignment WHERE id = ?"
-        assignment_rows = self.db.execute_query(assignment_query, (assignment_id,))
+        assignment_rows = self.db.execute_named('gradebook.import_grades_from_submissions_assignment', (assignment_id,))
         if not assignment_rows:
             raise ResourceNotFoundError("作业不存在")
         
-        assignment_info = assignment_rows[0]
-        total_score = assignment_info['total_score']
+        course_id = assignment_rows[0]['course_id']
+        if course_id is None:
+            raise ValidationError("作业未关联课程，无法导入成绩")
         
-        # 获取所有提交记录
-        submissions_query = """
-            SELECT s.student_id, s.total_score, s.grading_status
-            FROM submission s
-            WHERE s.assignment_id = ? AND s.grading_status = 'graded'
-        """
-        submissions = self.db.execute_query(submissions_query, (assignment_id,))
+        # 获取每个学生最后一次已评分的提交
+        submissions = self.db.execute_named('gradebook.import_grades_from_submissions_submissions', (assignment_id,))
         
-        imported_count = 0
-        for submission in submissions:
-            student_id = submission['student_id']
-            score = submission['total_score']
-            
-            # 更新成绩簿
-            success = self.update_gradebook(
-                student_id=student_id,
-                course_id=None,  # 需要通过作业获取课程ID
-                assignment_id=assignment_id,
-                score=score,
-                weight=1.0,
-                comment="从提交记录导入"
-            )
-            
-            if success:
-                imported_count += 1
+        scale = self.get_grade_scale(course_id)
+        params_list = [
+            (s['student_id'], course_id, assignment_id, s['total_score'],
+             scale.grade(s['total_score']), 1.0, "从提交记录导入")
+            for s in submissions
+        ]
+        with self.db.transaction():
+            self.db.execute_named_many('gradebook.upsert_entry', params_list)
         
-        logger.info(f"Grades imported from submissions: {imported_count} records")
-        return imported_count
+        logger.info(f"Grades imported from submissions: {len(params_list)} records")
+        return len(params_list)
 
     def calculate_final_grade(self, student_id: int, course_id: int) -> Dict[str, Any]:
         """计算最终成绩"""
         # 获取所有作业成绩
-        grades_query = """
-            SELECT g.score, g.weight, a.title, a.type
-            FROM gradebook g
-            JOIN assignment a ON g.assignment_id = a.id
-            WHERE g.student_id = ? AND g.course_id = ? AND g.score IS NOT NULL
-        """
-        grades = self.db.execute_query(grades_query, (student_id, course_id))
+        grades = self.db.execute_named('gradebook.calculate_final_grade_grades', (student_id, course_id))
         
         if not grades:
             return {
@@ -297,7 +415,7 @@ class GradebookService:
             })
         
         final_score = total_weighted_score / total_weight if total_weight > 0 else 0
-        final_grade = self.calculate_grade(final_score)
+        final_grade = self.calculate_grade(final_score, course_id=course_id)
         
         return {
             'final_score': round(final_score, 2),
@@ -306,137 +424,210 @@ class GradebookService:
             'grade_breakdown': grade_breakdown
         }
 
-    def get_grade_statistics(self, course_id: int) -> Dict[str, Any]:
-        """获取成绩统计信息"""
-        # 总体统计
-        overall_query = """
-            SELECT 
-                COUNT(DISTINCT g.student_id) as total_students,
-                AVG(g.score) as average_score,
-                MIN(g.score) as min_score,
-                MAX(g.score) as max_score,
-                COUNT(CASE WHEN g.grade = 'A' THEN 1 END) as grade_a,
-                COUNT(CASE WHEN g.grade = 'B' THEN 1 END) as grade_b,
-                COUNT(CASE WHEN g.grade = 'C' THEN 1 END) as grade_c,
-                COUNT(CASE WHEN g.grade = 'D' THEN 1 END) as grade_d,
-                COUNT(CASE WHEN g.grade = 'F' THEN 1 END) as grade_f
-            FROM gradebook g
-            WHERE g.course_id = ? AND g.score IS NOT NULL
+    def calculate_course_final_grades(self, course_id: int) -> Dict[int, Dict[str, Any]]:
         """
-        overall_stats = self.db.execute_query(overall_query, (course_id,))
-        
-        # 作业统计
-        assignment_query = """
-            SELECT 
-                a.id, a.title, a.type,
-                AVG(g.score) as average_score,
-                MIN(g.score) as min_score,
-                MAX(g.score) as max_score,
-                COUNT(g.score) as submission_count
-            FROM assignment a
-            LEFT JOIN gradebook g ON a.id = g.assignment_id
-            WHERE a.course_id = ?
-            GROUP BY a.id, a.title, a.type
-            ORDER BY a.created_at
+        计算课程所有学生的最终成绩，结果与逐个调用 calculate_final_grade 相同
+        一次查询读出全部成绩和权重，加权平均和等级按学生向量化计算
+        返回: {student_id: calculate_final_grade 的结果}，没有成绩的学生不在其中
         """
-        assignment_stats = self.db.execute_query(assignment_query, (course_id,))
-        
-        # 学生排名
-        ranking_query = """
-            SELECT 
-                g.student_id, u.nickname, u.username,
-                AVG(g.score) as average_score,
-                COUNT(g.score) as assignment_count
-            FROM gradebook g
-            JOIN user u ON g.student_id = u.id
-            WHERE g.course_id = ? AND g.score IS NOT NULL
-            GROUP BY g.student_id, u.nickname, u.username
-            ORDER BY average_score DESC
+        rows = self.db.execute_named('gradebook.calculate_course_final_grades_grades', (course_id,))
+        if not rows:
+            return {}
+        
+        student_column, scores, weights, titles, types = zip(*rows)
+        student_ids, finals, total_weights = final_scores(student_column, scores, weights)
+        grades = self.get_grade_scale(course_id).grade_array(finals)
+        
+        # 行按学生ID排序，与 final_scores 返回的学生顺序相同
+        results = {}
+        start = 0
+        for i, (student_id, group) in enumerate(groupby(student_column)):
+            end = start + len(list(group))
+            results[student_id] = {
+                'final_score': round(float(finals[i]), 2),
+                'final_grade': grades[i],
+                'total_weight': float(total_weights[i]),
+                'grade_breakdown': [
+                    {
+                        'assignment': titles[k],
+                        'type': types[k],
+                        'score': scores[k],
+                        'weight': weights[k],
+                        'weighted_score': scores[k] * weights[k]
+                    }
+                    for k in range(start, end)
+                ]
+            }
+            start = end
+        return results
+
+    def get_grade_statistics(self, course_id: int) -> Dict[str, Any]:
         """
-        ranking_stats = self.db.execute_query(ranking_query, (course_id,))
-        
-        # 成绩分布
-        distribution_query = """
-            SELECT 
-                g.grade,
-                COUNT(*) as count
-            FROM gradebook g
-            WHERE g.course_id = ? AND g.grade IS NOT NULL
-            GROUP BY g.grade
-            ORDER BY g.grade
+        获取成绩统计信息
+        读取由成绩表触发器增量维护的汇总表，不扫描成绩表；汇总不一致时用 rebuild_grade_statistics() 修复
         """
-        distribution_stats = self.db.execute_query(distribution_query, (course_id,))
+        # 总体统计（课程汇总行）
+        overall = self.db.execute_named('gradebook.get_grade_statistics_overall', {'course_id': course_id})[0]
+        
+        # 作业统计（每份作业一行汇总）
+        assignment_stats = self.db.execute_named('gradebook.get_grade_statistics_assignment', (course_id,))
         
+        # 学生排名（每个学生一行汇总）
+        ranking_stats = self.db.execute_named('gradebook.get_grade_statistics_ranking', (course_id,))
+        
+        # 等级计数（每个等级一行），按课程等级标准从高到低排列，标准中没有的等级（如改标准前的旧等级）排在最后
+        rows = self.db.execute_named('gradebook.get_grade_statistics_grade_counts', (course_id,))
+        order = {grade: i for i, grade in enumerate(reversed(self.get_grade_scale(course_id).grades))}
+        grade_counts = {
+            row['grade']: row['count']
+            for row in sorted(rows, key=lambda row: (order.get(row['grade'], len(order)), row['grade']))
+        }
         return {
-            'overall': dict(overall_stats[0]) if overall_stats else {},
-            'assignments': [dict(a) for a in assignment_stats],
+            'overall': {
+                'total_students': overall['total_students'],
+                **self._summary_stats(overall),
+                **{f'grade_{grade.lower()}': grade_counts.get(grade, 0) for grade in 'ABCDF'}
+            },
+            'assignments': [
+                {'id': a['id'], 'title': a['title'], 'type': a['type'], **self._summary_stats(a),
+                 'submission_count': a['score_count'] or 0}
+                for a in assignment_stats
+            ],
             'ranking': [dict(r) for r in ranking_stats],
-            'distribution': [dict(d) for d in distribution_stats]
+            # 成绩分布（来自课程的等级计数，包含自定义标准的等级）
+            'distribution': [{'grade': grade, 'count': count} for grade, count in grade_counts.items()]
+        }
+
+    @staticmethod
+    def _summary_stats(row) -> Dict[str, Any]:
+        """由汇总行的 count / sum / sum of squares 计算平均分、最值和标准差"""
+        count = row['score_count'] or 0
+        if count == 0:
+            return {'average_score': None, 'min_score': None, 'max_score': None, 'std_dev': None}
+        mean = row['score_sum'] / count
+        variance = max(row['score_sumsq'] / count - mean * mean, 0.0)
+        return {
+            'average_score': mean,
+            'min_score': row['min_score'],
+            'max_score': row['max_score'],
+            'std_dev': math.sqrt(variance)
         }
 
+    def rebuild_grade_statistics(self, course_id: Optional[int] = None) -> None:
+        """
+        从成绩表重新计算成绩统计汇总（修复用）
+        course_id 为空时重建所有课程
+        """
+        params = {'course_id': course_id}
+        with self.db.transaction():
+            for scope in ('course', 'assignment', 'student', 'grade_count'):
+                self.db.execute_named(f'gradebook.rebuild_stats_clear_{scope}', params)
+                self.db.execute_named(f'gradebook.rebuild_stats_{scope}', params)
+        logger.info(f"Grade statistics rebuilt for {'all courses' if course_id is None else f'course {course_id}'}")
+
     def export_grades(self, course_id: int, format: str = 'excel') -> Dict[str, Any]:
         """导出成绩"""
         # 获取课程信息
-        course_query = "SELECT title FROM course WHERE id = ?"
-        course_rows = self.db.execute_query(course_query, (course_id,))
+        course_rows = self.db.execute_named('gradebook.export_grades_course', (course_id,))
         if not course_rows:
             raise ResourceNotFoundError("课程不存在")
         
         course_title = course_rows[0]['title']
-        
-        # 获取成绩数据
-        grades_data = self.get_course_grades(course_id)
+        matrix = self.get_grade_matrix(course_id)
         
         # 构建导出数据
         export_data = {
             'course_title': course_title,
             'export_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'students': [],
-            'assignments': grades_data['assignments'],
+            'students': matrix.export_rows(),
+            'assignments': [dict(a) for a in matrix.assignments],
             'grades': []
         }
         
-        for student in grades_data['students']:
-            student_id = student['student_id']
-            student_grades = []
+        return export_data
+
+    def export_grades_csv(self, course_id: int, filename: str):
+        """
+        导出成绩到 CSV
+        逐个学生写入文件，内存占用与学生数无关
+        返回: (success, message)
+        """
+        course_rows = self.db.execute_named('gradebook.export_grades_course', (course_id,))
+        if not course_rows:
+            raise ResourceNotFoundError("课程不存在")
+        
+        assignments = self._get_graded_assignments(course_id)
+        headers = ['学生ID', '用户名', '姓名'] + [a['title'] for a in assignments] + ['总分', '平均分', '等级']
+        
+        def rows():
+            for student in self.iter_export_rows(course_id, assignments):
+                yield (
+                    [student['student_id'], student['username'], student['name']]
+                    + [g['score'] for g in student['grades']]
+                    + [student['total_score'], student['average_score'], student['average_grade']]
+                )
+        
+        return ExportUtils.export_rows_to_csv(rows(), filename, headers)
+
+    def iter_export_rows(self, course_id: int, assignments: List[Dict[str, Any]]):
+        """
+        按学生逐个产出导出数据，成绩表流式读取
+        assignments: 参与统计的作业列表（已批改的作业）
+        """
+        assignment_ids = [a['id'] for a in assignments]
+        scale = self.get_grade_scale(course_id)
+        rows = self.db.iter_named('gradebook.export_grades_rows', (course_id,))
+        
+        for student_id, student_rows in groupby(rows, key=lambda r: r['student_id']):
+            grade_map = {}
+            student = None
+            for row in student_rows:
+                student = row
+                grade_map[row['assignment_id']] = row
             
-            for assignment in grades_data['assignments']:
-                assignment_id = assignment['id']
-                grade_info = grades_data['grade_matrix'].get(student_id, {}).get(assignment_id, {})
+            student_grades = []
+            total_score = 0
+            grade_count = 0
+            for assignment_id in assignment_ids:
+                grade_info = grade_map.get(assignment_id)
+                score = grade_info['score'] if grade_info else None
                 student_grades.append({
                     'assignment_id': assignment_id,
-                    'score': grade_info.get('score'),
-                    'grade': grade_info.get('grade'),
-                    'comment': grade_info.get('comment')
+                    'score': score,
+                    'grade': grade_info['grade'] if grade_info else None,
+                    'comment': grade_info['comment'] if grade_info else None
                 })
+                if score is not None:
+                    total_score += score
+                    grade_count += 1
             
-            student_stats = grades_data['student_stats'].get(student_id, {})
-            
-            export_data['students'].append({
+            average_score = total_score / grade_count if grade_count > 0 else None
+            yield {
                 'student_id': student_id,
                 'name': student['nickname'],
                 'username': student['username'],
                 'grades': student_grades,
-                'total_score': student_stats.get('total_score'),
-                'average_score': student_stats.get('average_score'),
-                'average_grade': student_stats.get('average_grade')
-            })
-        
-        return export_data
+                'total_score': total_score,
+                'average_score': average_score,
+                'average_grade': scale.grade(average_score)
+            }
+
+    def _get_graded_assignments(self, course_id: int) -> List[Dict[str, Any]]:
+        """获取课程中已批改的作业"""
+        rows = self.db.execute_named('gradebook.get_course_grades_assignments', (course_id,))
+        return [dict(row) for row in rows]
 
     def generate_report_card(self, student_id: int, course_id: int) -> Dict[str, Any]:
         """生成成绩报告单"""
         # 获取学生信息
-        student_query = "SELECT nickname, username FROM user WHERE id = ?"
-        student_rows = self.db.execute_query(student_query, (student_id,))
+        student_rows = self.db.execute_named('gradebook.generate_report_card_student', (student_id,))
         if not student_rows:
             raise ResourceNotFoundError("学生不存在")
         
         student_info = student_rows[0]
         
         # 获取课程信息
-        course_query = "SELECT title, description FROM course WHERE id = ?"
-        course_rows = self.db.execute_query(course_query, (course_id,))
+        course_rows = self.db.execute_named('gradebook.generate_report_card_course', (course_id,))
         if not course_rows:
             raise ResourceNotFoundError("课程不存在")
         
@@ -449,26 +640,74 @@ class GradebookService:
         detailed_grades = self.get_student_grades(student_id, course_id)
         
         # 获取学习进度
-        progress_query = """
-            SELECT 
-                AVG(progress) as overall_progress,
-                SUM(time_spent) as total_time_spent
-            FROM learning_progress
-            WHERE student_id = ? AND course_id = ?
-        """
-        progress_rows = self.db.execute_query(progress_query, (student_id, course_id))
+        progress_rows = self.db.execute_named('gradebook.generate_report_card_progress', (student_id, course_id))
         progress_info = progress_rows[0] if progress_rows else {}
         
         # 获取教师评语
-        comment_query = """
-            SELECT comment FROM gradebook 
-            WHERE student_id = ? AND course_id = ? AND assignment_id IS NULL
-            ORDER BY updated_at DESC
-            LIMIT 1
-        """
-        comment_rows = self.db.execute_query(comment_query, (student_id, course_id))
+        comment_rows = self.db.execute_named('gradebook.generate_report_card_comment', (student_id, course_id))
         teacher_comment = comment_rows[0]['comment'] if comment_rows else None
         
+        return self._build_report_card(student_info, course_info, final_grade, detailed_grades, progress_info,
+                                       teacher_comment, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def generate_report_cards(self, course_id: int, student_ids: List[int] = None) -> List[Dict[str, Any]]:
+        """
+        批量生成课程的成绩报告单，每份与 generate_report_card 的结果相同
+        最终成绩、详细成绩、学习进度和教师评语各用一次课程范围的查询，不再每个学生查询五次
+        student_ids: 为空时为课程成绩簿中的全部学生（按姓名排序）
+        """
+        course_rows = self.db.execute_named('gradebook.generate_report_card_course', (course_id,))
+        if not course_rows:
+            raise ResourceNotFoundError("课程不存在")
+        
+        course_info = course_rows[0]
+        
+        students = {row['student_id']: row for row in
+                    self.db.execute_named('gradebook.get_course_grades_students', (course_id,))}
+        if student_ids is None:
+            student_ids = list(students)
+        for student_id in student_ids:
+            if student_id not in students:
+                # 不在课程成绩簿中的学生单独查询
+                student_rows = self.db.execute_named('gradebook.generate_report_card_student', (student_id,))
+                if not student_rows:
+                    raise ResourceNotFoundError("学生不存在")
+                students[student_id] = student_rows[0]
+        
+        final_grades = self.calculate_course_final_grades(course_id)
+        detailed_grades = {
+            student_id: [dict(row) for row in rows]
+            for student_id, rows in groupby(
+                self.db.execute_named('gradebook.generate_report_cards_grades', (course_id,)),
+                key=lambda row: row['student_id'])
+        }
+        progress = {row['student_id']: row for row in
+                    self.db.execute_named('gradebook.generate_report_cards_progress', (course_id,))}
+        # 每个学生的第一条即最新的评语
+        comments = {}
+        for row in self.db.execute_named('gradebook.generate_report_cards_comments', (course_id,)):
+            comments.setdefault(row['student_id'], row['comment'])
+        
+        # 单个学生查询进度时没有记录也会返回一行空值
+        no_progress = {'overall_progress': None, 'total_time_spent': None}
+        no_grades = {'final_score': None, 'final_grade': None, 'grade_breakdown': []}
+        generated_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [
+            self._build_report_card(
+                students[student_id], course_info,
+                final_grades.get(student_id, no_grades),
+                detailed_grades.get(student_id, []),
+                progress.get(student_id, no_progress),
+                comments.get(student_id),
+                generated_date
+            )
+            for student_id in student_ids
+        ]
+
+    @staticmethod
+    def _build_report_card(student_info, course_info, final_grade, detailed_grades, progress_info,
+                           teacher_comment, generated_date) -> Dict[str, Any]:
+        """组装成绩报告单"""
         return {
             'student': {
                 'name': student_info['nickname'],
@@ -485,40 +724,39 @@ class GradebookService:
                 'total_time_spent': progress_info.get('total_time_spent', 0)
             },
             'teacher_comment': teacher_comment,
-            'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'generated_date': generated_date
         }
 
     def bulk_update_grades(self, assignment_id: int, grade_data: List[Dict[str, Any]]) -> int:
-        """批量更新成绩"""
-        updated_count = 0
+        """
+        批量更新成绩
+        先校验全部数据，再在一个事务中用 executemany 批量插入或更新；任一条不合法则不写入
+        """
+        # 获取课程ID（整批只查询一次）
+        course_rows = self.db.execute_named('gradebook.bulk_update_grades_course', (assignment_id,))
+        if not course_rows:
+            return 0
         
+        course_id = course_rows[0]['course_id']
+        if course_id is None:
+            raise ValidationError("作业未关联课程，无法更新成绩")
+        
+        scale = self.get_grade_scale(course_id)
+        params_list = []
         for data in grade_data:
             student_id = data.get('student_id')
             score = data.get('score')
-            comment = data.get('comment')
             
             if not student_id or score is None:
                 continue
+            if score < 0 or score > 1000:
+                raise ValidationError("分数必须在0-1000之间")
             
-            # 获取课程ID
-            course_query = "SELECT course_id FROM assignment WHERE id = ?"
-            course_rows = self.db.execute_query(course_query, (assignment_id,))
-            if not course_rows:
-                continue
-            
-            course_id = course_rows[0]['course_id']
-            
-            # 更新成绩
-            success = self.update_gradebook(
-                student_id=student_id,
-                course_id=course_id,
-                assignment_id=assignment_id,
-                score=score,
-                comment=comment
-            )
-            
-            if success:
-                updated_count += 1
+            params_list.append((student_id, course_id, assignment_id, score,
+                                scale.grade(score), 1.0, data.get('comment')))
+        
+        with self.db.transaction():
+            self.db.execute_named_many('gradebook.upsert_entry', params_list)
         
-        logger.info(f"Bulk grades updated: {updated_count} records")
-        return updated_count
\ No newline at end of file
+        logger.info(f"Bulk grades updated: {len(params_list)} records")
+        return len(params_list)
\ No newline at end of file
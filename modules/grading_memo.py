@@ -0,0 +1,93 @@
+"""
+主观题评分结果记忆表
+- 以 (题目ID, 标准答案版本, 评分方式, 答案哈希) 为键持久化 (score, feedback)
+- 答案只去掉首尾空白（评分器同样会去掉），命中时直接返回，不再分词和计算相似度；
+  去掉标点或空格会改变 jieba 的分词结果，不能视为同一答案，否则开关记忆表或批量重评会改变分数
+- 评分出错时的基础分结果不记录，下次重新评分
+- 标准答案修改后题目的 answer_version 递增，旧结果不再命中，并由 AssignmentService 删除
+"""
+import hashlib
+import logging
+import threading
+from config import GRADING_MEMO_CONFIG
+from modules.ai_grader import AIGrader
+from modules.query_registry import query_registry
+
+logger = logging.getLogger(__name__)
+
+query_registry.register('grading_memo', {
+    'get': """
+        SELECT score, feedback FROM grading_memo
+        WHERE question_id = ? AND answer_version = ? AND grader = ? AND answer_hash = ?
+    """,
+    'put': """
+        INSERT OR REPLACE INTO grading_memo (question_id, answer_version, grader, answer_hash, score, feedback)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'delete_question': "DELETE FROM grading_memo WHERE question_id = ?",
+    'count': "SELECT COUNT(*) as count FROM grading_memo"
+})
+
+class GradingMemo:
+    def __init__(self, config=None):
+        self.config = config or GRADING_MEMO_CONFIG
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def answer_hash(answer):
+        return hashlib.blake2b(answer.encode('utf-8'), digest_size=16).hexdigest()
+
+    def grade(self, db, question, student_answer):
+        """
+        评分主观题，结果经记忆表
+        未命中时对原始答案评分，结果与不经记忆表、批量重评时相同
+        返回: (score, feedback)
+        """
+        answer = (student_answer or "").strip()
+        if not self.config['enabled'] or not answer:
+            # 空答案不经记忆表
+            return AIGrader.grade_subjective(student_answer, question.answer, question.score, question.answer_tokens)
+
+        key = (question.id, question.answer_version, AIGrader.subjective_grader_name(), self.answer_hash(answer))
+        rows = db.execute_named('grading_memo.get', key)
+        if rows:
+            with self._lock:
+                self.hits += 1
+            return rows[0]['score'], rows[0]['feedback']
+
+        with self._lock:
+            self.misses += 1
+        score, feedback = AIGrader.grade_subjective(student_answer, question.answer, question.score, question.answer_tokens)
+        if not AIGrader.is_failed_feedback(feedback):
+            try:
+                db.execute_named('grading_memo.put', key + (score, feedback))
+            except Exception as e:
+                # 记录失败不影响评分结果
+                logger.warning(f"Failed to save grading memo for question {question.id}: {e}")
+        return score, feedback
+
+    def invalidate(self, db, question_id):
+        """删除题目的所有评分记录（标准答案修改或题目删除时）"""
+        db.execute_named('grading_memo.delete_question', (question_id,))
+
+    def stats(self, db=None):
+        """返回 {'hits', 'misses', 'hit_rate', 'entries'}，entries 仅在传入 db 时统计"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'entries': db.execute_named('grading_memo.count')[0]['count'] if db is not None else None
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+# 全局评分记忆
+grading_memo = GradingMemo()
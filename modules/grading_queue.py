@@ -0,0 +1,217 @@
+"""
+异步评分队列
+- 提交时只记录答案并写入 grading_job 表，立即返回，学生和 Tk 主线程不再等待评分
+- 工作线程领取任务、评分、更新总分并发送成绩通知
+- 失败的任务按指数退避重试，次数用尽后标记为 failed
+- 启动时把上次进程退出时仍在 running 的任务重新放回队列
+"""
+import time
+import logging
+import threading
+from config import GRADING_QUEUE_CONFIG
+from modules.query_registry import query_registry
+
+logger = logging.getLogger(__name__)
+
+query_registry.register('grading_queue', {
+    'enqueue': """
+        INSERT INTO grading_job (submission_id) VALUES (?)
+        ON CONFLICT(submission_id) DO UPDATE SET
+            status = 'queued', attempts = 0, last_error = NULL,
+            available_at = CURRENT_TIMESTAMP, started_at = NULL, finished_at = NULL
+    """,
+    'next_job': """
+        SELECT id, submission_id, attempts
+        FROM grading_job
+        WHERE status = 'queued' AND available_at <= CURRENT_TIMESTAMP
+        ORDER BY available_at, id
+        LIMIT 1
+    """,
+    'mark_running': """
+        UPDATE grading_job
+        SET status = 'running', attempts = attempts + 1, started_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'queued'
+    """,
+    'mark_done': """
+        UPDATE grading_job
+        SET status = 'done', last_error = NULL, finished_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """,
+    'mark_retry': """
+        UPDATE grading_job
+        SET status = 'queued', last_error = ?, available_at = datetime('now', ?)
+        WHERE id = ?
+    """,
+    'mark_failed': """
+        UPDATE grading_job
+        SET status = 'failed', last_error = ?, finished_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """,
+    'recover_running': """
+        UPDATE grading_job
+        SET status = 'queued', available_at = CURRENT_TIMESTAMP
+        WHERE status = 'running'
+    """,
+    'status_counts': "SELECT status, COUNT(*) AS count FROM grading_job GROUP BY status",
+    'oldest_queued_age': """
+        SELECT (julianday('now') - julianday(MIN(created_at))) * 86400 AS age
+        FROM grading_job
+        WHERE status = 'queued'
+    """,
+    'get_job': "SELECT * FROM grading_job WHERE submission_id = ?"
+})
+
+class GradingQueue:
+    def __init__(self, db_manager, submission_service, notification_service=None, config=None):
+        self.db = db_manager
+        self.submission_service = submission_service
+        self.notification_service = notification_service
+        config = config or GRADING_QUEUE_CONFIG
+        self.workers = config['workers']
+        self.max_attempts = config['max_attempts']
+        self.retry_backoff = config['retry_backoff']
+        self.poll_interval = config['poll_interval']
+
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {'processed': 0, 'retried': 0, 'failed': 0, 'grading_time': 0.0}
+
+    def submit(self, student_id, assignment_id, answers):
+        """
+        记录提交并加入评分队列，不等待评分
+        返回: submission_id
+        """
+        with self.db.transaction():
+            submission_id = self.submission_service.record_submission(student_id, assignment_id, answers)
+            self.enqueue(submission_id)
+        return submission_id
+
+    def enqueue(self, submission_id):
+        """把提交加入队列（已有任务时重置为 queued）"""
+        self.db.execute_named('grading_queue.enqueue', (submission_id,))
+        self._wakeup.set()
+
+    def get_job(self, submission_id):
+        """获取提交对应的评分任务"""
+        rows = self.db.execute_named('grading_queue.get_job', (submission_id,))
+        return rows[0] if rows else None
+
+    def recover(self):
+        """把崩溃或强制退出时遗留的 running 任务放回队列"""
+        self.db.execute_named('grading_queue.recover_running')
+
+    def start(self):
+        """恢复遗留任务并启动工作线程"""
+        if self._threads:
+            return
+        self.recover()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'grading-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Grading queue started with {self.workers} workers")
+
+    def stop(self, timeout=5):
+        """停止工作线程；正在评分的任务完成后退出，未完成的任务下次启动时恢复"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.claim()
+            except Exception as e:
+                logger.error(f"Failed to claim grading job: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self.process(job)
+
+    def claim(self):
+        """
+        领取一个可执行的任务并标记为 running
+        - 先在读连接上查找任务，队列空闲时轮询不占用写锁
+        - 找到任务后用带 status = 'queued' 条件的 UPDATE 领取，影响行数为 0 说明已被其他工作线程领走，
+          继续查找下一个任务；多个工作线程不会领到同一个任务
+        返回: {'id', 'submission_id', 'attempts'} 或 None
+        """
+        while True:
+            rows = self.db.execute_named('grading_queue.next_job')
+            if not rows:
+                return None
+            job = dict(rows[0])
+            # execute_named 对写语句返回 lastrowid，这里需要影响行数
+            if self.db.execute_named_many('grading_queue.mark_running', [(job['id'],)]) == 1:
+                job['attempts'] += 1
+                return job
+
+    def process(self, job):
+        """执行一个已领取的任务，返回是否评分成功"""
+        start = time.perf_counter()
+        try:
+            total_score = self.submission_service.grade_submission(job['submission_id'])
+        except Exception as e:
+            self._handle_failure(job, e)
+            return False
+
+        self.db.execute_named('grading_queue.mark_done', (job['id'],))
+        with self._lock:
+            self._stats['processed'] += 1
+            self._stats['grading_time'] += time.perf_counter() - start
+
+        if self.notification_service is not None:
+            # 通知失败不影响评分结果，也不重试
+            try:
+                self.notification_service.create_grade_notification(job['submission_id'])
+            except Exception as e:
+                logger.warning(f"Grade notification failed for submission {job['submission_id']}: {e}")
+
+        logger.info(f"Grading job {job['id']} done: submission {job['submission_id']}, score {total_score}")
+        return True
+
+    def _handle_failure(self, job, error):
+        message = str(error) or type(error).__name__
+        if job['attempts'] < self.max_attempts:
+            delay = self.retry_backoff * 2 ** (job['attempts'] - 1)
+            self.db.execute_named('grading_queue.mark_retry', (message, f"+{delay} seconds", job['id']))
+            with self._lock:
+                self._stats['retried'] += 1
+            logger.warning(f"Grading job {job['id']} failed (attempt {job['attempts']}), retry in {delay}s: {message}")
+        else:
+            self.db.execute_named('grading_queue.mark_failed', (message, job['id']))
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.error(f"Grading job {job['id']} failed after {job['attempts']} attempts: {message}")
+
+    def metrics(self):
+        """
+        队列指标
+        返回: {'queued', 'running', 'done', 'failed', 'depth', 'oldest_queued_age',
+               'processed', 'retried', 'failed_jobs', 'avg_grading_time'}
+        depth 为尚未完成的任务数（queued + running）；processed / retried / failed_jobs 为本进程的计数
+        """
+        counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+        for row in self.db.execute_named('grading_queue.status_counts'):
+            counts[row['status']] = row['count']
+        age_rows = self.db.execute_named('grading_queue.oldest_queued_age')
+        age = age_rows[0]['age'] if age_rows and age_rows[0]['age'] is not None else 0.0
+
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            **counts,
+            'depth': counts['queued'] + counts['running'],
+            'oldest_queued_age': age,
+            'processed': stats['processed'],
+            'retried': stats['retried'],
+            'failed_jobs': stats['failed'],
+            'avg_grading_time': stats['grading_time'] / stats['processed'] if stats['processed'] else 0.0
+        }
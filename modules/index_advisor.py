@@ -0,0 +1,93 @@
+"""
+索引顾问
+- 对已注册的服务查询（或性能分析器采集到的语句）执行 EXPLAIN QUERY PLAN
+- 标记全表扫描和临时 B 树排序，提示可能缺少的索引
+"""
+import re
+
+# 去掉字符串常量后再统计参数占位符
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NAMED_PARAM = re.compile(r"(?<!:):(\w+)")
+
+# 全表扫描："SCAN name"，不带 USING INDEX；name 可能是表别名
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# FROM / JOIN 子句中的表名和别名
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT|USING)\b)(\w+))?",
+    re.I
+)
+
+class IndexAdvisor:
+    def __init__(self, conn, ignore_tables=()):
+        """
+        conn: 已完成迁移的数据库连接
+        ignore_tables: 数据量很小、允许全表扫描的表
+        """
+        self.conn = conn
+        self.ignore_tables = set(ignore_tables)
+
+    @staticmethod
+    def placeholder_params(sql):
+        """按占位符生成全 None 的参数，执行计划与参数取值无关"""
+        stripped = _STRING_LITERAL.sub("''", sql)
+        names = _NAMED_PARAM.findall(stripped)
+        if names:
+            return {name: None for name in names}
+        return (None,) * stripped.count('?')
+
+    @staticmethod
+    def table_aliases(sql):
+        """返回 {别名或表名: 表名}"""
+        aliases = {}
+        for table, alias in _TABLE_REF.findall(sql):
+            aliases[table] = table
+            if alias:
+                aliases[alias] = table
+        return aliases
+
+    def explain(self, sql):
+        """返回执行计划的 detail 列表"""
+        rows = self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", self.placeholder_params(sql)).fetchall()
+        return [row[3] for row in rows]
+
+    def check(self, name, sql):
+        """
+        检查单条查询
+        返回: {'name', 'sql', 'plan', 'full_scans', 'temp_btree'}，full_scans 为表名列表
+        """
+        plan = self.explain(sql)
+        aliases = self.table_aliases(sql)
+        full_scans = []
+        for detail in plan:
+            m = _FULL_SCAN.match(detail)
+            if not m:
+                continue
+            table = aliases.get(m.group(1), m.group(1))
+            if table not in self.ignore_tables:
+                full_scans.append(table)
+        return {
+            'name': name,
+            'sql': sql,
+            'plan': plan,
+            'full_scans': full_scans,
+            'temp_btree': [d for d in plan if 'USE TEMP B-TREE' in d]
+        }
+
+    def advise(self, queries):
+        """
+        批量检查
+        queries: iterable of (name, sql)
+        返回: (存在全表扫描的查询结果列表, 无法执行 EXPLAIN 的 [(name, 错误信息)])
+        """
+        findings = []
+        errors = []
+        for name, sql in queries:
+            try:
+                result = self.check(name, sql)
+            except Exception as e:
+                errors.append((name, str(e)))
+                continue
+            if result['full_scans']:
+                findings.append(result)
+        return findings, errors
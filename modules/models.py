@@ -164,7 +164,8 @@ class Assignment:
 
 class Question:
     def __init__(self, id, assignment_id, type, content, options=None, answer=None,
-                 score=0, difficulty='medium', tags=None, analysis=None, hint=None, created_at=None):
+                 score=0, difficulty='medium', tags=None, analysis=None, hint=None, created_at=None,
+                 answer_tokens=None, answer_version=1):
         self.id = id
         self.assignment_id = assignment_id
         self.type = type
@@ -177,6 +178,8 @@ class Question:
         self.analysis = analysis
         self.hint = hint
         self.created_at = created_at
+        self.answer_tokens = json.loads(answer_tokens) if answer_tokens else None
+        self.answer_version = answer_version
 
     @staticmethod
     def from_row(row):
@@ -194,7 +197,9 @@ class Question:
             tags=row.get('tags'),
             analysis=row.get('analysis'),
             hint=row.get('hint'),
-            created_at=row.get('created_at')
+            created_at=row.get('created_at'),
+            answer_tokens=row.get('answer_tokens'),
+            answer_version=row.get('answer_version', 1)
         )
 
 class Submission:
@@ -6,9 +6,119 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from modules.models import Notification, User
 from modules.exceptions import ValidationError
+from modules.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('notification', {
+    'mark_as_read': """
+        UPDATE notification 
+        SET is_read = TRUE 
+        WHERE id = ? AND user_id = ?
+    """,
+    'mark_all_as_read': "UPDATE notification SET is_read = TRUE WHERE user_id = ?",
+    'delete_notification': "DELETE FROM notification WHERE id = ? AND user_id = ?",
+    'delete_old_notifications': """
+        DELETE FROM notification 
+        WHERE created_at < datetime('now', ?) AND is_read = TRUE
+    """,
+    'create_assignment_notification_assignment': """
+        SELECT a.title as assignment_title, a.deadline, c.id as class_id
+        FROM assignment a
+        LEFT JOIN class c ON a.class_id = c.id
+        WHERE a.id = ?
+    """,
+    'get_class_students': """
+        SELECT student_id FROM class_member 
+        WHERE class_id = ? AND status = 'active'
+    """,
+    'create_grade_notification_submission': """
+        SELECT s.student_id, s.total_score, a.title as assignment_title
+        FROM submission s
+        JOIN assignment a ON s.assignment_id = a.id
+        WHERE s.id = ?
+    """,
+    'create_discussion_notification_post': """
+        SELECT d.user_id as author_id, d.title, d.content,
+               u.nickname as reply_user_name
+        FROM discussion d
+        JOIN user u ON ? = u.id
+        WHERE d.id = ?
+    """,
+    'create_system_announcement_all_users': "SELECT id FROM user WHERE status = 'active'",
+    'create_reminder_notification_assignment': """
+        SELECT a.title, a.deadline, c.id as class_id
+        FROM assignment a
+        LEFT JOIN class c ON a.class_id = c.id
+        WHERE a.id = ?
+    """,
+    'get_notification_statistics_type': """
+        SELECT 
+            type,
+            COUNT(*) as total,
+            COUNT(CASE WHEN is_read = FALSE THEN 1 END) as unread
+        FROM notification
+        WHERE user_id = ?
+        GROUP BY type
+    """,
+    'get_notification_statistics_weekly': """
+        SELECT 
+            DATE(created_at) as date,
+            COUNT(*) as count
+        FROM notification
+        WHERE user_id = ? AND created_at >= datetime('now', '-7 days')
+        GROUP BY DATE(created_at)
+        ORDER BY date
+    """,
+    'get_notification_statistics_unread': """
+        SELECT id, type, title, created_at
+        FROM notification
+        WHERE user_id = ? AND is_read = FALSE
+        ORDER BY created_at DESC
+        LIMIT 10
+    """,
+    'get_system_notifications_count': """
+        SELECT COUNT(*) as total 
+        FROM notification 
+        WHERE type = 'system'
+    """,
+    'get_system_notifications': """
+        SELECT n.*, u.nickname as sender_name
+        FROM notification n
+        LEFT JOIN user u ON n.user_id = u.id
+        WHERE n.type = 'system'
+        ORDER BY n.created_at DESC
+        LIMIT ? OFFSET ?
+    """,
+    'check_due_assignments_due': """
+        SELECT a.id, a.title, a.deadline, c.id as class_id,
+               julianday(a.deadline) - julianday('now') as days_left
+        FROM assignment a
+        LEFT JOIN class c ON a.class_id = c.id
+        WHERE a.status = 'published' 
+          AND a.deadline IS NOT NULL
+          AND julianday(a.deadline) - julianday('now') BETWEEN 0 AND 7
+          AND c.id IS NOT NULL
+    """,
+    'send_welcome_notification_user': "SELECT nickname, role FROM user WHERE id = ?",
+    'create_notification': """
+        INSERT INTO notification 
+        (user_id, type, title, content, related_id, related_type)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'get_user_notifications': """
+        SELECT n.*
+        FROM notification n
+        WHERE user_id = :user_id AND (:unread_only = 0 OR is_read = FALSE)
+        ORDER BY n.created_at DESC
+        LIMIT :limit
+    """,
+    'get_notification_count': """
+        SELECT COUNT(*) as count FROM notification
+        WHERE user_id = :user_id AND (:unread_only = 0 OR is_read = FALSE)
+    """
+})
+
 class NotificationService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -23,13 +133,8 @@ class NotificationService:
         if type not in ['assignment', 'grade', 'discussion', 'system', 'reminder']:
             raise ValidationError("无效的通知类型")
         
-        query = """
-            INSERT INTO notification 
-            (user_id, type, title, content, related_id, related_type)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
-        notification_id = self.db.execute_update(
-            query, (user_id, type, title.strip(), content, related_id, related_type)
+        notification_id = self.db.execute_named(
+            'notification.create_notification', (user_id, type, title.strip(), content, related_id, related_type)
         )
         
         if notification_id:
@@ -48,12 +153,7 @@ class NotificationService:
         for user_id in user_ids:
             params.append((user_id, type, title, content, related_id, related_type))
         
-        query = """
-            INSERT INTO notification 
-            (user_id, type, title, content, related_id, related_type)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
-        result = self.db.execute_many(query, params)
+        result = self.db.execute_named_many('notification.create_notification', params)
         
         if result:
             logger.info(f"Bulk notifications created: {result} notifications")
@@ -63,47 +163,21 @@ class NotificationService:
     def get_user_notifications(self, user_id: int, unread_only: bool = False,
                               limit: int = 50) -> List[Dict[str, Any]]:
         """获取用户的通知"""
-        conditions = ["user_id = ?"]
-        params = [user_id]
-        
-        if unread_only:
-            conditions.append("is_read = FALSE")
-        
-        where_clause = " AND ".join(conditions)
-        query = f"""
-            SELECT n.*
-            FROM notification n
-            WHERE {where_clause}
-            ORDER BY n.created_at DESC
-            LIMIT ?
-        """
-        params.append(limit)
-        
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('notification.get_user_notifications', {
+            'user_id': user_id, 'unread_only': int(bool(unread_only)), 'limit': limit
+        })
         return [dict(row) for row in rows]
 
     def get_notification_count(self, user_id: int, unread_only: bool = False) -> int:
         """获取用户的通知数量"""
-        conditions = ["user_id = ?"]
-        params = [user_id]
-        
-        if unread_only:
-            conditions.append("is_read = FALSE")
-        
-        where_clause = " AND ".join(conditions)
-        query = f"SELECT COUNT(*) as count FROM notification WHERE {where_clause}"
-        
-        rows = self.db.execute_query(query, tuple(params))
+        rows = self.db.execute_named('notification.get_notification_count', {
+            'user_id': user_id, 'unread_only': int(bool(unread_only))
+        })
         return rows[0]['count'] if rows else 0
 
     def mark_as_read(self, notification_id: int, user_id: int) -> bool:
         """标记通知为已读"""
-        query = """
-            UPDATE notification 
-            SET is_read = TRUE 
-            WHERE id = ? AND user_id = ?
-        """
-        result = self.db.execute_update(query, (notification_id, user_id))
+        result = self.db.execute_named('notification.mark_as_read', (notification_id, user_id))
         if result is not None:
             logger.info(f"Notification marked as read: {notification_id}")
             return True
@@ -111,8 +185,7 @@ class NotificationService:
 
     def mark_all_as_read(self, user_id: int) -> bool:
         """标记所有通知为已读"""
-        query = "UPDATE notification SET is_read = TRUE WHERE user_id = ?"
-        result = self.db.execute_update(query, (user_id,))
+        result = self.db.execute_named('notification.mark_all_as_read', (user_id,))
         if result is not None:
             logger.info(f"All notifications marked as read for user {user_id}")
             return True
@@ -120,8 +193,7 @@ class NotificationService:
 
     def delete_notification(self, notification_id: int, user_id: int) -> bool:
         """删除通知"""
-        query = "DELETE FROM notification WHERE id = ? AND user_id = ?"
-        result = self.db.execute_update(query, (notification_id, user_id))
+        result = self.db.execute_named('notification.delete_notification', (notification_id, user_id))
         if result is not None:
             logger.info(f"Notification deleted: {notification_id}")
             return True
@@ -129,11 +201,7 @@ class NotificationService:
 
     def delete_old_notifications(self, days: int = 30) -> int:
         """删除旧通知"""
-        query = """
-            DELETE FROM notification 
-            WHERE created_at < datetime('now', ?) AND is_read = TRUE
-        """
-        result = self.db.execute_update(query, (f'-{days} days',))
+        result = self.db.execute_named('notification.delete_old_notifications', (f'-{days} days',))
         if result is not None:
             logger.info(f"Old notifications deleted: {result} records")
             return result
@@ -143,13 +211,7 @@ class NotificationService:
                                       content: str = None) -> int:
         """创建作业通知（发送给相关班级的所有学生）"""
         # 获取作业信息
-        assignment_query = """
-            SELECT a.title as assignment_title, a.deadline, c.id as class_id
-            FROM assignment a
-            LEFT JOIN class c ON a.class_id = c.id
-            WHERE a.id = ?
-        """
-        assignment_rows = self.db.execute_query(assignment_query, (assignment_id,))
+        assignment_rows = self.db.execute_named('notification.create_assignment_notification_assignment', (assignment_id,))
         if not assignment_rows:
             raise ValidationError("作业不存在")
         
@@ -160,11 +222,7 @@ class NotificationService:
             raise ValidationError("作业没有关联班级")
         
         # 获取班级所有学生
-        student_query = """
-            SELECT student_id FROM class_member 
-            WHERE class_id = ? AND status = 'active'
-        """
-        student_rows = self.db.execute_query(student_query, (class_id,))
+        student_rows = self.db.execute_named('notification.get_class_students', (class_id,))
         student_ids = [row['student_id'] for row in student_rows]
         
         if not student_ids:
@@ -182,13 +240,7 @@ class NotificationService:
     def create_grade_notification(self, submission_id: int) -> int:
         """创建成绩通知"""
         # 获取提交信息
-        submission_query = """
-            SELECT s.student_id, s.total_score, a.title as assignment_title
-            FROM submission s
-            JOIN assignment a ON s.assignment_id = a.id
-            WHERE s.id = ?
-        """
-        submission_rows = self.db.execute_query(submission_query, (submission_id,))
+        submission_rows = self.db.execute_named('notification.create_grade_notification_submission', (submission_id,))
         if not submission_rows:
             raise ValidationError("提交记录不存在")
         
@@ -206,14 +258,7 @@ class NotificationService:
     def create_discussion_notification(self, post_id: int, reply_user_id: int) -> int:
         """创建讨论回复通知"""
         # 获取帖子信息
-        post_query = """
-            SELECT d.user_id as author_id, d.title, d.content,
-                   u.nickname as reply_user_name
-            FROM discussion d
-            JOIN user u ON ? = u.id
-            WHERE d.id = ?
-        """
-        post_rows = self.db.execute_query(post_query, (reply_user_id, post_id))
+        post_rows = self.db.execute_named('notification.create_discussion_notification_post', (reply_user_id, post_id))
         if not post_rows:
             raise ValidationError("帖子不存在")
         
@@ -240,8 +285,7 @@ class NotificationService:
             )
         else:
             # 发送给所有用户
-            all_users_query = "SELECT id FROM user WHERE status = 'active'"
-            all_users_rows = self.db.execute_query(all_users_query)
+            all_users_rows = self.db.execute_named('notification.create_system_announcement_all_users')
             all_user_ids = [row['id'] for row in all_users_rows]
             
             return self.create_bulk_notifications(
@@ -251,13 +295,7 @@ class NotificationService:
     def create_reminder_notification(self, assignment_id: int, days_before: int) -> int:
         """创建作业提醒通知"""
         # 获取作业信息
-        assignment_query = """
-            SELECT a.title, a.deadline, c.id as class_id
-            FROM assignment a
-            LEFT JOIN class c ON a.class_id = c.id
-            WHERE a.id = ?
-        """
-        assignment_rows = self.db.execute_query(assignment_query, (assignment_id,))
+        assignment_rows = self.db.execute_named('notification.create_reminder_notification_assignment', (assignment_id,))
         if not assignment_rows:
             raise ValidationError("作业不存在")
         
@@ -268,11 +306,7 @@ class NotificationService:
             return 0
         
         # 获取班级所有学生
-        student_query = """
-            SELECT student_id FROM class_member 
-            WHERE class_id = ? AND status = 'active'
-        """
-        student_rows = self.db.execute_query(student_query, (class_id,))
+        student_rows = self.db.execute_named('notification.get_class_students', (class_id,))
         student_ids = [row['student_id'] for row in student_rows]
         
         if not student_ids:
@@ -289,38 +323,13 @@ class NotificationService:
     def get_notification_statistics(self, user_id: int) -> Dict[str, Any]:
         """获取通知统计信息"""
         # 按类型统计
-        type_query = """
-            SELECT 
-                type,
-                COUNT(*) as total,
-                COUNT(CASE WHEN is_read = FALSE THEN 1 END) as unread
-            FROM notification
-            WHERE user_id = ?
-            GROUP BY type
-        """
-        type_stats = self.db.execute_query(type_query, (user_id,))
+        type_stats = self.db.execute_named('notification.get_notification_statistics_type', (user_id,))
         
         # 最近7天统计
-        weekly_query = """
-            SELECT 
-                DATE(created_at) as date,
-                COUNT(*) as count
-            FROM notification
-            WHERE user_id = ? AND created_at >= datetime('now', '-7 days')
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        """
-        weekly_stats = self.db.execute_query(weekly_query, (user_id,))
+        weekly_stats = self.db.execute_named('notification.get_notification_statistics_weekly', (user_id,))
         
         # 未读通知列表
-        unread_query = """
-            SELECT id, type, title, created_at
-            FROM notification
-            WHERE user_id = ? AND is_read = FALSE
-            ORDER BY created_at DESC
-            LIMIT 10
-        """
-        unread_list = self.db.execute_query(unread_query, (user_id,))
+        unread_list = self.db.execute_named('notification.get_notification_statistics_unread', (user_id,))
         
         return {
             'type_stats': [dict(row) for row in type_stats],
@@ -333,24 +342,11 @@ class NotificationService:
         offset = (page - 1) * page_size
         
         # 获取总数
-        count_query = """
-            SELECT COUNT(*) as total 
-            FROM notification 
-            WHERE type = 'system'
-        """
-        count_rows = self.db.execute_query(count_query)
+        count_rows = self.db.execute_named('notification.get_system_notifications_count')
         total = count_rows[0]['total'] if count_rows else 0
         
         # 获取通知列表
-        query = """
-            SELECT n.*, u.nickname as sender_name
-            FROM notification n
-            LEFT JOIN user u ON n.user_id = u.id
-            WHERE n.type = 'system'
-            ORDER BY n.created_at DESC
-            LIMIT ? OFFSET ?
-        """
-        rows = self.db.execute_query(query, (page_size, offset))
+        rows = self.db.execute_named('notification.get_system_notifications', (page_size, offset))
         
         return {
             'notifications': [dict(row) for row in rows],
@@ -365,17 +361,7 @@ class NotificationService:
         from datetime import datetime
         
         # 获取即将到期的作业（1天、3天、7天后到期）
-        due_query = """
-            SELECT a.id, a.title, a.deadline, c.id as class_id,
-                   julianday(a.deadline) - julianday('now') as days_left
-            FROM assignment a
-            LEFT JOIN class c ON a.class_id = c.id
-            WHERE a.status = 'published' 
-              AND a.deadline IS NOT NULL
-              AND julianday(a.deadline) - julianday('now') BETWEEN 0 AND 7
-              AND c.id IS NOT NULL
-        """
-        due_assignments = self.db.execute_query(due_query)
+        due_assignments = self.db.execute_named('notification.check_due_assignments_due')
         
         notification_count = 0
         for assignment in due_assignments:
@@ -392,8 +378,7 @@ class NotificationService:
 
     def send_welcome_notification(self, user_id: int) -> int:
         """发送欢迎通知给新用户"""
-        user_query = "SELECT nickname, role FROM user WHERE id = ?"
-        user_rows = self.db.execute_query(user_query, (user_id,))
+        user_rows = self.db.execute_named('notification.send_welcome_notification_user', (user_id,))
         if not user_rows:
             return 0
         
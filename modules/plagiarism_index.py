@@ -0,0 +1,224 @@
+"""
+相似答案（抄袭）检测索引
+- 每道题一个索引：答案经 AIGrader 分词后取连续词组成 shingle，计算 MinHash 签名
+- LSH 把签名分段放入哈希桶，只有落在同一个桶里的答案才需要比较，查询不必两两比较
+- 新提交的答案增量加入已建立的索引；索引在第一次查询时从 submission_detail 建立
+"""
+import zlib
+import threading
+import logging
+import numpy as np
+from config import PLAGIARISM_CONFIG
+from modules.ai_grader import AIGrader
+from modules.query_registry import query_registry
+
+logger = logging.getLogger(__name__)
+
+query_registry.register('plagiarism', {
+    'iter_question_answers': """
+        SELECT submission_id, student_answer
+        FROM submission_detail
+        WHERE question_id = ?
+        ORDER BY submission_id
+    """
+})
+
+# 轮换哈希使用的梅森素数，(a * h + b) 在 uint64 内不会溢出
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+class MinHasher:
+    def __init__(self, num_perm=None, shingle_size=None, min_tokens=None, seed=None):
+        config = PLAGIARISM_CONFIG
+        self.num_perm = num_perm or config['num_perm']
+        self.shingle_size = shingle_size or config['shingle_size']
+        self.min_tokens = min_tokens if min_tokens is not None else config['min_tokens']
+        rng = np.random.RandomState(config['seed'] if seed is None else seed)
+        self._a = rng.randint(1, 1 << 31, size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=self.num_perm).astype(np.uint64)
+
+    def shingles(self, text):
+        """分词（去掉空白和标点）后取连续 shingle_size 个词；词数不足 min_tokens 时返回空集合"""
+        tokens = [t for t in AIGrader.tokenize(text.strip()) if t.strip() and any(c.isalnum() for c in t)]
+        if len(tokens) < self.min_tokens:
+            return set()
+        k = min(self.shingle_size, len(tokens))
+        return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+    def signature(self, text):
+        """返回 MinHash 签名（uint32 数组），答案过短时返回 None"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig1, sig2):
+        """由签名估计 Jaccard 相似度"""
+        return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+class PlagiarismIndex:
+    """一道题的 MinHash LSH 索引，key 为 submission_id"""
+
+    def __init__(self, hasher=None, bands=None, threshold=None):
+        self.hasher = hasher or MinHasher()
+        self.bands = bands or PLAGIARISM_CONFIG['bands']
+        self.threshold = threshold if threshold is not None else PLAGIARISM_CONFIG['threshold']
+        if self.hasher.num_perm % self.bands:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.rows = self.hasher.num_perm // self.bands
+        self._signatures = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text):
+        """加入（或替换）一份答案，返回是否被索引（过短的答案不索引）"""
+        signature = self.hasher.signature(text or "")
+        with self._lock:
+            self._remove(key)
+            if signature is None:
+                return False
+            self._signatures[key] = signature
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(band_key, []).append(key)
+        return True
+
+    def _remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def query(self, text, threshold=None):
+        """
+        查找与 text 相似的答案（只比较同桶的候选）
+        返回: list of (key, 估计相似度)，按相似度降序
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.hasher.signature(text or "")
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, band_key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(band_key, ()))
+            scored = [(key, MinHasher.similarity(signature, self._signatures[key])) for key in candidates]
+        return sorted([c for c in scored if c[1] >= threshold], key=lambda c: c[1], reverse=True)
+
+    def clusters(self, threshold=None, min_size=2):
+        """
+        相似答案簇：同桶且估计相似度达到阈值的答案用并查集合并
+        返回: list of {'keys': [...], 'similarity': 簇内与代表答案的平均估计相似度}，按簇大小降序
+        """
+        threshold = self.threshold if threshold is None else threshold
+        parent = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                parent[x] = parent.get(parent[x], parent[x])
+                x = parent[x]
+            return x
+
+        with self._lock:
+            signatures = self._signatures
+            for buckets in self._buckets:
+                for members in buckets.values():
+                    if len(members) < 2:
+                        continue
+                    anchor = members[0]
+                    for key in members[1:]:
+                        if find(key) != find(anchor) and \
+                                MinHasher.similarity(signatures[anchor], signatures[key]) >= threshold:
+                            parent[find(key)] = find(anchor)
+
+            groups = {}
+            for key in parent:
+                groups.setdefault(find(key), set()).add(key)
+
+            result = []
+            for root, keys in groups.items():
+                keys.add(root)
+                if len(keys) < min_size:
+                    continue
+                others = [MinHasher.similarity(signatures[root], signatures[k]) for k in keys if k != root]
+                result.append({'keys': sorted(keys), 'similarity': sum(others) / len(others)})
+        result.sort(key=lambda c: len(c['keys']), reverse=True)
+        return result
+
+class PlagiarismIndexRegistry:
+    """
+    按 (数据库路径, 题目ID) 管理索引：第一次查询时建立，之后由提交服务增量更新
+    - 全局锁只保护字典本身；建立索引（读取 submission_detail）在锁外进行，不阻塞其他题目
+    - 索引在建立前就登记，建立期间到达的新答案直接加入（重复加入同一提交只会替换），
+      同一题目的其他查询等待建立完成
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._building = {}  # 正在建立的索引 -> threading.Event
+        self._lock = threading.Lock()
+
+    def get(self, db, question_id):
+        """获取题目的索引，不存在时从 submission_detail 流式建立"""
+        key = (db.db_path, question_id)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = PlagiarismIndex()
+                ready = self._building[key] = threading.Event()
+                owner = True
+            else:
+                ready = self._building.get(key)
+                owner = False
+
+        if not owner:
+            if ready is not None:
+                ready.wait()
+                with self._lock:
+                    if self._indexes.get(key) is not index:
+                        # 建立失败已被移除，重新建立
+                        return self.get(db, question_id)
+            return index
+
+        try:
+            for row in db.iter_named('plagiarism.iter_question_answers', (question_id,)):
+                index.add(row['submission_id'], row['student_answer'])
+        except BaseException:
+            with self._lock:
+                if self._indexes.get(key) is index:
+                    del self._indexes[key]
+            raise
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+            ready.set()
+        logger.info(f"Plagiarism index built for question {question_id}: {len(index)} answers")
+        return index
+
+    def add_answer(self, db, question_id, submission_id, answer):
+        """新答案加入已登记的索引；索引尚未建立时忽略（建立时会从数据库读到）"""
+        with self._lock:
+            index = self._indexes.get((db.db_path, question_id))
+        if index is not None:
+            index.add(submission_id, answer)
+
+    def invalidate(self, db, question_id):
+        with self._lock:
+            self._indexes.pop((db.db_path, question_id), None)
+
+# 全局索引
+plagiarism_indexes = PlagiarismIndexRegistry()
@@ -0,0 +1,163 @@
+"""
+SQL 性能分析器
+- 按语句统计调用次数、耗时和返回行数，并记录发起调用的服务方法
+- 超过阈值的慢查询连同 EXPLAIN QUERY PLAN 写入慢查询日志
+- 默认关闭；DBManager 在关闭状态下只多一次 None 判断
+"""
+import os
+import re
+import sys
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 统计调用方时跳过的文件（数据库层自身）
+_INTERNAL_FILES = ('db_manager.py', 'query_profiler.py', 'contextlib.py')
+
+_WHITESPACE = re.compile(r'\s+')
+
+class QueryStat:
+    __slots__ = ('sql', 'calls', 'total_time', 'max_time', 'rows', 'slow_calls', 'callers')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.slow_calls = 0
+        self.callers = {}
+
+class QueryProfiler:
+    def __init__(self, slow_threshold_ms=100, slow_log_path=None, explain=True):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.slow_log_path = slow_log_path
+        self.explain = explain
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(sql):
+        """压缩空白，作为统计的键"""
+        return _WHITESPACE.sub(' ', sql).strip()
+
+    @staticmethod
+    def find_caller():
+        """
+        返回数据库层之外最近的调用方，例如 submission_service.SubmissionService.get_submission_detail
+        类名取自帧中的 self / cls（co_qualname 只在 Python 3.11 及以上可用）
+        """
+        frame = sys._getframe(2)
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            if filename not in _INTERNAL_FILES:
+                name = code.co_name
+                owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+                if owner is not None:
+                    cls = owner if isinstance(owner, type) else type(owner)
+                    name = f"{cls.__name__}.{name}"
+                return f"{os.path.splitext(filename)[0]}.{name}"
+            frame = frame.f_back
+        return '<unknown>'
+
+    def record(self, sql, params, elapsed, rows, conn=None):
+        """
+        记录一次执行
+        conn: 执行该语句的连接，慢查询时用于获取执行计划
+        性能分析出错只记录日志，不影响语句的执行结果
+        """
+        try:
+            self._record(sql, params, elapsed, rows, conn)
+        except Exception as e:
+            logger.warning(f"Query profiler failed to record statement: {e}")
+
+    def _record(self, sql, params, elapsed, rows, conn):
+        key = self.normalize(sql)
+        caller = self.find_caller()
+        slow = elapsed >= self.slow_threshold
+
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = QueryStat(key)
+            stat.calls += 1
+            stat.total_time += elapsed
+            stat.rows += rows if rows and rows > 0 else 0
+            if elapsed > stat.max_time:
+                stat.max_time = elapsed
+            if slow:
+                stat.slow_calls += 1
+            stat.callers[caller] = stat.callers.get(caller, 0) + 1
+
+        if slow:
+            plan = self.explain_plan(conn, sql, params) if self.explain and conn is not None else []
+            self._write_slow_log(key, params, elapsed, rows, caller, plan)
+
+    @staticmethod
+    def explain_plan(conn, sql, params=()):
+        """获取语句的执行计划，返回 detail 列表"""
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except Exception as e:
+            logger.warning(f"EXPLAIN QUERY PLAN failed: {e}")
+            return []
+        return [row[3] for row in rows]
+
+    def _write_slow_log(self, sql, params, elapsed, rows, caller, plan):
+        lines = [
+            f"# {time.strftime('%Y-%m-%d %H:%M:%S')} {elapsed * 1000:.2f}ms rows={rows} caller={caller}",
+            f"# params: {params!r}",
+            sql
+        ]
+        lines.extend(f"  PLAN {detail}" for detail in plan)
+        text = '\n'.join(lines) + '\n\n'
+
+        if self.slow_log_path is None:
+            logger.warning(f"Slow query ({elapsed * 1000:.2f}ms) from {caller}: {sql}")
+            return
+        with self._lock:
+            with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                f.write(text)
+
+    def get_report(self, top_n=20, order_by='total_time'):
+        """
+        获取耗时最多的语句
+        order_by: total_time / max_time / calls / rows
+        返回: list of {'sql', 'calls', 'total_time', 'avg_time', 'max_time', 'rows', 'slow_calls', 'callers'}
+        """
+        with self._lock:
+            report = [
+                {
+                    'sql': s.sql,
+                    'calls': s.calls,
+                    'total_time': s.total_time,
+                    'avg_time': s.total_time / s.calls,
+                    'max_time': s.max_time,
+                    'rows': s.rows,
+                    'slow_calls': s.slow_calls,
+                    'callers': sorted(s.callers.items(), key=lambda c: c[1], reverse=True)
+                }
+                for s in self._stats.values()
+            ]
+        report.sort(key=lambda r: r[order_by], reverse=True)
+        return report[:top_n] if top_n else report
+
+    def format_report(self, top_n=20, order_by='total_time'):
+        """生成文本报告"""
+        lines = [f"{'总耗时(ms)':>12} {'次数':>8} {'平均(ms)':>10} {'最大(ms)':>10} {'行数':>8}  语句 / 调用方"]
+        for r in self.get_report(top_n, order_by):
+            lines.append(
+                f"{r['total_time'] * 1000:>12.2f} {r['calls']:>8} {r['avg_time'] * 1000:>10.3f} "
+                f"{r['max_time'] * 1000:>10.3f} {r['rows']:>8}  {r['sql'][:100]}"
+            )
+            for caller, count in r['callers'][:3]:
+                lines.append(f"{'':>52}  <- {caller} ({count})")
+        return '\n'.join(lines)
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,83 @@
+"""
+命名查询注册表
+- 各服务在模块级按 "命名空间.名称" 声明 SQL，文本固定不变
+- DBManager.execute_named 按名称执行，连接复用时 sqlite3 语句缓存可以命中
+- 记录每条查询的调用次数和累计耗时
+"""
+import threading
+
+class NamedQuery:
+    __slots__ = ('name', 'sql', 'readonly', 'calls', 'total_time')
+
+    # 可以走只读连接的语句
+    READ_STATEMENTS = ('SELECT', 'WITH')
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.readonly = sql.lstrip().upper().startswith(self.READ_STATEMENTS)
+        self.calls = 0
+        self.total_time = 0.0
+
+class QueryRegistry:
+    def __init__(self):
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def register(self, namespace, queries):
+        """
+        注册一组查询
+        queries: dict {name: sql}，注册名为 "namespace.name"
+        """
+        with self._lock:
+            for key, sql in queries.items():
+                name = f"{namespace}.{key}"
+                existing = self._queries.get(name)
+                if existing is not None and existing.sql != sql:
+                    raise ValueError(f"查询重复注册且内容不同: {name}")
+                if existing is None:
+                    self._queries[name] = NamedQuery(name, sql)
+
+    def get(self, name):
+        """根据名称获取查询"""
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise KeyError(f"未注册的查询: {name}") from None
+
+    def record(self, query, elapsed):
+        """记录一次执行"""
+        with self._lock:
+            query.calls += 1
+            query.total_time += elapsed
+
+    def get_stats(self, limit=None):
+        """
+        获取查询统计，按累计耗时降序
+        返回: list of {'name', 'calls', 'total_time', 'avg_time'}
+        """
+        with self._lock:
+            stats = [
+                {
+                    'name': q.name,
+                    'calls': q.calls,
+                    'total_time': q.total_time,
+                    'avg_time': q.total_time / q.calls if q.calls else 0
+                }
+                for q in self._queries.values() if q.calls
+            ]
+        stats.sort(key=lambda s: s['total_time'], reverse=True)
+        return stats[:limit] if limit else stats
+
+    def reset_stats(self):
+        """清空统计"""
+        with self._lock:
+            for q in self._queries.values():
+                q.calls = 0
+                q.total_time = 0.0
+
+    def names(self):
+        return sorted(self._queries)
+
+# 全局注册表
+query_registry = QueryRegistry()
@@ -0,0 +1,111 @@
+"""
+数据库结构迁移
+- start.sql 作为版本 1（基线）
+- migrations/ 目录下的 NNNN_name.sql 为后续版本，按编号顺序执行
+- schema_version 表记录已应用的版本，启动时只执行未应用的迁移
+"""
+import os
+import re
+import sqlite3
+import logging
+from config import SQL_SCRIPT_PATH, MIGRATIONS_DIR
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+class SchemaMigrator:
+    BASELINE_VERSION = 1
+
+    def __init__(self, conn, migrations_dir=None, baseline_path=None):
+        self.conn = conn
+        self.migrations_dir = migrations_dir or MIGRATIONS_DIR
+        self.baseline_path = baseline_path or SQL_SCRIPT_PATH
+
+    def discover_migrations(self):
+        """
+        列出所有迁移（不读取文件内容）
+        返回: list of (version, name, path)，按版本号排序
+        """
+        migrations = [(self.BASELINE_VERSION, 'baseline', self.baseline_path)]
+
+        if os.path.isdir(self.migrations_dir):
+            for filename in os.listdir(self.migrations_dir):
+                match = MIGRATION_FILE_PATTERN.match(filename)
+                if not match:
+                    continue
+                version = int(match.group(1))
+                if version <= self.BASELINE_VERSION:
+                    raise ValueError(f"迁移版本号必须大于 {self.BASELINE_VERSION}: {filename}")
+                migrations.append((version, match.group(2), os.path.join(self.migrations_dir, filename)))
+
+        migrations.sort()
+        versions = [m[0] for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError("存在重复的迁移版本号")
+        return migrations
+
+    def get_current_version(self):
+        """获取数据库当前版本（单条查询），未初始化时返回 0"""
+        try:
+            row = self.conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return row[0] or 0
+
+    def get_pending_migrations(self):
+        """获取未应用的迁移"""
+        current = self.get_current_version()
+        return [m for m in self.discover_migrations() if m[0] > current]
+
+    def migrate(self):
+        """
+        执行未应用的迁移
+        返回: 本次应用的版本号列表
+        """
+        pending = self.get_pending_migrations()
+        if not pending:
+            return []
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.commit()
+
+        applied = []
+        for version, name, path in pending:
+            self._apply(version, name, path)
+            applied.append(version)
+            logger.info(f"Schema migration applied: {version:04d}_{name}")
+
+        return applied
+
+    def _apply(self, version, name, path):
+        """在一个事务中执行迁移脚本并记录版本"""
+        with open(path, 'r', encoding='utf-8') as f:
+            sql_script = f.read()
+
+        try:
+            self.conn.executescript(
+                f"BEGIN;\n{sql_script}\n"
+                f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}');\n"
+                "COMMIT;"
+            )
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+
+if __name__ == "__main__":
+    from modules.db_manager import DBManager
+
+    db = DBManager()
+    with db.get_connection_context() as conn:
+        migrator = SchemaMigrator(conn)
+        print(f"当前版本: {migrator.get_current_version()}")
+        for version, name, _ in migrator.discover_migrations():
+            print(f"  {version:04d}_{name}")
@@ -1,14 +1,119 @@
 """
 提交服务层 - 处理作业提交和评分逻辑
 """
+import os
+import time
 import logging
+import multiprocessing
 from datetime import datetime
-from modules.ai_grader import AIGrader
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from config import AI_REGRADE_CONFIG
+from modules.ai_grader import AIGrader, OBJECTIVE_TYPES, SUBJECTIVE_TYPES
+from modules.answer_key import answer_key_cache
+from modules.grading_memo import grading_memo
+from modules.plagiarism_index import plagiarism_indexes
 from modules.validators import Validator
 from modules.exceptions import ValidationError, ResourceNotFoundError
+from modules.query_registry import query_registry
 
 logger = logging.getLogger(__name__)
 
+query_registry.register('submission', {
+    'get_questions': "SELECT * FROM question WHERE assignment_id = ? ORDER BY id",
+    'create_submission': """
+        INSERT INTO submission (student_id, assignment_id, total_score, feedback)
+        VALUES (?, ?, 0, '')
+    """,
+    'save_submission_details': """
+        INSERT INTO submission_detail 
+        (submission_id, question_id, student_answer, is_correct, score, ai_feedback)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'update_total_score': "UPDATE submission SET total_score = ? WHERE id = ?",
+    'get_student_submissions': """
+        SELECT s.*, a.title as assignment_title, j.status as job_status
+        FROM submission s
+        JOIN assignment a ON s.assignment_id = a.id
+        LEFT JOIN grading_job j ON j.submission_id = s.id
+        WHERE s.student_id = ?
+        ORDER BY s.submit_time DESC
+    """,
+    'get_submission_detail': """
+        SELECT sd.*, q.content, q.answer as standard_answer, q.type, q.score as max_score
+        FROM submission_detail sd
+        JOIN question q ON sd.question_id = q.id
+        WHERE sd.submission_id = ?
+        ORDER BY sd.question_id
+    """,
+    'get_assignment_submissions': """
+        SELECT s.*, u.nickname as student_name
+        FROM submission s
+        JOIN user u ON s.student_id = u.id
+        WHERE s.assignment_id = ?
+        ORDER BY s.submit_time DESC
+    """,
+    'manual_grade': """
+        UPDATE submission_detail 
+        SET score = ?, ai_feedback = ?
+        WHERE id = ?
+    """,
+    'get_detail_submission_id': "SELECT submission_id FROM submission_detail WHERE id = ?",
+    'sum_detail_scores': """
+        SELECT SUM(score) as total
+        FROM submission_detail
+        WHERE submission_id = ?
+    """,
+    'get_assignment_submission_ids': "SELECT id FROM submission WHERE assignment_id = ? ORDER BY id",
+    'get_regrade_answers': """
+        SELECT sd.submission_id, sd.question_id, sd.student_answer
+        FROM submission_detail sd
+        JOIN submission s ON sd.submission_id = s.id
+        WHERE s.assignment_id = ? AND sd.submission_id BETWEEN ? AND ?
+        ORDER BY sd.submission_id, sd.question_id
+    """,
+    'update_detail_grade': """
+        UPDATE submission_detail
+        SET score = ?, is_correct = ?, ai_feedback = ?
+        WHERE submission_id = ? AND question_id = ?
+    """,
+    'get_submission_assignment': "SELECT assignment_id FROM submission WHERE id = ?",
+    'get_submission_answers': """
+        SELECT question_id, student_answer
+        FROM submission_detail
+        WHERE submission_id = ?
+    """,
+    'mark_graded': """
+        UPDATE submission
+        SET total_score = ?, grading_status = 'graded', graded_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """
+})
+
+def _init_regrade_worker():
+    """评分进程初始化：预先加载 jieba 词典"""
+    from modules.ai_grader import grader_warmup
+    grader_warmup.start()
+    grader_warmup.wait()
+
+def _regrade_shard(questions, shard):
+    """
+    在评分进程中为一个分片评分
+    shard: list of (submission_id, {question_id: student_answer})
+    返回: list of (submission_id, total_score, [(question_id, score, is_correct, feedback)])
+    """
+    graded = AIGrader.batch_grade_many(questions, [answers for _, answers in shard])
+    results = []
+    for (submission_id, answers), grades in zip(shard, graded):
+        # 只写回提交中已有的题目详情，总分与 sum_detail_scores 的口径一致
+        details = [
+            (question.id, score, is_correct, feedback)
+            for question, (score, is_correct, feedback) in zip(questions, grades)
+            if question.id in answers
+        ]
+        results.append((submission_id, sum(d[1] for d in details), details))
+    return results
+
 class SubmissionService:
     def __init__(self, db_manager):
         self.db = db_manager
@@ -20,76 +125,143 @@ class SubmissionService:
         answers: {question_id: student_answer}
         返回: submission_id
         """
-        # 获取所有题目
-        questions = self._get_questions(assignment_id)
-        if not questions:
+        # 获取答案索引（缓存）
+        answer_key = self._get_answer_key(assignment_id)
+        if not answer_key.questions:
             raise ResourceNotFoundError("该作业没有题目")
         
-        # 创建提交记录
-        submission_id = self._create_submission(student_id, assignment_id)
-        
-        # 逐题评分
+        # 评分（在事务外进行，评分期间不占用写连接）
         total_score = 0
         details = []
         
-        for question in questions:
-            student_answer = answers.get(question.id, "")
-            score, is_correct, feedback = self._grade_question(
-                question, student_answer
-            )
+        for question, (score, is_correct, feedback) in self._grade_answers(answer_key, answers):
             total_score += score
             
             details.append({
-                'submission_id': submission_id,
                 'question_id': question.id,
-                'student_answer': student_answer,
+                'student_answer': answers.get(question.id, ""),
                 'is_correct': is_correct,
                 'score': score,
                 'ai_feedback': feedback
             })
         
-        # 批量插入提交详情
-        self._save_submission_details(details)
-        
-        # 更新总分
-        self._update_total_score(submission_id, total_score)
+        # 创建提交记录、保存详情、更新总分在同一个事务中完成
+        with self.db.transaction():
+            submission_id = self._create_submission(student_id, assignment_id)
+            for d in details:
+                d['submission_id'] = submission_id
+            self._save_submission_details(details)
+            self._update_total_score(submission_id, total_score)
+        self._index_answers(details)
         
         logger.info(f"Submission completed: {submission_id}, score: {total_score}")
         return submission_id, total_score
 
+    def record_submission(self, student_id, assignment_id, answers):
+        """
+        只记录提交和答案，不评分（grading_status 保持 pending），由 GradingQueue 异步评分
+        answers: {question_id: student_answer}
+        返回: submission_id
+        """
+        questions = self._get_questions(assignment_id)
+        if not questions:
+            raise ResourceNotFoundError("该作业没有题目")
+
+        with self.db.transaction():
+            submission_id = self._create_submission(student_id, assignment_id)
+            details = [
+                {
+                    'submission_id': submission_id,
+                    'question_id': question.id,
+                    'student_answer': answers.get(question.id, ""),
+                    'is_correct': None,
+                    'score': None,
+                    'ai_feedback': None
+                }
+                for question in questions
+            ]
+            self._save_submission_details(details)
+        self._index_answers(details)
+
+        logger.info(f"Submission recorded for grading: {submission_id}")
+        return submission_id
+
+    def grade_submission(self, submission_id):
+        """
+        为已记录的提交评分：写回每题得分和总分，并标记为 graded
+        重复调用结果相同，任务中断后可以安全地重新评分
+        返回: total_score
+        """
+        rows = self.db.execute_named('submission.get_submission_assignment', (submission_id,))
+        if not rows:
+            raise ResourceNotFoundError("提交记录不存在")
+
+        answer_key = self._get_answer_key(rows[0]['assignment_id'])
+        answers = {
+            row['question_id']: row['student_answer'] or ""
+            for row in self.db.execute_named('submission.get_submission_answers', (submission_id,))
+        }
+
+        # 评分在事务外进行，评分期间不占用写连接
+        details = [
+            (score, is_correct, feedback, submission_id, question.id)
+            for question, (score, is_correct, feedback) in self._grade_answers(answer_key, answers)
+            if question.id in answers
+        ]
+        total_score = sum(d[0] for d in details)
+
+        with self.db.transaction():
+            self.db.execute_named_many('submission.update_detail_grade', details)
+            self.db.execute_named('submission.mark_graded', (total_score, submission_id))
+
+        logger.info(f"Submission graded: {submission_id}, score: {total_score}")
+        return total_score
+
     def _get_questions(self, assignment_id):
-        """获取作业题目"""
-        query = "SELECT * FROM question WHERE assignment_id = ? ORDER BY id"
-        rows = self.db.execute_query(query, (assignment_id,))
+        """获取作业题目（经答案索引缓存）"""
+        return self._get_answer_key(assignment_id).questions
+
+    def _load_questions(self, assignment_id):
+        """从数据库读取作业题目"""
+        rows = self.db.execute_named('submission.get_questions', (assignment_id,))
         
         from modules.models import Question
         return [Question.from_row(row) for row in rows]
 
+    def _get_answer_key(self, assignment_id):
+        """获取作业的答案索引，题目修改后由 AssignmentService 使其失效"""
+        return answer_key_cache.get(self.db, assignment_id, lambda: self._load_questions(assignment_id))
+
+    def _grade_answers(self, answer_key, answers):
+        """
+        评分整份提交：客观题一次遍历查答案索引，其余题目逐题评分
+        返回: list of (question, (score, is_correct, feedback))，顺序与题目顺序相同
+        """
+        objective = answer_key.grade_objective(answers)
+        return [
+            (question, objective.get(question.id) or self._grade_question(question, answers.get(question.id, "")))
+            for question in answer_key.questions
+        ]
+
     def _create_submission(self, student_id, assignment_id):
         """创建提交记录"""
-        query = """
-            INSERT INTO submission (student_id, assignment_id, total_score, feedback)
-            VALUES (?, ?, 0, '')
-        """
-        submission_id = self.db.execute_update(query, (student_id, assignment_id))
+        submission_id = self.db.execute_named('submission.create_submission', (student_id, assignment_id))
         if not submission_id:
             raise ValidationError("创建提交记录失败")
         return submission_id
 
     def _grade_question(self, question, student_answer):
         """评分单个题目"""
-        if question.type in ['single_choice', 'multi_choice', 'boolean', 'fill_in']:
+        if question.type in OBJECTIVE_TYPES:
             # 客观题
-            is_correct = self.ai_grader.grade_objective(student_answer, question.answer)
+            is_correct = self.ai_grader.grade_objective(student_answer, question.answer, question.type)
             score = question.score if is_correct else 0
             feedback = "正确" if is_correct else "错误"
             return score, is_correct, feedback
         
-        elif question.type == 'subjective':
-            # 主观题
-            score, feedback = self.ai_grader.grade_subjective(
-                student_answer, question.answer, question.score
-            )
+        elif question.type in SUBJECTIVE_TYPES:
+            # 主观题（经评分记忆表，相同答案不重复评分）
+            score, feedback = grading_memo.grade(self.db, question, student_answer)
             is_correct = None  # 主观题不判断对错
             return score, is_correct, feedback
         
@@ -97,64 +269,42 @@ class SubmissionService:
 
     def _save_submission_details(self, details):
         """批量保存提交详情"""
-        query = """
-            INSERT INTO submission_detail 
-            (submission_id, question_id, student_answer, is_correct, score, ai_feedback)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
         params_list = [
             (d['submission_id'], d['question_id'], d['student_answer'],
              d['is_correct'], d['score'], d['ai_feedback'])
             for d in details
         ]
-        self.db.execute_many(query, params_list)
+        self.db.execute_named_many('submission.save_submission_details', params_list)
+
+    def _index_answers(self, details):
+        """
+        新答案增量加入已建立的相似答案索引
+        在事务中调用时（例如经 GradingQueue.submit）等最外层事务提交后再加入，回滚的提交不进入索引
+        """
+        def index():
+            for d in details:
+                plagiarism_indexes.add_answer(self.db, d['question_id'], d['submission_id'], d['student_answer'])
+        self.db.on_commit(index)
 
     def _update_total_score(self, submission_id, total_score):
         """更新总分"""
-        query = "UPDATE submission SET total_score = ? WHERE id = ?"
-        self.db.execute_update(query, (total_score, submission_id))
+        self.db.execute_named('submission.update_total_score', (total_score, submission_id))
 
     def get_student_submissions(self, student_id):
         """获取学生的所有提交记录"""
-        query = """
-            SELECT s.*, a.title as assignment_title
-            FROM submission s
-            JOIN assignment a ON s.assignment_id = a.id
-            WHERE s.student_id = ?
-            ORDER BY s.submit_time DESC
-        """
-        return self.db.execute_query(query, (student_id,))
+        return self.db.execute_named('submission.get_student_submissions', (student_id,))
 
     def get_submission_detail(self, submission_id):
         """获取提交详情"""
-        query = """
-            SELECT sd.*, q.content, q.answer as standard_answer, q.type, q.score as max_score
-            FROM submission_detail sd
-            JOIN question q ON sd.question_id = q.id
-            WHERE sd.submission_id = ?
-            ORDER BY sd.question_id
-        """
-        return self.db.execute_query(query, (submission_id,))
+        return self.db.execute_named('submission.get_submission_detail', (submission_id,))
 
     def get_assignment_submissions(self, assignment_id):
         """获取作业的所有提交（教师查看）"""
-        query = """
-            SELECT s.*, u.nickname as student_name
-            FROM submission s
-            JOIN user u ON s.student_id = u.id
-            WHERE s.assignment_id = ?
-            ORDER BY s.submit_time DESC
-        """
-        return self.db.execute_query(query, (assignment_id,))
+        return self.db.execute_named('submission.get_assignment_submissions', (assignment_id,))
 
     def manual_grade(self, submission_detail_id, score, feedback):
         """教师手动评分（主观题）"""
-        query = """
-            UPDATE submission_detail 
-            SET score = ?, ai_feedback = ?
-            WHERE id = ?
-        """
-        result = self.db.execute_update(query, (score, feedback, submission_detail_id))
+        result = self.db.execute_named('submission.manual_grade', (score, feedback, submission_detail_id))
         
         if result is not None:
             # 重新计算总分
@@ -162,23 +312,125 @@ class SubmissionService:
             return True
         return False
 
+    def regrade_assignment(self, assignment_id, workers=None, shard_size=None,
+                           progress_callback=None, cancel_event=None):
+        """
+        按当前的标准答案重新评分整份作业的所有提交
+        - 提交按 id 分片，分片在评分进程池中并行评分（进程启动时预先加载 jieba）
+        - 每个分片的结果在一个事务中写回，取消时已写回的分片保留
+        workers: 评分进程数，默认 AI_REGRADE_CONFIG['workers']；0 表示在当前进程中评分
+        progress_callback: callable(done, total)，每写回一个分片调用一次
+        cancel_event: threading.Event，置位后不再提交新分片，并取消排队中的分片
+        返回: {'total', 'regraded', 'cancelled', 'elapsed'}
+        """
+        start = time.perf_counter()
+        questions = self._get_questions(assignment_id)
+        if not questions:
+            raise ResourceNotFoundError("该作业没有题目")
+
+        if workers is None:
+            workers = AI_REGRADE_CONFIG['workers']
+            if workers is None:
+                workers = os.cpu_count() or 1
+        shard_size = shard_size or AI_REGRADE_CONFIG['shard_size']
+
+        ids = [row['id'] for row in self.db.execute_named('submission.get_assignment_submission_ids', (assignment_id,))]
+        shards = [ids[i:i + shard_size] for i in range(0, len(ids), shard_size)]
+        total = len(ids)
+        regraded = 0
+        cancelled = False
+
+        def cancel_requested():
+            return cancel_event is not None and cancel_event.is_set()
+
+        def write_back(results):
+            nonlocal regraded
+            self._save_regrade_results(results)
+            regraded += len(results)
+            if progress_callback:
+                progress_callback(regraded, total)
+
+        if workers == 0:
+            for shard_ids in shards:
+                if cancel_requested():
+                    cancelled = True
+                    break
+                write_back(_regrade_shard(questions, self._load_regrade_shard(assignment_id, shard_ids)))
+        else:
+            max_pending = workers * AI_REGRADE_CONFIG['pending_per_worker']
+            shard_iter = iter(shards)
+            pending = set()
+            # 主进程中有 Tk、数据库和预热线程，用 spawn 启动评分进程，避免 fork 复制持有中的锁
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_regrade_worker) as pool:
+                while True:
+                    # 读取分片在主进程中进行，评分进程不访问数据库
+                    while len(pending) < max_pending and not cancel_requested():
+                        shard_ids = next(shard_iter, None)
+                        if shard_ids is None:
+                            break
+                        shard = self._load_regrade_shard(assignment_id, shard_ids)
+                        pending.add(pool.submit(_regrade_shard, questions, shard))
+                    if not pending:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write_back(future.result())
+
+                    if cancel_requested():
+                        for future in pending:
+                            future.cancel()
+                        # 已在评分的分片仍然写回
+                        for future in pending:
+                            if not future.cancelled():
+                                write_back(future.result())
+                        pending = set()
+                        break
+            cancelled = cancel_requested() and regraded < total
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Assignment {assignment_id} regraded: {regraded}/{total} submissions "
+            f"in {elapsed:.2f}s with {workers} workers{' (cancelled)' if cancelled else ''}"
+        )
+        return {'total': total, 'regraded': regraded, 'cancelled': cancelled, 'elapsed': elapsed}
+
+    def _load_regrade_shard(self, assignment_id, submission_ids):
+        """读取分片内提交的答案，返回 list of (submission_id, {question_id: student_answer})"""
+        rows = self.db.execute_named(
+            'submission.get_regrade_answers', (assignment_id, submission_ids[0], submission_ids[-1])
+        )
+        answers = {submission_id: {} for submission_id in submission_ids}
+        for submission_id, group in groupby(rows, key=lambda row: row['submission_id']):
+            answers[submission_id] = {row['question_id']: row['student_answer'] or "" for row in group}
+        return list(answers.items())
+
+    def _save_regrade_results(self, results):
+        """在一个事务中写回一个分片的评分结果"""
+        with self.db.transaction():
+            self.db.execute_named_many('submission.update_detail_grade', [
+                (score, is_correct, feedback, submission_id, question_id)
+                for submission_id, _, details in results
+                for question_id, score, is_correct, feedback in details
+            ])
+            self.db.execute_named_many(
+                'submission.update_total_score',
+                [(total_score, submission_id) for submission_id, total_score, _ in results]
+            )
+
     def _recalculate_total_score(self, submission_detail_id):
         """重新计算提交的总分"""
         # 获取submission_id
-        query = "SELECT submission_id FROM submission_detail WHERE id = ?"
-        rows = self.db.execute_query(query, (submission_detail_id,))
+        rows = self.db.execute_named('submission.get_detail_submission_id', (submission_detail_id,))
         if not rows:
             return
         
         submission_id = rows[0]['submission_id']
         
         # 计算总分
-        query = """
-            SELECT SUM(score) as total
-            FROM submission_detail
-            WHERE submission_id = ?
-        """
-        rows = self.db.execute_query(query, (submission_id,))
+        rows = self.db.execute_named('submission.sum_detail_scores', (submission_id,))
         total_score = rows[0]['total'] if rows and rows[0]['total'] else 0
         
         # 更新
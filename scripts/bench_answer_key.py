@@ -0,0 +1,85 @@
+"""
+客观题评分微基准
+对比每份提交都从数据库重建题目、逐题标准化标准答案，与答案索引缓存下的一次遍历评分
+"""
+import sys
+import os
+import time
+import random
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+from modules.ai_grader import AIGrader
+
+def prepare(db, question_count):
+    """创建单选、多选、填空各占一部分的作业，返回 (assignment_id, 学生答案列表)"""
+    assignment_service = AssignmentService(db)
+    teacher_id = db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+    assignment_id = assignment_service.create_assignment("客观题基准", "", teacher_id, None)
+
+    rng = random.Random(42)
+    questions = []
+    for i in range(question_count):
+        question_type = ('single_choice', 'multi_choice', 'fill_in')[i % 3]
+        answer = {'single_choice': 'B', 'multi_choice': 'A,C', 'fill_in': 'def'}[question_type]
+        questions.append((assignment_service.add_question(assignment_id, question_type, f"第 {i + 1} 题", answer, 2), question_type))
+
+    choices = {'single_choice': ['A', 'B', 'b '], 'multi_choice': ['AC', 'C,A', 'A'], 'fill_in': ['def', 'DEF', 'class']}
+    answer_sets = [
+        {question_id: rng.choice(choices[question_type]) for question_id, question_type in questions}
+        for _ in range(200)
+    ]
+    return assignment_id, answer_sets
+
+def legacy_grade(service, assignment_id, answers):
+    """原有流程：每份提交从数据库重建 Question，逐题标准化标准答案"""
+    total = 0
+    for question in service._load_questions(assignment_id):
+        if AIGrader.grade_objective(answers.get(question.id, ""), question.answer, question.type):
+            total += question.score
+    return total
+
+def cached_grade(service, assignment_id, answers):
+    """答案索引：缓存命中后一次遍历评分"""
+    return sum(score for score, _, _ in service._get_answer_key(assignment_id).grade_objective(answers).values())
+
+def measure(func, service, assignment_id, answer_sets, submissions):
+    start = time.perf_counter()
+    for i in range(submissions):
+        func(service, assignment_id, answer_sets[i % len(answer_sets)])
+    return submissions / (time.perf_counter() - start)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="客观题评分微基准")
+    parser.add_argument('--questions', type=int, default=40, help="每份作业的题目数")
+    parser.add_argument('--submissions', type=int, default=5000, help="评分的提交数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"客观题评分微基准 - {args.submissions} 份提交，每份 {args.questions} 题")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        assignment_id, answer_sets = prepare(db, args.questions)
+        service = SubmissionService(db)
+
+        # 两种方式的总分必须一致
+        for answers in answer_sets:
+            assert legacy_grade(service, assignment_id, answers) == cached_grade(service, assignment_id, answers)
+
+        legacy = measure(legacy_grade, service, assignment_id, answer_sets, args.submissions)
+        cached = measure(cached_grade, service, assignment_id, answer_sets, args.submissions)
+        db.close()
+
+    print(f"每次重建题目: {legacy:>10.0f} 份/秒")
+    print(f"答案索引:     {cached:>10.0f} 份/秒")
+    print(f"加速比: {cached / legacy:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+连接池性能测试脚本
+对比连接池与每次调用新建连接两种方式执行大量小查询的耗时
+"""
+import sys
+import os
+import time
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+
+QUERY = "SELECT id, username, role FROM user WHERE id = ?"
+
+def run_workload(db, count):
+    """执行 count 次小查询，返回耗时（秒）"""
+    start = time.perf_counter()
+    for i in range(count):
+        db.execute_query(QUERY, (i % 6 + 1,))
+    return time.perf_counter() - start
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="连接池性能测试")
+    parser.add_argument('--queries', type=int, default=10000, help="查询次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"连接池性能测试 - {args.queries} 次小查询")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+
+        legacy_db = DBManager(db_path, pool_size=0)
+        legacy_time = run_workload(legacy_db, args.queries)
+
+        pooled_db = DBManager(db_path)
+        pooled_time = run_workload(pooled_db, args.queries)
+        stats = pooled_db.get_pool_stats()
+        pooled_db.close()
+
+    print(f"  每次新建连接: {legacy_time:.3f}s ({args.queries / legacy_time:.0f} 次/秒)")
+    print(f"  连接池:       {pooled_time:.3f}s ({args.queries / pooled_time:.0f} 次/秒)")
+    print(f"  加速比:       {legacy_time / pooled_time:.1f}x")
+    print(f"  连接池统计:   {stats}")
+
+if __name__ == "__main__":
+    main()
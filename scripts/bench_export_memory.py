@@ -0,0 +1,82 @@
+"""
+成绩导出内存测试脚本
+对比一次性读取（fetchall）与流式读取（iter_query）导出成绩时的峰值内存
+"""
+import sys
+import os
+import time
+import tempfile
+import argparse
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+from utils.export_utils import ExportUtils
+
+def populate(db, students, assignments):
+    """生成一门课程的成绩表（students * assignments 行）"""
+    with db.get_connection_context() as conn:
+        teacher_id = conn.execute("SELECT id FROM user WHERE role = 'teacher' LIMIT 1").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO user (username, password, role, nickname) VALUES (?, '', 'student', ?)",
+            [(f"bench_{i}", f"学生{i}") for i in range(students)]
+        )
+        course_id = conn.execute(
+            "INSERT INTO course (title, teacher_id) VALUES ('导出测试', ?)", (teacher_id,)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO assignment (title, course_id, teacher_id, status) VALUES (?, ?, ?, 'graded')",
+            [(f"作业{a}", course_id, teacher_id) for a in range(assignments)]
+        )
+        conn.execute("""
+            INSERT INTO gradebook (student_id, course_id, assignment_id, score, grade)
+            SELECT u.id, a.course_id, a.id, (u.id * 7 + a.id) % 101, 'B'
+            FROM user u, assignment a
+            WHERE u.role = 'student' AND a.course_id = ?
+        """, (course_id,))
+    return course_id
+
+def fetchall_export(db, course_id, filename):
+    """原有方式：读取全部成绩后再写文件"""
+    rows = db.execute_query(
+        "SELECT * FROM gradebook g JOIN user u ON g.student_id = u.id WHERE g.course_id = ?", (course_id,)
+    )
+    return ExportUtils.export_rows_to_csv((tuple(row) for row in rows), filename)
+
+def measure(func):
+    """返回 (耗时秒, 峰值内存 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="成绩导出内存测试")
+    parser.add_argument('--students', type=int, default=20000, help="学生数量")
+    parser.add_argument('--assignments', type=int, default=10, help="作业数量")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"成绩导出内存测试 - {args.students * args.assignments} 行成绩")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        course_id = populate(db, args.students, args.assignments)
+        service = GradebookService(db)
+        output = os.path.join(tmp_dir, 'export.csv')
+
+        fetchall_time, fetchall_peak = measure(lambda: fetchall_export(db, course_id, output))
+        stream_time, stream_peak = measure(lambda: service.export_grades_csv(course_id, output))
+        db.close()
+
+    print(f"  fetchall:    {fetchall_time:.2f}s, 峰值内存 {fetchall_peak:.1f}MB")
+    print(f"  iter_query:  {stream_time:.2f}s, 峰值内存 {stream_peak:.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+首次评分耗时测试脚本
+每种情况在新的进程中运行，测量从启动到第一份主观题评分完成的时间：
+- 冷启动：第一次评分时才加载 jieba 词典
+- 预热：启动时后台预热，模拟界面初始化耗时后再评分
+"""
+import sys
+import os
+import time
+import json
+import argparse
+import subprocess
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STANDARD_ANSWER = "Python是一种解释型的高级编程语言"
+STUDENT_ANSWER = "Python是一种高级语言"
+
+def child(mode, startup_delay):
+    """子进程：输出首次评分耗时（毫秒）"""
+    start = time.perf_counter()
+    from modules.ai_grader import AIGrader, grader_warmup
+
+    if mode == 'warm':
+        grader_warmup.start()
+    # 模拟界面和服务初始化
+    time.sleep(startup_delay)
+
+    ready = time.perf_counter()
+    AIGrader.grade_subjective(STUDENT_ANSWER, STANDARD_ANSWER, 10)
+    done = time.perf_counter()
+    print(json.dumps({
+        'first_grade_ms': (done - ready) * 1000,
+        'since_start_ms': (done - start) * 1000
+    }))
+
+def measure(mode, startup_delay, runs):
+    """返回多次运行的首次评分耗时中位数（毫秒）"""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, '--startup-delay', str(startup_delay)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(json.loads(output.strip().splitlines()[-1])['first_grade_ms'])
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="首次评分耗时测试")
+    parser.add_argument('--runs', type=int, default=5, help="每种情况运行次数")
+    parser.add_argument('--startup-delay', type=float, default=1.5, help="模拟的界面初始化耗时（秒）")
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.startup_delay)
+        return
+
+    print("=" * 50)
+    print(f"首次评分耗时测试 - 每种情况 {args.runs} 个进程，界面初始化 {args.startup_delay}s")
+    print("=" * 50)
+
+    cold = measure('cold', args.startup_delay, args.runs)
+    warm = measure('warm', args.startup_delay, args.runs)
+
+    print(f"冷启动: {cold:>10.1f} ms  （首次评分时加载 jieba 词典）")
+    print(f"预热:   {warm:>10.1f} ms  （启动时后台预热）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+课程成绩矩阵基准
+对比原有的嵌套字典 + 学生 x 作业 Python 循环与 NumPy 成绩矩阵，并校验结果一致
+"""
+import sys
+import os
+import time
+import shutil
+import random
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+
+def prepare(db, students, assignments, fill_rate):
+    """创建课程、已批改的作业和学生成绩，fill_rate 为有成绩的比例"""
+    teacher_id = db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+    course_id = db.execute_update("INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("基准课程", teacher_id))
+    rng = random.Random(42)
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO assignment (title, course_id, teacher_id, status) VALUES (?, ?, ?, 'graded')",
+            [(f"作业 {i}", course_id, teacher_id) for i in range(assignments)]
+        )
+        db.execute_many(
+            "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+            [(f"matrix_student_{i}", f"学生{i:05d}") for i in range(students)]
+        )
+    assignment_ids = [row['id'] for row in db.execute_query("SELECT id FROM assignment WHERE course_id = ?", (course_id,))]
+    student_ids = [row['id'] for row in db.execute_query("SELECT id FROM user WHERE username LIKE 'matrix_student_%'")]
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO gradebook (student_id, course_id, assignment_id, score, grade, weight) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (student_id, course_id, assignment_id, rng.randint(30, 100), None, rng.choice((1.0, 2.0)))
+                for student_id in student_ids for assignment_id in assignment_ids
+                if rng.random() < fill_rate
+            ]
+        )
+    return course_id
+
+def legacy_course_grades(service, course_id):
+    """原有实现：嵌套字典，学生 x 作业 Python 循环计算统计"""
+    db = service.db
+    students = db.execute_named('gradebook.get_course_grades_students', (course_id,))
+    assignments = db.execute_named('gradebook.get_course_grades_assignments', (course_id,))
+    grade_matrix = {}
+    for grade in db.iter_named('gradebook.get_course_grades_grades', (course_id,)):
+        grade_matrix.setdefault(grade['student_id'], {})[grade['assignment_id']] = {
+            'score': grade['score'], 'grade': grade['grade'], 'comment': grade['comment']
+        }
+    student_stats = {}
+    for student in students:
+        student_grades = grade_matrix.get(student['student_id'], {})
+        total_score = 0
+        grade_count = 0
+        for assignment in assignments:
+            grade_data = student_grades.get(assignment['id'])
+            if grade_data and grade_data['score'] is not None:
+                total_score += grade_data['score']
+                grade_count += 1
+        average_score = total_score / grade_count if grade_count > 0 else None
+        student_stats[student['student_id']] = {
+            'total_score': total_score,
+            'average_score': average_score,
+            'average_grade': service.calculate_grade(average_score) if average_score is not None else None,
+            'grade_count': grade_count
+        }
+    return {
+        'students': [dict(s) for s in students],
+        'assignments': [dict(a) for a in assignments],
+        'grade_matrix': grade_matrix,
+        'student_stats': student_stats
+    }
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="课程成绩矩阵基准")
+    parser.add_argument('--students', type=int, default=2000, help="学生数")
+    parser.add_argument('--assignments', type=int, default=100, help="作业数")
+    parser.add_argument('--fill-rate', type=float, default=0.9, help="有成绩的比例")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        service = GradebookService(db)
+        course_id = prepare(db, args.students, args.assignments, args.fill_rate)
+        assignments = service._get_graded_assignments(course_id)
+
+        legacy_time, legacy = best_of(lambda: legacy_course_grades(service, course_id), args.repeat)
+        view_time, view = best_of(lambda: service.get_course_grades(course_id), args.repeat)
+        load_time, matrix = best_of(lambda: service.get_grade_matrix(course_id), args.repeat)
+        stats_time, _ = best_of(lambda: (matrix.totals(), matrix.averages(), matrix.weighted_averages(),
+                                         matrix.rankings(), matrix.assignment_means()), args.repeat)
+        stream_time, streamed = best_of(lambda: list(service.iter_export_rows(course_id, assignments)), args.repeat)
+        export_time, exported = best_of(matrix.export_rows, args.repeat)
+
+        assert view == legacy, "字典视图与原实现不一致"
+        assert exported == streamed, "矩阵导出与流式导出不一致"
+
+        print("=" * 56)
+        print(f"课程成绩矩阵基准 - {args.students} 名学生 x {args.assignments} 份作业")
+        print("=" * 56)
+        print(f"原实现 get_course_grades（嵌套字典）: {legacy_time * 1000:>9.1f} ms")
+        print(f"get_course_grades（矩阵 + 字典视图）:  {view_time * 1000:>9.1f} ms")
+        print(f"get_grade_matrix（读取并填充矩阵）:    {load_time * 1000:>9.1f} ms")
+        print(f"矩阵统计（总分/平均/加权/排名/作业均分）: {stats_time * 1000:>7.1f} ms")
+        print(f"流式导出 iter_export_rows:            {stream_time * 1000:>9.1f} ms")
+        print(f"矩阵导出 export_rows（矩阵已加载）:    {export_time * 1000:>9.1f} ms")
+        print("\n结果校验通过")
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
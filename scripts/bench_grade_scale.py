@@ -0,0 +1,77 @@
+"""
+成绩等级查找微基准
+对比原有的逐个遍历 GRADE_SCALE（单个分数）和 np.select（数组）与编译后的 GradeScale（bisect / searchsorted）
+"""
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from config import GRADE_SCALE
+from modules.grade_scale import GradeScale
+
+def legacy_grade(score, total_score=100):
+    """原 GradebookService.calculate_grade"""
+    if score is None:
+        return None
+    percentage = (score / total_score) * 100 if total_score > 0 else 0
+    for grade, (min_score, max_score) in GRADE_SCALE.items():
+        if min_score <= percentage <= max_score:
+            return grade
+    return 'F'
+
+def legacy_grade_array(scores, total_score=100):
+    """原 grade_matrix.letter_grades"""
+    scores = np.asarray(scores, dtype=np.float64)
+    percentage = (scores / total_score) * 100 if total_score > 0 else np.zeros_like(scores)
+    conditions = [(percentage >= low) & (percentage <= high) for low, high in GRADE_SCALE.values()]
+    grades = np.select(conditions, list(GRADE_SCALE.keys()), 'F').astype(object)
+    grades[np.isnan(scores)] = None
+    return grades
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="成绩等级查找微基准")
+    parser.add_argument('--count', type=int, default=1000000, help="分数个数")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # 整数分数，与原实现的闭区间一致（不含 89.5 这类落在空隙中的分数）
+    scores = [float(rng.randint(0, 100)) for _ in range(args.count)]
+    array = np.array(scores)
+    scale = GradeScale.from_config()
+
+    legacy_time, legacy = best_of(lambda: [legacy_grade(s) for s in scores], args.repeat)
+    bisect_time, compiled = best_of(lambda: [scale.grade(s) for s in scores], args.repeat)
+    select_time, legacy_array = best_of(lambda: legacy_grade_array(array), args.repeat)
+    search_time, compiled_array = best_of(lambda: scale.grade_array(array), args.repeat)
+
+    assert compiled == legacy, "bisect 查找与原实现不一致"
+    assert compiled_array.tolist() == legacy_array.tolist() == legacy, "searchsorted 查找与原实现不一致"
+
+    per_item = 1e9 / args.count
+    print("=" * 56)
+    print(f"成绩等级查找微基准 - {args.count} 个分数")
+    print("=" * 56)
+    print(f"原实现 calculate_grade（遍历区间）: {legacy_time * 1000:>9.1f} ms  {legacy_time * per_item:>6.0f} ns/个")
+    print(f"GradeScale.grade（bisect）:        {bisect_time * 1000:>9.1f} ms  {bisect_time * per_item:>6.0f} ns/个")
+    print(f"原实现 letter_grades（np.select）:  {select_time * 1000:>9.1f} ms  {select_time * per_item:>6.1f} ns/个")
+    print(f"GradeScale.grade_array（searchsorted）: {search_time * 1000:>5.1f} ms  {search_time * per_item:>6.1f} ns/个")
+    print("\n结果校验通过")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+成绩统计基准
+对比每次扫描成绩表的四条聚合查询与读取增量维护的汇总表，并测量触发器带来的写入开销
+"""
+import sys
+import os
+import time
+import shutil
+import random
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+from bench_grade_matrix import prepare
+
+# 原有的四条聚合查询
+LEGACY_QUERIES = {
+    'overall': """
+        SELECT COUNT(DISTINCT g.student_id) as total_students, AVG(g.score) as average_score,
+               MIN(g.score) as min_score, MAX(g.score) as max_score,
+               COUNT(CASE WHEN g.grade = 'A' THEN 1 END) as grade_a, COUNT(CASE WHEN g.grade = 'B' THEN 1 END) as grade_b,
+               COUNT(CASE WHEN g.grade = 'C' THEN 1 END) as grade_c, COUNT(CASE WHEN g.grade = 'D' THEN 1 END) as grade_d,
+               COUNT(CASE WHEN g.grade = 'F' THEN 1 END) as grade_f
+        FROM gradebook g WHERE g.course_id = ? AND g.score IS NOT NULL
+    """,
+    'assignments': """
+        SELECT a.id, a.title, a.type, AVG(g.score) as average_score, MIN(g.score) as min_score,
+               MAX(g.score) as max_score, COUNT(g.score) as submission_count
+        FROM assignment a LEFT JOIN gradebook g ON a.id = g.assignment_id
+        WHERE a.course_id = ? GROUP BY a.id, a.title, a.type ORDER BY a.created_at, a.id
+    """,
+    'ranking': """
+        SELECT g.student_id, u.nickname, u.username, AVG(g.score) as average_score, COUNT(g.score) as assignment_count
+        FROM gradebook g JOIN user u ON g.student_id = u.id
+        WHERE g.course_id = ? AND g.score IS NOT NULL
+        GROUP BY g.student_id, u.nickname, u.username ORDER BY average_score DESC
+    """,
+    'distribution': """
+        SELECT g.grade, COUNT(*) as count FROM gradebook g
+        WHERE g.course_id = ? AND g.grade IS NOT NULL GROUP BY g.grade ORDER BY g.grade
+    """
+}
+
+def legacy_statistics(db, course_id):
+    return {name: [dict(row) for row in db.execute_query(sql, (course_id,))] for name, sql in LEGACY_QUERIES.items()}
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def check(legacy, current):
+    """校验汇总结果与聚合查询一致（平均分允许浮点误差）"""
+    overall = legacy['overall'][0]
+    for key, value in overall.items():
+        assert abs((current['overall'][key] or 0) - (value or 0)) < 1e-6, key
+    for old, new in zip(legacy['assignments'], current['assignments']):
+        assert old['id'] == new['id'] and old['submission_count'] == new['submission_count']
+        assert abs((old['average_score'] or 0) - (new['average_score'] or 0)) < 1e-6
+    assert len(legacy['ranking']) == len(current['ranking'])
+    assert legacy['distribution'] == current['distribution']
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="成绩统计基准")
+    parser.add_argument('--students', type=int, default=2000, help="学生数")
+    parser.add_argument('--assignments', type=int, default=100, help="作业数")
+    parser.add_argument('--repeat', type=int, default=5, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        service = GradebookService(db)
+        course_id = prepare(db, args.students, args.assignments, 0.9)
+        # 基准数据直接插入，等级为空；补上等级使分布统计有数据
+        db.execute_update("""
+            UPDATE gradebook SET grade = CASE WHEN score >= 90 THEN 'A' WHEN score >= 80 THEN 'B'
+                WHEN score >= 70 THEN 'C' WHEN score >= 60 THEN 'D' ELSE 'F' END
+        """)
+
+        legacy_time, legacy = best_of(lambda: legacy_statistics(db, course_id), args.repeat)
+        current_time, current = best_of(lambda: service.get_grade_statistics(course_id), args.repeat)
+        check(legacy, current)
+        rebuild_time, _ = best_of(lambda: service.rebuild_grade_statistics(course_id), 1)
+
+        # 写入开销：相同的几批成绩分别在有、无触发器时整批更新（每批分数不同，触发器每行都要调整汇总）
+        assignment_id = db.execute_query("SELECT id FROM assignment WHERE course_id = ? LIMIT 1", (course_id,))[0]['id']
+        student_ids = [row['id'] for row in db.execute_query("SELECT id FROM user WHERE username LIKE 'matrix_student_%'")]
+        rng = random.Random(7)
+        batches = [
+            [{'student_id': student_id, 'score': rng.randint(30, 100)} for student_id in student_ids]
+            for _ in range(3)
+        ]
+        grade_data = batches[0]
+        pending = iter(batches)
+        with_triggers, _ = best_of(lambda: service.bulk_update_grades(assignment_id, next(pending)), len(batches))
+        triggers = [row['name'] for row in db.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'gradebook'")]
+        for name in triggers:
+            db.execute_update(f"DROP TRIGGER {name}")
+        pending = iter(batches)
+        without_triggers, _ = best_of(lambda: service.bulk_update_grades(assignment_id, next(pending)), len(batches))
+
+        print("=" * 56)
+        print(f"成绩统计基准 - {args.students} 名学生 x {args.assignments} 份作业")
+        print("=" * 56)
+        print(f"聚合查询（扫描成绩表）:      {legacy_time * 1000:>9.2f} ms")
+        print(f"读取汇总表:                  {current_time * 1000:>9.2f} ms  ({legacy_time / current_time:.0f}x)")
+        print(f"重建课程汇总:                {rebuild_time * 1000:>9.2f} ms")
+        print(f"批量更新 {len(grade_data)} 条成绩（有触发器）: {with_triggers * 1000:>7.1f} ms")
+        print(f"批量更新 {len(grade_data)} 条成绩（无触发器）: {without_triggers * 1000:>7.1f} ms")
+        print("\n结果校验通过")
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+成绩批量写入基准
+对比逐条 update_gradebook（先查询再插入或更新）与 executemany 批量插入或更新
+"""
+import sys
+import os
+import time
+import shutil
+import random
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+
+def prepare(db, students):
+    """创建课程、两份作业和学生，第一份作业的提交全部已评分"""
+    teacher_id = db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+    course_id = db.execute_update("INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("基准课程", teacher_id))
+    assignment_ids = [
+        db.execute_update("INSERT INTO assignment (title, course_id, teacher_id) VALUES (?, ?, ?)",
+                          (f"基准作业 {i}", course_id, teacher_id))
+        for i in range(2)
+    ]
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+            [(f"bench_student_{i}", f"学生{i}") for i in range(students)]
+        )
+    student_ids = [row['id'] for row in db.execute_query(
+        "SELECT id FROM user WHERE username LIKE 'bench_student_%' ORDER BY id")]
+
+    rng = random.Random(42)
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO submission (student_id, assignment_id, total_score, grading_status) VALUES (?, ?, ?, 'graded')",
+            [(student_id, assignment_ids[0], rng.randint(30, 100)) for student_id in student_ids]
+        )
+    grade_data = [{'student_id': student_id, 'score': rng.randint(30, 100)} for student_id in student_ids]
+    return course_id, assignment_ids, grade_data
+
+def legacy_bulk_update(service, course_id, assignment_id, grade_data):
+    """原有流程：一个事务中逐条 update_gradebook"""
+    with service.db.transaction():
+        for data in grade_data:
+            service.update_gradebook(data['student_id'], course_id, assignment_id, data['score'])
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="成绩批量写入基准")
+    parser.add_argument('--students', type=int, default=10000, help="学生数（每份作业的成绩条数）")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        service = GradebookService(db)
+        course_id, (imported_id, bulk_id), grade_data = prepare(db, args.students)
+
+        print("=" * 50)
+        print(f"成绩批量写入基准 - {args.students} 条成绩")
+        print("=" * 50)
+
+        legacy_insert = timed(legacy_bulk_update, service, course_id, bulk_id, grade_data)
+        legacy_update = timed(legacy_bulk_update, service, course_id, bulk_id, grade_data)
+        db.execute_update("DELETE FROM gradebook WHERE assignment_id = ?", (bulk_id,))
+
+        bulk_insert = timed(service.bulk_update_grades, bulk_id, grade_data)
+        bulk_update = timed(service.bulk_update_grades, bulk_id, grade_data)
+        import_insert = timed(service.import_grades_from_submissions, imported_id)
+        import_update = timed(service.import_grades_from_submissions, imported_id)
+
+        print(f"{'':<28} {'首次写入(s)':>12} {'重复写入(s)':>12}")
+        print(f"{'逐条 update_gradebook':<28} {legacy_insert:>12.3f} {legacy_update:>12.3f}")
+        print(f"{'bulk_update_grades':<28} {bulk_insert:>12.3f} {bulk_update:>12.3f}")
+        print(f"{'import_grades_from_submissions':<28} {import_insert:>12.3f} {import_update:>12.3f}")
+        print(f"\nbulk_update_grades 加速: {legacy_insert / bulk_insert:.1f}x / {legacy_update / bulk_update:.1f}x")
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
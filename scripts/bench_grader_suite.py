@@ -0,0 +1,245 @@
+"""
+AIGrader 评分性能基准套件
+- 按语言（中文/英文）、答案长度和与标准答案的相似度生成可复现的答案语料
+- 测量 grade_objective、grade_subjective（sklearn 与关键词覆盖率两条路径）和 batch_grade 的
+  吞吐量（份/秒）、单次耗时 p50/p99 和峰值内存
+- 结果输出为 JSON，用 --compare 与另一次提交的结果对比
+"""
+import sys
+import os
+import gc
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+import tracemalloc
+from contextlib import contextmanager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import ai_grader
+from modules.ai_grader import AIGrader, token_cache
+from modules.models import Question
+
+ZH_STANDARD = (
+    "Python 是 一种 解释型 的 高级 编程语言 支持 面向对象 函数式 和 过程式 编程 拥有 丰富 的 标准库 "
+    "和 第三方 生态 广泛 用于 数据分析 人工智能 网络 开发 和 自动化 运维"
+).split()
+ZH_VOCABULARY = (
+    "Java 编译型 静态类型 动态类型 垃圾回收 跨平台 语法 简洁 缩进 我认为 主要 用于 数据库 事务 索引 "
+    "线程 进程 协程 内存 管理 模块 异常 处理 列表 字典 元组 集合 迭代器 生成器 装饰器 网络 协议 文件 编码"
+).split()
+EN_STANDARD = (
+    "python is an interpreted high level programming language that supports object oriented functional "
+    "and procedural programming with a rich standard library and a large third party ecosystem"
+).split()
+EN_VOCABULARY = (
+    "java compiled static dynamic typing garbage collection cross platform syntax simple indentation "
+    "database transaction index thread process coroutine memory module exception list dictionary tuple "
+    "iterator generator decorator network protocol file encoding i think mainly used for"
+).split()
+
+LANGUAGES = {
+    'zh': (ZH_STANDARD, ZH_VOCABULARY, ""),
+    'en': (EN_STANDARD, EN_VOCABULARY, " ")
+}
+
+def make_corpus(language, count, length, similarity, seed=42):
+    """
+    生成 (标准答案, 答案列表)
+    length: 每份答案的词数；标准答案按需重复到同样长度
+    similarity: 每个位置保留标准答案原词的概率，其余替换为词表中的随机词
+    """
+    standard_words, vocabulary, sep = LANGUAGES[language]
+    rng = random.Random(f"{seed}-{language}-{length}-{similarity}")
+    standard = (standard_words * (length // len(standard_words) + 1))[:length]
+    answers = []
+    for _ in range(count):
+        words = [w if rng.random() < similarity else rng.choice(vocabulary) for w in standard]
+        # 末尾加一个随机词，保证答案互不相同，每份答案都要重新分词
+        words.append(rng.choice(vocabulary) + str(rng.randrange(10 ** 6)))
+        answers.append(sep.join(words))
+    return sep.join(standard), answers
+
+def make_objective_corpus(count, seed=42):
+    """生成客观题 (标准答案, 学生答案, 题型) 列表，约一半答对"""
+    rng = random.Random(f"{seed}-objective")
+    cases = []
+    for i in range(count):
+        question_type = ('single_choice', 'multi_choice', 'boolean', 'fill_in')[i % 4]
+        standard, right, wrong = {
+            'single_choice': ('B', ' b', 'C'),
+            'multi_choice': ('A,C,D', 'dca', 'A,C'),
+            'boolean': ('正确', '正确 ', '错误'),
+            'fill_in': ('__init__', ' __INIT__ ', '__new__')
+        }[question_type]
+        cases.append((rng.choice((right, wrong)), standard, question_type))
+    return cases
+
+@contextmanager
+def fallback_path():
+    """强制走未安装 sklearn 时的关键词覆盖率评分"""
+    saved = ai_grader.HAS_SKLEARN
+    ai_grader.HAS_SKLEARN = False
+    try:
+        yield
+    finally:
+        ai_grader.HAS_SKLEARN = saved
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def measure(func, items, answers_per_item=1):
+    """
+    逐项调用 func(item)，返回吞吐量、单次耗时分位数和峰值内存
+    峰值内存在第二遍中用 tracemalloc 单独测量，不影响耗时
+    """
+    token_cache.clear()
+    gc.collect()
+    timings = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    token_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'calls': len(items),
+        'answers_per_sec': round(len(items) * answers_per_item / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50) * 1000, 4),
+        'p99_ms': round(percentile(timings, 99) * 1000, 4),
+        'peak_mb': round(peak / 1024 / 1024, 3)
+    }
+
+def run_suite(args):
+    results = []
+
+    def record(name, params, stats):
+        results.append({'name': name, **params, **stats})
+        label = " ".join(f"{k}={v}" for k, v in params.items())
+        print(f"{name:<28} {label:<36} {stats['answers_per_sec']:>10.1f}/s "
+              f"p50={stats['p50_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms peak={stats['peak_mb']:.2f}MB",
+              file=sys.stderr)
+
+    cases = make_objective_corpus(args.count * 10, args.seed)
+    record('grade_objective', {}, measure(lambda c: AIGrader.grade_objective(*c), cases))
+
+    for language in args.languages:
+        for length in args.lengths:
+            for similarity in args.similarities:
+                params = {'language': language, 'length': length, 'similarity': similarity}
+                standard, answers = make_corpus(language, args.count, length, similarity, args.seed)
+                record('grade_subjective', params,
+                       measure(lambda a: AIGrader.grade_subjective(a, standard, 10), answers))
+                with fallback_path():
+                    record('grade_subjective_fallback', params,
+                           measure(lambda a: AIGrader.grade_subjective(a, standard, 10), answers))
+
+    # batch_grade：每份提交 4 道客观题 + 2 道主观题
+    for language in args.languages:
+        standard, answers = make_corpus(language, args.count * 2, args.lengths[0], args.similarities[0], args.seed)
+        objective = make_objective_corpus(4, args.seed)
+        questions = [
+            Question(i + 1, 1, question_type, f"第 {i + 1} 题", answer=answer, score=5)
+            for i, (_, answer, question_type) in enumerate(objective)
+        ]
+        questions += [Question(5, 1, 'short_answer', "简答 1", answer=standard, score=10),
+                      Question(6, 1, 'short_answer', "简答 2", answer=standard, score=10)]
+        submissions = [
+            {1: objective[0][0], 2: objective[1][0], 3: objective[2][0], 4: objective[3][0],
+             5: answers[2 * i], 6: answers[2 * i + 1]}
+            for i in range(args.count)
+        ]
+        params = {'language': language, 'length': args.lengths[0], 'similarity': args.similarities[0]}
+        record('batch_grade', params,
+               measure(lambda s: AIGrader.batch_grade(questions, s), submissions, answers_per_item=len(questions)))
+    return results
+
+def environment():
+    """记录运行环境，便于区分不同机器上的结果"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except Exception:
+        commit = None
+    info = {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'sklearn': ai_grader.HAS_SKLEARN,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    if ai_grader.HAS_SKLEARN:
+        import numpy
+        import sklearn
+        info['numpy_version'] = numpy.__version__
+        info['sklearn_version'] = sklearn.__version__
+    return info
+
+def result_key(result):
+    return (result['name'], result.get('language'), result.get('length'), result.get('similarity'))
+
+def compare(baseline, current):
+    """打印与基线结果的对比：吞吐量比值 > 1 表示变快"""
+    base = {result_key(r): r for r in baseline['results']}
+    print(f"\n与基线对比（基线提交 {baseline['environment'].get('commit')}）:", file=sys.stderr)
+    for result in current['results']:
+        old = base.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result['answers_per_sec'] / old['answers_per_sec'] if old['answers_per_sec'] else float('inf')
+        label = " ".join(str(v) for v in result_key(result)[1:] if v is not None)
+        print(f"  {result['name']:<28} {label:<16} 吞吐量 x{ratio:.2f}  "
+              f"p99 {old['p99_ms']:.3f} -> {result['p99_ms']:.3f}ms  "
+              f"内存 {old['peak_mb']:.2f} -> {result['peak_mb']:.2f}MB", file=sys.stderr)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="AIGrader 评分性能基准套件")
+    parser.add_argument('--count', type=int, default=200, help="每个场景的答案份数")
+    parser.add_argument('--languages', nargs='+', default=['zh', 'en'], choices=sorted(LANGUAGES), help="答案语言")
+    parser.add_argument('--lengths', nargs='+', type=int, default=[20, 200], help="答案词数")
+    parser.add_argument('--similarities', nargs='+', type=float, default=[0.8, 0.3], help="与标准答案的相似度")
+    parser.add_argument('--seed', type=int, default=42, help="语料随机种子")
+    parser.add_argument('--output', help="JSON 结果文件，默认输出到标准输出")
+    parser.add_argument('--compare', help="基线 JSON 结果文件")
+    args = parser.parse_args()
+
+    # 预热分词词典，避免计入第一次加载的时间
+    AIGrader.grade_subjective("预热评分", "预热评分", 1)
+
+    report = {
+        'environment': environment(),
+        'config': {k: getattr(args, k) for k in ('count', 'languages', 'lengths', 'similarities', 'seed')},
+        'results': run_suite(args)
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+if __name__ == '__main__':
+    main()
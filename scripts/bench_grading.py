@@ -0,0 +1,58 @@
+"""
+主观题评分吞吐量测试脚本
+对比逐份调用 grade_subjective 与 grade_subjective_batch，并校验两者分数一致
+"""
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.ai_grader import AIGrader
+
+STANDARD_ANSWER = "Python是一种解释型的高级编程语言，支持面向对象、函数式和过程式编程，拥有丰富的标准库和第三方生态"
+
+PHRASES = [
+    "Python", "是", "一种", "解释型", "的", "高级", "编程语言", "支持", "面向对象", "函数式",
+    "过程式", "编程", "拥有", "丰富", "标准库", "第三方", "生态", "Java", "编译型", "静态类型",
+    "动态类型", "垃圾回收", "跨平台", "语法简洁", "缩进", "我认为", "主要", "用于", "数据分析", "人工智能"
+]
+
+def generate_answers(count, seed=42):
+    """生成模拟的学生答案"""
+    rng = random.Random(seed)
+    return ["".join(rng.choices(PHRASES, k=rng.randint(5, 40))) for _ in range(count)]
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="主观题评分吞吐量测试")
+    parser.add_argument('--answers', type=int, default=300, help="答案份数（一个班级）")
+    args = parser.parse_args()
+
+    answers = generate_answers(args.answers)
+    # 预热分词词典，避免计入第一次加载的时间
+    AIGrader.grade_subjective(answers[0], STANDARD_ANSWER, 10)
+
+    print("=" * 50)
+    print(f"主观题评分吞吐量测试 - {args.answers} 份答案")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    single = [AIGrader.grade_subjective(a, STANDARD_ANSWER, 10) for a in answers]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = AIGrader.grade_subjective_batch(answers, STANDARD_ANSWER, 10)
+    batch_time = time.perf_counter() - start
+
+    max_diff = max(abs(s[0] - b[0]) for s, b in zip(single, batch))
+    feedback_diff = sum(1 for s, b in zip(single, batch) if s[1] != b[1])
+
+    print(f"逐份评分: {single_time * 1000:>10.1f} ms  ({len(answers) / single_time:>8.0f} 份/秒)")
+    print(f"批量评分: {batch_time * 1000:>10.1f} ms  ({len(answers) / batch_time:>8.0f} 份/秒)")
+    print(f"加速比: {single_time / batch_time:.1f}x")
+    print(f"最大分数差: {max_diff:.6f}，评语不一致: {feedback_diff} 份")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+索引效果测试脚本
+在生成的数据集（默认 10 万条提交）上，对比应用 0002 索引迁移前后热点查询的耗时
+"""
+import sys
+import os
+import time
+import random
+import sqlite3
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.schema_migrator import SchemaMigrator
+from modules.query_registry import query_registry
+from modules import (  # noqa: F401
+    analytics_service, assignment_service, course_service, discussion_service,
+    gradebook_service, notification_service, submission_service
+)
+
+STUDENTS = 2000
+COURSES = 20
+QUESTIONS_PER_ASSIGNMENT = 5
+CONTENTS_PER_COURSE = 5
+
+def populate(conn, submissions):
+    """生成数据集：每名学生提交 submissions / STUDENTS 份作业"""
+    rng = random.Random(42)
+    per_student = max(1, submissions // STUDENTS)
+    assignments = per_student * 4
+
+    conn.executemany(
+        "INSERT INTO user (username, password, role, nickname) VALUES (?, '', 'student', ?)",
+        [(f"bench_{i}", f"学生{i}") for i in range(STUDENTS)]
+    )
+    student_ids = [row[0] for row in conn.execute("SELECT id FROM user WHERE role = 'student'")]
+    teacher_id = conn.execute("SELECT id FROM user WHERE role = 'teacher' LIMIT 1").fetchone()[0]
+
+    conn.executemany(
+        "INSERT INTO course (id, title, teacher_id) VALUES (?, ?, ?)",
+        [(c, f"课程{c}", teacher_id) for c in range(1, COURSES + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO chapter (id, course_id, title) VALUES (?, ?, '第一章')",
+        [(c, c) for c in range(1, COURSES + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO course_content (chapter_id, title, content_type, order_index) VALUES (?, '内容', 'text', ?)",
+        [(c, i) for c in range(1, COURSES + 1) for i in range(CONTENTS_PER_COURSE)]
+    )
+    conn.executemany(
+        "INSERT INTO assignment (id, title, course_id, teacher_id, status) VALUES (?, ?, ?, ?, 'graded')",
+        [(a, f"作业{a}", a % COURSES + 1, teacher_id) for a in range(1, assignments + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO question (assignment_id, type, content, answer, score) VALUES (?, 'single_choice', '题目', 'A', 20)",
+        [(a,) for a in range(1, assignments + 1) for _ in range(QUESTIONS_PER_ASSIGNMENT)]
+    )
+    questions = {}
+    for qid, aid in conn.execute("SELECT id, assignment_id FROM question"):
+        questions.setdefault(aid, []).append(qid)
+
+    submission_rows = []
+    for student_id in student_ids:
+        for aid in rng.sample(range(1, assignments + 1), per_student):
+            submission_rows.append((student_id, aid, rng.randint(0, 100)))
+    conn.executemany(
+        "INSERT INTO submission (student_id, assignment_id, total_score, grading_status) VALUES (?, ?, ?, 'graded')",
+        submission_rows
+    )
+    conn.execute("""
+        INSERT INTO submission_detail (submission_id, question_id, student_answer, is_correct, score)
+        SELECT s.id, q.id, 'A', s.total_score % 2, s.total_score % 21
+        FROM submission s JOIN question q ON q.assignment_id = s.assignment_id
+    """)
+    conn.execute("""
+        INSERT INTO gradebook (student_id, course_id, assignment_id, score, grade)
+        SELECT s.student_id, a.course_id, s.assignment_id, s.total_score, 'B'
+        FROM submission s JOIN assignment a ON s.assignment_id = a.id
+    """)
+
+    posts = []
+    for i in range(submissions // 20):
+        posts.append((i % COURSES + 1, rng.choice(student_ids), f"帖子{i}"))
+    conn.executemany("INSERT INTO discussion (course_id, user_id, title, content) VALUES (?, ?, ?, '内容')", posts)
+    post_ids = [row[0] for row in conn.execute("SELECT id FROM discussion")]
+    conn.executemany(
+        "INSERT INTO discussion (course_id, user_id, content, parent_id) VALUES (?, ?, '回复', ?)",
+        [(rng.randint(1, COURSES), rng.choice(student_ids), rng.choice(post_ids)) for _ in range(len(post_ids) * 3)]
+    )
+    conn.executemany(
+        "INSERT INTO notification (user_id, type, title, is_read) VALUES (?, 'grade', '成绩已发布', ?)",
+        [(rng.choice(student_ids), rng.random() < 0.7) for _ in range(submissions * 2)]
+    )
+    contents = [row[0] for row in conn.execute("SELECT id FROM course_content")]
+    conn.executemany(
+        "INSERT INTO learning_progress (student_id, course_id, chapter_id, content_id, progress) VALUES (?, ?, ?, ?, 50)",
+        [(s, (cid - 1) // CONTENTS_PER_COURSE + 1, (cid - 1) // CONTENTS_PER_COURSE + 1, cid)
+         for s in student_ids for cid in contents]
+    )
+    conn.commit()
+    return student_ids, assignments, len(submission_rows), post_ids
+
+def hot_queries(student_ids, assignments, submissions, post_ids):
+    """热点查询及其参数生成函数"""
+    rng = random.Random(7)
+    return [
+        ('submission.get_submission_detail', lambda: (rng.randint(1, submissions),)),
+        ('analytics.get_question_statistics', lambda: (rng.randint(1, assignments),)),
+        ('discussion.get_course_discussions', lambda: (rng.randint(1, COURSES), 20, 0)),
+        ('discussion.get_post_replies', lambda: (rng.choice(post_ids),)),
+        ('notification.get_user_notifications',
+         lambda: {'user_id': rng.choice(student_ids), 'unread_only': 1, 'limit': 50}),
+        ('notification.get_notification_count',
+         lambda: {'user_id': rng.choice(student_ids), 'unread_only': 1}),
+        ('gradebook.get_course_grades_grades', lambda: (rng.randint(1, COURSES),)),
+        ('assignment.get_questions_by_assignment', lambda: (rng.randint(1, assignments),)),
+        ('course.update_learning_progress_check',
+         lambda: (rng.choice(student_ids), rng.randint(1, COURSES), rng.randint(1, COURSES * CONTENTS_PER_COURSE))),
+    ]
+
+def measure(conn, queries, runs):
+    """返回 {查询名: 平均耗时（毫秒）}"""
+    results = {}
+    for name, make_params in queries:
+        sql = query_registry.get(name).sql
+        start = time.perf_counter()
+        for _ in range(runs):
+            conn.execute(sql, make_params()).fetchall()
+        results[name] = (time.perf_counter() - start) * 1000 / runs
+    return results
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="索引效果测试")
+    parser.add_argument('--submissions', type=int, default=100000, help="提交记录数量")
+    parser.add_argument('--runs', type=int, default=20, help="每条查询的执行次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"索引效果测试 - {args.submissions} 条提交")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        empty_dir = os.path.join(tmp_dir, 'migrations')
+        os.makedirs(empty_dir)
+        conn = sqlite3.connect(os.path.join(tmp_dir, 'bench.db'))
+
+        # 只应用基线（版本 1），生成数据
+        SchemaMigrator(conn, migrations_dir=empty_dir).migrate()
+        start = time.perf_counter()
+        fixtures = populate(conn, args.submissions)
+        print(f"  生成数据: {time.perf_counter() - start:.1f}s")
+        queries = hot_queries(*fixtures)
+
+        before = measure(conn, queries, args.runs)
+        start = time.perf_counter()
+        SchemaMigrator(conn).migrate()
+        print(f"  应用索引迁移: {time.perf_counter() - start:.1f}s")
+        after = measure(conn, queries, args.runs)
+        conn.close()
+
+    print()
+    print(f"  {'查询':<42} {'迁移前(ms)':>10} {'迁移后(ms)':>10} {'加速比':>8}")
+    for name, _ in queries:
+        print(f"  {name:<42} {before[name]:>10.3f} {after[name]:>10.3f} {before[name] / after[name]:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+相似答案检测规模基准
+MinHash LSH 索引：建立耗时、单次查询耗时随索引规模的变化、全部相似簇的计算耗时
+与两两比较的估算耗时对照
+"""
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.plagiarism_index import MinHasher, PlagiarismIndex
+
+WORDS = [
+    "Python", "解释型", "高级", "编程", "语言", "面向对象", "函数式", "标准库", "变量", "类型",
+    "动态", "内存", "管理", "垃圾", "回收", "模块", "异常", "处理", "列表", "字典",
+    "元组", "集合", "迭代器", "生成器", "装饰器", "上下文", "线程", "进程", "协程", "网络",
+    "数据库", "事务", "索引", "查询", "文件", "读写", "字符串", "编码", "正则", "测试"
+]
+
+def make_answers(count, copy_rate, rng):
+    """随机答案，其中 copy_rate 比例改写自已有答案（替换一个词）"""
+    answers = []
+    for i in range(count):
+        if answers and rng.random() < copy_rate:
+            tokens = rng.choice(answers).split(" ")
+            tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+        else:
+            tokens = [rng.choice(WORDS) for _ in range(rng.randint(15, 30))]
+        answers.append(" ".join(tokens))
+    return answers
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="相似答案检测规模基准")
+    parser.add_argument('--answers', type=int, default=100000, help="索引中的答案数")
+    parser.add_argument('--copy-rate', type=float, default=0.05, help="改写自已有答案的比例")
+    parser.add_argument('--queries', type=int, default=200, help="每个规模点的查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    answers = make_answers(args.answers, args.copy_rate, rng)
+    index = PlagiarismIndex()
+
+    checkpoints = sorted({max(1, args.answers // 100), max(1, args.answers // 10), args.answers})
+    print(f"{'索引规模':>10} {'累计建立(s)':>12} {'单次查询(ms)':>14} {'两两比较估算(s)':>16}")
+    build_time = 0.0
+    added = 0
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        for key in range(added, checkpoint):
+            index.add(key, answers[key])
+        build_time += time.perf_counter() - start
+        added = checkpoint
+
+        samples = [answers[rng.randrange(checkpoint)] for _ in range(args.queries)]
+        start = time.perf_counter()
+        for text in samples:
+            index.query(text)
+        query_ms = (time.perf_counter() - start) / args.queries * 1000
+
+        # 两两比较：n(n-1)/2 次签名比较，按实测单次比较耗时估算
+        hasher = index.hasher
+        sig1, sig2 = hasher.signature(answers[0]), hasher.signature(answers[-1])
+        start = time.perf_counter()
+        for _ in range(2000):
+            MinHasher.similarity(sig1, sig2)
+        pair_cost = (time.perf_counter() - start) / 2000
+        pairwise = checkpoint * (checkpoint - 1) / 2 * pair_cost
+
+        print(f"{checkpoint:>10} {build_time:>12.2f} {query_ms:>14.3f} {pairwise:>16.1f}")
+
+    start = time.perf_counter()
+    clusters = index.clusters()
+    cluster_time = time.perf_counter() - start
+    members = sum(len(c['keys']) for c in clusters)
+    print(f"\n相似簇: {len(clusters)} 个，共 {members} 份答案，耗时 {cluster_time:.2f}s")
+    print(f"建立速度: {args.answers / build_time:.0f} 份/秒")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+SQL 性能分析开销测试脚本
+对比分析器关闭与开启时的查询耗时，并输出耗时最多的语句
+"""
+import sys
+import os
+import time
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.auth import AuthManager
+
+def run_workload(db, queries):
+    """登录查询 + 用户列表查询混合负载"""
+    auth = AuthManager(db)
+    start = time.perf_counter()
+    for i in range(queries):
+        if i % 2:
+            auth.login('admin', 'wrong_password')
+        else:
+            db.execute_query("SELECT id, nickname FROM user WHERE role = ?", ('student',))
+    return time.perf_counter() - start
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="SQL 性能分析开销测试")
+    parser.add_argument('--queries', type=int, default=10000, help="查询次数")
+    parser.add_argument('--top', type=int, default=10, help="报告条数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"SQL 性能分析开销测试 - {args.queries} 次查询")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        run_workload(db, 100)  # 预热
+
+        disabled = run_workload(db, args.queries)
+        profiler = db.enable_profiler(slow_log_path=os.path.join(tmp_dir, 'slow.log'))
+        enabled = run_workload(db, args.queries)
+        db.close()
+
+    print(f"  关闭: {disabled * 1000:.1f}ms")
+    print(f"  开启: {enabled * 1000:.1f}ms  (额外开销 {(enabled / disabled - 1) * 100:.1f}%)")
+    print()
+    print(profiler.format_report(args.top))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+作业重新评分扩展性测试脚本
+构造一份有大量提交的作业，分别用 1..N 个评分进程重新评分，输出吞吐量和相对单进程的加速比
+"""
+import sys
+import os
+import random
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+
+ESSAY_ANSWER = "列表是可变的，可以修改元素；元组是不可变的，创建后不能修改。列表使用方括号，元组使用圆括号。"
+
+PHRASES = ["列表", "元组", "可变", "不可变", "修改", "元素", "创建", "方括号", "圆括号", "Python",
+           "数据结构", "性能", "哈希", "字典", "不知道", "区别", "使用", "场景"]
+
+def populate(db, submissions):
+    """创建 2 道选择题和 2 道简答题，直接批量插入提交和详情，返回作业 ID"""
+    assignment_service = AssignmentService(db)
+    teacher_id = db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+    assignment_id = assignment_service.create_assignment("重新评分测试", "", teacher_id, None)
+    question_ids = [
+        assignment_service.add_question(assignment_id, 'single_choice', "选择题 1", 'A', 10),
+        assignment_service.add_question(assignment_id, 'single_choice', "选择题 2", 'C', 10),
+        assignment_service.add_question(assignment_id, 'short_answer', "简答题 1", ESSAY_ANSWER, 40),
+        assignment_service.add_question(assignment_id, 'short_answer', "简答题 2", ESSAY_ANSWER, 40)
+    ]
+
+    rng = random.Random(42)
+    student_ids = [row['id'] for row in db.execute_query("SELECT id FROM user WHERE role = 'student'")]
+    with db.get_connection_context() as conn:
+        conn.executemany(
+            "INSERT INTO submission (student_id, assignment_id, total_score) VALUES (?, ?, 0)",
+            [(student_ids[i % len(student_ids)], assignment_id) for i in range(submissions)]
+        )
+        ids = [row[0] for row in conn.execute("SELECT id FROM submission WHERE assignment_id = ?", (assignment_id,))]
+        conn.executemany(
+            "INSERT INTO submission_detail (submission_id, question_id, student_answer, score) VALUES (?, ?, ?, 0)",
+            (
+                (submission_id, question_id,
+                 rng.choice('ABCD') if index < 2 else "".join(rng.choices(PHRASES, k=rng.randint(3, 20))))
+                for submission_id in ids
+                for index, question_id in enumerate(question_ids)
+            )
+        )
+    return assignment_id
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="作业重新评分扩展性测试")
+    parser.add_argument('--submissions', type=int, default=50000, help="提交数量")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="最多评分进程数")
+    parser.add_argument('--shard-size', type=int, default=None, help="每个分片的提交数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"作业重新评分扩展性测试 - {args.submissions} 份提交，每份 4 题（2 道简答题）")
+    print("=" * 50)
+
+    # 0 表示在当前进程中评分，作为参照
+    worker_counts = [0] + sorted({1, args.max_workers} | {n for n in (2, 4, 8, 16) if n < args.max_workers})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'), storage_profile='wal')
+        assignment_id = populate(db, args.submissions)
+        service = SubmissionService(db)
+
+        baseline = None
+        print(f"{'进程数':>6} {'耗时(s)':>10} {'提交/秒':>10} {'加速比':>8}")
+        for workers in worker_counts:
+            result = service.regrade_assignment(assignment_id, workers=workers, shard_size=args.shard_size)
+            rate = result['regraded'] / result['elapsed']
+            if workers == 0:
+                print(f"{'当前进程':>4} {result['elapsed']:>10.2f} {rate:>10.0f} {'-':>8}")
+                continue
+            baseline = baseline or rate
+            print(f"{workers:>6} {result['elapsed']:>10.2f} {rate:>10.0f} {rate / baseline:>7.2f}x")
+        db.close()
+
+    print("\n注：耗时包含评分进程启动（spawn 后导入 jieba / sklearn）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+课程成绩报告单基准
+对比逐个学生调用 generate_report_card 与 generate_report_cards 批量生成，并校验结果一致
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+from bench_grade_matrix import prepare, best_of
+
+def count_queries(db, func):
+    """执行 func 并统计其间 execute_named 的调用次数"""
+    calls = [0]
+    original = db.execute_named
+
+    def counted(*args, **kwargs):
+        calls[0] += 1
+        return original(*args, **kwargs)
+
+    db.execute_named = counted
+    try:
+        func()
+    finally:
+        db.execute_named = original
+    return calls[0]
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="课程成绩报告单基准")
+    parser.add_argument('--students', type=int, default=500, help="学生数")
+    parser.add_argument('--assignments', type=int, default=30, help="作业数")
+    parser.add_argument('--fill-rate', type=float, default=0.9, help="有成绩的比例")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'))
+        service = GradebookService(db)
+        course_id = prepare(db, args.students, args.assignments, args.fill_rate)
+        student_ids = [row['student_id'] for row in db.execute_named('gradebook.get_course_grades_students', (course_id,))]
+
+        def per_student_finals():
+            return {student_id: service.calculate_final_grade(student_id, course_id) for student_id in student_ids}
+
+        def per_student_cards():
+            return [service.generate_report_card(student_id, course_id) for student_id in student_ids]
+
+        final_loop_time, final_loop = best_of(per_student_finals, args.repeat)
+        final_batch_time, final_batch = best_of(lambda: service.calculate_course_final_grades(course_id), args.repeat)
+        card_loop_time, card_loop = best_of(per_student_cards, args.repeat)
+        card_batch_time, card_batch = best_of(lambda: service.generate_report_cards(course_id), args.repeat)
+        loop_queries = count_queries(db, per_student_cards)
+        batch_queries = count_queries(db, lambda: service.generate_report_cards(course_id))
+
+        assert final_batch == final_loop, "课程最终成绩与逐个计算不一致"
+        for card in card_loop + card_batch:
+            del card['generated_date']
+        assert card_batch == card_loop, "批量报告单与逐个生成不一致"
+
+        print("=" * 56)
+        print(f"成绩报告单基准 - {args.students} 名学生 x {args.assignments} 份作业")
+        print("=" * 56)
+        print(f"逐个 calculate_final_grade:       {final_loop_time * 1000:>9.1f} ms")
+        print(f"calculate_course_final_grades:    {final_batch_time * 1000:>9.1f} ms")
+        print(f"逐个 generate_report_card:        {card_loop_time * 1000:>9.1f} ms  ({loop_queries} 次查询)")
+        print(f"generate_report_cards:            {card_batch_time * 1000:>9.1f} ms  ({batch_queries} 次查询)")
+        print("\n结果校验通过")
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
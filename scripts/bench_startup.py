@@ -0,0 +1,81 @@
+"""
+启动耗时测试脚本
+在已填充数据的数据库上，对比每次执行 start.sql 与基于版本号的迁移检查
+"""
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from config import SQL_SCRIPT_PATH
+
+def populate(db, students, submissions):
+    """批量填充用户和提交记录"""
+    with db.get_connection_context() as conn:
+        conn.executemany(
+            "INSERT INTO user (username, password, role, nickname) VALUES (?, '', 'student', ?)",
+            [(f"bench_{i}", f"学生{i}") for i in range(students)]
+        )
+        teacher_id = conn.execute("SELECT id FROM user WHERE role = 'teacher' LIMIT 1").fetchone()[0]
+        assignment_id = conn.execute(
+            "INSERT INTO assignment (title, teacher_id) VALUES ('启动测试', ?)", (teacher_id,)
+        ).lastrowid
+        student_ids = [row[0] for row in conn.execute("SELECT id FROM user WHERE role = 'student'")]
+        conn.executemany(
+            "INSERT INTO submission (student_id, assignment_id, total_score) VALUES (?, ?, ?)",
+            [(student_ids[i % len(student_ids)], assignment_id, i % 100) for i in range(submissions)]
+        )
+
+def legacy_init(db_path):
+    """原有的初始化方式：每次都执行完整的 start.sql"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    with open(SQL_SCRIPT_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.commit()
+    conn.close()
+
+def measure(func, runs):
+    """返回多次运行的耗时中位数（毫秒）"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="启动耗时测试")
+    parser.add_argument('--students', type=int, default=5000, help="学生数量")
+    parser.add_argument('--submissions', type=int, default=100000, help="提交记录数量")
+    parser.add_argument('--runs', type=int, default=20, help="重复次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"启动耗时测试 - {args.students} 名学生, {args.submissions} 条提交")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        db = DBManager(db_path)
+        populate(db, args.students, args.submissions)
+        db.close()
+
+        def migrate_init():
+            DBManager(db_path).close()
+
+        legacy_ms = measure(lambda: legacy_init(db_path), args.runs)
+        migrate_ms = measure(migrate_init, args.runs)
+
+    print(f"  执行 start.sql:   {legacy_ms:.2f}ms")
+    print(f"  版本检查:         {migrate_ms:.2f}ms")
+    print(f"  加速比:           {legacy_ms / migrate_ms:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+存储配置并发性能测试脚本
+在后台持续执行 submit_assignment 写入的同时，测量通知查询（读）的延迟
+"""
+import sys
+import os
+import time
+import tempfile
+import threading
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+from modules.notification_service import NotificationService
+from config import DB_STORAGE_PROFILES
+
+def prepare_assignment(db):
+    """创建测试作业和题目，返回 (assignment_id, answers, student_ids)"""
+    assignment_service = AssignmentService(db)
+    teacher_id = db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+    assignment_id = assignment_service.create_assignment("并发测试作业", "", teacher_id, None)
+
+    answers = {}
+    for i in range(20):
+        question_id = assignment_service.add_question(
+            assignment_id, 'single_choice', f"第 {i + 1} 题", 'A', 5
+        )
+        answers[question_id] = 'A' if i % 3 else 'B'
+
+    student_ids = [row['id'] for row in db.execute_query("SELECT id FROM user WHERE role = 'student'")]
+    return assignment_id, answers, student_ids
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+def run_profile(profile, submissions):
+    """在指定存储配置下运行读写并发负载"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+        assignment_id, answers, student_ids = prepare_assignment(db)
+        submission_service = SubmissionService(db)
+        notification_service = NotificationService(db)
+
+        done = threading.Event()
+        latencies = []
+
+        def writer():
+            try:
+                for i in range(submissions):
+                    submission_service.submit_assignment(
+                        student_ids[i % len(student_ids)], assignment_id, answers
+                    )
+            finally:
+                done.set()
+
+        def reader():
+            user_id = student_ids[0]
+            while not done.is_set():
+                start = time.perf_counter()
+                notification_service.get_notification_count(user_id, unread_only=True)
+                notification_service.get_user_notifications(user_id, unread_only=True, limit=20)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        db.close()
+
+    return {
+        'elapsed': elapsed,
+        'reads': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies) if latencies else 0
+    }
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="存储配置并发性能测试")
+    parser.add_argument('--submissions', type=int, default=500, help="写入的提交次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"存储配置并发测试 - {args.submissions} 次提交")
+    print("=" * 50)
+
+    for profile in DB_STORAGE_PROFILES:
+        result = run_profile(profile, args.submissions)
+        print(f"\n[{profile}]")
+        print(f"  写入耗时:     {result['elapsed']:.2f}s ({args.submissions / result['elapsed']:.0f} 次提交/秒)")
+        print(f"  读取次数:     {result['reads']}")
+        print(f"  读延迟 p50:   {result['p50']:.2f}ms")
+        print(f"  读延迟 p99:   {result['p99']:.2f}ms")
+        print(f"  读延迟 max:   {result['max']:.2f}ms")
+
+if __name__ == "__main__":
+    main()
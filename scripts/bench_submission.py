@@ -0,0 +1,74 @@
+"""
+作业提交吞吐量测试脚本
+对比逐条提交（每一步单独提交事务）与 transaction() 工作单元下的 submit_assignment
+"""
+import sys
+import os
+import time
+import tempfile
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.submission_service import SubmissionService
+from config import DB_STORAGE_PROFILES
+from scripts.bench_storage_profile import prepare_assignment
+
+def legacy_submit(service, student_id, assignment_id, answers):
+    """原有流程：插入提交、批量插入详情、更新总分各自提交一次"""
+    questions = service._get_questions(assignment_id)
+    submission_id = service._create_submission(student_id, assignment_id)
+    total_score = 0
+    details = []
+    for question in questions:
+        student_answer = answers.get(question.id, "")
+        score, is_correct, feedback = service._grade_question(question, student_answer)
+        total_score += score
+        details.append({
+            'submission_id': submission_id,
+            'question_id': question.id,
+            'student_answer': student_answer,
+            'is_correct': is_correct,
+            'score': score,
+            'ai_feedback': feedback
+        })
+    service._save_submission_details(details)
+    service._update_total_score(submission_id, total_score)
+    return submission_id, total_score
+
+def run(profile, submissions, submit):
+    """返回每秒提交数"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DBManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+        assignment_id, answers, student_ids = prepare_assignment(db)
+        service = SubmissionService(db)
+
+        start = time.perf_counter()
+        for i in range(submissions):
+            submit(service, student_ids[i % len(student_ids)], assignment_id, answers)
+        elapsed = time.perf_counter() - start
+        db.close()
+    return submissions / elapsed
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="作业提交吞吐量测试")
+    parser.add_argument('--submissions', type=int, default=500, help="提交次数")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"作业提交吞吐量测试 - {args.submissions} 次提交，每次 20 题")
+    print("=" * 50)
+
+    for profile in DB_STORAGE_PROFILES:
+        legacy = run(profile, args.submissions, legacy_submit)
+        unit_of_work = run(
+            profile, args.submissions,
+            lambda service, *submit_args: service.submit_assignment(*submit_args)
+        )
+        print(f"\n[{profile}]")
+        print(f"  逐条提交:    {legacy:.1f} 次/秒")
+        print(f"  单一事务:    {unit_of_work:.1f} 次/秒  ({unit_of_work / legacy:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -52,7 +52,7 @@ def check_directories():
     """检查必要的目录"""
     print("\n检查目录结构...")
     
-    directories = ['data', 'logs', 'modules', 'ui', 'tests', 'docs']
+    directories = ['data', 'logs', 'modules', 'ui', 'tests', 'docs', 'migrations']
     all_exist = True
     
     for directory in directories:
@@ -0,0 +1,56 @@
+"""
+索引顾问脚本
+对所有已注册的服务查询执行 EXPLAIN QUERY PLAN，列出存在全表扫描的查询
+"""
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.index_advisor import IndexAdvisor
+from modules.query_registry import query_registry
+# 导入服务模块以注册其查询
+from modules import (  # noqa: F401
+    auth, analytics_service, assignment_service, class_service, course_service,
+    discussion_service, gradebook_service, notification_service, submission_service
+)
+
+# 数据量小、全表扫描可以接受的表
+SMALL_TABLES = ('user', 'class', 'course', 'chapter', 'assignment', 'system_setting')
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="索引顾问")
+    parser.add_argument('--db', help="数据库路径，默认使用配置中的数据库")
+    parser.add_argument('--all-tables', action='store_true', help="小表的全表扫描也列出")
+    parser.add_argument('--verbose', action='store_true', help="输出完整执行计划")
+    args = parser.parse_args()
+
+    db = DBManager(args.db)
+    queries = [(name, query_registry.get(name).sql) for name in query_registry.names()]
+
+    with db.get_connection_context(readonly=True) as conn:
+        advisor = IndexAdvisor(conn, ignore_tables=() if args.all_tables else SMALL_TABLES)
+        findings, errors = advisor.advise(queries)
+    db.close()
+
+    print("=" * 50)
+    print(f"索引顾问 - 检查 {len(queries)} 条查询，{len(findings)} 条存在全表扫描")
+    print("=" * 50)
+    for result in findings:
+        print(f"\n{result['name']}")
+        print(f"  全表扫描: {', '.join(result['full_scans'])}")
+        if result['temp_btree']:
+            print(f"  临时排序: {'; '.join(result['temp_btree'])}")
+        if args.verbose:
+            for detail in result['plan']:
+                print(f"    {detail}")
+
+    if errors:
+        print(f"\n无法分析的查询（{len(errors)} 条）:")
+        for name, error in errors:
+            print(f"  {name}: {error}")
+
+if __name__ == "__main__":
+    main()
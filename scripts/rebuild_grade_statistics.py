@@ -0,0 +1,31 @@
+"""
+重建成绩统计汇总
+成绩统计汇总表由成绩表上的触发器增量维护；直接修改过数据库文件或怀疑汇总不一致时运行本脚本
+"""
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="重建成绩统计汇总")
+    parser.add_argument('--db', help="数据库路径，默认使用配置中的数据库")
+    parser.add_argument('--course', type=int, help="只重建该课程，默认重建所有课程")
+    args = parser.parse_args()
+
+    db = DBManager(args.db)
+    start = time.perf_counter()
+    GradebookService(db).rebuild_grade_statistics(args.course)
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    scope = f"课程 {args.course}" if args.course is not None else "所有课程"
+    print(f"{scope}的成绩统计汇总已重建，耗时 {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
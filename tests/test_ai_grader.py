@@ -4,10 +4,14 @@ AI评分模块测试
 import unittest
 import sys
 import os
+import shutil
+import tempfile
+import numpy as np
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.ai_grader import AIGrader
+from modules.ai_grader import AIGrader, TokenCache, GraderWarmup, EmbeddingCache, HashedEmbeddingBackend
+from modules.models import Question
 
 class TestAIGrader(unittest.TestCase):
     def test_grade_objective_correct(self):
@@ -23,6 +27,12 @@ class TestAIGrader(unittest.TestCase):
         result = AIGrader.grade_objective(" A ", "A")
         self.assertTrue(result)
 
+    def test_grade_objective_multi_choice(self):
+        """测试多选题评分 - 不考虑选项顺序和分隔符"""
+        self.assertTrue(AIGrader.grade_objective("c, a", "AC", 'multi_choice'))
+        self.assertTrue(AIGrader.grade_objective("A、C", "C A", 'multi_choice'))
+        self.assertFalse(AIGrader.grade_objective("A", "AC", 'multi_choice'))
+
     def test_grade_objective_incorrect(self):
         """测试客观题评分 - 错误答案"""
         result = AIGrader.grade_objective("A", "B")
@@ -46,5 +56,120 @@ class TestAIGrader(unittest.TestCase):
         self.assertEqual(score, 0)
         self.assertEqual(feedback, "未作答")
 
+    def test_grade_subjective_batch_matches_single(self):
+        """测试主观题批量评分 - 与逐份评分结果一致"""
+        standard_answer = "Python是一种解释型的高级编程语言，支持面向对象和函数式编程"
+        student_answers = [
+            "",
+            "Python是一种高级编程语言",
+            standard_answer,
+            "Java是一种编译型的静态类型语言",
+            "完全无关的内容",
+            "PYTHON python 编程 编程 编程",
+            "我"
+        ]
+
+        results = AIGrader.grade_subjective_batch(student_answers, standard_answer, 10)
+
+        self.assertEqual(len(results), len(student_answers))
+        for answer, (score, feedback) in zip(student_answers, results):
+            expected_score, expected_feedback = AIGrader.grade_subjective(answer, standard_answer, 10)
+            self.assertAlmostEqual(score, expected_score, places=6)
+            self.assertEqual(feedback, expected_feedback)
+
+    def test_token_cache(self):
+        """测试分词缓存 - 重复文本只分词一次"""
+        cache = TokenCache(maxsize=2)
+        first = cache.cut("不知道")
+        self.assertEqual(cache.cut("不知道"), first)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        # 超出容量时淘汰最久未使用的条目
+        cache.cut("Python是一种编程语言")
+        cache.cut("标准答案")
+        self.assertEqual(cache.stats()['size'], 2)
+        cache.cut("不知道")
+        self.assertEqual(cache.stats()['misses'], 4)
+
+    def test_grade_subjective_with_standard_tokens(self):
+        """测试主观题评分 - 使用预先计算的标准答案分词"""
+        standard_answer = "Python是一种解释型的高级编程语言"
+        tokens = list(AIGrader.tokenize(standard_answer))
+        self.assertEqual(
+            AIGrader.grade_subjective("Python是高级语言", standard_answer, 10, tokens),
+            AIGrader.grade_subjective("Python是高级语言", standard_answer, 10)
+        )
+
+    def test_grader_warmup(self):
+        """测试评分器预热 - 后台完成后标记就绪"""
+        warmup = GraderWarmup({'jieba_cache_dir': None, 'wait_timeout': 30})
+        self.assertFalse(warmup.wait())  # 未启动时不等待
+
+        warmup.start()
+        self.assertTrue(warmup.wait())
+        self.assertTrue(warmup.ready)
+        self.assertIsNotNone(warmup.elapsed)
+
+    def test_batch_grade_many_matches_batch_grade(self):
+        """测试多份提交批量评分 - 与逐份 batch_grade 结果一致"""
+        questions = [
+            Question(1, 1, 'single_choice', "选择题", answer='A', score=5),
+            Question(2, 1, 'short_answer', "简答题", answer="Python是一种解释型的高级编程语言", score=10)
+        ]
+        answer_sets = [
+            {1: 'A', 2: "Python是高级语言"},
+            {1: 'b', 2: ""},
+            {2: "不知道"}
+        ]
+
+        results = AIGrader.batch_grade_many(questions, answer_sets)
+
+        self.assertEqual(results, [AIGrader.batch_grade(questions, answers) for answers in answer_sets])
+
+    def test_hashed_embedding_backend(self):
+        """测试字符 n-gram 向量评分后端 - 同义改写的得分高于答非所问"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cache_path = os.path.join(tmp_dir, 'embedding_cache.npz')
+            backend = HashedEmbeddingBackend(EmbeddingCache(cache_path))
+            standard_answer = "元组是不可变的，创建后不能修改；列表是可变的"
+            results = AIGrader.grade_subjective_batch(
+                ["元组创建之后无法修改，列表可以修改", "数据库用来存储数据", ""],
+                standard_answer, 10, backend=backend
+            )
+            self.assertGreater(results[0][0], results[1][0])
+            self.assertEqual(results[2], (0.0, "未作答"))
+
+            # 未命中时不写回文件，写回后新的缓存实例可以直接读到
+            self.assertFalse(os.path.exists(cache_path))
+            backend.cache.flush()
+            self.assertIsNotNone(EmbeddingCache(cache_path).get(standard_answer))
+
+            # 默认的哈希向量后端只在内存中缓存
+            self.assertIsNone(HashedEmbeddingBackend().cache.path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_embedding_cache_flush_every(self):
+        """测试向量缓存每新增 flush_every 个向量写回一次文件"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cache_path = os.path.join(tmp_dir, 'embedding_cache.npz')
+            cache = EmbeddingCache(cache_path, flush_every=3)
+            cache.put("a", np.ones(4, dtype=np.float32))
+            cache.put("b", np.ones(4, dtype=np.float32))
+            self.assertFalse(os.path.exists(cache_path))
+            cache.put("c", np.ones(4, dtype=np.float32))
+            self.assertTrue(os.path.exists(cache_path))
+            self.assertIsNotNone(EmbeddingCache(cache_path).get("c"))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_grade_subjective_batch_empty_standard(self):
+        """测试主观题批量评分 - 标准答案为空"""
+        results = AIGrader.grade_subjective_batch(["答案", ""], "", 10)
+        self.assertEqual(results, [(5.0, "标准答案为空，给予基础分"), (0.0, "未作答")])
+
 if __name__ == '__main__':
     unittest.main()
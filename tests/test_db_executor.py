@@ -0,0 +1,86 @@
+"""
+后台数据库执行器测试
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.db_executor import DBExecutor
+from modules.notification_service import NotificationService
+
+class TestDBExecutor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.executor = DBExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_service_call_in_worker(self):
+        """测试服务调用在工作线程中执行"""
+        service = NotificationService(self.db)
+        user_id = self.db.execute_query("SELECT id FROM user LIMIT 1")[0]['id']
+        service.create_notification(user_id, 'system', '测试')
+
+        threads = []
+
+        def call():
+            threads.append(threading.current_thread().name)
+            return service.get_notification_count(user_id)
+
+        self.assertEqual(self.executor.submit(call).result(timeout=5), 1)
+        self.assertTrue(threads[0].startswith('db-worker'))
+
+    def test_stats(self):
+        """测试执行统计"""
+        self.executor.submit(lambda: 1).result(timeout=5)
+        failed = self.executor.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            failed.result(timeout=5)
+
+        stats = self.executor.stats()
+        self.assertEqual(stats['submitted'], 2)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_cancel_pending(self):
+        """测试取消尚未开始的调用"""
+        gate = threading.Event()
+        running = [self.executor.submit(gate.wait) for _ in range(2)]
+        pending = self.executor.submit(lambda: 'never')
+        self.assertTrue(pending.cancel())
+        gate.set()
+        for future in running:
+            future.result(timeout=5)
+        self.assertEqual(self.executor.stats()['cancelled'], 1)
+
+    def test_shutdown_cancels_pending(self):
+        """测试关闭时取消尚未开始的调用，不依赖 Python 3.9 的 cancel_futures 参数"""
+        gate = threading.Event()
+        running = [self.executor.submit(gate.wait) for _ in range(2)]
+        pending = [self.executor.submit(lambda: 'never') for _ in range(3)]
+        pool = self.executor._executor
+        with mock.patch.object(pool, 'shutdown', wraps=pool.shutdown) as shutdown:
+            self.executor.shutdown()
+        shutdown.assert_called_once_with(wait=False)
+        self.assertTrue(all(future.cancelled() for future in pending))
+
+        gate.set()
+        for future in running:
+            self.assertTrue(future.result(timeout=5))
+        stats = self.executor.stats()
+        self.assertEqual((stats['cancelled'], stats['completed'], stats['in_flight']), (3, 2, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,478 @@
+"""
+数据库管理模块测试
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.exceptions import DatabaseError, DatabaseLockedError, IntegrityConstraintError
+from modules.schema_migrator import SchemaMigrator
+from modules.query_registry import QueryRegistry, query_registry
+from modules.index_advisor import IndexAdvisor
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：使用临时数据库"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'), pool_size=2)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_connection_reused(self):
+        """测试连接复用"""
+        for _ in range(10):
+            rows = self.db.execute_query("SELECT username FROM user WHERE username = ?", ('admin',))
+            self.assertEqual(rows[0]['username'], 'admin')
+
+        stats = self.db.get_pool_stats()['read']
+        self.assertEqual(stats['open_connections'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 9)
+
+    def test_foreign_keys_enabled(self):
+        """测试复用的连接仍启用外键约束"""
+        rows = self.db.execute_query("PRAGMA foreign_keys")
+        self.assertEqual(rows[0][0], 1)
+
+    def test_pool_is_bounded(self):
+        """测试连接数不超过上限，池满时等待"""
+        first = self.db.read_pool.acquire()
+        second = self.db.read_pool.acquire()
+        result = {}
+
+        def worker():
+            conn = self.db.read_pool.acquire()
+            result['conn'] = conn
+            self.db.read_pool.release(conn)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+
+        self.db.read_pool.release(first)
+        thread.join(5)
+        self.db.read_pool.release(second)
+
+        self.assertIs(result['conn'], first)
+        stats = self.db.get_pool_stats()['read']
+        self.assertEqual(stats['open_connections'], 2)
+        self.assertGreaterEqual(stats['waits'], 1)
+
+    def test_acquire_timeout(self):
+        """测试等待超时"""
+        self.db.read_pool.timeout = 0.1
+        first = self.db.read_pool.acquire()
+        second = self.db.read_pool.acquire()
+        with self.assertRaises(DatabaseError):
+            self.db.read_pool.acquire()
+        self.db.read_pool.release(first)
+        self.db.read_pool.release(second)
+        self.assertEqual(self.db.get_pool_stats()['read']['timeouts'], 1)
+
+    def test_unhealthy_connection_replaced(self):
+        """测试失效连接在借出前被替换"""
+        self.db.read_pool.health_check_interval = 0
+        conn = self.db.read_pool.acquire()
+        self.db.read_pool.release(conn)
+        conn.close()
+
+        rows = self.db.execute_query("SELECT 1 AS value")
+        self.assertEqual(rows[0]['value'], 1)
+        stats = self.db.get_pool_stats()['read']
+        self.assertEqual(stats['health_check_failures'], 1)
+        self.assertEqual(stats['open_connections'], 1)
+
+class TestStorageProfile(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：使用临时数据库"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'), storage_profile='wal')
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_wal_enabled(self):
+        """测试启用 WAL 模式"""
+        with self.db.get_connection_context() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_read_connection_is_read_only(self):
+        """测试读连接不能写入"""
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db.get_connection_context(readonly=True) as conn:
+                conn.execute("DELETE FROM user")
+
+    def test_reads_not_blocked_by_writer(self):
+        """测试写事务进行中读操作不被阻塞"""
+        with self.db.get_connection_context() as conn:
+            conn.execute("UPDATE user SET nickname = 'pending' WHERE username = 'admin'")
+            rows = self.db.execute_query("SELECT nickname FROM user WHERE username = ?", ('admin',))
+            self.assertEqual(rows[0]['nickname'], '系统管理员')
+
+        rows = self.db.execute_query("SELECT nickname FROM user WHERE username = ?", ('admin',))
+        self.assertEqual(rows[0]['nickname'], 'pending')
+
+class TestSchemaMigrator(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：使用临时数据库和迁移目录"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.migrations_dir = os.path.join(self.tmp_dir, 'migrations')
+        os.makedirs(self.migrations_dir)
+        self.conn = sqlite3.connect(os.path.join(self.tmp_dir, 'test.db'))
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write_migration(self, filename, sql):
+        with open(os.path.join(self.migrations_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(sql)
+
+    def test_fresh_database(self):
+        """测试新数据库执行全部迁移"""
+        self.write_migration('0002_add_tag.sql', "CREATE TABLE tag (id INTEGER PRIMARY KEY);")
+        migrator = SchemaMigrator(self.conn, self.migrations_dir)
+
+        self.assertEqual(migrator.migrate(), [1, 2])
+        self.assertEqual(migrator.get_current_version(), 2)
+        self.assertEqual(migrator.migrate(), [])
+
+    def test_only_pending_applied(self):
+        """测试只执行未应用的迁移"""
+        migrator = SchemaMigrator(self.conn, self.migrations_dir)
+        migrator.migrate()
+
+        self.write_migration('0002_add_tag.sql', "CREATE TABLE tag (id INTEGER PRIMARY KEY);")
+        self.assertEqual([m[0] for m in migrator.get_pending_migrations()], [2])
+        self.assertEqual(migrator.migrate(), [2])
+
+    def test_failed_migration_rolled_back(self):
+        """测试迁移失败时整体回滚"""
+        self.write_migration(
+            '0002_broken.sql',
+            "CREATE TABLE tag (id INTEGER PRIMARY KEY);\nINSERT INTO missing_table VALUES (1);"
+        )
+        migrator = SchemaMigrator(self.conn, self.migrations_dir)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            migrator.migrate()
+        self.assertEqual(migrator.get_current_version(), 1)
+        tables = self.conn.execute("SELECT name FROM sqlite_master WHERE name = 'tag'").fetchall()
+        self.assertEqual(tables, [])
+
+class TestStreamingQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'), pool_size=2)
+        with self.db.get_connection_context() as conn:
+            conn.executemany(
+                "INSERT INTO user (username, password, role) VALUES (?, '', 'student')",
+                [(f"stream_{i}",) for i in range(25)]
+            )
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_iter_query(self):
+        """测试流式查询返回全部结果"""
+        rows = self.db.iter_query("SELECT username FROM user WHERE username LIKE 'stream_%' ORDER BY id", batch_size=4)
+        self.assertEqual([row['username'] for row in rows], [f"stream_{i}" for i in range(25)])
+        self.assertEqual(self.db.get_pool_stats()['read']['in_use_connections'], 0)
+
+    def test_connection_released_on_early_exit(self):
+        """测试提前结束迭代时归还连接"""
+        rows = self.db.iter_query("SELECT * FROM user", batch_size=2)
+        next(rows)
+        self.assertEqual(self.db.get_pool_stats()['read']['in_use_connections'], 1)
+        rows.close()
+        self.assertEqual(self.db.get_pool_stats()['read']['in_use_connections'], 0)
+
+    def test_error_raised(self):
+        """测试流式查询出错时抛出异常"""
+        with self.assertRaises(DatabaseError):
+            list(self.db.iter_query("SELECT * FROM missing_table"))
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def insert_user(self, username):
+        return self.db.execute_update(
+            "INSERT INTO user (username, password, role) VALUES (?, '', 'student')", (username,)
+        )
+
+    def user_exists(self, username):
+        return bool(self.db.execute_query("SELECT id FROM user WHERE username = ?", (username,)))
+
+    def test_commit(self):
+        """测试事务内的读写共用连接并一次提交"""
+        with self.db.transaction():
+            self.insert_user('tx_a')
+            self.assertTrue(self.user_exists('tx_a'))  # 事务内可以读到未提交的数据
+            self.insert_user('tx_b')
+        self.assertTrue(self.user_exists('tx_a'))
+        self.assertTrue(self.user_exists('tx_b'))
+        self.assertFalse(self.db.in_transaction())
+
+    def test_rollback_on_exception(self):
+        """测试异常时整体回滚"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.insert_user('tx_a')
+                raise RuntimeError()
+        self.assertFalse(self.user_exists('tx_a'))
+
+    def test_swallowed_failure_rolls_back(self):
+        """测试 execute_update 吞掉的失败也会使事务回滚"""
+        with self.assertRaises(DatabaseError):
+            with self.db.transaction():
+                self.insert_user('tx_a')
+                self.assertIsNone(self.insert_user('tx_a'))  # 违反唯一约束
+        self.assertFalse(self.user_exists('tx_a'))
+
+    def test_nested_savepoint(self):
+        """测试嵌套事务只回滚内层"""
+        with self.db.transaction():
+            self.insert_user('tx_outer')
+            with self.assertRaises(DatabaseError):
+                with self.db.transaction():
+                    self.insert_user('tx_inner')
+                    self.insert_user('tx_inner')
+        self.assertTrue(self.user_exists('tx_outer'))
+        self.assertFalse(self.user_exists('tx_inner'))
+
+        with self.db.transaction():
+            self.insert_user('tx_outer2')
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.insert_user('tx_inner2')
+                    raise RuntimeError()
+        self.assertTrue(self.user_exists('tx_outer2'))
+        self.assertFalse(self.user_exists('tx_inner2'))
+
+    def test_on_commit(self):
+        """测试提交回调只在最外层提交后执行，回滚（包括内层回滚）时丢弃"""
+        calls = []
+        with self.db.transaction():
+            self.db.on_commit(lambda: calls.append('outer'))
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.db.on_commit(lambda: calls.append('inner'))
+                    raise RuntimeError()
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['outer'])
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.on_commit(lambda: calls.append('rolled_back'))
+                raise RuntimeError()
+        self.db.on_commit(lambda: calls.append('immediate'))
+        self.assertEqual(calls, ['outer', 'immediate'])
+
+@mock.patch.dict('config.DB_ERROR_CONFIG', {'busy_retries': 2, 'busy_backoff': 0.001})
+class TestStrictMode(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DBManager(self.db_path, pool_size=1, storage_profile='legacy', strict=True)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_typed_exceptions(self):
+        """测试严格模式抛出对应类型的异常"""
+        with self.assertRaises(IntegrityConstraintError):
+            self.db.execute_update("INSERT INTO user (username, password, role) VALUES ('admin', '', 'student')")
+        with self.assertRaises(DatabaseError):
+            self.db.execute_query("SELECT * FROM missing_table")
+        self.assertEqual(self.db.get_error_stats()['failures'], 2)
+
+    def test_non_strict_returns_default(self):
+        """测试非严格模式保持返回 [] / None"""
+        self.db.strict = False
+        self.assertEqual(self.db.execute_query("SELECT * FROM missing_table"), [])
+        self.assertIsNone(self.db.execute_update("UPDATE missing_table SET x = 1"))
+
+    def test_busy_retry(self):
+        """测试锁冲突时重试，重试用尽后抛出 DatabaseLockedError"""
+        with self.db.get_connection_context() as conn:
+            conn.execute("PRAGMA busy_timeout = 0")
+        locker = sqlite3.connect(self.db_path)
+        locker.execute("BEGIN EXCLUSIVE")
+        try:
+            with self.assertRaises(DatabaseLockedError):
+                self.db.execute_update("UPDATE user SET nickname = nickname")
+        finally:
+            locker.rollback()
+            locker.close()
+        self.db.execute_update("UPDATE user SET nickname = nickname")
+
+        stats = self.db.get_error_stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['busy_failures'], 1)
+
+    def test_transaction_begin_retry(self):
+        """测试 transaction() 开始时被锁定会重试，用尽后抛出 DatabaseLockedError"""
+        with self.db.get_connection_context() as conn:
+            conn.execute("PRAGMA busy_timeout = 0")
+        locker = sqlite3.connect(self.db_path)
+        locker.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(DatabaseLockedError):
+                with self.db.transaction():
+                    self.fail("事务不应开始")
+        finally:
+            locker.rollback()
+            locker.close()
+        self.assertFalse(self.db.in_transaction())
+
+        stats = self.db.get_error_stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['busy_failures'], 1)
+
+        # 锁释放后连接已归还，可以正常开始事务
+        with self.db.transaction():
+            self.db.execute_update("UPDATE user SET nickname = nickname")
+
+    def test_retry_then_success(self):
+        """测试重试后成功"""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise sqlite3.OperationalError("database is locked")
+            return 'ok'
+
+        self.assertEqual(self.db._with_retry(flaky), 'ok')
+        self.assertEqual(self.db.get_error_stats()['retried_successes'], 1)
+
+class TestQueryRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        query_registry.register('test', {
+            'count_users': "SELECT COUNT(*) AS count FROM user",
+            'rename_user': "UPDATE user SET nickname = :nickname WHERE username = :username"
+        })
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_execute_named(self):
+        """测试按名称执行读写语句并记录统计"""
+        query_registry.reset_stats()
+        self.db.execute_named('test.rename_user', {'nickname': '管理员', 'username': 'admin'})
+        for _ in range(3):
+            rows = self.db.execute_named('test.count_users')
+        self.assertGreater(rows[0]['count'], 0)
+
+        stats = {s['name']: s for s in self.db.get_query_stats()}
+        self.assertEqual(stats['test.count_users']['calls'], 3)
+        self.assertEqual(stats['test.rename_user']['calls'], 1)
+
+    def test_conflicting_registration(self):
+        """测试同名不同内容的重复注册"""
+        registry = QueryRegistry()
+        registry.register('test', {'q': "SELECT 1"})
+        registry.register('test', {'q': "SELECT 1"})
+        with self.assertRaises(ValueError):
+            registry.register('test', {'q': "SELECT 2"})
+        with self.assertRaises(KeyError):
+            registry.get('test.missing')
+
+class TestQueryProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.slow_log = os.path.join(self.tmp_dir, 'slow.log')
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_disabled_by_default(self):
+        """测试默认不开启"""
+        self.db.execute_query("SELECT * FROM user")
+        self.assertIsNone(self.db.profiler)
+        self.assertEqual(self.db.get_profile_report(), [])
+
+    def test_report_and_slow_log(self):
+        """测试统计报告和慢查询日志"""
+        self.db.enable_profiler(slow_threshold_ms=0, slow_log_path=self.slow_log)
+        for _ in range(3):
+            self.db.execute_query("SELECT * FROM user WHERE username = ?", ('admin',))
+        self.db.execute_update("UPDATE user SET nickname = nickname")
+
+        report = self.db.get_profile_report(top_n=1, order_by='calls')
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['calls'], 3)
+        self.assertEqual(report[0]['rows'], 3)
+        self.assertIn('test_db_manager.TestQueryProfiler.test_report_and_slow_log', dict(report[0]['callers']))
+
+        with open(self.slow_log, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('PLAN SEARCH user', content)
+
+    def test_profiler_error_does_not_fail_query(self):
+        """测试性能分析出错时语句照常返回结果"""
+        self.db.enable_profiler()
+        with mock.patch.object(self.db.profiler, 'find_caller', side_effect=AttributeError("co_qualname")):
+            rows = self.db.execute_query("SELECT * FROM user WHERE username = ?", ('admin',))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(self.db.get_error_stats()['failures'], 0)
+
+class TestIndexAdvisor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_hot_queries_use_indexes(self):
+        """测试索引迁移后热点查询不再全表扫描"""
+        queries = [
+            ('detail', "SELECT * FROM submission_detail sd WHERE sd.submission_id = ? ORDER BY sd.question_id"),
+            ('replies', "SELECT COUNT(*) FROM discussion WHERE parent_id = ?"),
+            ('unread', "SELECT COUNT(*) FROM notification WHERE user_id = :user_id AND is_read = FALSE")
+        ]
+        with self.db.get_connection_context(readonly=True) as conn:
+            findings, errors = IndexAdvisor(conn).advise(queries)
+        self.assertEqual(findings, [])
+        self.assertEqual(errors, [])
+
+    def test_full_scan_flagged(self):
+        """测试标记全表扫描（通过别名识别表名）"""
+        with self.db.get_connection_context(readonly=True) as conn:
+            advisor = IndexAdvisor(conn)
+            result = advisor.check('by_title', "SELECT * FROM notification n WHERE n.title = ?")
+            self.assertEqual(result['full_scans'], ['notification'])
+
+            advisor.ignore_tables.add('notification')
+            self.assertEqual(advisor.check('by_title', "SELECT * FROM notification WHERE title = 'a?'")['full_scans'], [])
+
+if __name__ == '__main__':
+    unittest.main()
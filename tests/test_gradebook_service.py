@@ -0,0 +1,476 @@
+"""
+成绩管理服务测试
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.gradebook_service import GradebookService
+from modules.grade_matrix import letter_grades
+from modules.grade_scale import GradeScale
+from modules.exceptions import ValidationError, ResourceNotFoundError
+
+class TestBulkGrades(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：临时数据库中创建课程、作业和学生"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.service = GradebookService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.course_id = self.db.execute_update(
+            "INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("成绩测试课程", teacher_id)
+        )
+        self.assignment_id = self.db.execute_update(
+            "INSERT INTO assignment (title, course_id, teacher_id) VALUES (?, ?, ?)", ("作业", self.course_id, teacher_id)
+        )
+        self.student_ids = []
+        for i in range(5):
+            self.student_ids.append(self.db.execute_update(
+                "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+                (f"bulk_student_{i}", f"学生{i}")
+            ))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def grades(self):
+        rows = self.db.execute_query(
+            "SELECT student_id, course_id, score, grade, comment FROM gradebook WHERE assignment_id = ? ORDER BY student_id",
+            (self.assignment_id,)
+        )
+        return {row['student_id']: dict(row) for row in rows}
+
+    def test_bulk_update_upserts(self):
+        """测试批量更新：新增与更新在一次调用中完成，未提供评语时保留原评语"""
+        self.service.update_gradebook(self.student_ids[0], self.course_id, self.assignment_id, 50, comment="原评语")
+        count = self.service.bulk_update_grades(self.assignment_id, [
+            {'student_id': self.student_ids[0], 'score': 95},
+            {'student_id': self.student_ids[1], 'score': 72, 'comment': "良好"},
+            {'student_id': self.student_ids[2], 'score': None}
+        ])
+        self.assertEqual(count, 2)
+
+        grades = self.grades()
+        self.assertEqual(len(grades), 2)
+        self.assertEqual((grades[self.student_ids[0]]['score'], grades[self.student_ids[0]]['grade']), (95, 'A'))
+        self.assertEqual(grades[self.student_ids[0]]['comment'], "原评语")
+        self.assertEqual(grades[self.student_ids[1]]['comment'], "良好")
+        self.assertEqual(grades[self.student_ids[1]]['course_id'], self.course_id)
+
+    def test_bulk_update_invalid_score_writes_nothing(self):
+        """测试任一分数不合法时整批不写入"""
+        with self.assertRaises(ValidationError):
+            self.service.bulk_update_grades(self.assignment_id, [
+                {'student_id': self.student_ids[0], 'score': 80},
+                {'student_id': self.student_ids[1], 'score': -1}
+            ])
+        self.assertEqual(self.grades(), {})
+
+    def test_import_latest_graded_submission(self):
+        """测试从提交导入：每个学生取最后一次已评分的提交，重复导入结果不变"""
+        submissions = [
+            (self.student_ids[0], 60, 'graded'),
+            (self.student_ids[0], 88, 'graded'),
+            (self.student_ids[1], 70, 'graded'),
+            (self.student_ids[1], 99, 'pending'),
+            (self.student_ids[2], 40, 'pending')
+        ]
+        self.db.execute_many(
+            "INSERT INTO submission (student_id, assignment_id, total_score, grading_status) VALUES (?, ?, ?, ?)",
+            [(student_id, self.assignment_id, score, status) for student_id, score, status in submissions]
+        )
+
+        self.assertEqual(self.service.import_grades_from_submissions(self.assignment_id), 2)
+        self.assertEqual(self.service.import_grades_from_submissions(self.assignment_id), 2)
+
+        grades = self.grades()
+        self.assertEqual({k: v['score'] for k, v in grades.items()}, {self.student_ids[0]: 88, self.student_ids[1]: 70})
+        self.assertEqual(grades[self.student_ids[0]]['grade'], 'B')
+        self.assertEqual(grades[self.student_ids[1]]['comment'], "从提交记录导入")
+
+    def test_import_requires_course(self):
+        """测试作业未关联课程时不能导入"""
+        self.db.execute_update("UPDATE assignment SET course_id = NULL WHERE id = ?", (self.assignment_id,))
+        with self.assertRaises(ValidationError):
+            self.service.import_grades_from_submissions(self.assignment_id)
+
+class TestGradeMatrix(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：两份已批改作业、一份未批改作业，部分成绩缺失或分数为空"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.service = GradebookService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.course_id = self.db.execute_update(
+            "INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("矩阵课程", teacher_id)
+        )
+        self.assignment_ids = [
+            self.db.execute_update(
+                "INSERT INTO assignment (title, course_id, teacher_id, status) VALUES (?, ?, ?, ?)",
+                (f"作业 {i}", self.course_id, teacher_id, status)
+            )
+            for i, status in enumerate(('graded', 'graded', 'published'))
+        ]
+        self.students = [
+            self.db.execute_update(
+                "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+                (f"matrix_student_{i}", name)
+            )
+            for i, name in enumerate(("甲", "乙", "丙", "丁"))
+        ]
+        a1, a2, a3 = self.assignment_ids
+        s1, s2, s3, s4 = self.students
+        entries = [
+            (s1, a1, 90, 2.0), (s1, a2, 70, 1.0), (s1, a3, 10, 1.0),
+            (s2, a1, 89.5, 1.0),
+            (s3, a2, None, 1.0), (s3, a3, 50, 1.0),
+            (s4, a1, 80, 1.0), (s4, a2, 80, 1.0)
+        ]
+        for student_id, assignment_id, score, weight in entries:
+            self.service.update_gradebook(student_id, self.course_id, assignment_id, score, weight, "评语")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_statistics(self):
+        """测试向量化统计"""
+        matrix = self.service.get_grade_matrix(self.course_id)
+        order = {student_id: i for i, student_id in enumerate(matrix.student_ids)}
+        s1, s2, s3, s4 = (order[s] for s in self.students)
+
+        totals = matrix.totals()
+        averages = matrix.averages()
+        self.assertEqual(totals[[s1, s2, s3, s4]].tolist(), [160, 89.5, 0, 160])
+        self.assertEqual(matrix.grade_counts()[[s1, s2, s3, s4]].tolist(), [2, 1, 0, 2])
+        self.assertTrue(np.isnan(averages[s3]))
+        self.assertAlmostEqual(matrix.weighted_averages()[s1], (90 * 2 + 70) / 3)
+        self.assertEqual(matrix.rankings()[[s1, s2, s3, s4]].tolist(), [2, 1, 0, 2])
+        self.assertEqual(matrix.assignment_means().tolist(), [(90 + 89.5 + 80) / 3, 75])
+
+    def test_dict_view(self):
+        """测试字典视图：成绩矩阵包含未批改作业和空分数的记录，统计只计已批改作业"""
+        result = self.service.get_course_grades(self.course_id)
+        a1, a2, a3 = self.assignment_ids
+        s1, s2, s3, s4 = self.students
+
+        self.assertEqual([a['id'] for a in result['assignments']], [a1, a2])
+        self.assertEqual(result['grade_matrix'][s1][a3], {'score': 10, 'grade': 'F', 'comment': "评语"})
+        self.assertEqual(result['grade_matrix'][s3][a2]['score'], None)
+        self.assertEqual(result['student_stats'][s1],
+                         {'total_score': 160, 'average_score': 80, 'average_grade': 'B', 'grade_count': 2})
+        # 等级区间没有空隙，89.5 属于 B
+        self.assertEqual(result['student_stats'][s2]['average_grade'], 'B')
+        self.assertEqual(result['student_stats'][s3],
+                         {'total_score': 0, 'average_score': None, 'average_grade': None, 'grade_count': 0})
+
+    def test_export_rows_match_streaming(self):
+        """测试矩阵导出与流式导出结果一致"""
+        assignments = self.service._get_graded_assignments(self.course_id)
+        streamed = list(self.service.iter_export_rows(self.course_id, assignments))
+        self.assertEqual(self.service.export_grades(self.course_id)['students'], streamed)
+
+    def test_letter_grades_match_calculate_grade(self):
+        """测试向量化等级与 calculate_grade 一致"""
+        scores = [0, 59, 59.5, 60, 69.9, 79, 80, 89, 89.5, 90, 100, 120, float('nan')]
+        expected = [self.service.calculate_grade(s) if s == s else None for s in scores]
+        self.assertEqual(letter_grades(scores).tolist(), expected)
+        self.assertEqual(letter_grades([45], 50).tolist(), [self.service.calculate_grade(45, 50)])
+
+class TestGradeStatistics(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：一门课程两份作业"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.service = GradebookService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.course_id = self.db.execute_update(
+            "INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("统计课程", teacher_id)
+        )
+        self.assignment_ids = [
+            self.db.execute_update(
+                "INSERT INTO assignment (title, course_id, teacher_id) VALUES (?, ?, ?)",
+                (f"作业 {i}", self.course_id, teacher_id)
+            )
+            for i in range(2)
+        ]
+        self.students = [
+            self.db.execute_update(
+                "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+                (f"stats_student_{i}", f"学生{i}")
+            )
+            for i in range(4)
+        ]
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def rebuilt_statistics(self):
+        """从成绩表重建后的统计（作为对照）"""
+        self.service.rebuild_grade_statistics(self.course_id)
+        return self.service.get_grade_statistics(self.course_id)
+
+    def assertStatisticsEqual(self, actual, expected):
+        self.assertEqual(actual['distribution'], expected['distribution'])
+        self.assertEqual([r['student_id'] for r in actual['ranking']], [r['student_id'] for r in expected['ranking']])
+        for key, value in expected['overall'].items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(actual['overall'][key], value)
+            else:
+                self.assertEqual(actual['overall'][key], value, key)
+        for got, want in zip(actual['assignments'], expected['assignments']):
+            for key, value in want.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(got[key], value)
+                else:
+                    self.assertEqual(got[key], value, key)
+
+    def test_empty_course(self):
+        """测试没有成绩时的统计"""
+        stats = self.service.get_grade_statistics(self.course_id)
+        self.assertEqual(stats['overall']['total_students'], 0)
+        self.assertIsNone(stats['overall']['average_score'])
+        self.assertEqual(stats['overall']['grade_a'], 0)
+        self.assertEqual([a['submission_count'] for a in stats['assignments']], [0, 0])
+        self.assertEqual(stats['ranking'], [])
+        self.assertEqual(stats['distribution'], [])
+
+    def test_incremental_updates(self):
+        """测试插入、修改、删除成绩后汇总与重建结果一致"""
+        a1, a2 = self.assignment_ids
+        s1, s2, s3, s4 = self.students
+        self.service.bulk_update_grades(a1, [
+            {'student_id': s1, 'score': 95}, {'student_id': s2, 'score': 82},
+            {'student_id': s3, 'score': 64}, {'student_id': s4, 'score': 40}
+        ])
+        self.service.update_gradebook(s1, self.course_id, a2, 70)
+        self.service.update_gradebook(s2, self.course_id, a2, None)
+
+        stats = self.service.get_grade_statistics(self.course_id)
+        overall = stats['overall']
+        self.assertEqual(overall['total_students'], 4)
+        self.assertAlmostEqual(overall['average_score'], (95 + 82 + 64 + 40 + 70) / 5)
+        self.assertEqual((overall['min_score'], overall['max_score']), (40, 95))
+        self.assertEqual((overall['grade_a'], overall['grade_c'], overall['grade_f']), (1, 1, 1))
+        self.assertEqual(stats['distribution'], [
+            {'grade': 'A', 'count': 1}, {'grade': 'B', 'count': 1}, {'grade': 'C', 'count': 1},
+            {'grade': 'D', 'count': 1}, {'grade': 'F', 'count': 1}
+        ])
+        self.assertEqual([a['submission_count'] for a in stats['assignments']], [4, 1])
+        self.assertEqual(stats['ranking'][0]['student_id'], s1)
+        self.assertStatisticsEqual(stats, self.rebuilt_statistics())
+
+        # 修改最高分和最低分，删除一条成绩
+        self.service.bulk_update_grades(a1, [{'student_id': s1, 'score': 60}, {'student_id': s4, 'score': 75}])
+        self.db.execute_update("DELETE FROM gradebook WHERE student_id = ? AND assignment_id = ?", (s3, a1))
+        stats = self.service.get_grade_statistics(self.course_id)
+        self.assertEqual((stats['overall']['min_score'], stats['overall']['max_score']), (60, 82))
+        self.assertEqual(stats['overall']['total_students'], 3)
+        self.assertEqual(stats['assignments'][0]['submission_count'], 3)
+        self.assertStatisticsEqual(stats, self.rebuilt_statistics())
+
+    def test_grade_only_and_unassigned_rows(self):
+        """测试只修改等级、以及未关联作业的成绩是最值时的汇总"""
+        a1, _ = self.assignment_ids
+        s1, s2, s3, _ = self.students
+        self.service.bulk_update_grades(a1, [{'student_id': s1, 'score': 91}, {'student_id': s2, 'score': 72}])
+        self.db.execute_update(
+            "INSERT INTO gradebook (student_id, course_id, assignment_id, score, grade) VALUES (?, ?, NULL, 99, 'A')",
+            (s3, self.course_id)
+        )
+        self.db.execute_update("UPDATE gradebook SET grade = 'B' WHERE student_id = ? AND assignment_id = ?", (s2, a1))
+        self.db.execute_update("DELETE FROM gradebook WHERE student_id = ? AND assignment_id = ?", (s1, a1))
+
+        stats = self.service.get_grade_statistics(self.course_id)
+        self.assertEqual((stats['overall']['min_score'], stats['overall']['max_score']), (72, 99))
+        self.assertEqual((stats['overall']['grade_a'], stats['overall']['grade_b'], stats['overall']['grade_c']), (1, 1, 0))
+        self.assertStatisticsEqual(stats, self.rebuilt_statistics())
+
+    def test_rebuild_repairs_drift(self):
+        """测试绕过触发器损坏汇总后重建恢复"""
+        self.service.bulk_update_grades(self.assignment_ids[0], [{'student_id': s, 'score': 88} for s in self.students])
+        self.db.execute_update("UPDATE course_grade_stats SET score_count = 99, min_score = 0")
+        self.assertEqual(self.service.get_grade_statistics(self.course_id)['overall']['min_score'], 0)
+
+        stats = self.rebuilt_statistics()
+        self.assertEqual(stats['overall']['min_score'], 88)
+        self.assertAlmostEqual(stats['overall']['average_score'], 88)
+        self.assertAlmostEqual(stats['overall']['std_dev'], 0)
+
+class TestCourseFinalGrades(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：一门课程三份作业，成绩权重各不相同"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.service = GradebookService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.course_id = self.db.execute_update(
+            "INSERT INTO course (title, teacher_id, description) VALUES (?, ?, ?)", ("期末课程", teacher_id, "说明")
+        )
+        assignment_ids = [
+            self.db.execute_update(
+                "INSERT INTO assignment (title, course_id, teacher_id, type) VALUES (?, ?, ?, ?)",
+                (f"作业 {i}", self.course_id, teacher_id, ('homework', 'exam', 'homework')[i])
+            )
+            for i in range(3)
+        ]
+        self.students = [
+            self.db.execute_update(
+                "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+                (f"final_student_{i}", f"学生{i}")
+            )
+            for i in range(5)
+        ]
+        scores = [(88.5, 92, 79.25), (59.5, None, 61), (100, 89.7, 90), (None, None, None)]
+        weights = (1.0, 2.5, 0.7)
+        # 学生4 不在成绩簿中
+        for student_id, row in zip(self.students, scores):
+            for assignment_id, score, weight in zip(assignment_ids, row, weights):
+                if score is not None:
+                    self.service.update_gradebook(student_id, self.course_id, assignment_id, score, weight)
+        # 只有评语的记录，不参与最终成绩
+        self.service.update_gradebook(self.students[0], self.course_id, None, None, comment="学习认真")
+        self.service.update_gradebook(self.students[3], self.course_id, None, None, comment="需要补交作业")
+        self.db.execute_update(
+            "INSERT INTO learning_progress (student_id, course_id, progress, time_spent) VALUES (?, ?, ?, ?)",
+            (self.students[0], self.course_id, 80, 3600)
+        )
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_final_grades_match_per_student(self):
+        """测试课程范围的最终成绩与逐个学生计算一致"""
+        results = self.service.calculate_course_final_grades(self.course_id)
+        self.assertEqual(set(results), set(self.students[:3]))
+        for student_id in self.students:
+            expected = self.service.calculate_final_grade(student_id, self.course_id)
+            if expected['final_score'] is None:
+                self.assertNotIn(student_id, results)
+            else:
+                self.assertEqual(results[student_id], expected)
+        self.assertEqual(self.service.calculate_course_final_grades(-1), {})
+
+    def test_report_cards_match_per_student(self):
+        """测试批量生成的报告单与逐个生成一致"""
+        cards = self.service.generate_report_cards(self.course_id, self.students)
+        self.assertEqual(len(cards), len(self.students))
+        for student_id, card in zip(self.students, cards):
+            expected = self.service.generate_report_card(student_id, self.course_id)
+            del card['generated_date'], expected['generated_date']
+            self.assertEqual(card, expected)
+
+        # 默认为成绩簿中的学生，按姓名排序
+        names = [card['student']['name'] for card in self.service.generate_report_cards(self.course_id)]
+        self.assertEqual(names, ["学生0", "学生1", "学生2", "学生3"])
+        with self.assertRaises(ResourceNotFoundError):
+            self.service.generate_report_cards(-1)
+
+class TestGradeScale(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：临时数据库中的一门课程和一份作业"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.service = GradebookService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.course_id = self.db.execute_update(
+            "INSERT INTO course (title, teacher_id) VALUES (?, ?)", ("等级课程", teacher_id)
+        )
+        self.assignment_id = self.db.execute_update(
+            "INSERT INTO assignment (title, course_id, teacher_id, status) VALUES (?, ?, ?, 'graded')",
+            ("作业", self.course_id, teacher_id)
+        )
+        self.student_id = self.db.execute_update(
+            "INSERT INTO user (username, password, role, nickname) VALUES ('scale_student', 'x', 'student', '学生')"
+        )
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_lookup_without_gaps(self):
+        """测试等级区间没有空隙，单个查找与数组查找一致"""
+        scale = GradeScale.parse("A:90-100,B:80-89,C:70-79,D:60-69,F:0-59")
+        self.assertEqual(scale, GradeScale.from_config())
+        scores = [-5, 0, 59.99, 60, 69.5, 79.999, 80, 89.5, 90, 100, 130]
+        expected = ['F', 'F', 'F', 'D', 'D', 'C', 'B', 'B', 'A', 'A', 'A']
+        self.assertEqual([scale.grade(s) for s in scores], expected)
+        self.assertEqual(scale.grade_array(scores + [float('nan')]).tolist(), expected + [None])
+        self.assertEqual(scale.grade_array(np.array([[45.0], [29.0]]), 50).tolist(), [['A'], ['F']])
+        self.assertEqual((scale.grade(None), scale.grade(45, 50), scale.grade(45, 0)), (None, 'A', 'F'))
+
+    def test_invalid_scale(self):
+        """测试格式错误和重复的等级标准"""
+        for text in ("A90-100", "A:90-80", "A:x-100", "A:90-100,B:90-95", "", None):
+            with self.assertRaises(ValidationError):
+                GradeScale.parse(text)
+
+    def test_course_scale(self):
+        """测试课程自定义等级标准、系统默认标准及其缓存"""
+        self.db.execute_update("UPDATE system_setting SET value = 'P:60-100,F:0-59' WHERE key = 'grade_scale'")
+        self.assertEqual(self.service.calculate_grade(75, course_id=self.course_id), 'P')
+
+        self.service.set_course_grade_scale(self.course_id, "优:85-100,良:70-84,差:0-69")
+        self.service.update_gradebook(self.student_id, self.course_id, self.assignment_id, 84.5)
+        self.assertEqual(self.service.get_student_grades(self.student_id)[0]['grade'], "良")
+        self.assertEqual(self.service.calculate_course_final_grades(self.course_id)[self.student_id]['final_grade'], "良")
+        self.assertEqual(self.service.get_course_grades(self.course_id)['student_stats'][self.student_id]['average_grade'],
+                         "良")
+        # 其他课程和不带课程的调用仍用系统默认标准
+        self.assertEqual(self.service.calculate_grade(84.5), 'P')
+
+        with self.assertRaises(ValidationError):
+            self.service.set_course_grade_scale(self.course_id, "优:85")
+        self.service.set_course_grade_scale(self.course_id, None)
+        self.assertEqual(self.service.calculate_grade(84.5, course_id=self.course_id), 'P')
+
+        # 保存的标准格式错误时退回上一级
+        self.db.execute_update("UPDATE course SET grade_scale = 'broken' WHERE id = ?", (self.course_id,))
+        self.service.clear_grade_scale_cache()
+        self.assertEqual(self.service.calculate_grade(84.5, course_id=self.course_id), 'P')
+
+    def test_custom_scale_distribution(self):
+        """测试自定义等级标准的成绩分布：按等级计数，增量维护与重建结果一致"""
+        self.service.set_course_grade_scale(self.course_id, "优:90-100,良:75-89,中:60-74,差:0-59")
+        students = [self.student_id] + [
+            self.db.execute_update(
+                "INSERT INTO user (username, password, role, nickname) VALUES (?, 'x', 'student', ?)",
+                (f"scale_student_{i}", f"学生{i}")
+            )
+            for i in range(3)
+        ]
+        self.service.bulk_update_grades(self.assignment_id, [
+            {'student_id': s, 'score': score} for s, score in zip(students, (95, 80, 78, 50))
+        ])
+        stats = self.service.get_grade_statistics(self.course_id)
+        self.assertEqual(stats['distribution'], [
+            {'grade': "优", 'count': 1}, {'grade': "良", 'count': 2}, {'grade': "差", 'count': 1}
+        ])
+        self.assertEqual(stats['overall']['grade_a'], 0)
+
+        # 修改分数、只修改等级、删除成绩
+        self.service.update_gradebook(students[1], self.course_id, self.assignment_id, 65)
+        self.db.execute_update("UPDATE gradebook SET grade = '优' WHERE student_id = ?", (students[2],))
+        self.db.execute_update("DELETE FROM gradebook WHERE student_id = ?", (students[3],))
+        expected = [{'grade': "优", 'count': 2}, {'grade': "中", 'count': 1}]
+        self.assertEqual(self.service.get_grade_statistics(self.course_id)['distribution'], expected)
+
+        self.service.rebuild_grade_statistics(self.course_id)
+        self.assertEqual(self.service.get_grade_statistics(self.course_id)['distribution'], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+异步评分队列测试
+"""
+import unittest
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+from modules.notification_service import NotificationService
+from modules.grading_queue import GradingQueue
+
+QUEUE_CONFIG = {'workers': 2, 'max_attempts': 2, 'retry_backoff': 60, 'poll_interval': 0.05}
+
+class FlakySubmissionService(SubmissionService):
+    """前 failures 次评分抛出异常"""
+    def __init__(self, db_manager, failures):
+        super().__init__(db_manager)
+        self.failures = failures
+
+    def grade_submission(self, submission_id):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("grader crashed")
+        return super().grade_submission(submission_id)
+
+class TestGradingQueue(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：临时数据库中创建作业和题目"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.submission_service = SubmissionService(self.db)
+        self.notification_service = NotificationService(self.db)
+
+        assignment_service = AssignmentService(self.db)
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.assignment_id = assignment_service.create_assignment("队列测试", "", teacher_id, None)
+        question_id = assignment_service.add_question(self.assignment_id, 'single_choice', "选择题", 'A', 5)
+        self.answers = {question_id: 'A'}
+        self.student_id = self.db.execute_query("SELECT id FROM user WHERE role = 'student' LIMIT 1")[0]['id']
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_queue(self, submission_service=None):
+        return GradingQueue(
+            self.db, submission_service or self.submission_service, self.notification_service, QUEUE_CONFIG
+        )
+
+    def get_submission(self, submission_id):
+        return self.db.execute_query("SELECT * FROM submission WHERE id = ?", (submission_id,))[0]
+
+    def test_submit_then_grade(self):
+        """测试提交后立即返回，领取任务后完成评分和通知"""
+        queue = self.make_queue()
+        submission_id = queue.submit(self.student_id, self.assignment_id, self.answers)
+
+        self.assertEqual(self.get_submission(submission_id)['grading_status'], 'pending')
+        self.assertEqual(queue.metrics()['depth'], 1)
+
+        job = queue.claim()
+        self.assertEqual(job['submission_id'], submission_id)
+        self.assertTrue(queue.process(job))
+
+        submission = self.get_submission(submission_id)
+        self.assertEqual(submission['grading_status'], 'graded')
+        self.assertEqual(submission['total_score'], 5)
+        self.assertEqual(queue.get_job(submission_id)['status'], 'done')
+        self.assertEqual(self.notification_service.get_notification_count(self.student_id), 1)
+        self.assertEqual(queue.metrics()['depth'], 0)
+
+    def test_retry_then_fail(self):
+        """测试失败重试（带退避），次数用尽后标记为 failed"""
+        queue = self.make_queue(FlakySubmissionService(self.db, failures=2))
+        submission_id = queue.submit(self.student_id, self.assignment_id, self.answers)
+
+        self.assertFalse(queue.process(queue.claim()))
+        job = queue.get_job(submission_id)
+        self.assertEqual(job['status'], 'queued')
+        self.assertEqual(job['attempts'], 1)
+        self.assertIsNone(queue.claim())  # 退避期间不可领取
+
+        self.db.execute_update("UPDATE grading_job SET available_at = CURRENT_TIMESTAMP")
+        self.assertFalse(queue.process(queue.claim()))
+        job = queue.get_job(submission_id)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['last_error'], "grader crashed")
+        self.assertEqual(queue.metrics()['failed'], 1)
+
+        # 学生的提交记录带有任务状态，界面据此显示评分失败而不是评分中
+        submission = self.submission_service.get_student_submissions(self.student_id)[0]
+        self.assertEqual((submission['grading_status'], submission['job_status']), ('pending', 'failed'))
+
+    def test_recover_running_jobs(self):
+        """测试崩溃恢复：遗留的 running 任务重新入队"""
+        queue = self.make_queue()
+        submission_id = queue.submit(self.student_id, self.assignment_id, self.answers)
+        queue.claim()  # 领取后进程"崩溃"
+        self.assertEqual(queue.get_job(submission_id)['status'], 'running')
+
+        restarted = self.make_queue()
+        restarted.recover()
+        self.assertEqual(restarted.get_job(submission_id)['status'], 'queued')
+        self.assertTrue(restarted.process(restarted.claim()))
+
+    def test_idle_claim_takes_no_write_lock(self):
+        """测试队列为空时领取只读不写：其他连接持有写锁时也能立即返回"""
+        queue = self.make_queue()
+        locker = sqlite3.connect(self.db.db_path)
+        try:
+            locker.execute("BEGIN IMMEDIATE")
+            start = time.perf_counter()
+            self.assertIsNone(queue.claim())
+            self.assertLess(time.perf_counter() - start, 1)
+        finally:
+            locker.rollback()
+            locker.close()
+
+    def test_claim_skips_job_taken_by_other_worker(self):
+        """测试读到的任务已被其他工作线程领走时，条件更新失败并领取下一个任务"""
+        queue = self.make_queue()
+        first = queue.submit(self.student_id, self.assignment_id, self.answers)
+        second = queue.submit(self.student_id, self.assignment_id, self.answers)
+        taken = queue.claim()
+        self.assertEqual(taken['submission_id'], first)
+
+        # 第一次读取返回过期的结果：仍然是已被领取的任务
+        execute_named = self.db.execute_named
+        stale = [[{'id': taken['id'], 'submission_id': first, 'attempts': 0}]]
+        def stale_next_job(name, params=()):
+            if name == 'grading_queue.next_job' and stale:
+                return stale.pop()
+            return execute_named(name, params)
+
+        with mock.patch.object(self.db, 'execute_named', side_effect=stale_next_job):
+            job = queue.claim()
+        self.assertEqual(job['submission_id'], second)
+        self.assertEqual(job['attempts'], 1)
+        self.assertEqual(queue.get_job(first)['attempts'], 1)
+
+    def test_workers_drain_queue(self):
+        """测试工作线程清空队列"""
+        queue = self.make_queue()
+        submission_ids = [queue.submit(self.student_id, self.assignment_id, self.answers) for _ in range(5)]
+        queue.start()
+        try:
+            deadline = time.time() + 10
+            while queue.metrics()['depth'] and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            queue.stop()
+
+        self.assertEqual(queue.metrics()['done'], 5)
+        for submission_id in submission_ids:
+            self.assertEqual(self.get_submission(submission_id)['grading_status'], 'graded')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+相似答案索引测试
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+from modules.analytics_service import AnalyticsService
+from modules.plagiarism_index import MinHasher, PlagiarismIndex, plagiarism_indexes
+
+ORIGINAL = "Python是一种解释型的高级编程语言，支持面向对象和函数式编程，拥有丰富的标准库"
+COPIED = "Python是一种解释型的高级编程语言，支持面向对象和函数式编程，拥有非常丰富的标准库"
+DIFFERENT = "数据库事务具有原子性一致性隔离性和持久性四个特性，用于保证并发访问时的数据正确"
+
+class TestPlagiarismIndex(unittest.TestCase):
+    def test_similarity_estimate(self):
+        hasher = MinHasher()
+        self.assertEqual(MinHasher.similarity(hasher.signature(ORIGINAL), hasher.signature(ORIGINAL)), 1.0)
+        self.assertGreater(MinHasher.similarity(hasher.signature(ORIGINAL), hasher.signature(COPIED)), 0.7)
+        self.assertLess(MinHasher.similarity(hasher.signature(ORIGINAL), hasher.signature(DIFFERENT)), 0.3)
+
+    def test_short_answers_skipped(self):
+        index = PlagiarismIndex()
+        self.assertFalse(index.add(1, "A"))
+        self.assertEqual(len(index), 0)
+
+    def test_query_and_clusters(self):
+        index = PlagiarismIndex()
+        index.add(1, ORIGINAL)
+        index.add(2, COPIED)
+        index.add(3, DIFFERENT)
+
+        self.assertEqual([key for key, _ in index.query(COPIED)], [2, 1])
+        clusters = index.clusters()
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['keys'], [1, 2])
+
+        # 重新加入同一个键会替换旧答案
+        index.add(2, DIFFERENT)
+        self.assertEqual(index.clusters()[0]['keys'], [2, 3])
+
+class TestDuplicateAnswers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        assignment_service = AssignmentService(self.db)
+        self.service = SubmissionService(self.db)
+        self.analytics = AnalyticsService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.student_id = self.db.execute_query("SELECT id FROM user WHERE role = 'student' LIMIT 1")[0]['id']
+        self.assignment_id = assignment_service.create_assignment("查重", "", teacher_id, None)
+        self.question_id = assignment_service.add_question(self.assignment_id, 'short_answer', "简答题", ORIGINAL, 10)
+
+    def tearDown(self):
+        plagiarism_indexes.invalidate(self.db, self.question_id)
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def submit(self, answer):
+        return self.service.submit_assignment(self.student_id, self.assignment_id, {self.question_id: answer})[0]
+
+    def test_duplicates_and_incremental_add(self):
+        first = self.submit(ORIGINAL)
+        self.submit(DIFFERENT)
+        self.assertEqual(self.analytics.get_duplicate_answers(self.question_id), [])
+
+        # 索引建立后，新提交增量加入
+        copied = self.submit(COPIED)
+        clusters = self.analytics.get_duplicate_answers(self.question_id)
+        self.assertEqual(len(clusters), 1)
+        members = clusters[0]['members']
+        self.assertEqual([m['submission_id'] for m in members], [first, copied])
+        self.assertEqual(members[1]['student_answer'], COPIED)
+        self.assertEqual(members[0]['student_id'], self.student_id)
+
+        similar = self.analytics.find_similar_answers(self.question_id, ORIGINAL)
+        self.assertEqual([key for key, _ in similar], [first, copied])
+
+    def test_rolled_back_submission_not_indexed(self):
+        """测试外层事务回滚的提交不进入索引"""
+        first = self.submit(ORIGINAL)
+        self.assertEqual(self.analytics.get_duplicate_answers(self.question_id), [])
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.service.record_submission(self.student_id, self.assignment_id, {self.question_id: COPIED})
+                raise RuntimeError("入队失败")
+        self.assertEqual(self.analytics.get_duplicate_answers(self.question_id), [])
+
+        with self.db.transaction():
+            copied = self.service.record_submission(self.student_id, self.assignment_id, {self.question_id: COPIED})
+        clusters = self.analytics.get_duplicate_answers(self.question_id)
+        self.assertEqual([m['submission_id'] for m in clusters[0]['members']], [first, copied])
+
+    def test_build_does_not_block_other_questions(self):
+        """测试建立一道题的索引时不持有全局锁"""
+        other = (self.db.db_path, -1)
+        seen = []
+        original = self.db.iter_named
+
+        def iter_named(name, params=(), batch_size=None):
+            # 建立过程中其他题目的索引可以正常读写
+            seen.append(plagiarism_indexes._lock.acquire(blocking=False))
+            plagiarism_indexes._lock.release()
+            plagiarism_indexes.add_answer(self.db, -1, 1, ORIGINAL)
+            return original(name, params, batch_size)
+
+        self.db.iter_named = iter_named
+        self.analytics.get_duplicate_answers(self.question_id)
+        self.assertEqual(seen, [True])
+        self.assertNotIn(other, plagiarism_indexes._indexes)
+
+if __name__ == '__main__':
+    unittest.main()
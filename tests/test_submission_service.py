@@ -0,0 +1,239 @@
+"""
+提交服务测试
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.db_manager import DBManager
+from modules.assignment_service import AssignmentService
+from modules.submission_service import SubmissionService
+from modules.answer_key import AnswerKey, answer_key_cache
+from modules.models import Question
+from modules.ai_grader import AIGrader
+from modules.grading_memo import grading_memo
+
+class TestRegradeAssignment(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：临时数据库中创建作业、题目和提交"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.assignment_service = AssignmentService(self.db)
+        self.service = SubmissionService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.assignment_id = self.assignment_service.create_assignment("重新评分", "", teacher_id, None)
+        self.choice_id = self.assignment_service.add_question(self.assignment_id, 'single_choice', "选择题", 'A', 5)
+        self.essay_id = self.assignment_service.add_question(
+            self.assignment_id, 'short_answer', "简答题", "Python是一种解释型的高级编程语言", 10
+        )
+
+        student_id = self.db.execute_query("SELECT id FROM user WHERE role = 'student' LIMIT 1")[0]['id']
+        for i in range(12):
+            self.service.submit_assignment(student_id, self.assignment_id, {
+                self.choice_id: 'B' if i % 2 else 'A',
+                self.essay_id: "Python是高级语言" if i % 3 else "不知道"
+            })
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def expected_totals(self):
+        """按当前标准答案逐份评分得到的总分"""
+        questions = self.service._get_questions(self.assignment_id)
+        totals = []
+        for row in self.db.execute_query("SELECT id FROM submission ORDER BY id"):
+            details = self.db.execute_query(
+                "SELECT question_id, student_answer FROM submission_detail WHERE submission_id = ?", (row['id'],)
+            )
+            answers = {d['question_id']: d['student_answer'] for d in details}
+            totals.append(sum(self.service._grade_question(q, answers[q.id])[0] for q in questions))
+        return totals
+
+    def current_totals(self):
+        return [row['total_score'] for row in self.db.execute_query("SELECT total_score FROM submission ORDER BY id")]
+
+    def change_answers(self):
+        self.assignment_service.update_question(self.choice_id, "选择题", 'B', 5, "")
+        self.assignment_service.update_question(self.essay_id, "简答题", "Python是高级语言", 10, "")
+
+    def test_regrade_in_process(self):
+        """测试在当前进程中重新评分"""
+        self.change_answers()
+        progress = []
+        result = self.service.regrade_assignment(
+            self.assignment_id, workers=0, shard_size=5,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        self.assertEqual(result['regraded'], 12)
+        self.assertFalse(result['cancelled'])
+        self.assertEqual(progress, [(5, 12), (10, 12), (12, 12)])
+        for current, expected in zip(self.current_totals(), self.expected_totals()):
+            self.assertAlmostEqual(current, expected, places=6)
+
+    def test_regrade_process_pool(self):
+        """测试在进程池中重新评分"""
+        self.change_answers()
+        result = self.service.regrade_assignment(self.assignment_id, workers=2, shard_size=4)
+
+        self.assertEqual(result['regraded'], 12)
+        for current, expected in zip(self.current_totals(), self.expected_totals()):
+            self.assertAlmostEqual(current, expected, places=6)
+
+    def test_regrade_cancel(self):
+        """测试取消重新评分：已写回的分片保留"""
+        self.change_answers()
+        cancel_event = threading.Event()
+        result = self.service.regrade_assignment(
+            self.assignment_id, workers=0, shard_size=5,
+            progress_callback=lambda done, total: cancel_event.set(),
+            cancel_event=cancel_event
+        )
+
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(result['regraded'], 5)
+
+class TestAnswerKey(unittest.TestCase):
+    def setUp(self):
+        """测试前准备：临时数据库中创建作业"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.assignment_service = AssignmentService(self.db)
+        self.service = SubmissionService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.assignment_id = self.assignment_service.create_assignment("答案索引", "", teacher_id, None)
+        self.student_id = self.db.execute_query("SELECT id FROM user WHERE role = 'student' LIMIT 1")[0]['id']
+
+    def tearDown(self):
+        answer_key_cache.invalidate(self.db, self.assignment_id)
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_grade_objective_matches_grader(self):
+        """测试答案索引评分与 AIGrader.grade_objective 一致"""
+        questions = [
+            Question(1, 1, 'single_choice', "单选", answer='A', score=5),
+            Question(2, 1, 'multi_choice', "多选", answer='A,C', score=5),
+            Question(3, 1, 'fill_in', "填空", answer=' def ', score=5),
+            Question(4, 1, 'single_choice', "无答案", answer='', score=5)
+        ]
+        answer_key = AnswerKey(1, questions)
+        for answers in ({1: 'a', 2: 'CA', 3: 'DEF', 4: 'A'}, {1: 'B', 2: 'A'}, {}):
+            results = answer_key.grade_objective(answers)
+            for question in questions:
+                is_correct = AIGrader.grade_objective(answers.get(question.id, ""), question.answer, question.type)
+                self.assertEqual(results[question.id][1], is_correct)
+
+    def test_invalidated_on_question_edit(self):
+        """测试修改题目后答案索引失效"""
+        question_id = self.assignment_service.add_question(self.assignment_id, 'single_choice', "选择题", 'A', 5)
+        _, score = self.service.submit_assignment(self.student_id, self.assignment_id, {question_id: 'A'})
+        self.assertEqual(score, 5)
+
+        self.assignment_service.update_question(question_id, "选择题", 'B', 5, "")
+        _, score = self.service.submit_assignment(self.student_id, self.assignment_id, {question_id: 'A'})
+        self.assertEqual(score, 0)
+
+        # 新增题目后重新加载
+        self.assignment_service.add_question(self.assignment_id, 'single_choice', "选择题 2", 'C', 5)
+        self.assertEqual(len(self.service._get_questions(self.assignment_id)), 2)
+
+class TestGradingMemo(unittest.TestCase):
+    STANDARD = "Python是一种解释型的高级编程语言"
+
+    def setUp(self):
+        """测试前准备：临时数据库中创建一道主观题"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DBManager(os.path.join(self.tmp_dir, 'test.db'))
+        self.assignment_service = AssignmentService(self.db)
+        self.service = SubmissionService(self.db)
+
+        teacher_id = self.db.execute_query("SELECT id FROM user WHERE role = 'teacher' LIMIT 1")[0]['id']
+        self.assignment_id = self.assignment_service.create_assignment("评分记忆", "", teacher_id, None)
+        self.question_id = self.assignment_service.add_question(
+            self.assignment_id, 'short_answer', "简答题", self.STANDARD, 10
+        )
+        self.student_id = self.db.execute_query("SELECT id FROM user WHERE role = 'student' LIMIT 1")[0]['id']
+        grading_memo.reset_stats()
+
+    def tearDown(self):
+        answer_key_cache.invalidate(self.db, self.assignment_id)
+        grading_memo.reset_stats()
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def submit(self, answer):
+        return self.service.submit_assignment(self.student_id, self.assignment_id, {self.question_id: answer})[1]
+
+    def test_same_answers_hit(self):
+        """测试相同答案（忽略首尾空白）命中记忆表，标点不同的答案分开评分"""
+        first = self.submit("Python 是高级语言。")
+        self.assertEqual(self.submit("  Python 是高级语言。\n"), first)
+        self.assertEqual(first, AIGrader.grade_subjective("Python 是高级语言。", self.STANDARD, 10)[0])
+        self.submit("Python，是高级语言")
+
+        stats = grading_memo.stats(self.db)
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 2, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3)
+
+        # 空答案不经记忆表
+        self.assertEqual(self.submit("   "), 0)
+        self.assertEqual(grading_memo.stats()['misses'], 2)
+
+    def test_scores_match_without_memo(self):
+        """测试开关记忆表、批量重评得到的分数相同：未命中时对原始答案评分"""
+        answers = ["它是解释型，高级编程，语言", "编程 语言 简洁", "Python 是高级语言。", "Python是高级语言"]
+        memo_on = [self.submit(answer) for answer in answers]
+        self.assertEqual([self.submit(answer) for answer in answers], memo_on)  # 全部命中
+        with mock.patch.dict(grading_memo.config, {'enabled': False}):
+            memo_off = [self.submit(answer) for answer in answers]
+        self.assertEqual(memo_on, memo_off)
+        batch = AIGrader.grade_subjective_batch(answers, self.STANDARD, 10)
+        self.assertEqual([score for score, _ in batch], memo_off)
+
+    def test_invalidated_on_answer_change(self):
+        """测试修改标准答案后不再使用旧的评分结果"""
+        answer = "Python是一种解释型的高级编程语言"
+        self.assertEqual(self.submit(answer), 10)
+
+        self.assignment_service.update_question(self.question_id, "简答题", "数据库事务具有原子性", 10, "")
+        self.assertEqual(grading_memo.stats(self.db)['entries'], 0)
+        self.assertLess(self.submit(answer), 10)
+        self.assertEqual(grading_memo.stats()['hits'], 0)
+
+        # 只修改题干和解析时版本不变，评分记录保留并继续命中
+        self.assignment_service.update_question(self.question_id, "简答题（修改）", "数据库事务具有原子性", 10, "解析")
+        version = self.db.execute_query("SELECT answer_version FROM question WHERE id = ?", (self.question_id,))
+        self.assertEqual(version[0]['answer_version'], 2)
+        self.assertEqual(grading_memo.stats(self.db)['entries'], 1)
+        self.submit(answer)
+        self.assertEqual(grading_memo.stats()['hits'], 1)
+
+    def test_fallback_grader(self):
+        """测试未安装 sklearn 时关键词覆盖率评分同样经过记忆表，且与 TF-IDF 结果分开记录"""
+        self.submit("Python是高级语言")
+        with mock.patch('modules.ai_grader.HAS_SKLEARN', False):
+            self.assertEqual(AIGrader.subjective_grader_name(), 'overlap')
+            first = self.submit("Python是高级语言")
+            self.assertEqual(self.submit(" Python是高级语言 "), first)
+            self.assertEqual(first, AIGrader._grade_feature_overlap("Python是高级语言", self.STANDARD, 10)[0])
+        stats = grading_memo.stats(self.db)
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 2, 2))
+
+    def test_failed_grading_not_saved(self):
+        """测试评分出错时的基础分结果不记录"""
+        with mock.patch('modules.ai_grader.TfidfVectorizer', side_effect=RuntimeError("boom")):
+            self.assertEqual(self.submit("Python是高级语言"), 3)
+        self.assertEqual(grading_memo.stats(self.db)['entries'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
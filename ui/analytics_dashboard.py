@@ -13,6 +13,7 @@ except ImportError:
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from ui.components import MessageDialog
+from ui.async_tasks import run_async
 
 # Windows 中文字体修复
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
@@ -85,53 +86,67 @@ class AnalyticsDashboardFrame(ttk.Frame):
         self.right_chart_canvas = None
 
     def load_analytics(self):
-        """加载分析数据"""
-        try:
-            # 获取统计数据
-            classes = self.class_service.get_classes_by_teacher(self.user.id)
-            courses = self.course_service.get_courses_by_teacher(self.user.id)
-            
-            total_students = 0
-            for cls in classes:
-                students = self.class_service.get_class_students(cls.id)
-                total_students += len(students)
-            
-            total_courses = len(courses)
-            
-            # 获取作业统计
-            total_assignments = 0
-            all_scores = []
+        """加载分析数据（查询在后台线程执行）"""
+        run_async(
+            self, self.fetch_analytics,
+            on_success=self.show_analytics,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载分析数据失败: {e}"),
+            key='analytics'
+        )
+
+    def fetch_analytics(self):
+        """查询统计数据（在工作线程中执行，不访问界面组件）"""
+        # 获取统计数据
+        classes = self.class_service.get_classes_by_teacher(self.user.id)
+        courses = self.course_service.get_courses_by_teacher(self.user.id)
+        
+        total_students = 0
+        for cls in classes:
+            students = self.class_service.get_class_students(cls.id)
+            total_students += len(students)
+        
+        total_courses = len(courses)
+        
+        # 获取作业统计
+        total_assignments = 0
+        all_scores = []
+        
+        for course in courses:
+            assignments = self.analytics_service.db.execute_query(
+                "SELECT * FROM assignment WHERE course_id = ?", (course.id,)
+            )
+            total_assignments += len(assignments)
             
-            for course in courses:
-                from modules.assignment_service import AssignmentService
-                assignments = self.analytics_service.db.execute_query(
-                    "SELECT * FROM assignment WHERE course_id = ?", (course.id,)
+            # 获取成绩
+            for assignment in assignments:
+                scores = self.analytics_service.db.execute_query(
+                    "SELECT total_score FROM submission WHERE assignment_id = ? AND total_score IS NOT NULL",
+                    (assignment['id'],)
                 )
-                total_assignments += len(assignments)
-                
-                # 获取成绩
-                for assignment in assignments:
-                    scores = self.analytics_service.db.execute_query(
-                        "SELECT total_score FROM submission WHERE assignment_id = ? AND total_score IS NOT NULL",
-                        (assignment['id'],)
-                    )
-                    all_scores.extend([s['total_score'] for s in scores])
-            
-            # 计算平均成绩
-            average_score = sum(all_scores) / len(all_scores) if all_scores else 0
-            
-            # 更新统计卡片
-            self.update_stat_card("total_students", total_students)
-            self.update_stat_card("total_courses", total_courses)
-            self.update_stat_card("total_assignments", total_assignments)
-            self.update_stat_card("average_score", f"{average_score:.1f}")
-            
-            # 绘制图表
-            self.draw_grade_distribution(all_scores)
-            self.draw_completion_rate()
-            
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载分析数据失败: {e}")
+                all_scores.extend([s['total_score'] for s in scores])
+        
+        # 计算平均成绩
+        average_score = sum(all_scores) / len(all_scores) if all_scores else 0
+        
+        return {
+            'total_students': total_students,
+            'total_courses': total_courses,
+            'total_assignments': total_assignments,
+            'average_score': average_score,
+            'all_scores': all_scores
+        }
+
+    def show_analytics(self, data):
+        """把统计数据显示到界面（主线程）"""
+        # 更新统计卡片
+        self.update_stat_card("total_students", data['total_students'])
+        self.update_stat_card("total_courses", data['total_courses'])
+        self.update_stat_card("total_assignments", data['total_assignments'])
+        self.update_stat_card("average_score", f"{data['average_score']:.1f}")
+        
+        # 绘制图表
+        self.draw_grade_distribution(data['all_scores'])
+        self.draw_completion_rate()
 
     def update_stat_card(self, key, value):
         """更新统计卡片"""
@@ -8,6 +8,7 @@ try:
 except ImportError:
     pass
 from modules.models import Assignment
+from modules.assignment_service import AssignmentService
 
 class AssignmentManagerFrame(ttk.Frame):
     def __init__(self, parent, user, db_manager):
@@ -246,9 +247,9 @@ class AddQuestionDialog(tk.Toplevel):
              messagebox.showwarning("提示", "分值必须是数字")
              return
 
-        query = "INSERT INTO question (assignment_id, type, content, answer, score, analysis) VALUES (?, ?, ?, ?, ?, ?)"
         try:
-            self.db.execute_update(query, (self.assignment_id, self.q_type, content, answer, score, analysis))
+            # 经服务层保存，同时写入标准答案的分词结果
+            AssignmentService(self.db).add_question(self.assignment_id, self.q_type, content, answer, score, analysis)
             self.callback()
             self.destroy()
         except Exception as e:
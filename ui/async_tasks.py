@@ -0,0 +1,157 @@
+"""
+界面异步任务
+- 服务调用在 DBExecutor 的工作线程中执行，Tk 主线程不再等待 SQL
+- 主线程用 after() 轮询结果，回调总是在主线程中执行
+- 组件销毁时取消尚未开始的任务，已在执行的任务结果直接丢弃
+- 组件有任务进行中时显示 LoadingOverlay
+"""
+import logging
+from config import DB_EXECUTOR_CONFIG
+from modules.db_executor import get_db_executor
+
+logger = logging.getLogger(__name__)
+
+class _Task:
+    __slots__ = ('future', 'widget', 'key', 'on_success', 'on_error')
+
+    def __init__(self, future, widget, key, on_success, on_error):
+        self.future = future
+        self.widget = widget
+        self.key = key
+        self.on_success = on_success
+        self.on_error = on_error
+
+class TkAsyncRunner:
+    def __init__(self, root, executor=None, poll_interval=None):
+        self.root = root
+        self.executor = executor or get_db_executor()
+        self.poll_interval = poll_interval or DB_EXECUTOR_CONFIG['poll_interval']
+        self._tasks = []
+        self._latest = {}  # (组件, key) -> 最新的 Future
+        self._overlays = {}  # 组件 -> LoadingOverlay
+        self._bound = set()  # 已绑定 <Destroy> 的组件
+        self._polling = False
+
+    def run(self, widget, func, *args, on_success=None, on_error=None, key=None,
+            loading=True, loading_message="加载中...", **kwargs):
+        """
+        在后台执行 func(*args, **kwargs)，完成后在主线程调用 on_success(result) 或 on_error(exception)
+        key: 同一组件同一 key 的新任务会取代旧任务，旧任务的结果被丢弃（例如快速切换下拉框）
+        返回: Future
+        """
+        future = self.executor.submit(func, *args, **kwargs)
+        task = _Task(future, widget, key, on_success, on_error)
+        self._tasks.append(task)
+
+        if key is not None:
+            previous = self._latest.get((str(widget), key))
+            if previous is not None:
+                previous.cancel()
+            self._latest[(str(widget), key)] = future
+
+        name = str(widget)
+        if name not in self._bound:
+            widget.bind('<Destroy>', lambda event, w=widget: self._on_destroy(event, w), add='+')
+            self._bound.add(name)
+
+        if loading:
+            self._show_loading(widget, loading_message)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+        return future
+
+    def cancel(self, widget):
+        """取消组件的所有任务"""
+        name = str(widget)
+        for task in self._tasks:
+            if str(task.widget) == name:
+                task.future.cancel()
+
+    def _on_destroy(self, event, widget):
+        # <Destroy> 也会从子组件冒泡上来，只处理组件自身
+        if event.widget is not widget:
+            return
+        self.cancel(widget)
+        name = str(widget)
+        self._tasks = [t for t in self._tasks if str(t.widget) != name]
+        self._overlays.pop(name, None)
+        self._bound.discard(name)
+        for latest_key in [k for k in self._latest if k[0] == name]:
+            del self._latest[latest_key]
+
+    def _poll(self):
+        pending = []
+        finished = []
+        for task in self._tasks:
+            (finished if task.future.done() else pending).append(task)
+        self._tasks = pending
+
+        for task in finished:
+            self._dispatch(task)
+
+        for widget in {str(t.widget): t.widget for t in finished}.values():
+            if not any(str(t.widget) == str(widget) for t in pending):
+                self._hide_loading(widget)
+
+        if self._tasks:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
+
+    def _dispatch(self, task):
+        """在主线程中执行回调"""
+        future = task.future
+        if future.cancelled() or not self._alive(task.widget):
+            return
+        if task.key is not None:
+            latest_key = (str(task.widget), task.key)
+            if self._latest.get(latest_key) is not future:
+                return  # 已被新任务取代
+            del self._latest[latest_key]
+
+        error = future.exception()
+        try:
+            if error is None:
+                if task.on_success:
+                    task.on_success(future.result())
+            elif task.on_error:
+                task.on_error(error)
+            else:
+                logger.error(f"Background task failed: {error}", exc_info=error)
+                from ui.components import MessageDialog
+                MessageDialog.show_error(task.widget, "错误", f"加载数据失败: {error}")
+        except Exception as e:
+            logger.error(f"Async callback failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _alive(widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _show_loading(self, widget, message):
+        name = str(widget)
+        overlay = self._overlays.get(name)
+        if overlay is None or not self._alive(overlay):
+            from ui.components import LoadingOverlay
+            overlay = self._overlays[name] = LoadingOverlay(widget, message)
+        overlay.show()
+
+    def _hide_loading(self, widget):
+        overlay = self._overlays.get(str(widget))
+        if overlay is not None and self._alive(overlay):
+            overlay.hide()
+
+def get_runner(widget):
+    """获取组件所在主窗口的 TkAsyncRunner（首次调用时创建）"""
+    root = widget._root()
+    runner = getattr(root, '_async_runner', None)
+    if runner is None:
+        runner = root._async_runner = TkAsyncRunner(root)
+    return runner
+
+def run_async(widget, func, *args, **kwargs):
+    """在后台执行服务调用，参数同 TkAsyncRunner.run"""
+    return get_runner(widget).run(widget, func, *args, **kwargs)
@@ -506,9 +506,9 @@ class LoadingOverlay(ttk.Frame):
         text_label.pack()
     
     def show(self):
-        """显示加载层"""
+        """显示加载层（hide 之后可以再次显示）"""
+        self.place(relx=0.5, rely=0.5, anchor=CENTER)
         self.lift()
-        self.update()
     
     def hide(self):
         """隐藏加载层"""
@@ -8,6 +8,7 @@ from .create_assignment_dialog import CreateAssignmentDialog
 from .create_post_dialog import CreatePostDialog
 from .reply_post_dialog import ReplyPostDialog
 from .edit_reply_dialog import EditReplyDialog
+from .submit_assignment_dialog import SubmitAssignmentDialog
 
 # 导入存根对话框类（暂未完整实现的功能）
 from ._dialog_stubs import (
@@ -24,7 +25,6 @@ from ._dialog_stubs import (
     EditGradeDialog,
     GenerateReportDialog,
     AssignmentDetailsDialog,
-    SubmitAssignmentDialog,
     ViewSubmissionDialog,
     ResourceDetailsDialog,
     ExportReportCardDialog,
@@ -48,6 +48,7 @@ __all__ = [
     'CreatePostDialog',
     'ReplyPostDialog',
     'EditReplyDialog',
+    'SubmitAssignmentDialog',
     'ClassDetailsDialog',
     'EditClassDialog',
     'ManageStudentsDialog',
@@ -61,7 +62,6 @@ __all__ = [
     'EditGradeDialog',
     'GenerateReportDialog',
     'AssignmentDetailsDialog',
-    'SubmitAssignmentDialog',
     'ViewSubmissionDialog',
     'ResourceDetailsDialog',
     'ExportReportCardDialog',
@@ -94,10 +94,6 @@ class AssignmentDetailsDialog(BaseStubDialog):
     def __init__(self, parent, assignment_id, assignment_service):
         super().__init__(parent, "作业详情", f"作业ID: {assignment_id}\n\n此功能正在开发中...")
 
-class SubmitAssignmentDialog(BaseStubDialog):
-    def __init__(self, parent, assignment_id, user, assignment_service, submission_service):
-        super().__init__(parent, "提交作业", f"提交作业ID: {assignment_id}\n\n此功能正在开发中...")
-
 class ViewSubmissionDialog(BaseStubDialog):
     def __init__(self, parent, assignment_id, user, submission_service):
         super().__init__(parent, "查看提交", f"查看作业ID: {assignment_id} 的提交\n\n此功能正在开发中...")
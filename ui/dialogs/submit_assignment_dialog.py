@@ -0,0 +1,159 @@
+"""
+提交作业对话框
+- 题目加载和提交都在后台线程执行
+- 提交只记录答案并加入评分队列（GradingQueue.submit），不在 Tk 主线程中评分；
+  评分完成后学生会收到成绩通知
+"""
+import tkinter as tk
+from tkinter import ttk
+from tkinter.constants import *
+try:
+    import ttkbootstrap as ttk
+    from ttkbootstrap.constants import *
+except ImportError:
+    pass
+
+from ui.components import MessageDialog
+from ui.async_tasks import run_async
+
+class SubmitAssignmentDialog(tk.Toplevel):
+    def __init__(self, parent, assignment_id, user, assignment_service, grading_queue):
+        super().__init__(parent)
+        self.title("提交作业")
+        self.geometry("800x600")
+        self.assignment_id = assignment_id
+        self.user = user
+        self.assignment_service = assignment_service
+        self.grading_queue = grading_queue
+        self.questions = []
+        self.answers = {}  # question_id -> StringVar 或 Text
+
+        self.create_widgets()
+        self.load_questions()
+
+        # 居中显示
+        self.transient(parent)
+        self.grab_set()
+        self.center_window()
+
+    def center_window(self):
+        """居中显示窗口"""
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+    def create_widgets(self):
+        """创建界面组件"""
+        # 按钮区域（在底部，不随题目滚动）
+        button_frame = ttk.Frame(self, padding=10)
+        button_frame.pack(side=BOTTOM, fill=X)
+
+        self.status_label = ttk.Label(button_frame, text="", bootstyle="info")
+        self.status_label.pack(side=LEFT)
+
+        cancel_btn = ttk.Button(
+            button_frame,
+            text="取消",
+            command=self.destroy,
+            bootstyle="outline",
+            width=10
+        )
+        cancel_btn.pack(side=RIGHT, padx=(10, 0))
+
+        self.submit_btn = ttk.Button(
+            button_frame,
+            text="提交",
+            command=self.submit,
+            bootstyle="success",
+            width=10,
+            state=DISABLED
+        )
+        self.submit_btn.pack(side=RIGHT)
+
+        # 题目区域
+        container = ttk.Frame(self)
+        container.pack(fill=BOTH, expand=True)
+
+        self.canvas = tk.Canvas(container)
+        scrollbar = ttk.Scrollbar(container, orient=VERTICAL, command=self.canvas.yview)
+        self.questions_frame = ttk.Frame(self.canvas)
+        self.questions_frame.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        )
+        self.canvas.create_window((0, 0), window=self.questions_frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+
+        self.canvas.pack(side=LEFT, fill=BOTH, expand=True)
+        scrollbar.pack(side=RIGHT, fill=Y)
+
+    def load_questions(self):
+        """加载题目（查询在后台线程执行）"""
+        run_async(
+            self, self.assignment_service.get_questions_by_assignment, self.assignment_id,
+            on_success=self.show_questions,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载题目失败: {e}")
+        )
+
+    def show_questions(self, questions):
+        """显示题目（主线程）"""
+        self.questions = questions
+        if not questions:
+            self.status_label.configure(text="该作业没有题目")
+            return
+
+        for i, question in enumerate(questions):
+            q_frame = ttk.LabelFrame(
+                self.questions_frame, text=f"第 {i + 1} 题 ({question.score} 分)", padding=10
+            )
+            q_frame.pack(fill=X, expand=True, padx=10, pady=5)
+
+            ttk.Label(q_frame, text=question.content, wraplength=700).pack(anchor=W)
+
+            if question.type == 'single_choice':
+                answer_var = tk.StringVar()
+                ttk.Entry(q_frame, textvariable=answer_var).pack(fill=X, pady=5)
+                ttk.Label(q_frame, text="请输入选项 (如 A, B)").pack(anchor=W)
+                self.answers[question.id] = answer_var
+            else:
+                answer_text = tk.Text(q_frame, height=3, wrap=WORD)
+                answer_text.pack(fill=X, pady=5)
+                self.answers[question.id] = answer_text
+
+        self.submit_btn.configure(state=NORMAL)
+
+    def get_answers(self):
+        """收集答案: {question_id: student_answer}"""
+        answers = {}
+        for question_id, widget in self.answers.items():
+            if isinstance(widget, tk.StringVar):
+                answers[question_id] = widget.get().strip()
+            else:
+                answers[question_id] = widget.get("1.0", END).strip()
+        return answers
+
+    def submit(self):
+        """提交作业：记录答案并加入评分队列，立即返回"""
+        if not MessageDialog.ask_yesno(self, "确认", "确定要提交吗？提交后不可修改。"):
+            return
+
+        self.submit_btn.configure(state=DISABLED)
+        run_async(
+            self, self.grading_queue.submit, self.user.id, self.assignment_id, self.get_answers(),
+            on_success=self.on_submitted,
+            on_error=self.on_submit_failed,
+            loading_message="正在提交..."
+        )
+
+    def on_submitted(self, submission_id):
+        """提交成功（主线程）：评分在后台进行"""
+        MessageDialog.show_info(self, "成功", "已提交，正在评分。评分完成后会收到成绩通知。")
+        self.destroy()
+
+    def on_submit_failed(self, error):
+        """提交失败（主线程）"""
+        self.submit_btn.configure(state=NORMAL)
+        MessageDialog.show_error(self, "错误", f"提交作业失败: {error}")
@@ -13,6 +13,7 @@ except ImportError:
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from ui.components import DataTable, SearchBar, MessageDialog
+from ui.async_tasks import run_async
 
 # Windows 中文字体修复
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
@@ -247,24 +248,28 @@ class GradeManagerFrame(ttk.Frame):
         publish_btn.pack(side=LEFT, padx=(0, 5))
 
     def load_courses(self):
-        """加载课程列表"""
-        try:
-            courses = self.course_service.get_courses_by_teacher(self.user.id, status='published')
-            course_options = []
-            self.course_map = {}
-            
-            for course in courses:
-                course_options.append(f"{course.id}: {course.title}")
-                self.course_map[course.id] = course
-            
-            self.course_combo['values'] = course_options
-            
-            if course_options:
-                self.course_combo.current(0)
-                self.on_course_selected(None)
-            
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载课程失败: {e}")
+        """加载课程列表（查询在后台线程执行）"""
+        run_async(
+            self, self.course_service.get_courses_by_teacher, self.user.id, status='published',
+            on_success=self.show_courses,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载课程失败: {e}"),
+            key='courses'
+        )
+
+    def show_courses(self, courses):
+        """显示课程列表（主线程）"""
+        course_options = []
+        self.course_map = {}
+        
+        for course in courses:
+            course_options.append(f"{course.id}: {course.title}")
+            self.course_map[course.id] = course
+        
+        self.course_combo['values'] = course_options
+        
+        if course_options:
+            self.course_combo.current(0)
+            self.on_course_selected(None)
 
     def on_course_selected(self, event):
         """课程选择事件"""
@@ -272,25 +277,29 @@ class GradeManagerFrame(ttk.Frame):
         if not course_text:
             return
         
-        try:
-            course_id = int(course_text.split(":")[0])
-            self.current_course_id = course_id
-            
-            # 加载作业列表
-            assignments = self.assignment_service.get_assignments_by_course(course_id)
-            assignment_options = ["全部作业"]
-            self.assignment_map = {"全部作业": None}
-            
-            for assignment in assignments:
-                assignment_options.append(f"{assignment.id}: {assignment.title}")
-                self.assignment_map[assignment.id] = assignment
-            
-            self.assignment_combo['values'] = assignment_options
-            self.assignment_combo.current(0)
-            self.on_assignment_selected(None)
-            
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载作业失败: {e}")
+        course_id = int(course_text.split(":")[0])
+        self.current_course_id = course_id
+        
+        # 加载作业列表
+        run_async(
+            self, self.assignment_service.get_assignments_by_course, course_id,
+            on_success=self.show_assignments,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载作业失败: {e}"),
+            key='assignments'
+        )
+
+    def show_assignments(self, assignments):
+        """显示作业列表（主线程）"""
+        assignment_options = ["全部作业"]
+        self.assignment_map = {"全部作业": None}
+        
+        for assignment in assignments:
+            assignment_options.append(f"{assignment.id}: {assignment.title}")
+            self.assignment_map[assignment.id] = assignment
+        
+        self.assignment_combo['values'] = assignment_options
+        self.assignment_combo.current(0)
+        self.on_assignment_selected(None)
 
     def on_assignment_selected(self, event):
         """作业选择事件"""
@@ -311,55 +320,62 @@ class GradeManagerFrame(ttk.Frame):
             MessageDialog.show_error(self, "错误", f"加载成绩失败: {e}")
 
     def load_course_grades(self):
-        """加载课程所有成绩"""
-        try:
-            grades_data = self.gradebook_service.get_course_grades(self.current_course_id)
-            
-            table_data = []
-            for student in grades_data['students']:
-                student_id = student['student_id']
-                student_stats = grades_data['student_stats'].get(student_id, {})
-                
-                table_data.append([
-                    student['username'],
-                    student['nickname'],
-                    student_stats.get('average_score', ''),
-                    student_stats.get('average_grade', ''),
-                    '',  # 提交时间
-                    '已统计',  # 状态
-                    ''  # 评语
-                ])
-            
-            self.grade_table.update_data(table_data)
-            self.update_statistics(grades_data)
-            self.update_chart(grades_data)
+        """加载课程所有成绩（查询在后台线程执行）"""
+        # 与作业成绩共用 key，快速切换时只显示最后一次选择的结果
+        run_async(
+            self, self.gradebook_service.get_course_grades, self.current_course_id,
+            on_success=self.show_course_grades,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载课程成绩失败: {e}"),
+            key='grades'
+        )
+
+    def show_course_grades(self, grades_data):
+        """显示课程所有成绩（主线程）"""
+        table_data = []
+        for student in grades_data['students']:
+            student_id = student['student_id']
+            student_stats = grades_data['student_stats'].get(student_id, {})
             
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载课程成绩失败: {e}")
+            table_data.append([
+                student['username'],
+                student['nickname'],
+                student_stats.get('average_score', ''),
+                student_stats.get('average_grade', ''),
+                '',  # 提交时间
+                '已统计',  # 状态
+                ''  # 评语
+            ])
+        
+        self.grade_table.update_data(table_data)
+        self.update_statistics(grades_data)
+        self.update_chart(grades_data)
 
     def load_assignment_grades(self):
-        """加载作业成绩"""
-        try:
-            grades = self.gradebook_service.get_assignment_grades(self.current_assignment_id)
-            
-            table_data = []
-            for grade in grades:
-                table_data.append([
-                    grade['username'],
-                    grade['student_name'],
-                    grade['score'] if grade['score'] is not None else '未评分',
-                    grade['grade'] if grade['grade'] else '未评级',
-                    grade.get('submit_time', ''),
-                    '已提交' if grade.get('submit_time') else '未提交',
-                    grade.get('comment', '')
-                ])
-            
-            self.grade_table.update_data(table_data)
-            self.update_assignment_statistics(grades)
-            self.update_assignment_chart(grades)
-            
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载作业成绩失败: {e}")
+        """加载作业成绩（查询在后台线程执行）"""
+        run_async(
+            self, self.gradebook_service.get_assignment_grades, self.current_assignment_id,
+            on_success=self.show_assignment_grades,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载作业成绩失败: {e}"),
+            key='grades'
+        )
+
+    def show_assignment_grades(self, grades):
+        """显示作业成绩（主线程）"""
+        table_data = []
+        for grade in grades:
+            table_data.append([
+                grade['username'],
+                grade['student_name'],
+                grade['score'] if grade['score'] is not None else '未评分',
+                grade['grade'] if grade['grade'] else '未评级',
+                grade.get('submit_time', ''),
+                '已提交' if grade.get('submit_time') else '未提交',
+                grade.get('comment', '')
+            ])
+        
+        self.grade_table.update_data(table_data)
+        self.update_assignment_statistics(grades)
+        self.update_assignment_chart(grades)
 
     def update_statistics(self, grades_data):
         """更新统计信息"""
@@ -490,10 +506,22 @@ class GradeManagerFrame(ttk.Frame):
         """导出成绩"""
         if hasattr(self, 'current_course_id'):
             try:
-                export_data = self.gradebook_service.export_grades(self.current_course_id)
-                from ui.dialogs import ExportGradesDialog
-                dialog = ExportGradesDialog(self, export_data)
-                dialog.grab_set()
+                from tkinter import filedialog
+                from utils.export_utils import ExportUtils
+                save_path = filedialog.asksaveasfilename(
+                    title="导出成绩",
+                    initialfile=ExportUtils.generate_filename("成绩", "csv"),
+                    defaultextension=".csv",
+                    filetypes=[("CSV 文件", "*.csv")]
+                )
+                if not save_path:
+                    return
+                # 成绩逐行写入文件，不在内存中构建完整成绩表
+                success, message = self.gradebook_service.export_grades_csv(self.current_course_id, save_path)
+                if success:
+                    MessageDialog.show_info(self, "成功", message)
+                else:
+                    MessageDialog.show_error(self, "错误", message)
             except Exception as e:
                 MessageDialog.show_error(self, "错误", f"导出成绩失败: {e}")
         else:
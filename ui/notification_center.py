@@ -11,6 +11,7 @@ except ImportError:
     pass
 
 from ui.components import DataTable, SearchBar, Pagination, MessageDialog
+from ui.async_tasks import run_async
 
 class NotificationCenter(ttk.Frame):
     def __init__(self, parent, user, notification_service):
@@ -208,41 +209,43 @@ class NotificationCenter(ttk.Frame):
             self.stats_labels[key].pack()
 
     def load_notifications(self):
-        """加载通知列表"""
-        try:
-            notifications = self.notification_service.get_user_notifications(
-                self.user.id, unread_only=False, limit=100
-            )
-            
-            table_data = []
-            for notification in notifications:
-                # 类型图标
-                type_icons = {
-                    'assignment': '📝',
-                    'grade': '��',
-                    'discussion': '💬',
-                    'system': '⚙️',
-                    'reminder': '⏰'
-                }
-                type_icon = type_icons.get(notification['type'], '📌')
-                type_text = f"{type_icon} {notification['type']}"
-                
-                # 状态文本
-                status_text = "未读" if not notification['is_read'] else "已读"
-                
-                table_data.append([
-                    notification['id'],
-                    type_text,
-                    notification['title'],
-                    status_text,
-                    notification['created_at']
-                ])
+        """加载通知列表（查询在后台线程执行）"""
+        run_async(
+            self, self.notification_service.get_user_notifications,
+            self.user.id, unread_only=False, limit=100,
+            on_success=self.show_notifications,
+            on_error=lambda e: MessageDialog.show_error(self, "错误", f"加载通知失败: {e}"),
+            key='notifications'
+        )
+
+    def show_notifications(self, notifications):
+        """显示通知列表（主线程）"""
+        table_data = []
+        for notification in notifications:
+            # 类型图标
+            type_icons = {
+                'assignment': '📝',
+                'grade': '��',
+                'discussion': '💬',
+                'system': '⚙️',
+                'reminder': '⏰'
+            }
+            type_icon = type_icons.get(notification['type'], '📌')
+            type_text = f"{type_icon} {notification['type']}"
             
-            self.notification_table.update_data(table_data)
-            self.update_statistics(notifications)
+            # 状态文本
+            status_text = "未读" if not notification['is_read'] else "已读"
             
-        except Exception as e:
-            MessageDialog.show_error(self, "错误", f"加载通知失败: {e}")
+            table_data.append([
+                notification['id'],
+                type_text,
+                notification['title'],
+                status_text,
+                notification['created_at']
+            ])
+        
+        self.notification_table.update_data(table_data)
+        self.update_statistics(notifications)
 
     def update_statistics(self, notifications):
         """更新统计信息"""
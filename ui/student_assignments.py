@@ -12,13 +12,33 @@ except ImportError:
 
 from ui.components import DataTable, SearchBar, MessageDialog
 
+# 已提交作业的状态：评分队列中的任务（queued / running）显示为评分中，重试用尽的任务显示为评分失败
+GRADING_STATUS_LABELS = {
+    'graded': "已批改",
+    'reviewing': "待复核",
+    'rejected': "已退回"
+}
+JOB_STATUS_LABELS = {
+    'queued': "评分中",
+    'running': "评分中",
+    'failed': "评分失败"
+}
+SUBMITTED_LABELS = ("已提交", "评分中", "评分失败", "待复核", "已退回")
+
+def submission_status(grading_status, job_status=None):
+    """提交记录的显示状态"""
+    if grading_status in GRADING_STATUS_LABELS:
+        return GRADING_STATUS_LABELS[grading_status]
+    return JOB_STATUS_LABELS.get(job_status, "已提交")
+
 class StudentAssignmentsFrame(ttk.Frame):
-    def __init__(self, parent, user, assignment_service, submission_service, course_service):
+    def __init__(self, parent, user, assignment_service, submission_service, course_service, grading_queue):
         super().__init__(parent)
         self.user = user
         self.assignment_service = assignment_service
         self.submission_service = submission_service
         self.course_service = course_service
+        self.grading_queue = grading_queue
         
         self.pack(fill=BOTH, expand=True)
         
@@ -198,12 +218,11 @@ class StudentAssignmentsFrame(ttk.Frame):
                     submission_time = ""
                     
                     if submission:
+                        status = submission_status(submission['grading_status'], submission['job_status'])
                         if submission['grading_status'] == 'graded':
-                            status = "已批改"
                             score = f"{submission['total_score']:.1f}"
                             assignment_stats['graded'] += 1
                         else:
-                            status = "已提交"
                             assignment_stats['submitted'] += 1
                         submission_time = submission.get('submit_time', '')
                     else:
@@ -242,7 +261,7 @@ class StudentAssignmentsFrame(ttk.Frame):
                 for row in table_data:
                     if status_filter == "pending" and row[4] == "待完成":
                         filtered_data.append(row)
-                    elif status_filter == "submitted" and row[4] == "已提交":
+                    elif status_filter == "submitted" and row[4] in SUBMITTED_LABELS:
                         filtered_data.append(row)
                     elif status_filter == "graded" and row[4] == "已批改":
                         filtered_data.append(row)
@@ -295,7 +314,7 @@ class StudentAssignmentsFrame(ttk.Frame):
         assignment_id = selected[0]
         status = selected[4]
         
-        if status in ["已提交", "已批改"]:
+        if status in SUBMITTED_LABELS or status == "已批改":
             MessageDialog.show_warning(self, "提示", "该作业已经提交")
             return
         
@@ -305,7 +324,7 @@ class StudentAssignmentsFrame(ttk.Frame):
             assignment_id, 
             self.user, 
             self.assignment_service,
-            self.submission_service
+            self.grading_queue
         )
         dialog.grab_set()
         self.wait_window(dialog)
@@ -20,7 +20,7 @@ from ui.student_resources import StudentResourcesFrame
 class StudentDashboard(ttk.Frame):
     def __init__(self, parent, user, db, class_service, course_service, 
                  assignment_service, submission_service, discussion_service,
-                 notification_service, gradebook_service, analytics_service, logout_callback):
+                 notification_service, gradebook_service, analytics_service, grading_queue, logout_callback):
         super().__init__(parent)
         self.user = user
         self.db = db
@@ -32,6 +32,7 @@ class StudentDashboard(ttk.Frame):
         self.notification_service = notification_service
         self.gradebook_service = gradebook_service
         self.analytics_service = analytics_service
+        self.grading_queue = grading_queue
         self.logout_callback = logout_callback
         
         self.pack(fill=BOTH, expand=True)
@@ -316,7 +317,8 @@ class StudentDashboard(ttk.Frame):
             self.user,
             self.assignment_service,
             self.submission_service,
-            self.course_service
+            self.course_service,
+            self.grading_queue
         )
         assignments_frame.pack(fill=BOTH, expand=True)
 
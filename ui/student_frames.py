@@ -8,13 +8,14 @@ try:
 except ImportError:
     pass
 from modules.models import Assignment, Question
-from modules.ai_grader import AIGrader
+from ui.student_assignments import submission_status
 
 class StudentAssignmentListFrame(ttk.Frame):
-    def __init__(self, parent, user, db_manager):
+    def __init__(self, parent, user, db_manager, grading_queue):
         super().__init__(parent)
         self.user = user
         self.db = db_manager
+        self.grading_queue = grading_queue
         self.pack(fill=BOTH, expand=True)
 
         self.create_widgets()
@@ -57,9 +58,13 @@ class StudentAssignmentListFrame(ttk.Frame):
         
         for row in rows:
             # Check if submitted
-            sub_query = "SELECT id FROM submission WHERE student_id = ? AND assignment_id = ?"
+            sub_query = """
+                SELECT s.id, s.grading_status, j.status as job_status
+                FROM submission s LEFT JOIN grading_job j ON j.submission_id = s.id
+                WHERE s.student_id = ? AND s.assignment_id = ?
+            """
             sub = self.db.execute_query(sub_query, (self.user.id, row['id']))
-            status = "已提交" if sub else "未完成"
+            status = submission_status(sub[0]['grading_status'], sub[0]['job_status']) if sub else "未完成"
             
             self.tree.insert("", END, values=(row['id'], row['title'], row['teacher_name'], row['deadline'], status))
 
@@ -69,20 +74,21 @@ class StudentAssignmentListFrame(ttk.Frame):
         assignment_id = values[0]
         status = values[4]
         
-        if status == "已提交":
+        if status != "未完成":
             messagebox.showinfo("提示", "您已经提交过该作业")
             return
 
-        TakingAssignmentDialog(self, assignment_id, self.user, self.db, self.load_assignments)
+        TakingAssignmentDialog(self, assignment_id, self.user, self.db, self.grading_queue, self.load_assignments)
 
 class TakingAssignmentDialog(tk.Toplevel):
-    def __init__(self, parent, assignment_id, user, db_manager, callback):
+    def __init__(self, parent, assignment_id, user, db_manager, grading_queue, callback):
         super().__init__(parent)
         self.title("答题中...")
         self.geometry("800x600")
         self.assignment_id = assignment_id
         self.user = user
         self.db = db_manager
+        self.grading_queue = grading_queue
         self.callback = callback
         self.answers = {} # question_id -> answer
         
@@ -174,47 +180,22 @@ class TakingAssignmentDialog(tk.Toplevel):
         if not messagebox.askyesno("确认", "确定要提交吗？提交后不可修改。"):
             return
 
-        total_score = 0
-        submission_id = self.db.execute_update(
-            "INSERT INTO submission (student_id, assignment_id, total_score) VALUES (?, ?, ?)",
-            (self.user.id, self.assignment_id, 0) # Score updated later
-        )
-
-        # Process answers
+        # Collect answers
+        answers = {}
         for q in self.questions:
-            student_ans = ""
             if isinstance(self.answers[q.id], tk.StringVar):
-                student_ans = self.answers[q.id].get().strip()
+                answers[q.id] = self.answers[q.id].get().strip()
             else:
-                student_ans = self.answers[q.id].get("1.0", END).strip()
-            
-            is_correct = False
-            score = 0
-            ai_feedback = ""
-            
-            # Object Questions
-            if q.type == 'single_choice':
-                if AIGrader.grade_objective(student_ans, q.answer):
-                    is_correct = True
-                    score = q.score
-            
-            # Subjective Questions (AI Grading)
-            elif q.type == 'subjective':
-                # Use standard answer + analysis as reference
-                reference = q.answer + " " + (q.analysis or "")
-                score, ai_feedback = AIGrader.grade_subjective(student_ans, reference, q.score)
-            
-            total_score += score
-            
-            self.db.execute_update(
-                "INSERT INTO submission_detail (submission_id, question_id, student_answer, is_correct, score, ai_feedback) VALUES (?, ?, ?, ?, ?, ?)",
-                (submission_id, q.id, student_ans, is_correct, score, ai_feedback)
-            )
+                answers[q.id] = self.answers[q.id].get("1.0", END).strip()
 
-        # Update total score
-        self.db.execute_update("UPDATE submission SET total_score = ? WHERE id = ?", (total_score, submission_id))
-        
-        messagebox.showinfo("成功", f"提交成功！初步得分: {total_score:.1f}")
+        # Only record the answers and enqueue; grading runs on the queue's worker threads
+        try:
+            self.grading_queue.submit(self.user.id, self.assignment_id, answers)
+        except Exception as e:
+            messagebox.showerror("错误", f"提交失败: {e}")
+            return
+
+        messagebox.showinfo("成功", "已提交，正在评分。评分完成后会收到成绩通知。")
         self.callback()
         self.destroy()
 
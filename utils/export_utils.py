@@ -1,6 +1,7 @@
 """
 导出工具 - 支持导出成绩为 Excel/PDF
 """
+import csv
 import logging
 from datetime import datetime
 
@@ -63,6 +64,28 @@ class ExportUtils:
             logger.error(f"Export to Excel failed: {e}")
             return False, f"导出失败: {str(e)}"
 
+    @staticmethod
+    def export_rows_to_csv(rows, filename, headers=None):
+        """
+        导出数据到 CSV
+        rows: 可迭代的行（list/tuple），逐行写入，可以直接传入生成器
+        """
+        try:
+            count = 0
+            # utf-8-sig 让 Excel 正确识别中文
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                if headers:
+                    writer.writerow(headers)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            logger.info(f"Data exported to CSV: {filename}, {count} rows")
+            return True, f"导出成功: {filename}"
+        except Exception as e:
+            logger.error(f"Export to CSV failed: {e}")
+            return False, f"导出失败: {str(e)}"
+
     @staticmethod
     def export_to_pdf(data, filename, title="成绩报告"):
         """